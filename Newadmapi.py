@@ -1,36 +1,83 @@
-# adm_api.py
+# Newadmapi.py
 import logging
+import multiprocessing
+import threading
 import time
+import zlib
 from datetime import datetime, timedelta, date
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 from sqlalchemy import text
-from database.connectors import get_adm_engine, get_atls_engine
+from database.session import adm_connection, atls_connection
+from api.adm_api import MessageIdSet
+from api.aod_progress import AodProgressTracker
+from api.cache_backends import get_cache_backend
+from api.row_store import RowInterner, as_compact_rows, compact_rows
+from api.singleflight import SingleFlight
+from api.workflow_eval import (AOD_STAGE_MARKERS, ENABLE_ADM_FALLBACK_WHEN_ATLS_EMPTY, EXPECTED_SUBJECTS,
+                               GLOBAL_AOD_FINAL_MARKER, _norm_snapshot, evaluate_pairs, evaluate_workflow,
+                               index_message_ids)
 
 """
-adm_api.py
-
-Updated to avoid duplicate combined-SQL DB calls:
-- After get_combined_workflow_status fetches combined rows (all_rows),
-  it populates a short-lived in-memory cache (_COMBINED_ROWS_CACHE) keyed by
-  (client, region, business_date).
-- get_all_reporting_loaders_status will reuse cached all_rows when available,
-  avoiding a second DB call for the same client/region/business_date.
-- If cache miss, get_all_reporting_loaders_status falls back to calling
-  get_combined_workflow_sql_rows() (single DB call).
-No other workflow logic changes.
+Newadmapi.py
+
+Workflow statuses from the combined ADM rows (markers, final_markers, error_logs,
+reporting_loaders_markers) matched against the ATLS message ids:
+- get_combined_workflow_status fetches the rows once per call, either per snapshot with the
+  ATLS ids pushed down into SQL or streamed and grouped as they arrive, and evaluates every
+  (client, region, workflow) from the grouped rows. Identical concurrent calls share one run.
+- The grouped rows are stored per (client, region, business_date) in _COMBINED_ROWS_CACHE
+  (memory, file or redis backend, short TTL), so get_all_reporting_loaders_status and
+  get_aod_progress reuse them instead of querying again; on a miss they fetch them once.
+- With ENABLE_INCREMENTAL_REFRESH only rows past the per-source created_at watermarks are
+  fetched and only the affected workflows are re-evaluated.
 """
 
 logger = logging.getLogger(__name__)
 
 # ----------------------------------
-# Tunables
+# Tunables (the evaluation ones, e.g. ENABLE_ADM_FALLBACK_WHEN_ATLS_EMPTY, are in api.workflow_eval)
 # ----------------------------------
-LONG_RUNNING_THRESHOLD_MINUTES = 30
-ENABLE_ADM_FALLBACK_WHEN_ATLS_EMPTY = True  # If True, evaluate status from ADM markers when ATLS IDs are missing
+ENABLE_ADM_ID_PUSHDOWN = True  # If True, filter ADM rows by the ATLS message ids per snapshot in SQL
+FETCH_MAX_WORKERS = 6  # ATLS/ADM fetches that run concurrently (each on its own pooled connection)
+ENABLE_STREAMING_FETCH = True  # If True, stream the combined SQL through a server-side cursor and group on the fly
+STREAM_BATCH_SIZE = 5000  # Rows per server-side cursor fetch in streaming mode
+ENABLE_INCREMENTAL_REFRESH = False  # If True, refresh combined rows by created_at watermark instead of refetching
+INCREMENTAL_FULL_REFRESH_SECONDS = 600  # Full refetch at least this often even without a detected gap
+INCREMENTAL_MAX_STATES = 4  # (business_date, scope) states kept for incremental refresh; least recently used dropped
+ENABLE_SHARDED_EVALUATION = False  # If True, evaluate all-clients mode in worker processes, sharded by client
+EVALUATION_WORKERS = 4  # Worker processes (= shards) for sharded evaluation
+SHARDED_EVALUATION_MIN_PAIRS = 50  # Below this many pairs, shipping the rows costs more than it saves
+
+# Worker threads have no app context, so every fetch checks out its own connection
+_FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=FETCH_MAX_WORKERS, thread_name_prefix="newadm-fetch")
 
 # Cache TTL for combined rows (seconds). Keep short to avoid stale data.
 _COMBINED_ROWS_CACHE_TTL_SECONDS = 20
-_COMBINED_ROWS_CACHE = {}  # key -> {"ts": epoch_seconds, "rows": [...]}
+# Backend chosen by CACHE_BACKEND (memory | file | redis); file/redis are shared by all workers on the host
+_COMBINED_ROWS_CACHE = get_cache_backend("combined_rows", default_ttl=_COMBINED_ROWS_CACHE_TTL_SECONDS)
+
+# Concurrent identical computations share one in-flight run (see api.singleflight)
+_STATUS_FLIGHTS = SingleFlight("combined_workflow_status")
+_ROWS_FLIGHTS = SingleFlight("combined_rows")
+
+# Evaluation worker processes, created on first use. Spawned rather than forked: the parent runs
+# fetch threads and holds pooled connections, neither of which may be copied into a child. The
+# workers run api.workflow_eval.evaluate_pairs and import only that module (no pools, no cache).
+_EVALUATION_POOL = None
+_EVALUATION_POOL_LOCK = threading.Lock()
+
+# Incremental refresh state per (business_date, SQL scope (client_filter, region_filter)), least
+# recently used first:
+#   counts {source: rows up to the watermark, see _source_counts}, grouped, watermarks {source: max
+#   created_at}, full_ts, workflows {(client, region, workflow_type): workflow},
+#   atls_ids {same key: tuple of ids}, aod {(client, region, "AOD", business_dt): AodProgressTracker}
+# Every key has its own lock, so refreshes of other dates or scopes never wait on each other.
+_INCREMENTAL_STATE = OrderedDict()
+_INCREMENTAL_LOCKS = {}
+_INCREMENTAL_LOCK = threading.Lock()  # guards the two dicts above, never held during a refresh
+_WATERMARK_FLOOR = datetime(1970, 1, 1)
 
 # Canonical region mapping if systems differ on labels/case
 REGION_MAP = {
@@ -53,63 +100,6 @@ WORKFLOW_ORDER = {
     'sod_enrich': 29, 'sod_roll': 30, 'sod_mart': 31, 'sod_final': 32
 }
 
-EXPECTED_SUBJECTS = {
-    "eodpx_raw": ["valuation_prices"],
-    "eodpx_enrich": ["valuation_prices"],
-    "eodpx_roll": ["valuation_prices"],
-    "eodpx_mart": ["valuation_prices"],
-    "eodpx_final": ["valuation_prices"],
-
-    "eod_raw": ["positions", "taxlots", "transactions", "cash_settlements", "disposal_lots"],
-    "eod_enrich": ["positions", "taxlots", "transactions", "cash_settlements", "disposal_lots"],
-    "eod_roll": ["positions", "taxlots", "transactions", "cash_settlements", "disposal_lots"],
-    "eod_mart": ["positions", "taxlots", "transactions", "cash_settlements", "disposal_lots"],
-    "eod_final": ["positions", "taxlots", "transactions", "cash_settlements", "disposal_lots"],
-
-    "aod_raw": ["positions", "taxlots"],
-    "aod_enrich": ["positions", "taxlots"],
-    "aod_roll": ["positions", "taxlots"],
-    "aod_mart": ["positions", "taxlots"],
-    "aod_final": ["positions", "taxlots"],
-
-    "sod_raw": ["positions", "taxlots", "transactions", "cash_settlements", "disposal_lots"],
-    "sod_enrich": ["positions", "taxlots", "transactions", "cash_settlements", "disposal_lots"],
-    "sod_roll": ["positions", "taxlots", "transactions", "cash_settlements", "disposal_lots"],
-    "sod_mart": ["positions", "taxlots", "transactions", "cash_settlements", "disposal_lots"],
-    "sod_final": ["positions", "taxlots", "transactions", "cash_settlements", "disposal_lots"]
-}
-
-# Stage → marker_type_cd filtering
-STAGE_MARKER_FILTERS = {
-    ("EOD", "RAW"): "eodRegionSubjectAreaRawLoadComplete",
-    ("EOD", "ENRICH"): "eodRegionSubjectAreaEnriched",
-    ("EOD", "ROLL"): "eodRegionSubjectAreaRollupComplete",
-    ("EOD", "MART"): {
-        "eodRegionPositionsMartLoadComplete",
-        "eodRegionTaxlotsMartLoadComplete",
-        "eodRegionTransactionsMartLoadComplete",
-        "eodRegionDisposalLotsMartLoadComplete",
-        "eodRegionCashSettlementsMartLoadComplete",
-    },
-
-    ("SOD", "RAW"): "sodRegionSubjectAreaRawLoadComplete",
-    ("SOD", "ENRICH"): "sodRegionSubjectAreaEnriched",
-    ("SOD", "ROLL"): "sodRegionSubjectAreaRollupComplete",
-    ("SOD", "MART"): {
-        "sodRegionPositionsMartLoadComplete",
-        "sodRegionTaxlotsMartLoadComplete",
-        "sodRegionTransactionsMartLoadComplete",
-        "sodRegionDisposalLotsMartLoadComplete",
-        "sodRegionCashSettlementsMartLoadComplete",
-    },
-
-    ("AOD", "RAW"): "asOfRegionSubjectAreaRawLoadComplete",
-    ("AOD", "ENRICH"): "asOfRegionSubjectAreaEnriched",
-    ("AOD", "ROLL"): "asOfRegionSubjectAreaRollupComplete",
-    ("AOD", "MART"): "asOfRegionSubjectAreaMartLoadComplete",
-    ("AOD", "FINAL"): "asOfRegionsStatementsPublished",
-}
-
 # --------------------------------------------------------------------
 # Reporting static mapping (from your old code)
 # --------------------------------------------------------------------
@@ -168,20 +158,23 @@ REPORTING_STATIC_MARKERS = {
 # ----------------------------------
 
 
+# The normalizers see the same few values on every row: memoized per distinct input
+NORM_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=NORM_CACHE_SIZE)
 def _norm_client(v: str) -> str:
     return (v or "").strip().upper()
 
 
+@lru_cache(maxsize=NORM_CACHE_SIZE)
 def _norm_region(v: str) -> str:
     if v is None:
         return ""
     return REGION_MAP.get(v, REGION_MAP.get(v.upper(), v.strip().upper()))
 
 
-def _norm_snapshot(v: str) -> str:
-    return (v or "").strip().upper()
-
-
+@lru_cache(maxsize=NORM_CACHE_SIZE)
 def _norm_date(d) -> str:
     """Accepts date/datetime/str and returns YYYY-MM-DD string."""
     if d is None:
@@ -198,62 +191,96 @@ def _norm_date(d) -> str:
     return str(d)
 
 
+@lru_cache(maxsize=NORM_CACHE_SIZE)
+def _group_key(client_cd, processing_region_cd, snapshot_type_cd, business_dt):
+    """(client, region, snapshot, business_dt) grouping key of a row, one cache lookup per row"""
+    return (
+        _norm_client(client_cd),
+        _norm_region(processing_region_cd),
+        _norm_snapshot(snapshot_type_cd),
+        _norm_date(business_dt),
+    )
+
+
 def _cache_put_combined_rows(client, region, business_date, rows):
     """Store combined rows into short-lived cache for reuse."""
     key = (client or "").upper(), (region or "").upper(), business_date
-    _COMBINED_ROWS_CACHE[key] = {"ts": time.time(), "rows": rows}
+    try:
+        _COMBINED_ROWS_CACHE.set(key, rows)
+    except Exception:
+        logger.exception("Error caching combined rows for key=%s", key)
+        return
     logger.debug("Cached combined rows for key=%s (rows=%d)", key, len(rows))
 
 
 def _cache_get_combined_rows(client, region, business_date):
     """Return cached combined rows or None if expired/missing."""
     key = (client or "").upper(), (region or "").upper(), business_date
-    rec = _COMBINED_ROWS_CACHE.get(key)
-    if not rec:
-        return None
-    if time.time() - rec["ts"] > _COMBINED_ROWS_CACHE_TTL_SECONDS:
-        del _COMBINED_ROWS_CACHE[key]
-        logger.debug("Combined rows cache expired for key=%s", key)
+    rows = _COMBINED_ROWS_CACHE.get(key)
+    if rows is None:
+        logger.debug("Combined rows cache miss for key=%s", key)
         return None
-    logger.debug("Reusing cached combined rows for key=%s (rows=%d)", key, len(rec["rows"]))
-    return rec["rows"]
+    logger.debug("Reusing cached combined rows for key=%s (rows=%d)", key, len(rows))
+    return rows
+
+
+def get_combined_rows_cache_info():
+    """Backend name, size and hit/miss/eviction counters of the combined rows cache."""
+    return _COMBINED_ROWS_CACHE.info()
 
 # ----------------------------------
 # SQL builder
 # ----------------------------------
 
 
-def get_combined_workflow_sql_all(business_date: str, sod_date: str) -> str:
+# All builders emit named bind parameters (:business_date, :sod_date, :client, :region)
+# so the SQL text is identical on every call and the server can reuse its plan.
+
+
+def get_combined_workflow_sql_all(business_date: str = None, sod_date: str = None) -> str:
     return get_combined_workflow_sql_base(business_date, sod_date)
 
 
-def get_combined_workflow_sql_for_client_region(business_date: str, sod_date: str, client: str, region: str) -> str:
-    client_val = client.strip() if client else None
-    region_val = region.strip() if region else None
+def _combined_bases(filter_client: bool, filter_region: bool):
+    """WHERE conditions (base_m, base_fm) for the date-scoped combined SQL."""
+    conds_m = ["m.business_dt IN (:business_date, :sod_date)"]
+    if filter_client:
+        conds_m.append("UPPER(m.client_cd) = UPPER(:client)")
+    if filter_region:
+        conds_m.append("UPPER(m.processing_region_cd) = UPPER(:region)")
 
-    conds_m = [f"m.business_dt IN ('{business_date}', '{sod_date}')"]
-    if client_val:
-        conds_m.append(f"UPPER(m.client_cd) = UPPER('{client_val}')")
-    if region_val:
-        conds_m.append(f"UPPER(m.processing_region_cd) = UPPER('{region_val}')")
-    base_m = " AND ".join(conds_m)
+    conds_fm = ["CAST(fm.marker->'payload'->>'business_date' AS date) IN (:business_date, :sod_date)"]
+    if filter_client:
+        conds_fm.append("UPPER(fm.marker->'header'->>'party_cd') = UPPER(:client)")
+    if filter_region:
+        conds_fm.append("UPPER(fm.marker->'header'->>'processing_region_cd') = UPPER(:region)")
 
-    conds_fm = [f"CAST(fm.marker->'payload'->>'business_date' AS date) IN ('{business_date}', '{sod_date}')"]
-    if client_val:
-        conds_fm.append(f"UPPER(fm.marker->'header'->>'party_cd') = UPPER('{client_val}')")
-    if region_val:
-        conds_fm.append(f"UPPER(fm.marker->'header'->>'processing_region_cd') = UPPER('{region_val}')")
-    base_fm = " AND ".join(conds_fm)
+    return " AND ".join(conds_m), " AND ".join(conds_fm)
 
+
+def get_combined_workflow_sql_for_client_region(business_date: str = None, sod_date: str = None,
+                                                client: str = None, region: str = None) -> str:
+    base_m, base_fm = _combined_bases(bool(client), bool(region))
     return get_combined_workflow_sql_base_with_bases(base_m, base_fm)
 
 
-def get_combined_workflow_sql_base(business_date: str, sod_date: str) -> str:
-    base_m = f"m.business_dt IN ('{business_date}', '{sod_date}')"
-    base_fm = f"CAST(fm.marker->'payload'->>'business_date' AS date) IN ('{business_date}', '{sod_date}')"
+def get_combined_workflow_sql_base(business_date: str = None, sod_date: str = None) -> str:
+    base_m, base_fm = _combined_bases(False, False)
     return get_combined_workflow_sql_base_with_bases(base_m, base_fm)
 
 
+@lru_cache(maxsize=8)
+def _combined_workflow_clause(filter_client: bool, filter_region: bool):
+    """Build the text() clause once per filter shape so SQLAlchemy's compiled cache is reused."""
+    if filter_client or filter_region:
+        sql = get_combined_workflow_sql_for_client_region(
+            client="x" if filter_client else None, region="x" if filter_region else None
+        )
+    else:
+        sql = get_combined_workflow_sql_all()
+    return text(sql)
+
+
 def _build_base_r_from_base_m(base_m: str) -> str:
     """
     Convert base_m (which references m.*) into base_r for reporting_loaders_markers (r.*).
@@ -265,14 +292,15 @@ def _build_base_r_from_base_m(base_m: str) -> str:
     return base_r
 
 
-def get_combined_workflow_sql_base_with_bases(base_m: str, base_fm: str) -> str:
+def get_combined_workflow_sql_base_with_bases(base_m: str, base_fm: str, include_reporting: bool = True,
+                                              base_el: str = None, base_r: str = None) -> str:
     """
     Combined union SQL for markers, final_markers, error_logs (joined to markers), reporting_loaders_markers.
     NOTE: base_m and base_fm are the WHERE conditions for markers/error_logs and final_markers respectively.
+    base_el / base_r override the error_logs and reporting conditions (default: derived from base_m).
+    Every row carries its source table in "source" (used for per-source watermarks).
     """
-    base_r = _build_base_r_from_base_m(base_m)
-
-    return f"""
+    sql = f"""
 SELECT
     m.created_at AS last_updated,
     m.client_cd,
@@ -282,7 +310,8 @@ SELECT
     m.subject_area_cd,
     m.original_message_id,
     CAST(m.business_dt AS date) AS business_dt,
-    'success' AS status
+    'success' AS status,
+    'markers' AS source
 FROM markers m
 WHERE {base_m}
 
@@ -297,7 +326,8 @@ SELECT
     fm.marker->'payload'->>'subject_area_cd' AS subject_area_cd,
     fm.original_message_id,
     CAST(fm.marker->'payload'->>'business_date' AS date) AS business_dt,
-    'success' AS status
+    'success' AS status,
+    'final_markers' AS source
 FROM final_markers fm
 WHERE {base_fm}
 
@@ -312,13 +342,19 @@ SELECT
     el.table_nm AS subject_area_cd,
     el.original_message_id,
     CAST(m.business_dt AS date) AS business_dt,
-    'failed' AS status
+    'failed' AS status,
+    'error_logs' AS source
 FROM error_logs el
 JOIN markers m ON el.original_message_id = m.original_message_id
-WHERE {base_m}
+WHERE {base_el or base_m}
+"""
+    if include_reporting:
+        sql += "\nUNION ALL\n" + get_reporting_sql_with_base(base_r or _build_base_r_from_base_m(base_m))
+    return sql
 
-UNION ALL
 
+def get_reporting_sql_with_base(base_r: str) -> str:
+    return f"""
 SELECT
     r.created_at AS last_updated,
     r.client_cd,
@@ -328,68 +364,91 @@ SELECT
     r.subject_area_cd,
     r.original_message_id,
     CAST(r.business_dt AS date) AS business_dt,
-    'success' AS status
+    'success' AS status,
+    'reporting' AS source
 FROM reporting_loaders_markers r
 WHERE {base_r}
 """
 
 
-# ----------------------------------
-# Evaluators (unchanged)
-# ----------------------------------
-
-
-def evaluate_workflow_status(subjects_found, expected_subjects, first_event_time):
-    if not subjects_found:
-        return "pending"
-    missing = set(expected_subjects) - set(subjects_found)
-    if not missing:
-        return "completed"
-    elif first_event_time:
-        age = (datetime.now() - first_event_time).total_seconds() / 60
-        if age > LONG_RUNNING_THRESHOLD_MINUTES:
-            return "long_running"
-        return "inprogress"
-    return "pending"
-
-
-def evaluate_aod_stage(rows, total_count):
-    positions_ids = {r["original_message_id"] for r in rows if r["subject_area_cd"] == "positions"}
-    taxlots_ids = {r["original_message_id"] for r in rows if r["subject_area_cd"] == "taxlots"}
-
-    pos_count, tax_count = len(positions_ids), len(taxlots_ids)
-
-    if total_count == 0:
-        return "pending", pos_count, tax_count
-    if pos_count == total_count and tax_count == total_count:
-        return "completed", pos_count, tax_count
-    elif pos_count or tax_count:
-        return "inprogress", pos_count, tax_count
-    return "pending", pos_count, tax_count
-
-
-def evaluate_aod_final(rows, total_count):
-    positions_ids = {
-        r["original_message_id"]
-        for r in rows
-        if r["marker_type_cd"] == "asOfRegionsStatementsPublished" and r["subject_area_cd"] == "positions"
-    }
-    taxlots_ids = {
-        r["original_message_id"]
-        for r in rows
-        if r["marker_type_cd"] == "asOfRegionsStatementsPublished" and r["subject_area_cd"] == "taxlots"
-    }
-    global_marker = any(r["marker_type_cd"] == "eodAllRegionStatementsPublished" for r in rows)
+# Pushdown mode: one query per snapshot carrying that snapshot's ATLS ids.
+#   :pair_keys    - requested "CLIENT|REGION" keys
+#   :covered_keys - keys that have ATLS ids; keys without ids keep all their rows
+#                   (same as the Python filter's "not message_ids" fallback)
+#   :message_ids  - ATLS ids of the snapshot; bound as an array or joined via a temp table
+_PAIR_KEY_M = "UPPER(TRIM(m.client_cd)) || '|' || UPPER(TRIM(m.processing_region_cd))"
+_PAIR_KEY_FM = ("UPPER(TRIM(fm.marker->'header'->>'party_cd')) || '|' || "
+                "UPPER(TRIM(fm.marker->'header'->>'processing_region_cd'))")
+
+
+@lru_cache(maxsize=1)
+def _pushdown_workflow_clause():
+    base_m = " AND ".join([
+        "m.business_dt = :target_date",
+        "UPPER(m.snapshot_type_cd) = :snapshot",
+        f"{_PAIR_KEY_M} = ANY(:pair_keys)",
+        f"(m.original_message_id = ANY(:message_ids) OR NOT {_PAIR_KEY_M} = ANY(:covered_keys))",
+    ])
+    base_fm = " AND ".join([
+        "CAST(fm.marker->'payload'->>'business_date' AS date) = :target_date",
+        "UPPER(fm.marker->'payload'->>'snapshot_type_cd') = :snapshot",
+        f"{_PAIR_KEY_FM} = ANY(:pair_keys)",
+        # the global AOD final marker is not tied to any ATLS message id
+        f"(fm.original_message_id = ANY(:message_ids) OR fm.marker_type = 'eodAllRegionStatementsPublished'"
+        f" OR NOT {_PAIR_KEY_FM} = ANY(:covered_keys))",
+    ])
+    return text(get_combined_workflow_sql_base_with_bases(base_m, base_fm, include_reporting=False))
+
+
+@lru_cache(maxsize=8)
+def _reporting_clause(filter_client: bool, filter_region: bool):
+    conds_r = ["r.business_dt IN (:business_date, :sod_date)"]
+    if filter_client:
+        conds_r.append("UPPER(r.client_cd) = UPPER(:client)")
+    if filter_region:
+        conds_r.append("UPPER(r.processing_region_cd) = UPPER(:region)")
+    return text(get_reporting_sql_with_base(" AND ".join(conds_r)))
+
+
+# Incremental mode: per-source created_at watermarks (:wm_<source>)
+WATERMARK_SOURCES = ("markers", "final_markers", "error_logs", "reporting")
+
+
+@lru_cache(maxsize=8)
+def _incremental_clauses(filter_client: bool, filter_region: bool):
+    """
+    (rows_clause, counts_clause) for the watermark refresh:
+      rows_clause   - combined rows created after each source's watermark
+      counts_clause - per-source row counts up to the watermark; a count that differs from
+                      the cached rows means rows arrived with an older created_at (a gap).
+                      error_logs are counted once per entry, not per joined marker row, so a
+                      new marker of a message with an old error is not mistaken for a gap.
+    """
+    base_m, base_fm = _combined_bases(filter_client, filter_region)
+    base_r = _build_base_r_from_base_m(base_m)
 
-    pos_count, tax_count = len(positions_ids), len(taxlots_ids)
+    rows_sql = get_combined_workflow_sql_base_with_bases(
+        f"{base_m} AND m.created_at > :wm_markers",
+        f"{base_fm} AND fm.created_at > :wm_final_markers",
+        base_el=f"{base_m} AND el.created_at > :wm_error_logs",
+        base_r=f"{base_r} AND r.created_at > :wm_reporting",
+    )
+    counts_sql = f"""
+SELECT
+    (SELECT COUNT(*) FROM markers m
+      WHERE {base_m} AND m.created_at <= :wm_markers) AS markers,
+    (SELECT COUNT(*) FROM final_markers fm
+      WHERE {base_fm} AND fm.created_at <= :wm_final_markers) AS final_markers,
+    (SELECT COUNT(DISTINCT (el.original_message_id, el.service_nm, el.table_nm, el.created_at))
+       FROM error_logs el
+      WHERE el.created_at <= :wm_error_logs
+        AND EXISTS (SELECT 1 FROM markers m
+                     WHERE m.original_message_id = el.original_message_id AND {base_m})) AS error_logs,
+    (SELECT COUNT(*) FROM reporting_loaders_markers r
+      WHERE {base_r} AND r.created_at <= :wm_reporting) AS reporting
+"""
+    return text(rows_sql), text(counts_sql)
 
-    if total_count == 0:
-        return "pending", pos_count, tax_count
-    if pos_count == total_count and tax_count == total_count and global_marker:
-        return "completed", pos_count, tax_count
-    elif pos_count or tax_count or global_marker:
-        return "inprogress", pos_count, tax_count
-    return "pending", pos_count, tax_count
 
 # ----------------------------------
 # ATLS message IDs
@@ -397,60 +456,63 @@ def evaluate_aod_final(rows, total_count):
 
 
 def get_atls_message_ids(business_date: str, sod_date: str):
+    """{(client, region): [id entries]}; waits on _FETCH_EXECUTOR, so never call it from a pool task"""
     message_ids_map = defaultdict(list)
 
-    def _fetch_source(conn, table, params):
+    def _fetch_source(table, params):
         q = text(f"""
             SELECT client_cd, processing_region_cd, snapshot_type_cd, business_dt, original_message_id
             FROM {table}
             WHERE business_dt IN (:business_date, :sod_date)
         """)
         t0 = time.time()
-        rows = conn.execute(q, params).mappings().all()
+        with atls_connection() as conn:
+            rows = conn.execute(q, params).mappings().all()
         dur = time.time() - t0
         logger.info("ATLS fetch from %s: %d rows in %.2fs for %s", table, len(rows), dur, params)
         return rows
 
     try:
-        with get_atls_engine().connect() as conn:
-            params = {"business_date": business_date, "sod_date": sod_date}
-            acc_rows = _fetch_source(conn, "accounting_events", params)
-            prc_rows = _fetch_source(conn, "pricing_events", params)
-
-            def _ingest(rows, source):
-                for r in rows:
-                    client = _norm_client(r["client_cd"])
-                    region = _norm_region(r["processing_region_cd"])
-                    snap = _norm_snapshot(r["snapshot_type_cd"])
-                    bdt = _norm_date(r["business_dt"])
-                    oid = r["original_message_id"]
-                    if not oid:
-                        continue
-                    message_ids_map[(client, region)].append({
-                        "id": oid,
-                        "snapshot": snap,
-                        "business_dt": bdt,
-                        "source": source,
-                    })
-
-            _ingest(acc_rows, "ACCOUNTING")
-            _ingest(prc_rows, "PRICING")
-
-            summary = defaultdict(lambda: {"ACCOUNTING": [], "PRICING": []})
-            for (client, region), items in message_ids_map.items():
-                for it in items:
-                    key = (client, region, it["snapshot"], it["business_dt"])
-                    summary[key][it["source"].upper()].append(it["id"])
-
-            for (client, region, snap, bdt), src_map in summary.items():
-                acc_ids = src_map["ACCOUNTING"]
-                prc_ids = src_map["PRICING"]
-                logger.info(
-                    "ATLS IDs [%s|%s|%s|%s] accounting=%d%s pricing=%d%s",
-                    client, region, snap, bdt,
-                    len(acc_ids), f" sample={acc_ids[:3]}" if acc_ids else "",
-                    len(prc_ids), f" sample={prc_ids[:3]}" if prc_ids else "",
-                )
+        params = {"business_date": business_date, "sod_date": sod_date}
+        # The two sources are independent: fetch them concurrently
+        prc_future = _FETCH_EXECUTOR.submit(_fetch_source, "pricing_events", params)
+        acc_rows = _fetch_source("accounting_events", params)
+        prc_rows = prc_future.result()
+
+        def _ingest(rows, source):
+            for r in rows:
+                client = _norm_client(r["client_cd"])
+                region = _norm_region(r["processing_region_cd"])
+                snap = _norm_snapshot(r["snapshot_type_cd"])
+                bdt = _norm_date(r["business_dt"])
+                oid = r["original_message_id"]
+                if not oid:
+                    continue
+                message_ids_map[(client, region)].append({
+                    "id": oid,
+                    "snapshot": snap,
+                    "business_dt": bdt,
+                    "source": source,
+                })
+
+        _ingest(acc_rows, "ACCOUNTING")
+        _ingest(prc_rows, "PRICING")
+
+        summary = defaultdict(lambda: {"ACCOUNTING": [], "PRICING": []})
+        for (client, region), items in message_ids_map.items():
+            for it in items:
+                key = (client, region, it["snapshot"], it["business_dt"])
+                summary[key][it["source"].upper()].append(it["id"])
+
+        for (client, region, snap, bdt), src_map in summary.items():
+            acc_ids = src_map["ACCOUNTING"]
+            prc_ids = src_map["PRICING"]
+            logger.info(
+                "ATLS IDs [%s|%s|%s|%s] accounting=%d%s pricing=%d%s",
+                client, region, snap, bdt,
+                len(acc_ids), f" sample={acc_ids[:3]}" if acc_ids else "",
+                len(prc_ids), f" sample={prc_ids[:3]}" if prc_ids else "",
+            )
     except Exception as e:
         logger.error("Error getting message IDs from ATLS: %s", e)
 
@@ -464,12 +526,7 @@ def get_atls_message_ids(business_date: str, sod_date: str):
 def group_rows_by_key(all_rows):
     grouped = defaultdict(list)
     for r in all_rows:
-        key = (
-            _norm_client(r["client_cd"]),
-            _norm_region(r["processing_region_cd"]),
-            _norm_snapshot(r["snapshot_type_cd"]),
-            _norm_date(r["business_dt"]),
-        )
+        key = _group_key(r.client_cd, r.processing_region_cd, r.snapshot_type_cd, r.business_dt)
         grouped[key].append(r)
     return grouped
 
@@ -486,32 +543,462 @@ def calculate_sod_date(business_date: str) -> str:
     return sod_date.strftime("%Y-%m-%d")
 
 
-def get_combined_workflow_sql_rows(business_date: str, sod_date: str, client: str = None, region: str = None):
+def _combined_clause_and_params(business_date: str, sod_date: str, client: str = None, region: str = None):
     # Decide which SQL to call: all vs filtered
+    params = {"business_date": business_date, "sod_date": sod_date}
     if client and region:
-        sql = get_combined_workflow_sql_for_client_region(business_date, sod_date, client, region)
+        clause = _combined_workflow_clause(True, True)
+        params.update({"client": client.strip(), "region": region.strip()})
         mode = 'filtered'
     else:
-        sql = get_combined_workflow_sql_all(business_date, sod_date)
+        clause = _combined_workflow_clause(False, False)
         mode = 'all'
+    return clause, params, mode
+
+
+def get_combined_workflow_sql_rows(business_date: str, sod_date: str, client: str = None, region: str = None):
+    clause, params, mode = _combined_clause_and_params(business_date, sod_date, client, region)
+    sql = clause.text
 
     # Log the exact SQL for debugging (trimmed) so we can paste into psql if needed
     try:
         sql_preview = "\n" + (sql if len(sql) < 2000 else sql[:2000] + "\n... (truncated)")
-        logger.debug("Executing ADM SQL (mode=%s): %s", mode, sql_preview)
+        logger.debug("Executing ADM SQL (mode=%s, params=%s): %s", mode, params, sql_preview)
     except Exception:
         logger.debug("Executing ADM SQL (mode=%s)", mode)
 
     t0 = time.time()
-    with get_adm_engine().connect() as conn:
-        result = conn.execute(text(sql))
-        rows = [dict(row) for row in result.mappings()]
+    with adm_connection() as conn:
+        result = conn.execute(clause, params)
+        rows = list(compact_rows(result))
     dur = time.time() - t0
     logger.info("ADM combined SQL fetched %d rows in %.2fs (mode=%s, client=%s, region=%s)", len(rows), dur, mode, client, region)
     return rows
 
 
-def get_combined_workflow_status(clients_regions, business_date):
+def iter_combined_workflow_rows(business_date: str, sod_date: str, client: str = None, region: str = None,
+                                batch_size: int = None):
+    """
+    Stream the combined SQL through a server-side (named) cursor, yield_per rows at a time,
+    so the raw result is never materialized as a whole.
+    """
+    clause, params, mode = _combined_clause_and_params(business_date, sod_date, client, region)
+    batch_size = batch_size or STREAM_BATCH_SIZE
+    t0 = time.time()
+    n = 0
+    with adm_connection() as conn:
+        # per-statement options: a request-scoped connection must not keep streaming for later queries
+        result = conn.execute(clause, params, execution_options={"stream_results": True, "yield_per": batch_size})
+        try:
+            for row in compact_rows(result):
+                n += 1
+                yield row
+        finally:
+            # closes the named cursor when the consumer stops early, before the connection is reused
+            result.close()
+    logger.info("ADM combined SQL streamed %d rows in %.2fs (mode=%s, client=%s, region=%s, yield_per=%d)",
+                n, time.time() - t0, mode, client, region, batch_size)
+
+
+def group_rows_with_diagnostics(rows, client: str = None, region: str = None):
+    """
+    One pass over rows (a list or a streaming iterator): normalize and bucket every row into
+    the grouped structure, count the reporting loader rows, and, when client and region are
+    given, drop rows of other pairs right away.
+    Returns (grouped, diagnostics).
+    """
+    grouped = defaultdict(list)
+    total = kept = reporting = 0
+    reporting_types = set()
+    for r in rows:
+        total += 1
+        marker_type = r.marker_type_cd or ""
+        subject = r.subject_area_cd or ""
+        if "reporting" in marker_type.lower() or subject.startswith("reporting_"):
+            reporting += 1
+            if len(reporting_types) < 6:
+                reporting_types.add((marker_type, subject))
+        key = _group_key(r.client_cd, r.processing_region_cd, r.snapshot_type_cd, r.business_dt)
+        if client and region and (key[0] != client or key[1] != region):
+            continue
+        grouped[key].append(r)
+        kept += 1
+    diagnostics = {
+        "rows": total,
+        "kept": kept,
+        "groups": len(grouped),
+        "reporting_rows": reporting,
+        "reporting_sample": sorted(reporting_types),
+    }
+    return grouped, diagnostics
+
+
+def fetch_grouped_combined_rows(business_date: str, sod_date: str, client: str = None, region: str = None,
+                                streaming: bool = None):
+    """Grouped combined rows plus diagnostics; streamed unless ENABLE_STREAMING_FETCH is off."""
+    if streaming is None:
+        streaming = ENABLE_STREAMING_FETCH
+    if not streaming:
+        rows = get_combined_workflow_sql_rows(business_date, sod_date, client, region)
+        return group_rows_with_diagnostics(rows, client, region)
+    rows = iter_combined_workflow_rows(business_date, sod_date, client, region)
+    try:
+        return group_rows_with_diagnostics(rows, client, region)
+    finally:
+        rows.close()  # release the cursor and connection even if grouping failed midway
+
+
+def _cache_put_grouped_rows(clients_regions, business_date, grouped_rows):
+    """Cache, per requested pair, only that pair's rows (the reporting helper filters by pair anyway)."""
+    by_pair = defaultdict(list)
+    for (c, r, _snap, _bdt), rows in grouped_rows.items():
+        by_pair[(c, r)].extend(rows)
+    for client_in, region_in in clients_regions:
+        client, region = _norm_client(client_in), _norm_region(region_in)
+        _cache_put_combined_rows(client, region, business_date, by_pair.get((client, region), []))
+
+
+def _client_shard(client, shards):
+    # crc32 rather than hash(): string hashes are salted per process
+    return zlib.crc32(client.encode("utf-8")) % shards
+
+
+def _get_evaluation_pool():
+    global _EVALUATION_POOL
+    with _EVALUATION_POOL_LOCK:
+        if _EVALUATION_POOL is None:
+            _EVALUATION_POOL = ProcessPoolExecutor(max_workers=EVALUATION_WORKERS,
+                                                   mp_context=multiprocessing.get_context("spawn"))
+        return _EVALUATION_POOL
+
+
+def _reset_evaluation_pool():
+    global _EVALUATION_POOL
+    with _EVALUATION_POOL_LOCK:
+        pool, _EVALUATION_POOL = _EVALUATION_POOL, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def evaluate_pairs_sharded(pairs, grouped_rows, ids_by_key, business_date, sod_date):
+    """
+    evaluate_pairs across EVALUATION_WORKERS processes. Pairs are partitioned by client, and each
+    shard receives only its own grouped rows (interned CombinedRow tuples pickle compactly) and
+    ATLS ids. Results come back in the order evaluate_pairs would produce them.
+    Returns None if the pool fails, so the caller can evaluate in process.
+    """
+    shards = max(1, EVALUATION_WORKERS)
+    shard_pairs = defaultdict(list)
+    for pair in dict.fromkeys(pairs):
+        shard_pairs[_client_shard(pair[0], shards)].append(pair)
+    shard_rows = defaultdict(dict)
+    for key, rows in grouped_rows.items():
+        shard_rows[_client_shard(key[0], shards)][key] = rows
+    shard_ids = defaultdict(dict)
+    for key, ids in ids_by_key.items():
+        shard_ids[_client_shard(key[0], shards)][key] = ids
+
+    t0 = time.time()
+    try:
+        pool = _get_evaluation_pool()
+        futures = [
+            pool.submit(evaluate_pairs, shard_pairs[shard], shard_rows[shard], shard_ids[shard],
+                        business_date, sod_date)
+            for shard in sorted(shard_pairs)
+        ]
+        by_pair = defaultdict(list)
+        for future in futures:
+            for workflow in future.result():
+                by_pair[(workflow["client_cd"], workflow["processing_region_cd"])].append(workflow)
+    except Exception:
+        logger.exception("Sharded evaluation failed, evaluating in process")
+        _reset_evaluation_pool()
+        return None
+
+    logger.info("Sharded evaluation of %d pairs in %d shards took %.2fs",
+                len(by_pair), len(futures), time.time() - t0)
+    workflows = []
+    seen = set()
+    for pair in pairs:
+        # a pair listed twice gets its own copies, as evaluate_pairs would produce
+        workflows.extend([dict(w) for w in by_pair[pair]] if pair in seen else by_pair[pair])
+        seen.add(pair)
+    return workflows
+
+
+def _fetch_rows(clause, params, message_ids=None, interner=None):
+    """Execute one ADM statement on its own connection; message_ids go through MessageIdSet"""
+    with adm_connection() as conn:
+        if message_ids is None:
+            result = conn.execute(clause, params)
+        else:
+            result = MessageIdSet(conn, message_ids).execute(clause, params)
+        return list(compact_rows(result, interner))
+
+
+def get_pushdown_workflow_sql_rows(atls_message_map, clients_regions, business_date: str, sod_date: str,
+                                   client: str = None, region: str = None):
+    """
+    ADM rows with the ATLS message ids pushed into SQL, one query per snapshot, run concurrently.
+    Reporting rows are not tied to message ids and come from one extra query with the usual filters.
+    """
+    pairs = sorted({(_norm_client(c), _norm_region(r)) for c, r in clients_regions})
+    pair_keys = [f"{c}|{r}" for c, r in pairs]
+    snapshots = sorted({_norm_snapshot(wt.split("_")[0]) for wt in EXPECTED_SUBJECTS})
+
+    t0 = time.time()
+    interner = RowInterner()  # shared by the concurrent fetches of this refresh
+    futures = {}
+    for snapshot in snapshots:
+        target_date = sod_date if snapshot == "SOD" else business_date
+        message_ids = set()
+        covered_keys = []
+        for (c, r), key in zip(pairs, pair_keys):
+            ids = {
+                m["id"] for m in atls_message_map.get((c, r), [])
+                if m["snapshot"] == snapshot and m["business_dt"] == target_date
+            }
+            if ids:
+                covered_keys.append(key)
+                message_ids |= ids
+        params = {
+            "target_date": target_date,
+            "snapshot": snapshot,
+            "pair_keys": pair_keys,
+            "covered_keys": covered_keys,
+        }
+        logger.debug("Pushdown [%s|%s]: ids=%d covered=%d/%d",
+                     snapshot, target_date, len(message_ids), len(covered_keys), len(pair_keys))
+        futures[snapshot] = _FETCH_EXECUTOR.submit(
+            _fetch_rows, _pushdown_workflow_clause(), params, sorted(message_ids), interner)
+
+    params = {"business_date": business_date, "sod_date": sod_date}
+    if client and region:
+        params.update({"client": client.strip(), "region": region.strip()})
+    futures["REPORTING"] = _FETCH_EXECUTOR.submit(
+        _fetch_rows, _reporting_clause(bool(client and region), bool(client and region)), params, None, interner)
+
+    rows = []
+    for name, future in futures.items():
+        part = future.result()
+        logger.debug("Pushdown fetch %s: %d rows", name, len(part))
+        rows.extend(part)
+    logger.info("ADM pushdown SQL fetched %d rows in %.2fs (snapshots=%s, pairs=%d)",
+                len(rows), time.time() - t0, snapshots, len(pairs))
+    return rows
+
+
+def _watermarks(rows, watermarks=None):
+    watermarks = dict(watermarks or {})
+    for r in rows:
+        source, ts = r.source, r.last_updated
+        if source and ts and (source not in watermarks or ts > watermarks[source]):
+            watermarks[source] = ts
+    return watermarks
+
+
+def _source_counts(rows):
+    """Rows per source as counts_clause counts them (error_logs rows repeat per joined marker)"""
+    counts = defaultdict(int)
+    errors = set()
+    for r in rows:
+        if not r.last_updated:
+            continue
+        if r.source == "error_logs":
+            errors.add((r.original_message_id, r.marker_type_cd, r.subject_area_cd, r.last_updated))
+        else:
+            counts[r.source] += 1
+    if errors:
+        counts["error_logs"] = len(errors)
+    return counts
+
+
+def _incremental_key(business_date, client=None, region=None):
+    return (business_date, (client, region) if client and region else (None, None))
+
+
+def _incremental_lock(key):
+    with _INCREMENTAL_LOCK:
+        lock = _INCREMENTAL_LOCKS.get(key)
+        if lock is None:
+            lock = _INCREMENTAL_LOCKS[key] = threading.Lock()
+        return lock
+
+
+def _get_incremental_state(key):
+    with _INCREMENTAL_LOCK:
+        state = _INCREMENTAL_STATE.get(key)
+        if state is not None:
+            _INCREMENTAL_STATE.move_to_end(key)
+        return state
+
+
+def _put_incremental_state(key, state):
+    """Store the state of key, dropping the least recently used beyond INCREMENTAL_MAX_STATES"""
+    with _INCREMENTAL_LOCK:
+        _INCREMENTAL_STATE[key] = state
+        _INCREMENTAL_STATE.move_to_end(key)
+        while len(_INCREMENTAL_STATE) > INCREMENTAL_MAX_STATES:
+            evicted, _ = _INCREMENTAL_STATE.popitem(last=False)
+            lock = _INCREMENTAL_LOCKS.get(evicted)
+            if lock is not None and not lock.locked():
+                del _INCREMENTAL_LOCKS[evicted]
+            logger.info("ADM incremental state for %s dropped (limit %d)", evicted, INCREMENTAL_MAX_STATES)
+
+
+def new_aod_tracker():
+    return AodProgressTracker(AOD_STAGE_MARKERS, GLOBAL_AOD_FINAL_MARKER,
+                              auto_members=ENABLE_ADM_FALLBACK_WHEN_ATLS_EMPTY)
+
+
+def update_aod_trackers(trackers, grouped_rows):
+    """Feed the AOD groups of grouped_rows into their per-key trackers (created on first rows)"""
+    for key, rows in grouped_rows.items():
+        if key[2] == "AOD":
+            tracker = trackers.get(key)
+            if tracker is None:
+                tracker = trackers[key] = new_aod_tracker()
+            tracker.observe_rows(rows)
+    return trackers
+
+
+def refresh_combined_rows_incremental(business_date: str, sod_date: str, client: str = None, region: str = None):
+    """
+    Bring the incremental state for this business date and scope up to date.
+    Fetches only rows newer than each source's watermark; falls back to a full refetch on a
+    cold start, INCREMENTAL_FULL_REFRESH_SECONDS elapsed, or a gap (per-source counts up to
+    the watermark no longer match the cached rows).
+    Returns (state, changed_keys) where changed_keys is None after a full refetch.
+    Caller must hold _incremental_lock(_incremental_key(business_date, client, region)).
+    """
+    filtered = bool(client and region)
+    key = _incremental_key(business_date, client, region)
+    scope = key[1]
+    params = {"business_date": business_date, "sod_date": sod_date}
+    if filtered:
+        params.update({"client": client.strip(), "region": region.strip()})
+
+    state = _get_incremental_state(key)
+    reason = None
+    if state is None:
+        reason = "cold start"
+    elif time.time() - state["full_ts"] > INCREMENTAL_FULL_REFRESH_SECONDS:
+        reason = "max age"
+
+    if reason is None:
+        t0 = time.time()
+        rows_clause, counts_clause = _incremental_clauses(filtered, filtered)
+        wm_params = dict(params)
+        for source in WATERMARK_SOURCES:
+            wm_params[f"wm_{source}"] = state["watermarks"].get(source) or _WATERMARK_FLOOR
+
+        with adm_connection() as conn:
+            new_rows = list(compact_rows(conn.execute(rows_clause, wm_params)))
+            watermarks = _watermarks(new_rows, state["watermarks"])
+            for source in WATERMARK_SOURCES:
+                wm_params[f"wm_{source}"] = watermarks.get(source) or _WATERMARK_FLOOR
+            counts = conn.execute(counts_clause, wm_params).mappings().one()
+
+        expected = defaultdict(int, state["counts"])
+        for source, n in _source_counts(new_rows).items():
+            expected[source] += n
+        gaps = [source for source in WATERMARK_SOURCES if counts[source] != expected.get(source, 0)]
+        if gaps:
+            reason = f"gap in {gaps}"
+        else:
+            state["counts"] = expected
+            new_grouped = group_rows_by_key(new_rows)
+            for key, rows in new_grouped.items():
+                state["grouped"][key].extend(rows)
+            update_aod_trackers(state["aod"], new_grouped)
+            state["watermarks"] = watermarks
+            logger.info("ADM incremental refresh: %d new rows, %d keys changed in %.2fs (scope=%s)",
+                        len(new_rows), len(new_grouped), time.time() - t0, scope)
+            return state, set(new_grouped)
+
+    logger.info("ADM full refresh (%s) for scope=%s business_date=%s", reason, scope, business_date)
+    rows = get_combined_workflow_sql_rows(business_date, sod_date, client, region)
+    grouped = group_rows_by_key(rows)
+    state = {
+        "business_date": business_date,
+        "counts": _source_counts(rows),
+        "grouped": grouped,
+        "watermarks": _watermarks(rows),
+        "full_ts": time.time(),
+        "workflows": {},
+        "atls_ids": {},
+        "aod": update_aod_trackers({}, grouped),
+    }
+    # the rows live on in grouped; the flat list is only needed for the counts above
+    del rows
+    _put_incremental_state(key, state)
+    return state, None
+
+
+def _get_combined_workflow_status_incremental(clients_regions, business_date, sod_date, client_filter, region_filter):
+    """Incremental variant of get_combined_workflow_status: re-evaluates only affected workflows."""
+    with _incremental_lock(_incremental_key(business_date, client_filter, region_filter)):
+        # get_atls_message_ids submits to _FETCH_EXECUTOR itself, so it runs here and the
+        # refresh (which submits nothing) goes to the pool: a pool task never waits on the pool
+        refresh_future = _FETCH_EXECUTOR.submit(
+            refresh_combined_rows_incremental, business_date, sod_date, client_filter, region_filter)
+        atls_message_map = get_atls_message_ids(business_date, sod_date)
+        state, changed_keys = refresh_future.result()
+
+        try:
+            _cache_put_grouped_rows(clients_regions, business_date, state["grouped"])
+        except Exception:
+            logger.exception("Error caching combined rows")
+
+        workflows = []
+        evaluated = 0
+        for client_in, region_in in clients_regions:
+            client = _norm_client(client_in)
+            region = _norm_region(region_in)
+            message_entries = atls_message_map.get((client, region), [])
+
+            for workflow_type, expected_subjects in EXPECTED_SUBJECTS.items():
+                snapshot = _norm_snapshot(workflow_type.split("_")[0])
+                target_date = sod_date if snapshot == "SOD" else business_date
+                wkey = (client, region, workflow_type)
+                ids = tuple(sorted(
+                    m["id"] for m in message_entries
+                    if m["snapshot"] == snapshot and m["business_dt"] == target_date
+                ))
+                cached = state["workflows"].get(wkey)
+                # "inprogress" can turn into "long_running" with time alone, so always re-evaluate it
+                if (cached is None or changed_keys is None
+                        or (client, region, snapshot, target_date) in changed_keys
+                        or state["atls_ids"].get(wkey) != ids
+                        or cached["status"] == "inprogress"):
+                    cached = evaluate_workflow(client, region, workflow_type, expected_subjects,
+                                               message_entries, state["grouped"], business_date, sod_date,
+                                               state["aod"].get((client, region, snapshot, target_date)))
+                    state["workflows"][wkey] = cached
+                    state["atls_ids"][wkey] = ids
+                    evaluated += 1
+                workflows.append(dict(cached))
+
+    logger.info("Incremental workflow processing re-evaluated %d of %d workflows", evaluated, len(workflows))
+    workflows.sort(key=lambda w: WORKFLOW_ORDER.get(w["workflow_type"], 999))
+    return workflows
+
+
+def get_combined_workflow_status(clients_regions, business_date, pushdown: bool = None, incremental: bool = None):
+    """
+    Workflow statuses for the given (client, region) pairs. Concurrent calls for the same
+    business date and pairs are coalesced into one computation whose result they share.
+    """
+    pairs = tuple(sorted({(_norm_client(c), _norm_region(r)) for c, r in clients_regions}))
+    if len(clients_regions) == 1:
+        key = ("combined_workflow_status", business_date, pairs[0][0], pairs[0][1], pushdown, incremental)
+    else:
+        key = ("combined_workflow_status", business_date, None, None, pairs, pushdown, incremental)
+    return _STATUS_FLIGHTS.do(key, _get_combined_workflow_status, clients_regions, business_date,
+                              pushdown, incremental)
+
+
+def _get_combined_workflow_status(clients_regions, business_date, pushdown: bool = None, incremental: bool = None):
     sod_date = calculate_sod_date(business_date)
     logger.info("Running ADM workflow for business_date=%s, sod_date=%s", business_date, sod_date)
 
@@ -526,163 +1013,53 @@ def get_combined_workflow_status(clients_regions, business_date):
         clients_regions = [(client_filter, region_filter)]
         logger.debug("Processing restricted to clients_regions=%s", clients_regions)
 
-    # ATLS IDs (with logs per source)
-    atls_message_map = get_atls_message_ids(business_date, sod_date)
-
-    # ADM rows (filtered at SQL level when single client/region requested)
-    all_rows = get_combined_workflow_sql_rows(business_date, sod_date, client_filter, region_filter)
+    if incremental is None:
+        incremental = ENABLE_INCREMENTAL_REFRESH
+    if incremental:
+        # Watermark refresh works on the date-scoped combined rows, so pushdown does not apply
+        return _get_combined_workflow_status_incremental(clients_regions, business_date, sod_date,
+                                                         client_filter, region_filter)
+
+    if pushdown is None:
+        pushdown = ENABLE_ADM_ID_PUSHDOWN
+
+    if pushdown:
+        # ATLS IDs first, then ADM rows filtered server-side by those IDs per snapshot
+        atls_message_map = get_atls_message_ids(business_date, sod_date)
+        all_rows = get_pushdown_workflow_sql_rows(atls_message_map, clients_regions, business_date, sod_date,
+                                                  client_filter, region_filter)
+        t_group = time.time()
+        grouped_rows, diagnostics = group_rows_with_diagnostics(all_rows, client_filter, region_filter)
+        del all_rows
+        logger.info("Row grouping completed in %.2fs. Groups=%d", time.time() - t_group, len(grouped_rows))
+    else:
+        # ADM rows (filtered at SQL level when single client/region requested) fetched,
+        # grouped as they stream in, concurrently with the ATLS IDs
+        adm_future = _FETCH_EXECUTOR.submit(
+            fetch_grouped_combined_rows, business_date, sod_date, client_filter, region_filter)
+        atls_message_map = get_atls_message_ids(business_date, sod_date)
+        grouped_rows, diagnostics = adm_future.result()
 
     # Cache combined rows for reuse by reporting helper (avoid duplicate DB hit)
     try:
-        # cache for each client/region key we will process
-        for (c, r) in clients_regions:
-            _cache_put_combined_rows(c, r, business_date, all_rows)
+        _cache_put_grouped_rows(clients_regions, business_date, grouped_rows)
     except Exception:
         logger.exception("Error caching combined rows")
 
-    # --- diagnostics: how many reporting loader rows arrived for this fetch
-    try:
-        reporting_rows = [
-            r for r in all_rows
-            if (r.get('marker_type_cd') or '').lower().find('reporting') >= 0
-            or (r.get('subject_area_cd') or '').startswith('reporting_')
-        ]
-        logger.info("Diagnostic: reporting_rows fetched=%d (sample types=%s)",
-                    len(reporting_rows),
-                    list({ (r.get('marker_type_cd'), r.get('subject_area_cd')) for r in reporting_rows } )[:6])
-    except Exception:
-        logger.exception("Diagnostic: error enumerating reporting rows")
-
-    # Group once
-    t_group = time.time()
-    grouped_rows = group_rows_by_key(all_rows)
-    logger.info("Row grouping completed in %.2fs. Groups=%d", time.time() - t_group, len(grouped_rows))
-
-    # If we ran in filtered mode (single client/region), prune grouped_rows to that key set
-    if client_filter and region_filter:
-        keys_before = len(grouped_rows)
-        pruned = {k: v for k, v in grouped_rows.items() if k[0] == client_filter and k[1] == region_filter}
-        logger.debug("Pruned grouped_rows from %d to %d entries for filtered client/region", keys_before, len(pruned))
-        grouped_rows = defaultdict(list, pruned)
+    # --- diagnostics: how many reporting loader rows arrived for this fetch (counted while grouping)
+    logger.info("Diagnostic: rows=%d kept=%d groups=%d reporting_rows fetched=%d (sample types=%s)",
+                diagnostics["rows"], diagnostics["kept"], diagnostics["groups"],
+                diagnostics["reporting_rows"], diagnostics["reporting_sample"])
 
-    workflows = []
     t_process = time.time()
+    pairs = [(_norm_client(c), _norm_region(r)) for c, r in clients_regions]
+    ids_by_key = index_message_ids(atls_message_map)
 
-    for client_in, region_in in clients_regions:
-        client = _norm_client(client_in)
-        region = _norm_region(region_in)
-
-        message_entries = atls_message_map.get((client, region), [])
-
-        for workflow_type, expected_subjects in EXPECTED_SUBJECTS.items():
-            stage_start = time.time()
-
-            snapshot = _norm_snapshot(workflow_type.split("_")[0])
-            stage = workflow_type.split("_")[1].upper()
-            target_date = sod_date if snapshot == "SOD" else business_date
-            key = (client, region, snapshot, target_date)
-
-            message_items = [
-                m for m in message_entries
-                if m["snapshot"] == snapshot and m["business_dt"] == target_date
-            ]
-            message_ids = [m["id"] for m in message_items]
-
-            acc_ids = [m["id"] for m in message_items if m.get("source") == "ACCOUNTING"]
-            prc_ids = [m["id"] for m in message_items if m.get("source") == "PRICING"]
-            logger.debug(
-                "ATLS key [%s|%s|%s|%s] → total=%d acc=%d%s prc=%d%s",
-                client, region, snapshot, target_date,
-                len(message_ids), len(acc_ids), f" sample={acc_ids[:3]}" if acc_ids else "",
-                len(prc_ids), f" sample={prc_ids[:3]}" if prc_ids else "",
-            )
-
-            candidate_rows = grouped_rows.get(key, [])
-            marker_filter = STAGE_MARKER_FILTERS.get((snapshot, stage))
-
-            if snapshot == "AOD" and stage == "FINAL":
-                workflow_rows = [
-                    r for r in candidate_rows
-                    if (not message_ids or r["original_message_id"] in message_ids
-                        or r["marker_type_cd"] == "eodAllRegionStatementsPublished")
-                ]
-            else:
-                workflow_rows = [
-                    r for r in candidate_rows
-                    if (not message_ids or r["original_message_id"] in message_ids)
-                    and (
-                        not marker_filter or (
-                            isinstance(marker_filter, set) and r["marker_type_cd"] in marker_filter
-                        ) or (
-                            isinstance(marker_filter, str) and r["marker_type_cd"] == marker_filter
-                        )
-                    )
-                ]
-
-            if ENABLE_ADM_FALLBACK_WHEN_ATLS_EMPTY and not message_ids and workflow_rows:
-                adm_ids = list({r.get("original_message_id") for r in workflow_rows if r.get("original_message_id")})
-                if adm_ids:
-                    logger.warning(
-                        "ATLS empty, using ADM fallback IDs for [%s|%s|%s|%s]: %s",
-                        client, region, snapshot + "_" + stage, target_date, adm_ids[:3] + (["..."] if len(adm_ids) > 3 else [])
-                    )
-                    message_ids = adm_ids
-
-            subjects_found = list({
-                r["subject_area_cd"] for r in workflow_rows if r["subject_area_cd"] in expected_subjects
-            })
-            missing = list(set(expected_subjects) - set(subjects_found))
-
-            first_event_time = min([r.get("last_updated") for r in workflow_rows if r.get("last_updated")], default=None)
-
-            if snapshot == "AOD":
-                total_count = len(message_ids)
-                if stage == "FINAL":
-                    status, pos_count, tax_count = evaluate_aod_final(workflow_rows, total_count)
-                else:
-                    status, pos_count, tax_count = evaluate_aod_stage(workflow_rows, total_count)
-            else:
-                status = evaluate_workflow_status(subjects_found, expected_subjects, first_event_time)
-                pos_count, tax_count, total_count = None, None, None
-
-                failed_rows = [r for r in workflow_rows if r.get("status") == "failed"]
-                if failed_rows:
-                    service_nm_list = [(fr.get("marker_type_cd") or "").lower() for fr in failed_rows]
-                    if stage == "RAW" and any("raw" in s for s in service_nm_list):
-                        status = "failed"
-                    elif stage == "ENRICH" and any("enrich" in s for s in service_nm_list):
-                        status = "failed"
-                    elif stage in ("ROLL", "ROLLUP") and any(("roll" in s or "rollup" in s) for s in service_nm_list):
-                        status = "failed"
-                    elif stage == "MART" and any("mart" in s for s in service_nm_list):
-                        status = "failed"
-                    elif stage == "FINAL" and any("final" in s for s in service_nm_list):
-                        status = "failed"
-
-            last_updated = max([r.get("last_updated") for r in workflow_rows if r.get("last_updated")], default=None)
-            first_oid = message_ids[0] if message_ids else next((r.get("original_message_id") for r in workflow_rows if r.get("original_message_id")), None)
-
-            workflows.append({
-                "client_cd": client,
-                "processing_region_cd": region,
-                "workflow_type": workflow_type,
-                "snapshot_type_cd": snapshot,
-                "status": status,
-                "status_with_long_running": status,
-                "subjects_found": subjects_found,
-                "last_updated": last_updated,
-                "business_dt": target_date,
-                "original_message_id": first_oid,
-                "total_count": total_count,
-                "positions_count": pos_count if snapshot == "AOD" else None,
-                "taxlots_count": tax_count if snapshot == "AOD" else None,
-            })
-
-            elapsed = time.time() - stage_start
-            logger.debug(
-                "Stage [%s|%s|%s] status=%s subjects=%s missing=%s rows=%d elapsed=%.3fs",
-                client, region, workflow_type, status, subjects_found, missing, len(workflow_rows), elapsed
-            )
+    workflows = None
+    if ENABLE_SHARDED_EVALUATION and client_filter is None and len(set(pairs)) >= SHARDED_EVALUATION_MIN_PAIRS:
+        workflows = evaluate_pairs_sharded(pairs, grouped_rows, ids_by_key, business_date, sod_date)
+    if workflows is None:
+        workflows = evaluate_pairs(pairs, grouped_rows, ids_by_key, business_date, sod_date)
 
     total_elapsed = time.time() - t_process
     logger.info("Python workflow processing completed in %.2fs. Total workflows=%d", total_elapsed, len(workflows))
@@ -698,7 +1075,7 @@ def get_combined_workflow_status(clients_regions, business_date):
 def _collect_reporting_rows_from_all_rows(all_rows):
     """
     Returns a dict keyed by (client, region, snapshot, business_dt, marker_type_cd, subject_area_cd)
-    mapping to the row dict from the combined SQL that came from reporting_loaders_markers.
+    mapping to the CombinedRow from the combined SQL that came from reporting_loaders_markers.
     """
     reporting_rows = {}
     reporting_subjects = {
@@ -712,32 +1089,37 @@ def _collect_reporting_rows_from_all_rows(all_rows):
     }
 
     for r in all_rows:
-        subj = (r.get('subject_area_cd') or '').strip()
-        mtype = (r.get('marker_type_cd') or '').strip()
+        subj = (r.subject_area_cd or '').strip()
+        mtype = (r.marker_type_cd or '').strip()
         # simple heuristics to identify reporting rows coming from reporting_loaders_markers
         if (mtype.lower().startswith('eod') and 'reporting' in mtype.lower()) or \
            (mtype.lower().startswith('sod') and 'reporting' in mtype.lower()) or \
            (mtype.lower().startswith('aod') and 'reporting' in mtype.lower()) or \
            subj in reporting_subjects:
-            key = (
-                _norm_client(r.get('client_cd')),
-                _norm_region(r.get('processing_region_cd')),
-                _norm_snapshot(r.get('snapshot_type_cd')),
-                _norm_date(r.get('business_dt')),
-                mtype,
-                subj
-            )
+            key = _group_key(r.client_cd, r.processing_region_cd, r.snapshot_type_cd, r.business_dt) + (mtype, subj)
             existing = reporting_rows.get(key)
-            if not existing or (r.get('last_updated') and existing.get('last_updated') and r['last_updated'] > existing['last_updated']):
+            if not existing or (r.last_updated and existing.last_updated and r.last_updated > existing.last_updated):
                 reporting_rows[key] = r
     return reporting_rows
 
 
+def _fetch_and_cache_combined_rows(client, region, business_date):
+    # A flight that finished just before this one started may already have filled the cache
+    cached = _cache_get_combined_rows(client, region, business_date)
+    if cached is not None:
+        return cached
+    sod_date = calculate_sod_date(business_date)
+    all_rows = get_combined_workflow_sql_rows(business_date, sod_date, client, region)
+    # put into cache for potential subsequent reuse
+    _cache_put_combined_rows(client, region, business_date, all_rows)
+    return all_rows
+
+
 def get_all_reporting_loaders_status(client, region, business_date, *, _reuse_combined_rows=None):
     """
     Return reporting loader statuses for all snapshots.
     Behavior:
-      - If _reuse_combined_rows is provided (list of rows), the helper will use it (no DB call).
+      - If _reuse_combined_rows is provided (list of CombinedRow or row dicts), the helper will use it (no DB call).
       - Else tries to reuse short-lived cache (populated by get_combined_workflow_status). If cache hit, reuses it.
       - On cache miss, will call get_combined_workflow_sql_rows(...) to fetch combined rows (single DB call).
     Returns a dict: snapshot -> list of rows in the same shape as your old function.
@@ -748,7 +1130,7 @@ def get_all_reporting_loaders_status(client, region, business_date, *, _reuse_co
 
     # 1) If caller supplied combined rows directly, use them
     if _reuse_combined_rows is not None:
-        all_rows = _reuse_combined_rows
+        all_rows = as_compact_rows(_reuse_combined_rows)
         logger.debug("get_all_reporting_loaders_status: using _reuse_combined_rows supplied by caller (rows=%d)", len(all_rows))
     else:
         # 2) try short-lived cache
@@ -757,12 +1139,11 @@ def get_all_reporting_loaders_status(client, region, business_date, *, _reuse_co
             all_rows = cached
             logger.debug("get_all_reporting_loaders_status: reused cached combined rows (rows=%d)", len(all_rows))
         else:
-            # 3) fallback: fetch combined rows now (single DB call)
+            # 3) fallback: fetch combined rows now (single DB call, shared by concurrent callers)
             logger.info("get_all_reporting_loaders_status: cache miss, fetching combined SQL rows from DB for %s|%s|%s", client_norm, region_norm, business_date)
-            sod_date = calculate_sod_date(business_date)
-            all_rows = get_combined_workflow_sql_rows(business_date, sod_date, client_norm, region_norm)
-            # put into cache for potential subsequent reuse
-            _cache_put_combined_rows(client_norm, region_norm, business_date, all_rows)
+            all_rows = _ROWS_FLIGHTS.do(
+                ("reporting_loaders_status", business_date, client_norm, region_norm),
+                _fetch_and_cache_combined_rows, client_norm, region_norm, business_date)
 
     # collect reporting rows
     reporting_lookup = _collect_reporting_rows_from_all_rows(all_rows)
@@ -770,28 +1151,70 @@ def get_all_reporting_loaders_status(client, region, business_date, *, _reuse_co
     results_by_snapshot = {}
     for snapshot_type, static_markers in REPORTING_STATIC_MARKERS.items():
         snap_norm = _norm_snapshot(snapshot_type)
+        # SOD loaders run on the SOD date, like the SOD workflows
+        target_date = sod_date if snap_norm == "SOD" else business_date
         snapshot_results = []
         for marker_type, subject_area in static_markers:
             matched_row = None
             # try exact key
-            key = (client_norm, region_norm, snap_norm, business_date, marker_type, subject_area)
+            key = (client_norm, region_norm, snap_norm, target_date, marker_type, subject_area)
             matched_row = reporting_lookup.get(key)
             # fallback: match by marker_type only
             if not matched_row:
                 for (c, rg, s, bd, mtype, subj), row in reporting_lookup.items():
-                    if c == client_norm and rg == region_norm and s == snap_norm and bd == business_date and mtype == marker_type:
+                    if c == client_norm and rg == region_norm and s == snap_norm and bd == target_date and mtype == marker_type:
                         matched_row = row
                         break
             snapshot_results.append({
                 'client_cd': client_norm,
                 'processing_region_cd': region_norm,
-                'business_dt': business_date,
+                'business_dt': target_date,
                 'snapshot_type_cd': snap_norm,
                 'marker_type_cd': marker_type,
                 'subject_area_cd': subject_area,
-                'created_at': matched_row.get('last_updated') if matched_row else None,
+                'created_at': matched_row.last_updated if matched_row else None,
                 'status': 'completed' if matched_row else 'pending'
             })
         results_by_snapshot[snap_norm] = snapshot_results
 
     return results_by_snapshot
+
+# --------------------------------------------------------------------
+# AOD progress
+# --------------------------------------------------------------------
+
+
+def get_aod_progress(client, region, business_date, message_ids=None, max_stragglers=50):
+    """
+    AOD progress per stage for one client/region: counts, percent complete, stragglers and failures.
+    Answers from the tracker kept by the incremental refresh when there is one; otherwise builds a
+    tracker from the combined rows (cache first, as get_all_reporting_loaders_status does).
+    message_ids: ATLS AOD ids to count against (default: the ids the tracker already expects, else
+    the ids seen in ADM).
+    """
+    client, region = _norm_client(client), _norm_region(region)
+    key = (client, region, "AOD", business_date)
+    for state_key in (_incremental_key(business_date, client, region), _incremental_key(business_date)):
+        state = _get_incremental_state(state_key)
+        if state is None or key not in state["aod"]:
+            continue
+        # the refresh of that key feeds the tracker; read it between refreshes
+        with _incremental_lock(state_key):
+            tracker = state["aod"][key]
+            if message_ids:
+                tracker.expect(message_ids)
+            return tracker.summary(max_stragglers)
+
+    all_rows = _cache_get_combined_rows(client, region, business_date)
+    if all_rows is None:
+        all_rows = _ROWS_FLIGHTS.do(
+            ("reporting_loaders_status", business_date, client, region),
+            _fetch_and_cache_combined_rows, client, region, business_date)
+    tracker = new_aod_tracker()
+    tracker.observe_rows(
+        r for r in all_rows
+        if _group_key(r.client_cd, r.processing_region_cd, r.snapshot_type_cd, r.business_dt) == key
+    )
+    if message_ids:
+        tracker.expect(message_ids)
+    return tracker.summary(max_stragglers)
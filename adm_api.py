@@ -1,341 +1,353 @@
 from sqlalchemy import text
-from database.connectors import get_adm_engine, get_atls_engine
+from database.session import adm_connection, is_read_only
+from api.query_registry import ADM_QUERIES
 import logging
 import os
+import re
+from collections import defaultdict
 from datetime import datetime
 import json
 
 logger = logging.getLogger(__name__)
 
 def load_adm_query(query_name):
-    """Helper function to load SQL queries from adm_queries.sql file"""
-    try:
-        query_file = os.path.join(os.path.dirname(__file__), '../sql/adm_queries.sql')
-        with open(query_file, 'r') as f:
-            content = f.read()
-        
-        # Extract the specific query by name
-        queries = content.split(';')
-        for query in queries:
-            if query.strip().startswith(f'-- {query_name}'):
-                return query.strip()
-        return None
-    except Exception as e:
-        logger.error(f"Error loading query {query_name}: {str(e)}")
-        return None
-
-def format_message_ids(message_ids):
-    """Properly format message IDs for SQL queries"""
-    if isinstance(message_ids, list):
-        # If it's a list, join with commas and quote each ID
-        return ", ".join([f"'{msg_id}'" for msg_id in message_ids])
+    """Return a named ADM query from the in-memory registry (no file I/O)"""
+    statement = ADM_QUERIES.get(query_name)
+    return statement.sql if statement else None
+
+def normalize_message_ids(message_ids):
+    """Normalize message IDs to a list of strings for binding as a single array parameter"""
+    if isinstance(message_ids, (list, tuple, set)):
+        return [str(msg_id) for msg_id in message_ids]
     elif isinstance(message_ids, str):
         # If it's already a string, check if it's JSON-like
         try:
             # Try to parse as JSON array
             parsed_ids = json.loads(message_ids)
             if isinstance(parsed_ids, list):
-                return ", ".join([f"'{msg_id}'" for msg_id in parsed_ids])
+                return [str(msg_id) for msg_id in parsed_ids]
             else:
-                return f"'{message_ids}'"
+                return [message_ids]
         except json.JSONDecodeError:
             # If not JSON, treat as single ID
-            return f"'{message_ids}'"
+            return [message_ids]
     else:
-        return "''"
-
-def get_pricing_workflow_status(message_id):
-    """Get pricing workflow statuses from ADM database using queries from adm_queries.sql"""
-    if not message_id:
-        return []
-        
-    try:
-        workflows = []
-        
-        # Check status for each workflow type using the proper queries
-        for workflow_type, query_name in [
-            ('pricing_raw', 'pricing_raw_status'),
-            ('pricing_enrich', 'pricing_enrich_status'),
-            ('pricing_roll', 'pricing_roll_status'),
-            ('pricing_mart', 'pricing_mart_status')
-        ]:
-            query_text = load_adm_query(query_name)
-            if not query_text:
-                logger.error(f"Query {query_name} not found in adm_queries.sql")
-                continue
-                
-            # Format the query with the message_id parameter
-            formatted_message_id = format_message_ids(message_id)
-            formatted_query = query_text.format(message_id=formatted_message_id)
-            
-            with get_adm_engine().connect() as conn:
-                result = conn.execute(text(formatted_query))
-                row = result.fetchone()
-                
-                if row:
-                    status = row[0]
-                    last_updated = row[1]
-                    started_at = row[2] if len(row) > 2 else None
-                    
-                    # Calculate status_with_long_running
-                    if status == 'pending' and started_at:
-                        time_diff = (datetime.now() - started_at).total_seconds() / 60
-                        if time_diff > 30:
-                            status_with_long_running = 'long_running'
-                        else:
-                            status_with_long_running = 'inprogress'
-                    else:
-                        status_with_long_running = status
-                    
-                    workflows.append({
-                        'workflow_type': workflow_type,
-                        'status': status,
-                        'status_with_long_running': status_with_long_running,
-                        'last_updated': last_updated,
-                        'original_message_id': message_id,
-                        'started_at': started_at
-                    })
-        
-        return workflows
-        
-    except Exception as e:
-        logger.error(f"Error getting ADM pricing workflow status: {str(e)}")
-        return []
-        
-def get_eod_workflow_status(message_id):
-    """Get EOD workflow statuses from ADM database"""
-    if not message_id:
-        return []
-        
-    try:
-        workflows = []
-        
-        # Check status for each workflow type
-        for workflow_type, query_name in [
-            ('eod_raw', 'eod_raw_status'),
-            ('eod_enrich', 'eod_enrich_status'),
-            ('eod_roll', 'eod_roll_status'),
-            ('eod_mart', 'eod_mart_status'),
-            ('eod_final', 'eod_final_status')  # Added eod_final
-        ]:
-            query_text = load_adm_query(query_name)
-            if not query_text:
-                logger.error(f"Query {query_name} not found in adm_queries.sql")
-                continue
-                
-            formatted_message_id = format_message_ids(message_id)
-            formatted_query = query_text.format(message_id=formatted_message_id)
-            
-            with get_adm_engine().connect() as conn:
-                result = conn.execute(text(formatted_query))
-                row = result.fetchone()
-                
-                if row:
-                    status = row[0]
-                    last_updated = row[1]
-                    started_at = row[2] if len(row) > 2 else None
-                    
-                    # Calculate status_with_long_running
-                    if status == 'pending' and started_at:
-                        time_diff = (datetime.now() - started_at).total_seconds() / 60
-                        if time_diff > 30:
-                            status_with_long_running = 'long_running'
-                        else:
-                            status_with_long_running = 'inprogress'
-                    else:
-                        status_with_long_running = status
-                    
-                    workflows.append({
-                        'workflow_type': workflow_type,
-                        'status': status,
-                        'status_with_long_running': status_with_long_running,
-                        'last_updated': last_updated,
-                        'original_message_id': message_id,
-                        'started_at': started_at
-                    })
-        
-        return workflows
-        
-    except Exception as e:
-        logger.error(f"Error getting ADM EOD workflow status: {str(e)}")
-        return []
-        
-def get_sod_workflow_status(message_id):
-    """Get SOD workflow statuses from ADM database"""
-    if not message_id:
-        return []
-        
-    try:
-        workflows = []
-        
-        # Check status for each workflow type
-        for workflow_type, query_name in [
-            ('sod_raw', 'sod_raw_status'),
-            ('sod_enrich', 'sod_enrich_status'),
-            ('sod_roll', 'sod_roll_status'),
-            ('sod_mart', 'sod_mart_status'),
-            ('sod_final', 'sod_final_status')
-        ]:
-            query_text = load_adm_query(query_name)
-            if not query_text:
-                logger.error(f"Query {query_name} not found in adm_queries.sql")
-                continue
-                
-            formatted_message_id = format_message_ids(message_id)
-            formatted_query = query_text.format(message_id=formatted_message_id)
-            
-            with get_adm_engine().connect() as conn:
-                result = conn.execute(text(formatted_query))
-                row = result.fetchone()
-                
-                if row:
-                    status = row[0]
-                    last_updated = row[1]
-                    started_at = row[2] if len(row) > 2 else None
-                    
-                    # Calculate status_with_long_running
-                    if status == 'pending' and started_at:
-                        time_diff = (datetime.now() - started_at).total_seconds() / 60
-                        if time_diff > 30:
-                            status_with_long_running = 'long_running'
-                        else:
-                            status_with_long_running = 'inprogress'
-                    else:
-                        status_with_long_running = status
-                    
-                    workflows.append({
-                        'workflow_type': workflow_type,
-                        'status': status,
-                        'status_with_long_running': status_with_long_running,
-                        'last_updated': last_updated,
-                        'original_message_id': message_id,
-                        'started_at': started_at
-                    })
-        
-        return workflows
-    except Exception as e:
-        logger.error(f"Error getting ADM SOD workflow status: {str(e)}")
-        return []
-        
-def get_aod_workflow_status(message_ids):
-    """Get AOD workflow statuses from ADM database"""
-    if not message_ids:
-        return []
-        
-    try:
-        workflows = []
-        
-        # Format message IDs for SQL query
-        message_ids_str = format_message_ids(message_ids)
-        total_count = len(message_ids) if isinstance(message_ids, list) else 1
-        
-        # Get parent_original_message_id from ATLS database
-        parent_message_id = get_aod_parent_message_id(message_ids)
-        
-        # Check status for each AOD workflow type
-        for workflow_type, query_name, service_name in [
-            ('aod_raw', 'aod_raw_status', 'aod_raw_loader'),
-            ('aod_enrich', 'aod_enrich_status', 'aod_enrichment_service'),
-            ('aod_roll', 'aod_roll_status', 'aod_rollup_service'),
-            ('aod_mart', 'aod_mart_status', 'aod_mart_loader'),
-            ('aod_final', 'aod_final_status', 'aod_final_publisher')
-        ]:
-            query_text = load_adm_query(query_name)
-            if not query_text:
-                logger.error(f"Query {query_name} not found in adm_queries.sql")
-                continue
-                
-            # Replace placeholders with actual values
-            formatted_query = query_text.format(
-                message_ids_placeholder=message_ids_str,
-                total_count=total_count,
-                parent_message_id=parent_message_id or ''
-            )
-            
-            with get_adm_engine().connect() as conn:
-                result = conn.execute(text(formatted_query))
-                row = result.fetchone()
-                
-                if row:
-                    status = row[0]
-                    last_updated = row[1]
-                    started_at = row[2] if len(row) > 2 else None
-                    
-                    # Extract progress counts based on workflow type
-                    if workflow_type in ['aod_raw', 'aod_enrich', 'aod_roll', 'aod_mart']:
-                        # For regular AOD workflows: total:positions:taxlots
-                        total_count_val = row[3] if len(row) > 3 else total_count
-                        positions_count = row[4] if len(row) > 4 else 0
-                        taxlots_count = row[5] if len(row) > 5 else 0
-                        progress_data = {
-                            'total_count': total_count_val,
-                            'positions_count': positions_count,
-                            'taxlots_count': taxlots_count
-                        }
-                    elif workflow_type == 'aod_final':
-                        # For final workflow: total:asof_statements:eod_all_statements
-                        total_count_val = row[3] if len(row) > 3 else total_count
-                        asof_statements_count = row[4] if len(row) > 4 else 0
-                        eod_all_statements_count = row[5] if len(row) > 5 else 0
-                        progress_data = {
-                            'total_count': total_count_val,
-                            'asof_statements_count': asof_statements_count,
-                            'eod_all_statements_count': eod_all_statements_count
-                        }
-                    else:
-                        progress_data = {}
-                    
-                    # Calculate status_with_long_running
-                    if status == 'pending' and started_at:
-                        time_diff = (datetime.now() - started_at).total_seconds() / 60
-                        if time_diff > 30:
-                            status_with_long_running = 'long_running'
-                        else:
-                            status_with_long_running = 'inprogress'
-                    else:
-                        status_with_long_running = status
-                    
-                    workflow_data = {
-                        'workflow_type': workflow_type,
-                        'status': status,
-                        'status_with_long_running': status_with_long_running,
-                        'last_updated': last_updated,
-                        'original_message_ids': message_ids,
-                        'parent_message_id': parent_message_id,
-                        'started_at': started_at
-                    }
-                    workflow_data.update(progress_data)
-                    workflows.append(workflow_data)
-        
-        return workflows
-        
-    except Exception as e:
-        logger.error(f"Error getting ADM AOD workflow status: {str(e)}")
         return []
 
-def get_aod_parent_message_id(message_ids):
-    """Get the parent_original_message_id from accounting_events for AOD workflows"""
+# Message id sets up to this size are bound as one text[] parameter; larger sets are
+# loaded into a session temp table so the statement text stays small and the planner
+# gets row estimates for a semi-join instead of a huge ANY() array. Creating and
+# analyzing the temp table costs a few ms per request, so below ~1000 ids the array
+# is as fast or faster; at 50k ids the temp table is 3-4x faster (bench.py id_sets).
+ID_SET_TEMP_TABLE_THRESHOLD = int(os.getenv('ADM_ID_SET_TEMP_TABLE_THRESHOLD', 2000))
+ID_SET_TEMP_TABLE = 'adm_message_ids'
+
+_ANY_MESSAGE_IDS_RE = re.compile(r'=\s*ANY\(\s*:message_ids\s*\)')
+_TEMP_TABLE_CLAUSES = {}
+
+def _temp_table_clause(sql):
+    """text() clause for a statement with ANY(:message_ids) rewritten to read the temp table"""
+    clause = _TEMP_TABLE_CLAUSES.get(sql)
+    if clause is None:
+        clause = text(_ANY_MESSAGE_IDS_RE.sub(
+            f'IN (SELECT original_message_id FROM {ID_SET_TEMP_TABLE})', sql))
+        _TEMP_TABLE_CLAUSES[sql] = clause
+    return clause
+
+class MessageIdSet:
+    """
+    A message id set bound to one connection.
+
+    Small sets are passed as the :message_ids array parameter. Sets larger than
+    ID_SET_TEMP_TABLE_THRESHOLD are inserted once into a transaction-scoped temp
+    table and every statement executed through execute() joins against it, so
+    the ids cross the wire once no matter how many stage queries follow.
+    """
+
+    def __init__(self, conn, message_ids, threshold=None):
+        self.conn = conn
+        self.ids = list(dict.fromkeys(normalize_message_ids(message_ids)))
+        if threshold is None:
+            threshold = ID_SET_TEMP_TABLE_THRESHOLD
+        # A read-only snapshot cannot create temp tables, so it always binds the array
+        self.use_temp_table = len(self.ids) > threshold and not is_read_only(conn)
+        if self.use_temp_table:
+            self._load_temp_table()
+
+    @property
+    def strategy(self):
+        return 'temp_table' if self.use_temp_table else 'array'
+
+    def _load_temp_table(self):
+        # ON COMMIT DROP: the table disappears with the transaction, so pooled
+        # connections never carry a stale id set into the next request
+        self.conn.execute(text(
+            f"CREATE TEMP TABLE IF NOT EXISTS {ID_SET_TEMP_TABLE} "
+            f"(original_message_id text PRIMARY KEY) ON COMMIT DROP"))
+        self.conn.execute(text(f"TRUNCATE {ID_SET_TEMP_TABLE}"))
+        self.conn.execute(text(
+            f"INSERT INTO {ID_SET_TEMP_TABLE} SELECT unnest(CAST(:message_ids AS text[]))"),
+            {'message_ids': self.ids})
+        self.conn.execute(text(f"ANALYZE {ID_SET_TEMP_TABLE}"))
+
+    def execute(self, statement, params=None):
+        """Execute a SqlStatement, text() clause or SQL string filtered by this id set"""
+        params = dict(params or {})
+        sql = getattr(statement, 'sql', None) or getattr(statement, 'text', None) or statement
+        if self.use_temp_table:
+            return self.conn.execute(_temp_table_clause(sql), params)
+        params['message_ids'] = self.ids
+        clause = getattr(statement, 'clause', None)
+        if clause is None:
+            clause = statement if not isinstance(statement, str) else text(statement)
+        return self.conn.execute(clause, params)
+
+# Stage definitions mirrored from the per-stage queries in adm_queries.sql:
+#   complete      - marker type whose presence completes the stage
+#   subjects      - subject areas that must all carry the complete marker (None = any row)
+#   service       - error_logs.service_nm that fails the stage
+#   long_running  - marker type that flags the stage long running after 30 minutes
+#   started       - marker type whose latest timestamp is reported as started_at
+# Final stages read final_markers: the statements marker plus one subject_marker per subject.
+FINAL_SUBJECTS = ('positions', 'disposal_lots', 'cash_settlements', 'transactions', 'taxlots')
+SUBJECT_AREAS = ('taxlots', 'positions', 'disposal_lots', 'transactions', 'cash_settlements')
+
+ADM_STAGE_DEFINITIONS = {
+    'pricing_raw': {'complete': 'eodpxRegionSubjectAreaRawLoadComplete', 'subjects': None,
+                    'service': 'raw_statement_loader',
+                    'long_running': 'eodpxRegionSubjectAreaRawLoadComplete',
+                    'started': 'eodpxRegionSubjectAreaRawLoadComplete'},
+    'pricing_enrich': {'complete': 'eodpxRegionSubjectAreaEnriched', 'subjects': None,
+                       'service': 'enriched_statement_loader',
+                       'long_running': 'eodpxAccountSubjectAreaEnriched',
+                       'started': 'eodpxRegionSubjectAreaEnrichStarted'},
+    'pricing_roll': {'complete': 'eodpxRegionSubjectAreaRollupComplete', 'subjects': None,
+                     'service': 'rollup',
+                     'long_running': 'eodpxAccountSubjectAreaRollupComplete',
+                     'started': 'eodpxRegionSubjectAreaRollupStarted'},
+    'pricing_mart': {'complete': 'eodpxRegionValuationPricesMartLoadComplete', 'subjects': None,
+                     'service': 'mln',
+                     'long_running': 'eodpxAccountSubjectAreaMartLoadComplete',
+                     'started': 'eodpxRegionSubjectAreaMartLoadStarted'},
+    'eod_raw': {'complete': 'eodRegionSubjectAreaRawLoadComplete', 'subjects': SUBJECT_AREAS,
+                'service': 'eod_raw_loader',
+                'long_running': 'eodRegionSubjectAreaRawLoadComplete',
+                'started': 'eodRegionSubjectAreaRawLoadComplete'},
+    'eod_enrich': {'complete': 'eodRegionSubjectAreaEnriched', 'subjects': SUBJECT_AREAS,
+                   'service': 'eod_enrichment_service',
+                   'long_running': 'eodRegionSubjectAreaEnrichStarted',
+                   'started': 'eodRegionSubjectAreaEnrichStarted'},
+    'eod_roll': {'complete': 'eodRegionSubjectAreaRollupComplete', 'subjects': SUBJECT_AREAS,
+                 'service': 'eod_rollup_service',
+                 'long_running': 'eodRegionSubjectAreaRollupStarted',
+                 'started': 'eodRegionSubjectAreaRollupStarted'},
+    'eod_mart': {'complete': 'eodRegionMartLoadComplete', 'subjects': None,
+                 'service': 'eod_mart_loader',
+                 'long_running': 'eodRegionMartloadStarted',
+                 'started': 'eodRegionMartloadStarted'},
+    'eod_final': {'final': True, 'complete': 'eodRegionStatementsPublished',
+                  'subject_marker': 'eodRegionSubjectAreaPublished', 'subjects': FINAL_SUBJECTS,
+                  'service': 'eod_final_publisher'},
+    'sod_raw': {'complete': 'sodRegionSubjectAreaRawLoadComplete', 'subjects': SUBJECT_AREAS,
+                'service': 'sod_raw_loader',
+                'long_running': 'sodRegionSubjectAreaRawloadStarted',
+                'started': 'sodRegionSubjectAreaRawloadStarted'},
+    'sod_enrich': {'complete': 'sodRegionSubjectAreaEnriched', 'subjects': SUBJECT_AREAS,
+                   'service': 'sod_enrichment_service',
+                   'long_running': 'sodRegionSubjectAreaEnrichStarted',
+                   'started': 'sodRegionSubjectAreaEnrichStarted'},
+    'sod_roll': {'complete': 'sodRegionSubjectAreaRollupComplete', 'subjects': SUBJECT_AREAS,
+                 'service': 'sod_rollup_service',
+                 'long_running': 'sodRegionSubjectAreaRollupStarted',
+                 'started': 'sodRegionSubjectAreaRollupStarted'},
+    'sod_mart': {'complete': 'sodRegionMartLoadComplete', 'subjects': None,
+                 'service': 'sod_mart_loader',
+                 'long_running': 'sodRegionMartloadStarted',
+                 'started': 'sodRegionMartloadStarted'},
+    'sod_final': {'final': True, 'complete': 'sodRegionStatementsPublished',
+                  'subject_marker': 'sodRegionSubjectAreaPublished', 'subjects': FINAL_SUBJECTS,
+                  'service': 'sod_final_publisher'},
+}
+
+PRICING_STAGES = ['pricing_raw', 'pricing_enrich', 'pricing_roll', 'pricing_mart']
+EOD_STAGES = ['eod_raw', 'eod_enrich', 'eod_roll', 'eod_mart', 'eod_final']
+SOD_STAGES = ['sod_raw', 'sod_enrich', 'sod_roll', 'sod_mart', 'sod_final']
+
+LONG_RUNNING_MINUTES = 30
+
+def _minutes_since(ts):
+    now = datetime.now(ts.tzinfo) if ts.tzinfo else datetime.now()
+    return (now - ts).total_seconds() / 60
+
+def _with_long_running(status, started_at):
+    """Same rule the per-stage helpers apply to a pending stage that has started"""
+    if status == 'pending' and started_at:
+        return 'long_running' if _minutes_since(started_at) > LONG_RUNNING_MINUTES else 'inprogress'
+    return status
+
+def _evaluate_stage(definition, events):
+    """
+    Evaluate one stage for one message id.
+    events maps (source, type_cd) -> {subject_area_cd: (first_created, last_created)}
+    Returns (status, last_updated, started_at) following the CASE order of the SQL.
+    """
+    marker_source = 'final_marker' if definition.get('final') else 'marker'
+    complete_rows = events.get((marker_source, definition['complete']), {})
+    failed = (('error', definition['service']) in events)
+
+    if definition.get('final'):
+        subject_rows = events.get((marker_source, definition['subject_marker']), {})
+        published = set(subject_rows) & set(definition['subjects'])
+        timestamps = list(complete_rows.values()) + list(subject_rows.values())
+        last_updated = max((last for _, last in timestamps), default=None)
+        started_at = min((first for first, _ in timestamps), default=None)
+
+        if complete_rows and len(published) == len(definition['subjects']):
+            status = 'completed'
+        elif failed:
+            status = 'failed'
+        elif timestamps:
+            status = 'inprogress'
+        else:
+            status = 'pending'
+        return status, last_updated, started_at
+
+    last_updated = max((last for _, last in complete_rows.values()), default=None)
+    started_rows = events.get((marker_source, definition['started']), {})
+    started_at = max((last for _, last in started_rows.values()), default=None)
+    long_running_rows = events.get((marker_source, definition['long_running']), {})
+
+    subjects = definition['subjects']
+    if subjects:
+        done = set(complete_rows) & set(subjects)
+        complete = len(done) == len(subjects)
+    else:
+        done = set()
+        complete = bool(complete_rows)
+
+    if complete:
+        status = 'completed'
+    elif failed:
+        status = 'failed'
+    elif done:
+        status = 'inprogress'
+    elif any(_minutes_since(first) > LONG_RUNNING_MINUTES for first, _ in long_running_rows.values()):
+        status = 'long_running'
+    else:
+        status = 'pending'
+    return status, last_updated, started_at
+
+def _aggregate_stage(workflow_type, per_id_rows):
+    """Roll per-message-id stage rows up into one row for the whole id set"""
+    statuses = [r['status'] for r in per_id_rows]
+    long_running = [r['status_with_long_running'] for r in per_id_rows]
+
+    def _rollup(values):
+        if values and all(v == 'completed' for v in values):
+            return 'completed'
+        for candidate in ('failed', 'long_running'):
+            if candidate in values:
+                return candidate
+        if any(v in ('completed', 'inprogress') for v in values):
+            return 'inprogress'
+        return 'pending'
+
+    return {
+        'workflow_type': workflow_type,
+        'status': _rollup(statuses),
+        'status_with_long_running': _rollup(long_running),
+        'last_updated': max((r['last_updated'] for r in per_id_rows if r['last_updated']), default=None),
+        'started_at': min((r['started_at'] for r in per_id_rows if r['started_at']), default=None),
+        'original_message_id': per_id_rows[0]['original_message_id'] if per_id_rows else None,
+        'message_count': len(per_id_rows),
+        'completed_count': statuses.count('completed'),
+        'failed_count': statuses.count('failed')
+    }
+
+def aggregate_stage_statuses(per_id, message_ids, workflow_types=None):
+    """
+    Roll the per_id rows of get_batch_stage_statuses up over a subset of its ids, e.g. the ids
+    of one client/region out of a batch fetched for many. Same rows as its 'aggregate'.
+    """
+    workflow_types = workflow_types or PRICING_STAGES + EOD_STAGES + SOD_STAGES
+    per_stage = defaultdict(list)
+    for message_id in dict.fromkeys(normalize_message_ids(message_ids)):
+        for row in per_id.get(message_id, []):
+            per_stage[row['workflow_type']].append(row)
+    return [_aggregate_stage(wt, per_stage[wt]) for wt in workflow_types]
+
+def get_batch_stage_statuses(message_ids, workflow_types=None):
+    """
+    Get ADM stage statuses for many message ids in one round trip.
+
+    Runs the grouped batch_stage_events query once for all ids and all requested stage
+    definitions, then evaluates every (message id, stage) in Python.
+    Returns a dict with
+      per_id    - {message_id: [stage rows]}, each id evaluated on its own
+      aggregate - one row per stage rolled up over the per-id rows (all completed,
+                  any failed, any long running, ...) with completed/failed counts
+      combined  - one row per stage evaluating the whole id set at once, i.e. the
+                  semantics of the per-stage queries with ANY(:message_ids)
+    """
+    workflow_types = workflow_types or PRICING_STAGES + EOD_STAGES + SOD_STAGES
+    message_id_list = list(dict.fromkeys(normalize_message_ids(message_ids)))
+    result = {'per_id': {}, 'aggregate': [], 'combined': []}
+    if not message_id_list:
+        return result
+
+    definitions = [(wt, ADM_STAGE_DEFINITIONS[wt]) for wt in workflow_types]
+    marker_types = set()
+    service_names = set()
+    for _, definition in definitions:
+        service_names.add(definition['service'])
+        for key in ('complete', 'subject_marker', 'long_running', 'started'):
+            if definition.get(key):
+                marker_types.add(definition[key])
+
     try:
-        if not message_ids:
-            return None
-            
-        # Format message IDs for SQL query
-        message_ids_str = format_message_ids(message_ids)
-        
-        # Query to get parent_original_message_id from accounting_events
-        query = """
-            SELECT DISTINCT parent_original_message_id
-            FROM accounting_events
-            WHERE original_message_id IN ({})
-              AND snapshot_type_cd = 'AOD'
-            LIMIT 1
-        """.format(message_ids_str)
-        
-        with get_atls_engine().connect() as conn:
-            result = conn.execute(text(query))
-            row = result.fetchone()
-            return row[0] if row else None
-            
+        events_by_id = defaultdict(dict)
+        with adm_connection() as conn:
+            rows = MessageIdSet(conn, message_id_list).execute(ADM_QUERIES.get('batch_stage_events'), {
+                'marker_types': sorted(marker_types),
+                'service_names': sorted(service_names)
+            })
+            for oid, source, type_cd, subject, first_created, last_created in rows:
+                events_by_id[oid].setdefault((source, type_cd), {})[subject] = (first_created, last_created)
     except Exception as e:
-        logger.error(f"Error getting AOD parent message ID: {str(e)}")
-        return None
\ No newline at end of file
+        logger.error(f"Error getting batched ADM stage statuses: {str(e)}")
+        return result
+
+    def _stage_rows(events, message_id):
+        rows = []
+        for workflow_type, definition in definitions:
+            status, last_updated, started_at = _evaluate_stage(definition, events)
+            rows.append({
+                'workflow_type': workflow_type,
+                'status': status,
+                'status_with_long_running': _with_long_running(status, started_at),
+                'last_updated': last_updated,
+                'original_message_id': message_id,
+                'started_at': started_at
+            })
+        return rows
+
+    per_stage = defaultdict(list)
+    combined_events = {}
+    for message_id in message_id_list:
+        events = events_by_id.get(message_id, {})
+        stage_rows = _stage_rows(events, message_id)
+        for row in stage_rows:
+            per_stage[row['workflow_type']].append(row)
+        result['per_id'][message_id] = stage_rows
+
+        for key, subjects in events.items():
+            merged = combined_events.setdefault(key, {})
+            for subject, (first, last) in subjects.items():
+                if subject in merged:
+                    first = min(first, merged[subject][0])
+                    last = max(last, merged[subject][1])
+                merged[subject] = (first, last)
+
+    result['aggregate'] = [_aggregate_stage(wt, per_stage[wt]) for wt, _ in definitions]
+    result['combined'] = _stage_rows(combined_events, message_id_list)
+    return result
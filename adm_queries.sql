@@ -3,28 +3,28 @@ SELECT
     CASE 
         WHEN EXISTS (
             SELECT 1 FROM markers 
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'eodpxRegionSubjectAreaRawLoadComplete'
         ) THEN 'completed'
         WHEN EXISTS (
             SELECT 1 FROM error_logs
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND service_nm = 'raw_statement_loader'
         ) THEN 'failed'
         WHEN EXISTS (
             SELECT 1 FROM markers
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'eodpxRegionSubjectAreaRawLoadComplete'
               AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
         ) THEN 'long_running'
         ELSE 'pending'
     END AS status,
     (SELECT MAX(created_at) FROM markers 
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'eodpxRegionSubjectAreaRawLoadComplete'
     ) AS last_updated,
     (SELECT MAX(created_at) FROM markers
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'eodpxRegionSubjectAreaRawLoadComplete'
     ) AS started_at;
 
@@ -33,28 +33,28 @@ SELECT
     CASE 
         WHEN EXISTS (
             SELECT 1 FROM markers 
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'eodpxRegionSubjectAreaEnriched'
         ) THEN 'completed'
         WHEN EXISTS (
             SELECT 1 FROM error_logs
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND service_nm = 'enriched_statement_loader'
         ) THEN 'failed'
         WHEN EXISTS (
             SELECT 1 FROM markers
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'eodpxAccountSubjectAreaEnriched'
               AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
         ) THEN 'long_running'
         ELSE 'pending'
     END AS status,
     (SELECT MAX(created_at) FROM markers 
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'eodpxRegionSubjectAreaEnriched'
     ) AS last_updated,
     (SELECT MAX(created_at) FROM markers
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'eodpxRegionSubjectAreaEnrichStarted'
     ) AS started_at;
 
@@ -63,28 +63,28 @@ SELECT
     CASE 
         WHEN EXISTS (
             SELECT 1 FROM markers 
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'eodpxRegionSubjectAreaRollupComplete'
         ) THEN 'completed'
         WHEN EXISTS (
             SELECT 1 FROM error_logs
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND service_nm = 'rollup'
         ) THEN 'failed'
         WHEN EXISTS (
             SELECT 1 FROM markers
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'eodpxAccountSubjectAreaRollupComplete'
               AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
         ) THEN 'long_running'
         ELSE 'pending'
     END AS status,
     (SELECT MAX(created_at) FROM markers 
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'eodpxRegionSubjectAreaRollupComplete'
     ) AS last_updated,
     (SELECT MAX(created_at) FROM markers
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'eodpxRegionSubjectAreaRollupStarted'
     ) AS started_at;
 
@@ -93,28 +93,28 @@ SELECT
     CASE 
         WHEN EXISTS (
             SELECT 1 FROM markers 
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'eodpxRegionValuationPricesMartLoadComplete'
         ) THEN 'completed'
         WHEN EXISTS (
             SELECT 1 FROM error_logs
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND service_nm = 'mln'
         ) THEN 'failed'
         WHEN EXISTS (
             SELECT 1 FROM markers
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'eodpxAccountSubjectAreaMartLoadComplete'
               AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
         ) THEN 'long_running'
         ELSE 'pending'
     END AS status,
     (SELECT MAX(created_at) FROM markers 
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'eodpxRegionValuationPricesMartLoadComplete'
     ) AS last_updated,
     (SELECT MAX(created_at) FROM markers
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'eodpxRegionSubjectAreaMartLoadStarted'
     ) AS started_at;
 
@@ -123,35 +123,35 @@ SELECT
     CASE 
         WHEN (
             SELECT COUNT(DISTINCT subject_area_cd) FROM markers 
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'eodRegionSubjectAreaRawLoadComplete'
               AND subject_area_cd IN ('taxlots', 'positions', 'disposal_lots', 'transactions', 'cash_settlements')
         ) = 5 THEN 'completed'
         WHEN EXISTS (
             SELECT 1 FROM error_logs
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND service_nm = 'eod_raw_loader'
         ) THEN 'failed'
         WHEN (
             SELECT COUNT(DISTINCT subject_area_cd) FROM markers 
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'eodRegionSubjectAreaRawLoadComplete'
               AND subject_area_cd IN ('taxlots', 'positions', 'disposal_lots', 'transactions', 'cash_settlements')
         ) > 0 THEN 'inprogress'
         WHEN EXISTS (
             SELECT 1 FROM markers
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'eodRegionSubjectAreaRawLoadComplete'
               AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
         ) THEN 'long_running'
         ELSE 'pending'
     END AS status,
     (SELECT MAX(created_at) FROM markers 
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'eodRegionSubjectAreaRawLoadComplete'
     ) AS last_updated,
     (SELECT MAX(created_at) FROM markers
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'eodRegionSubjectAreaRawLoadComplete'
     ) AS started_at;
 
@@ -160,35 +160,35 @@ SELECT
     CASE 
         WHEN (
             SELECT COUNT(DISTINCT subject_area_cd) FROM markers 
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'eodRegionSubjectAreaEnriched'
               AND subject_area_cd IN ('taxlots', 'positions', 'disposal_lots', 'transactions', 'cash_settlements')
         ) = 5 THEN 'completed'
         WHEN EXISTS (
             SELECT 1 FROM error_logs
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND service_nm = 'eod_enrichment_service'
         ) THEN 'failed'
         WHEN (
             SELECT COUNT(DISTINCT subject_area_cd) FROM markers 
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'eodRegionSubjectAreaEnriched'
               AND subject_area_cd IN ('taxlots', 'positions', 'disposal_lots', 'transactions', 'cash_settlements')
         ) > 0 THEN 'inprogress'
         WHEN EXISTS (
             SELECT 1 FROM markers
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'eodRegionSubjectAreaEnrichStarted'
               AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
         ) THEN 'long_running'
         ELSE 'pending'
     END AS status,
     (SELECT MAX(created_at) FROM markers 
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'eodRegionSubjectAreaEnriched'
     ) AS last_updated,
     (SELECT MAX(created_at) FROM markers
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'eodRegionSubjectAreaEnrichStarted'
     ) AS started_at;
 
@@ -197,35 +197,35 @@ SELECT
     CASE 
         WHEN (
             SELECT COUNT(DISTINCT subject_area_cd) FROM markers 
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'eodRegionSubjectAreaRollupComplete'
               AND subject_area_cd IN ('taxlots', 'positions', 'disposal_lots', 'transactions', 'cash_settlements')
         ) = 5 THEN 'completed'
         WHEN EXISTS (
             SELECT 1 FROM error_logs
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND service_nm = 'eod_rollup_service'
         ) THEN 'failed'
         WHEN (
             SELECT COUNT(DISTINCT subject_area_cd) FROM markers 
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'eodRegionSubjectAreaRollupComplete'
               AND subject_area_cd IN ('taxlots', 'positions', 'disposal_lots', 'transactions', 'cash_settlements')
         ) > 0 THEN 'inprogress'
         WHEN EXISTS (
             SELECT 1 FROM markers
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'eodRegionSubjectAreaRollupStarted'
               AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
         ) THEN 'long_running'
         ELSE 'pending'
     END AS status,
     (SELECT MAX(created_at) FROM markers 
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'eodRegionSubjectAreaRollupComplete'
     ) AS last_updated,
     (SELECT MAX(created_at) FROM markers
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'eodRegionSubjectAreaRollupStarted'
     ) AS started_at;
 
@@ -234,28 +234,28 @@ SELECT
     CASE 
         WHEN EXISTS (
             SELECT 1 FROM markers 
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'eodRegionMartLoadComplete'
         ) THEN 'completed'
         WHEN EXISTS (
             SELECT 1 FROM error_logs
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND service_nm = 'eod_mart_loader'
         ) THEN 'failed'
         WHEN EXISTS (
             SELECT 1 FROM markers
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'eodRegionMartloadStarted'
               AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
         ) THEN 'long_running'
         ELSE 'pending'
     END AS status,
     (SELECT MAX(created_at) FROM markers 
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'eodRegionMartLoadComplete'
     ) AS last_updated,
     (SELECT MAX(created_at) from markers
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'eodRegionMartloadStarted'
     ) AS started_at;
 
@@ -265,12 +265,12 @@ SELECT
         -- Check if eodRegionStatementsPublished exists AND eodRegionSubjectAreaPublished exists for all 5 subject areas
         WHEN EXISTS (
             SELECT 1 FROM final_markers 
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type = 'eodRegionStatementsPublished'
         ) AND (
             SELECT COUNT(DISTINCT marker->'payload'->>'subject_area_cd') 
             FROM final_markers 
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type = 'eodRegionSubjectAreaPublished'
               AND marker->'payload'->>'subject_area_cd' IN ('positions', 'disposal_lots', 'cash_settlements', 'transactions', 'taxlots')
         ) = 5 THEN 'completed'
@@ -278,21 +278,21 @@ SELECT
         -- Check for errors
         WHEN EXISTS (
             SELECT 1 FROM error_logs
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND service_nm = 'eod_final_publisher'
         ) THEN 'failed'
         
         -- Check if any markers exist but not all required ones
         WHEN EXISTS (
             SELECT 1 FROM final_markers 
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type IN ('eodRegionStatementsPublished', 'eodRegionSubjectAreaPublished')
         ) THEN 'inprogress'
         
         -- Check for long running (more than 30 minutes since first marker started)
         WHEN EXISTS (
             SELECT 1 FROM final_markers
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type IN ('eodRegionStatementsPublished', 'eodRegionSubjectAreaPublished')
               AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
         ) THEN 'long_running'
@@ -302,13 +302,13 @@ SELECT
     
     -- Get the latest update time from any completed marker
     (SELECT MAX(created_at) FROM final_markers 
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type IN ('eodRegionStatementsPublished', 'eodRegionSubjectAreaPublished')
     ) AS last_updated,
     
     -- Get the earliest start time from any marker
     (SELECT MIN(created_at) FROM final_markers
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type IN ('eodRegionStatementsPublished', 'eodRegionSubjectAreaPublished')
     ) AS started_at;
 	
@@ -317,35 +317,35 @@ SELECT
     CASE 
         WHEN (
             SELECT COUNT(DISTINCT subject_area_cd) FROM markers 
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'sodRegionSubjectAreaRawLoadComplete'
               AND subject_area_cd IN ('taxlots', 'positions', 'disposal_lots', 'transactions', 'cash_settlements')
         ) = 5 THEN 'completed'
         WHEN EXISTS (
             SELECT 1 FROM error_logs
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND service_nm = 'sod_raw_loader'
         ) THEN 'failed'
         WHEN (
             SELECT COUNT(DISTINCT subject_area_cd) FROM markers 
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'sodRegionSubjectAreaRawLoadComplete'
               AND subject_area_cd IN ('taxlots', 'positions', 'disposal_lots', 'transactions', 'cash_settlements')
         ) > 0 THEN 'inprogress'
         WHEN EXISTS (
             SELECT 1 FROM markers
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'sodRegionSubjectAreaRawloadStarted'
               AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
         ) THEN 'long_running'
         ELSE 'pending'
     END AS status,
     (SELECT MAX(created_at) FROM markers 
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'sodRegionSubjectAreaRawLoadComplete'
     ) AS last_updated,
     (SELECT MAX(created_at) FROM markers
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'sodRegionSubjectAreaRawloadStarted'
     ) AS started_at;
 
@@ -354,35 +354,35 @@ SELECT
     CASE 
         WHEN (
             SELECT COUNT(DISTINCT subject_area_cd) FROM markers 
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'sodRegionSubjectAreaEnriched'
               AND subject_area_cd IN ('taxlots', 'positions', 'disposal_lots', 'transactions', 'cash_settlements')
         ) = 5 THEN 'completed'
         WHEN EXISTS (
             SELECT 1 FROM error_logs
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND service_nm = 'sod_enrichment_service'
         ) THEN 'failed'
         WHEN (
             SELECT COUNT(DISTINCT subject_area_cd) FROM markers 
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'sodRegionSubjectAreaEnriched'
               AND subject_area_cd IN ('taxlots', 'positions', 'disposal_lots', 'transactions', 'cash_settlements')
         ) > 0 THEN 'inprogress'
         WHEN EXISTS (
             SELECT 1 FROM markers
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'sodRegionSubjectAreaEnrichStarted'
               AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
         ) THEN 'long_running'
         ELSE 'pending'
     END AS status,
     (SELECT MAX(created_at) FROM markers 
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'sodRegionSubjectAreaEnriched'
     ) AS last_updated,
     (SELECT MAX(created_at) FROM markers
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'sodRegionSubjectAreaEnrichStarted'
     ) AS started_at;
 
@@ -391,35 +391,35 @@ SELECT
     CASE 
         WHEN (
             SELECT COUNT(DISTINCT subject_area_cd) FROM markers 
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'sodRegionSubjectAreaRollupComplete'
               AND subject_area_cd IN ('taxlots', 'positions', 'disposal_lots', 'transactions', 'cash_settlements')
         ) = 5 THEN 'completed'
         WHEN EXISTS (
             SELECT 1 FROM error_logs
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND service_nm = 'sod_rollup_service'
         ) THEN 'failed'
         WHEN (
             SELECT COUNT(DISTINCT subject_area_cd) FROM markers 
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'sodRegionSubjectAreaRollupComplete'
               AND subject_area_cd IN ('taxlots', 'positions', 'disposal_lots', 'transactions', 'cash_settlements')
         ) > 0 THEN 'inprogress'
         WHEN EXISTS (
             SELECT 1 FROM markers
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'sodRegionSubjectAreaRollupStarted'
               AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
         ) THEN 'long_running'
         ELSE 'pending'
     END AS status,
     (SELECT MAX(created_at) FROM markers 
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'sodRegionSubjectAreaRollupComplete'
     ) AS last_updated,
     (SELECT MAX(created_at) FROM markers
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'sodRegionSubjectAreaRollupStarted'
     ) AS started_at;
 
@@ -428,28 +428,28 @@ SELECT
     CASE 
         WHEN EXISTS (
             SELECT 1 FROM markers 
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'sodRegionMartLoadComplete'
         ) THEN 'completed'
         WHEN EXISTS (
             SELECT 1 FROM error_logs
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND service_nm = 'sod_mart_loader'
         ) THEN 'failed'
         WHEN EXISTS (
             SELECT 1 FROM markers
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'sodRegionMartloadStarted'
               AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
         ) THEN 'long_running'
         ELSE 'pending'
     END AS status,
     (SELECT MAX(created_at) FROM markers 
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'sodRegionMartLoadComplete'
     ) AS last_updated,
     (SELECT MAX(created_at) FROM markers
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'sodRegionMartloadStarted'
     ) AS started_at;
 
@@ -459,56 +459,56 @@ SELECT
         WHEN (
             SELECT COUNT(DISTINCT m.original_message_id) 
             FROM markers m
-            WHERE m.original_message_id IN ({message_ids_placeholder})
+            WHERE m.original_message_id = ANY(:message_ids)
               AND m.marker_type_cd = 'asOfRegionSubjectAreaRawLoadComplete'
               AND m.subject_area_cd = 'positions'
-        ) = {total_count} 
+        ) = :total_count 
         AND (
             SELECT COUNT(DISTINCT m.original_message_id) 
             FROM markers m
-            WHERE m.original_message_id IN ({message_ids_placeholder})
+            WHERE m.original_message_id = ANY(:message_ids)
               AND m.marker_type_cd = 'asOfRegionSubjectAreaRawLoadComplete'
               AND m.subject_area_cd = 'taxlots'
-        ) = {total_count} THEN 'completed'
+        ) = :total_count THEN 'completed'
         WHEN EXISTS (
             SELECT 1 FROM error_logs
-            WHERE original_message_id IN ({message_ids_placeholder})
+            WHERE original_message_id = ANY(:message_ids)
               AND service_nm = 'aod_raw_loader'
         ) THEN 'failed'
         WHEN (
             SELECT COUNT(DISTINCT m.original_message_id) 
             FROM markers m
-            WHERE m.original_message_id IN ({message_ids_placeholder})
+            WHERE m.original_message_id = ANY(:message_ids)
               AND m.marker_type_cd = 'asOfRegionSubjectAreaRawLoadComplete'
               AND m.subject_area_cd IN ('positions', 'taxlots')
         ) > 0 THEN 'inprogress'
         WHEN EXISTS (
             SELECT 1 FROM markers
-            WHERE original_message_id IN ({message_ids_placeholder})
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'asOfRegionSubjectAreaRawLoadStarted'
               AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
         ) THEN 'long_running'
         ELSE 'pending'
     END AS status,
     (SELECT MAX(created_at) FROM markers 
-     WHERE original_message_id IN ({message_ids_placeholder})
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'asOfRegionSubjectAreaRawLoadComplete'
     ) AS last_updated,
     (SELECT MAX(created_at) FROM markers
-     WHERE original_message_id IN ({message_ids_placeholder})
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'asOfRegionSubjectAreaRawLoadStarted'
     ) AS started_at,
     -- Progress counts: total:positions:taxlots
-    {total_count} AS total_count,
+    CAST(:total_count AS integer) AS total_count,
     (SELECT COUNT(DISTINCT m.original_message_id) 
      FROM markers m
-     WHERE m.original_message_id IN ({message_ids_placeholder})
+     WHERE m.original_message_id = ANY(:message_ids)
        AND m.marker_type_cd = 'asOfRegionSubjectAreaRawLoadComplete'
        AND m.subject_area_cd = 'positions'
     ) AS positions_count,
     (SELECT COUNT(DISTINCT m.original_message_id) 
      FROM markers m
-     WHERE m.original_message_id IN ({message_ids_placeholder})
+     WHERE m.original_message_id = ANY(:message_ids)
        AND m.marker_type_cd = 'asOfRegionSubjectAreaRawLoadComplete'
        AND m.subject_area_cd = 'taxlots'
     ) AS taxlots_count;
@@ -519,56 +519,56 @@ SELECT
         WHEN (
             SELECT COUNT(DISTINCT m.original_message_id) 
             FROM markers m
-            WHERE m.original_message_id IN ({message_ids_placeholder})
+            WHERE m.original_message_id = ANY(:message_ids)
               AND m.marker_type_cd = 'asOfRegionSubjectAreaEnriched'
               AND m.subject_area_cd = 'positions'
-        ) = {total_count} 
+        ) = :total_count 
         AND (
             SELECT COUNT(DISTINCT m.original_message_id) 
             FROM markers m
-            WHERE m.original_message_id IN ({message_ids_placeholder})
+            WHERE m.original_message_id = ANY(:message_ids)
               AND m.marker_type_cd = 'asOfRegionSubjectAreaEnriched'
               AND m.subject_area_cd = 'taxlots'
-        ) = {total_count} THEN 'completed'
+        ) = :total_count THEN 'completed'
         WHEN EXISTS (
             SELECT 1 FROM error_logs
-            WHERE original_message_id IN ({message_ids_placeholder})
+            WHERE original_message_id = ANY(:message_ids)
               AND service_nm = 'aod_enrichment_service'
         ) THEN 'failed'
         WHEN (
             SELECT COUNT(DISTINCT m.original_message_id) 
             FROM markers m
-            WHERE m.original_message_id IN ({message_ids_placeholder})
+            WHERE m.original_message_id = ANY(:message_ids)
               AND m.marker_type_cd = 'asOfRegionSubjectAreaEnriched'
               AND m.subject_area_cd IN ('positions', 'taxlots')
         ) > 0 THEN 'inprogress'
         WHEN EXISTS (
             SELECT 1 FROM markers
-            WHERE original_message_id IN ({message_ids_placeholder})
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'asOfRegionSubjectAreaEnrichStarted'
               AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
         ) THEN 'long_running'
         ELSE 'pending'
     END AS status,
     (SELECT MAX(created_at) FROM markers 
-     WHERE original_message_id IN ({message_ids_placeholder})
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'asOfRegionSubjectAreaEnriched'
     ) AS last_updated,
     (SELECT MAX(created_at) FROM markers
-     WHERE original_message_id IN ({message_ids_placeholder})
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'asOfRegionSubjectAreaEnrichStarted'
     ) AS started_at,
     -- Progress counts: total:positions:taxlots
-    {total_count} AS total_count,
+    CAST(:total_count AS integer) AS total_count,
     (SELECT COUNT(DISTINCT m.original_message_id) 
      FROM markers m
-     WHERE m.original_message_id IN ({message_ids_placeholder})
+     WHERE m.original_message_id = ANY(:message_ids)
        AND m.marker_type_cd = 'asOfRegionSubjectAreaEnriched'
        AND m.subject_area_cd = 'positions'
     ) AS positions_count,
     (SELECT COUNT(DISTINCT m.original_message_id) 
      FROM markers m
-     WHERE m.original_message_id IN ({message_ids_placeholder})
+     WHERE m.original_message_id = ANY(:message_ids)
        AND m.marker_type_cd = 'asOfRegionSubjectAreaEnriched'
        AND m.subject_area_cd = 'taxlots'
     ) AS taxlots_count;
@@ -579,56 +579,56 @@ SELECT
         WHEN (
             SELECT COUNT(DISTINCT m.original_message_id) 
             FROM markers m
-            WHERE m.original_message_id IN ({message_ids_placeholder})
+            WHERE m.original_message_id = ANY(:message_ids)
               AND m.marker_type_cd = 'asOfRegionSubjectAreaRollupComplete'
               AND m.subject_area_cd = 'positions'
-        ) = {total_count} 
+        ) = :total_count 
         AND (
             SELECT COUNT(DISTINCT m.original_message_id) 
             FROM markers m
-            WHERE m.original_message_id IN ({message_ids_placeholder})
+            WHERE m.original_message_id = ANY(:message_ids)
               AND m.marker_type_cd = 'asOfRegionSubjectAreaRollupComplete'
               AND m.subject_area_cd = 'taxlots'
-        ) = {total_count} THEN 'completed'
+        ) = :total_count THEN 'completed'
         WHEN EXISTS (
             SELECT 1 FROM error_logs
-            WHERE original_message_id IN ({message_ids_placeholder})
+            WHERE original_message_id = ANY(:message_ids)
               AND service_nm = 'aod_rollup_service'
         ) THEN 'failed'
         WHEN (
             SELECT COUNT(DISTINCT m.original_message_id) 
             FROM markers m
-            WHERE m.original_message_id IN ({message_ids_placeholder})
+            WHERE m.original_message_id = ANY(:message_ids)
               AND m.marker_type_cd = 'asOfRegionSubjectAreaRollupComplete'
               AND m.subject_area_cd IN ('positions', 'taxlots')
         ) > 0 THEN 'inprogress'
         WHEN EXISTS (
             SELECT 1 FROM markers
-            WHERE original_message_id IN ({message_ids_placeholder})
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'asOfRegionSubjectAreaRollupStarted'
               AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
         ) THEN 'long_running'
         ELSE 'pending'
     END AS status,
     (SELECT MAX(created_at) FROM markers 
-     WHERE original_message_id IN ({message_ids_placeholder})
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'asOfRegionSubjectAreaRollupComplete'
     ) AS last_updated,
     (SELECT MAX(created_at) FROM markers
-     WHERE original_message_id IN ({message_ids_placeholder})
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'asOfRegionSubjectAreaRollupStarted'
     ) AS started_at,
     -- Progress counts: total:positions:taxlots
-    {total_count} AS total_count,
+    CAST(:total_count AS integer) AS total_count,
     (SELECT COUNT(DISTINCT m.original_message_id) 
      FROM markers m
-     WHERE m.original_message_id IN ({message_ids_placeholder})
+     WHERE m.original_message_id = ANY(:message_ids)
        AND m.marker_type_cd = 'asOfRegionSubjectAreaRollupComplete'
        AND m.subject_area_cd = 'positions'
     ) AS positions_count,
     (SELECT COUNT(DISTINCT m.original_message_id) 
      FROM markers m
-     WHERE m.original_message_id IN ({message_ids_placeholder})
+     WHERE m.original_message_id = ANY(:message_ids)
        AND m.marker_type_cd = 'asOfRegionSubjectAreaRollupComplete'
        AND m.subject_area_cd = 'taxlots'
     ) AS taxlots_count;
@@ -639,56 +639,56 @@ SELECT
         WHEN (
             SELECT COUNT(DISTINCT m.original_message_id) 
             FROM markers m
-            WHERE m.original_message_id IN ({message_ids_placeholder})
+            WHERE m.original_message_id = ANY(:message_ids)
               AND m.marker_type_cd = 'asOfRegionSubjectAreaMartLoadComplete'
               AND m.subject_area_cd = 'positions'
-        ) = {total_count} 
+        ) = :total_count 
         AND (
             SELECT COUNT(DISTINCT m.original_message_id) 
             FROM markers m
-            WHERE m.original_message_id IN ({message_ids_placeholder})
+            WHERE m.original_message_id = ANY(:message_ids)
               AND m.marker_type_cd = 'asOfRegionSubjectAreaMartLoadComplete'
               AND m.subject_area_cd = 'taxlots'
-        ) = {total_count} THEN 'completed'
+        ) = :total_count THEN 'completed'
         WHEN EXISTS (
             SELECT 1 FROM error_logs
-            WHERE original_message_id IN ({message_ids_placeholder})
+            WHERE original_message_id = ANY(:message_ids)
               AND service_nm = 'aod_mart_loader'
         ) THEN 'failed'
         WHEN (
             SELECT COUNT(DISTINCT m.original_message_id) 
             FROM markers m
-            WHERE m.original_message_id IN ({message_ids_placeholder})
+            WHERE m.original_message_id = ANY(:message_ids)
               AND m.marker_type_cd = 'asOfRegionSubjectAreaMartLoadComplete'
               AND m.subject_area_cd IN ('positions', 'taxlots')
         ) > 0 THEN 'inprogress'
         WHEN EXISTS (
             SELECT 1 FROM markers
-            WHERE original_message_id IN ({message_ids_placeholder})
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type_cd = 'asOfRegionSubjectAreaMartLoadStarted'
               AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
         ) THEN 'long_running'
         ELSE 'pending'
     END AS status,
     (SELECT MAX(created_at) FROM markers 
-     WHERE original_message_id IN ({message_ids_placeholder})
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'asOfRegionSubjectAreaMartLoadComplete'
     ) AS last_updated,
     (SELECT MAX(created_at) FROM markers
-     WHERE original_message_id IN ({message_ids_placeholder})
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type_cd = 'asOfRegionSubjectAreaMartLoadStarted'
     ) AS started_at,
     -- Progress counts: total:positions:taxlots
-    {total_count} AS total_count,
+    CAST(:total_count AS integer) AS total_count,
     (SELECT COUNT(DISTINCT m.original_message_id) 
      FROM markers m
-     WHERE m.original_message_id IN ({message_ids_placeholder})
+     WHERE m.original_message_id = ANY(:message_ids)
        AND m.marker_type_cd = 'asOfRegionSubjectAreaMartLoadComplete'
        AND m.subject_area_cd = 'positions'
     ) AS positions_count,
     (SELECT COUNT(DISTINCT m.original_message_id) 
      FROM markers m
-     WHERE m.original_message_id IN ({message_ids_placeholder})
+     WHERE m.original_message_id = ANY(:message_ids)
        AND m.marker_type_cd = 'asOfRegionSubjectAreaMartLoadComplete'
        AND m.subject_area_cd = 'taxlots'
     ) AS taxlots_count;
@@ -699,12 +699,12 @@ SELECT
         -- Check if sodRegionStatementsPublished exists AND sodRegionSubjectAreaPublished exists for all 5 subject areas
         WHEN EXISTS (
             SELECT 1 FROM final_markers 
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type = 'sodRegionStatementsPublished'
         ) AND (
             SELECT COUNT(DISTINCT marker->'payload'->>'subject_area_cd') 
             FROM final_markers 
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type = 'sodRegionSubjectAreaPublished'
               AND marker->'payload'->>'subject_area_cd' IN ('positions', 'disposal_lots', 'cash_settlements', 'transactions', 'taxlots')
         ) = 5 THEN 'completed'
@@ -712,21 +712,21 @@ SELECT
         -- Check for errors
         WHEN EXISTS (
             SELECT 1 FROM error_logs
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND service_nm = 'sod_final_publisher'
         ) THEN 'failed'
         
         -- Check if any markers exist but not all required ones
         WHEN EXISTS (
             SELECT 1 FROM final_markers 
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type IN ('sodRegionStatementsPublished', 'sodRegionSubjectAreaPublished')
         ) THEN 'inprogress'
         
         -- Check for long running (more than 30 minutes since first marker started)
         WHEN EXISTS (
             SELECT 1 FROM final_markers
-            WHERE original_message_id = {message_id}
+            WHERE original_message_id = ANY(:message_ids)
               AND marker_type IN ('sodRegionStatementsPublished', 'sodRegionSubjectAreaPublished')
               AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
         ) THEN 'long_running'
@@ -736,74 +736,55 @@ SELECT
     
     -- Get the latest update time from any completed marker
     (SELECT MAX(created_at) FROM final_markers 
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type IN ('sodRegionStatementsPublished', 'sodRegionSubjectAreaPublished')
     ) AS last_updated,
     
     -- Get the earliest start time from any marker
     (SELECT MIN(created_at) FROM final_markers
-     WHERE original_message_id = {message_id}
+     WHERE original_message_id = ANY(:message_ids)
        AND marker_type IN ('sodRegionStatementsPublished', 'sodRegionSubjectAreaPublished')
     ) AS started_at;
 
--- aod_final_status (ADM DB)
-SELECT 
-    CASE 
-        -- Check if asOfRegionsStatementsPublished exists for all AOD message IDs
-        WHEN (
-            SELECT COUNT(DISTINCT original_message_id) 
-            FROM final_markers 
-            WHERE original_message_id IN ({message_ids_placeholder})
-              AND marker_type = 'asOfRegionsStatementsPublished'
-        ) = {total_count} 
-        -- Check if eodAllRegionStatementsPublished exists with the parent_original_message_id
-        AND EXISTS (
-            SELECT 1 FROM final_markers
-            WHERE parent_original_message_id = '{parent_message_id}'
-              AND marker_type = 'eodAllRegionStatementsPublished'
-        ) THEN 'completed'
-        
-        -- Check for errors
-        WHEN EXISTS (
-            SELECT 1 FROM error_logs
-            WHERE original_message_id IN ({message_ids_placeholder})
-              AND service_nm = 'aod_final_publisher'
-        ) THEN 'failed'
-        
-        -- Check if any markers exist but not all required ones
-        WHEN EXISTS (
-            SELECT 1 FROM final_markers 
-            WHERE (original_message_id IN ({message_ids_placeholder}) 
-                   AND marker_type = 'asOfRegionsStatementsPublished')
-            OR (parent_original_message_id = '{parent_message_id}'
-                AND marker_type = 'eodAllRegionStatementsPublished')
-        ) THEN 'inprogress'
-        
-        -- Check for long running (more than 30 minutes since first marker started)
-        WHEN EXISTS (
-            SELECT 1 FROM final_markers
-            WHERE (original_message_id IN ({message_ids_placeholder}) 
-                   AND marker_type = 'asOfRegionsStatementsPublished')
-            OR (parent_original_message_id = '{parent_message_id}'
-                AND marker_type = 'eodAllRegionStatementsPublished')
-              AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
-        ) THEN 'long_running'
-        
-        ELSE 'pending'
-    END AS status,
-    
-    -- Get the latest update time from any completed marker
-    (SELECT MAX(created_at) FROM final_markers 
-     WHERE (original_message_id IN ({message_ids_placeholder}) 
-            AND marker_type = 'asOfRegionsStatementsPublished')
-        OR (parent_original_message_id = '{parent_message_id}'
-            AND marker_type = 'eodAllRegionStatementsPublished')
-    ) AS last_updated,
-    
-    -- Get the earliest start time from any marker
-    (SELECT MIN(created_at) FROM final_markers
-     WHERE (original_message_id IN ({message_ids_placeholder}) 
-            AND marker_type = 'asOfRegionsStatementsPublished')
-        OR (parent_original_message_id = '{parent_message_id}'
-            AND marker_type = 'eodAllRegionStatementsPublished')
-    ) AS started_at;
\ No newline at end of file
+-- batch_stage_events (ADM DB)
+-- One grouped pass over markers, final_markers and error_logs for many message ids.
+-- adm_api.get_batch_stage_statuses evaluates every stage definition from these rows.
+SELECT
+    original_message_id,
+    'marker' AS source,
+    marker_type_cd AS type_cd,
+    subject_area_cd,
+    MIN(created_at) AS first_created,
+    MAX(created_at) AS last_created
+FROM markers
+WHERE original_message_id = ANY(:message_ids)
+  AND marker_type_cd = ANY(:marker_types)
+GROUP BY original_message_id, marker_type_cd, subject_area_cd
+
+UNION ALL
+
+SELECT
+    original_message_id,
+    'final_marker' AS source,
+    marker_type AS type_cd,
+    marker->'payload'->>'subject_area_cd' AS subject_area_cd,
+    MIN(created_at) AS first_created,
+    MAX(created_at) AS last_created
+FROM final_markers
+WHERE original_message_id = ANY(:message_ids)
+  AND marker_type = ANY(:marker_types)
+GROUP BY original_message_id, marker_type, marker->'payload'->>'subject_area_cd'
+
+UNION ALL
+
+SELECT
+    original_message_id,
+    'error' AS source,
+    service_nm AS type_cd,
+    NULL AS subject_area_cd,
+    MIN(created_at) AS first_created,
+    MAX(created_at) AS last_created
+FROM error_logs
+WHERE original_message_id = ANY(:message_ids)
+  AND service_nm = ANY(:service_names)
+GROUP BY original_message_id, service_nm;
\ No newline at end of file
@@ -0,0 +1,183 @@
+import logging
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+AOD_STAGES = ('RAW', 'ENRICH', 'ROLL', 'MART', 'FINAL')
+AOD_SUBJECTS = ('positions', 'taxlots')
+
+# error_logs rows carry the service name as marker type; it names the stage it failed in
+_FAILURE_KEYWORDS = (('raw', 'RAW'), ('enrich', 'ENRICH'), ('roll', 'ROLL'), ('mart', 'MART'), ('final', 'FINAL'))
+
+
+def _bit(stage_index, subject_index):
+    return 1 << (stage_index * len(AOD_SUBJECTS) + subject_index)
+
+
+class AodProgressTracker:
+    """
+    AOD progress of one (client, region, business_dt), updated one marker row at a time.
+
+    Per message id it keeps a bitset of (stage x subject) completions, and per stage the
+    member ids (the ATLS ids, or the ids seen in ADM when ATLS has none), the number of
+    members with each subject done, the number with all subjects done, the members still
+    missing a subject (stragglers) and the ids with a failure. Observing a row and reading
+    counts, percent complete or status are O(1); listing stragglers is O(stragglers).
+    Statuses follow evaluate_aod_stage / evaluate_aod_final.
+    """
+
+    def __init__(self, stage_markers, global_marker, auto_members=True):
+        """
+        stage_markers: {stage: marker_type_cd} marking a subject of a message done for a stage
+        global_marker: marker (any message id) that FINAL additionally waits for
+        auto_members:  without expect(), count the ids seen in ADM (the ATLS-empty fallback)
+        """
+        self.stage_index = {stage: i for i, stage in enumerate(AOD_STAGES)}
+        self.marker_stage = {marker: stage for stage, marker in stage_markers.items()}
+        self.global_marker = global_marker
+        self.auto_members = auto_members
+        self.subject_index = {subject: i for i, subject in enumerate(AOD_SUBJECTS)}
+        self.complete_mask = {
+            stage: sum(_bit(i, j) for j in range(len(AOD_SUBJECTS)))
+            for stage, i in self.stage_index.items()
+        }
+        self.expected = None  # set once expect() is called
+        self.global_seen = False
+        self.last_updated = None
+        self._bits = defaultdict(int)
+        self._failures = {stage: set() for stage in AOD_STAGES}
+        self._reset_members()
+
+    def _reset_members(self):
+        self._members = {stage: set() for stage in AOD_STAGES}
+        self._subject_counts = {stage: [0] * len(AOD_SUBJECTS) for stage in AOD_STAGES}
+        self._complete = dict.fromkeys(AOD_STAGES, 0)
+        self._stragglers = {stage: set() for stage in AOD_STAGES}
+
+    def _add_member(self, stage, message_id):
+        members = self._members[stage]
+        if message_id in members:
+            return
+        members.add(message_id)
+        bits = self._bits.get(message_id, 0)
+        i = self.stage_index[stage]
+        counts = self._subject_counts[stage]
+        for j in range(len(AOD_SUBJECTS)):
+            if bits & _bit(i, j):
+                counts[j] += 1
+        mask = self.complete_mask[stage]
+        if bits & mask == mask:
+            self._complete[stage] += 1
+        else:
+            self._stragglers[stage].add(message_id)
+
+    def expect(self, message_ids):
+        """Count exactly these (ATLS) ids from now on; cheap when the set only grows"""
+        message_ids = set(message_ids)
+        if not message_ids and self.expected is None:
+            return
+        if self.expected is None or not self.expected <= message_ids:
+            # first explicit set, or ids disappeared: rebuild membership from the bitsets
+            self.expected = set()
+            self._reset_members()
+        for message_id in message_ids - self.expected:
+            for stage in AOD_STAGES:
+                self._add_member(stage, message_id)
+        self.expected |= message_ids
+
+    def observe(self, row):
+        """Apply one AOD row (CombinedRow) of this client/region/date"""
+        message_id = row.original_message_id
+        marker_type = row.marker_type_cd or ""
+        if row.last_updated and (self.last_updated is None or row.last_updated > self.last_updated):
+            self.last_updated = row.last_updated
+        if marker_type == self.global_marker:
+            self.global_seen = True
+        if not message_id:
+            return
+
+        stage = self.marker_stage.get(marker_type)
+        if self.expected is None and self.auto_members:
+            # ATLS-empty fallback: a stage counts the ids of its own markers, FINAL every AOD id
+            self._add_member("FINAL", message_id)
+            if stage is not None:
+                self._add_member(stage, message_id)
+
+        if row.status == "failed":
+            service = marker_type.lower()
+            for keyword, failed_stage in _FAILURE_KEYWORDS:
+                if keyword in service:
+                    self._failures[failed_stage].add(message_id)
+            return
+
+        j = self.subject_index.get(row.subject_area_cd)
+        if stage is None or j is None:
+            return
+        bit = _bit(self.stage_index[stage], j)
+        bits = self._bits[message_id]
+        if bits & bit:
+            return  # re-delivered marker
+        bits |= bit
+        self._bits[message_id] = bits
+        if message_id in self._members[stage]:
+            self._subject_counts[stage][j] += 1
+            mask = self.complete_mask[stage]
+            if bits & mask == mask:
+                self._complete[stage] += 1
+                self._stragglers[stage].discard(message_id)
+
+    def observe_rows(self, rows):
+        for row in rows:
+            self.observe(row)
+
+    def counts(self, stage):
+        positions, taxlots = self._subject_counts[stage]
+        return {
+            "total": len(self._members[stage]),
+            "positions": positions,
+            "taxlots": taxlots,
+            "complete": self._complete[stage],
+            "failed": len(self._failures[stage] & self._members[stage]),
+        }
+
+    def percent_complete(self, stage):
+        total = len(self._members[stage])
+        return round(100.0 * self._complete[stage] / total, 1) if total else 0.0
+
+    def stragglers(self, stage):
+        """Member ids still missing a subject for the stage"""
+        return sorted(self._stragglers[stage])
+
+    def failures(self, stage):
+        """Member ids with an error logged for the stage"""
+        return sorted(self._failures[stage] & self._members[stage])
+
+    def stage_status(self, stage):
+        """(status, positions_count, taxlots_count) as evaluate_aod_stage / evaluate_aod_final"""
+        total = len(self._members[stage])
+        pos_count, tax_count = self._subject_counts[stage]
+        needs_global = stage == "FINAL"
+        if total == 0:
+            return "pending", pos_count, tax_count
+        if pos_count == total and tax_count == total and (self.global_seen or not needs_global):
+            return "completed", pos_count, tax_count
+        if pos_count or tax_count or (needs_global and self.global_seen):
+            return "inprogress", pos_count, tax_count
+        return "pending", pos_count, tax_count
+
+    def summary(self, max_stragglers=50):
+        """Per stage status, counts, percent complete and (up to max_stragglers) straggler ids"""
+        result = {}
+        for stage in AOD_STAGES:
+            stragglers = self._stragglers[stage]
+            result[stage] = dict(
+                self.counts(stage),
+                status=self.stage_status(stage)[0],
+                percent_complete=self.percent_complete(stage),
+                stragglers=sorted(stragglers)[:max_stragglers],
+                straggler_count=len(stragglers),
+                failed_ids=self.failures(stage)[:max_stragglers],
+            )
+        result["global_marker"] = self.global_seen
+        result["last_updated"] = self.last_updated
+        return result
@@ -1,16 +1,20 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request, stream_with_context
 from datetime import datetime, timedelta
 import logging
-from api.atls_api import get_workflow_status, get_original_message_id
-from database.connectors import get_atls_engine, get_adm_engine  # Add get_adm_engine here
-from api.adm_api import get_pricing_workflow_status
-from api.adm_api import get_eod_workflow_status
-from api.adm_api import get_sod_workflow_status
-from api.adm_api import get_aod_workflow_status
+from database.connectors import get_pool_stats
+from database.session import atls_connection, close_request_connections
+from api.singleflight import SingleFlightTimeout
+from api.Newadmapi import get_aod_progress
+from api.status_engine import (get_details, get_pricing_workflows, get_snapshot, get_status_watermark,
+                               snapshot_covers, snapshot_freshness, status_time_bucket)
+from api.status_deltas import status_delta
+from api.status_stream import stream_status_events
+from api.materializer import ENABLE_MATERIALIZER_THREAD, start_materializer_thread
+from api.reconciliation import RECON_LAKE_TABLE, reconcile_ndjson
+from api.lake_counts import get_lake_count_job, start_lake_counts
 from sqlalchemy import text
-from datetime import datetime, timedelta
 from functools import lru_cache
-import time
+import hashlib
 
 
 # Configure logging
@@ -19,45 +23,15 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
-# Define workflow order for UI display (add eod_final)
-WORKFLOW_ORDER = {
-    'trading_ars': 1,
-    'pricing_ars': 2,
-    'pricing_marker': 3,
-    'pricing_raw': 4,
-    'pricing_enrich': 5,
-    'pricing_roll': 6,
-    'pricing_mart': 7,
-    'eod_ars': 8,
-    'eod': 9,
-    'eod_marker': 10,
-    'eod_raw': 11,
-    'eod_enrich': 12,
-    'eod_roll': 13,
-    'eod_mart': 14,
-    'eod_final': 15,
-    'asof_events': 16,
-    'asof_marker': 17,
-    'aod': 18,
-    'aod_marker': 19,
-    'aod_raw': 20,
-    'aod_enrich': 21,
-    'aod_roll': 22,
-    'aod_mart': 23,
-    'aod_final': 24,  # Added aod_final
-    'sod_ars': 25,
-    'sod': 26,
-    'sod_marker': 27,
-    'sod_raw': 28,
-    'sod_enrich': 29,
-    'sod_roll': 30,
-    'sod_mart': 31,
-    'sod_final': 32
-}
-
-def sort_workflows(workflows):
-    """Sort workflows according to the defined order"""
-    return sorted(workflows, key=lambda x: WORKFLOW_ORDER.get(x['workflow_type'], 999))
+# Request connections are checked out lazily and released here
+app.teardown_appcontext(close_request_connections)
+
+# Keep the status snapshots of the active business dates materialized (alternatively run
+# materializer.py as its own process). Every worker starts the thread; the store's leader lock
+# lets only one process on the host compute. Spawned evaluation workers re-import the main
+# script as __mp_main__ and must not start a materializer of their own.
+if ENABLE_MATERIALIZER_THREAD and __name__ != '__mp_main__':
+    start_materializer_thread()
 
 def calculate_sod_date(business_date):
     """Calculate SOD date (next business day)"""
@@ -66,70 +40,33 @@ def calculate_sod_date(business_date):
     while sod_date.weekday() >= 5:  # Skip weekends
         sod_date += timedelta(days=1)
     return sod_date.strftime('%Y-%m-%d')
-    
-def execute_query(query):
-    """Execute a SQL query and return results as dictionaries"""
+
+def make_etag(*parts):
+    """Content version of a response from the watermarks and parameters it was built from"""
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:32]
+
+def not_modified(etag):
+    response = Response(status=304)
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def with_etag(response, etag):
+    """Tag a JSON response; no-cache makes browsers revalidate (If-None-Match) on every poll"""
+    if etag:
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def status_etag(business_date, *params):
+    """(etag, watermark) of a status response; (None, None) when the watermark is unavailable"""
     try:
-        with get_atls_engine().connect() as connection:
-            result = connection.execute(text(query))
-            columns = result.keys()
-            return [dict(zip(columns, row)) for row in result.fetchall()]
+        watermark = get_status_watermark(business_date)
     except Exception as e:
-        logger.error(f"Database error: {str(e)}")
-        return []
-
-def get_workflow_statuses_from_adm(client, region, business_date, snapshot_type, workflow_types, get_status_function):
-    """Generic function to get workflow statuses from ADM"""
-    sod_date = calculate_sod_date(business_date)
-    
-    # Determine the date to use based on snapshot type
-    query_date = sod_date if snapshot_type == 'SOD' else business_date
-    
-    message_ids_query = """
-        SELECT original_message_id
-        FROM accounting_events
-        WHERE client_cd = :client
-          AND processing_region_cd = :region
-          AND business_dt = :query_date
-          AND snapshot_type_cd = :snapshot_type
-    """
-    
-    with get_atls_engine().connect() as conn:
-        result = conn.execute(text(message_ids_query), {
-            'client': client,
-            'region': region,
-            'query_date': query_date,
-            'snapshot_type': snapshot_type
-        })
-        message_ids = [row[0] for row in result.fetchall()]
+        logger.warning(f"Status watermark unavailable, serving without ETag: {str(e)}")
+        return None, None
+    return make_etag(business_date, watermark, status_time_bucket(), *params), watermark
     
-    workflows = []
-    
-    # Get actual statuses using the provided function
-    adm_workflows = get_status_function(message_ids)
-    for workflow in adm_workflows:
-        workflow.update({
-            'client_cd': client,
-            'processing_region_cd': region,
-            'business_dt': query_date
-        })
-        workflows.append(workflow)
-    
-    # If no workflows were returned (no message IDs or no data), return pending statuses
-    if not workflows:
-        for workflow_type in workflow_types:
-            workflows.append({
-                "client_cd": client,
-                "processing_region_cd": region,
-                "workflow_type": workflow_type,
-                "status": "pending",
-                "status_with_long_running": "pending",
-                "last_updated": None,
-                "business_dt": query_date
-            })
-    
-    return workflows
-
 @app.route('/api/batch_status')
 def get_batch_status():
     business_date = request.args.get('business_date')
@@ -141,129 +78,35 @@ def get_batch_status():
         }), 400
 
     try:
-        sod_date = calculate_sod_date(business_date)
-        # Get all distinct client/region combinations
-        clients_regions = execute_query("""
-            SELECT DISTINCT client_cd, processing_region_cd 
-            FROM (
-                SELECT client_cd, processing_region_cd FROM ars_events
-                UNION
-                SELECT client_cd, processing_region_cd FROM pricing_events
-                UNION
-                SELECT client_cd, processing_region_cd FROM accounting_events
-            ) AS combined
-            ORDER BY client_cd, processing_region_cd
-        """)
-
-        response_data = []
-        seen = set()  # Track unique (client, region, workflow_type)
-
-        for row in clients_regions:
-            client = row['client_cd']
-            region = row['processing_region_cd']
-
-            # Standard workflow types (ATLS workflows only)
-            standard_workflows = [
-                'trading_ars', 'pricing_ars', 'pricing_marker',
-                'eod_ars', 'eod', 'eod_marker',
-                'asof_events', 'asof_marker', 'aod', 'aod_marker',
-                'sod_ars', 'sod', 'sod_marker'
-            ]
-
-            # Get standard workflow statuses
-            for workflow_type in standard_workflows:
-                status_data = get_workflow_status(client, region, workflow_type, business_date)
-                if not status_data:
-                    status_data = {
-                        "client_cd": client,
-                        "processing_region_cd": region,
-                        "workflow_type": workflow_type,
-                        "status": "pending",
-                        "status_with_long_running": "pending",
-                        "last_updated": None,
-                        "business_dt": business_date
-                    }
-                key = (status_data["client_cd"], status_data["processing_region_cd"], status_data["workflow_type"])
-                if key not in seen:
-                    seen.add(key)
-                    response_data.append(status_data)
-
-            # Get pricing workflow statuses from ADM
-            message_ids_query = """
-                SELECT original_message_id
-                FROM pricing_events
-                WHERE client_cd = :client
-                  AND processing_region_cd = :region
-                  AND business_dt = :business_date
-            """
-            
-            with get_atls_engine().connect() as conn:
-                result = conn.execute(text(message_ids_query), {
-                    'client': client,
-                    'region': region,
-                    'business_date': business_date
-                })
-                message_ids = [row[0] for row in result.fetchall()]
-            
-            # If no pricing message IDs found, return pending statuses
-            if not message_ids:
-                for workflow_type in ['pricing_raw', 'pricing_enrich', 'pricing_roll', 'pricing_mart']:
-                    response_data.append({
-                        "client_cd": client,
-                        "processing_region_cd": region,
-                        "workflow_type": workflow_type,
-                        "status": "pending",
-                        "status_with_long_running": "pending",
-                        "last_updated": None,
-                        "business_dt": business_date
-                    })
-            else:
-                for message_id in message_ids:
-                    adm_workflows = get_pricing_workflow_status(message_id)
-                    for workflow in adm_workflows:
-                        workflow.update({
-                            'client_cd': client,
-                            'processing_region_cd': region,
-                            'business_dt': business_date
-                        })
-                        key = (workflow["client_cd"], workflow["processing_region_cd"], workflow["workflow_type"])
-                        if key not in seen:
-                            seen.add(key)
-                            response_data.append(workflow)
-
-            # Get EOD workflow statuses from ADM
-            eod_workflows = get_workflow_statuses_from_adm(
-                client, region, business_date, 'EOD', 
-                ['eod_raw', 'eod_enrich', 'eod_roll', 'eod_mart','eod_final'],
-                get_eod_workflow_status
-            )
-            response_data.extend(eod_workflows)
-
-            # Get AOD workflow statuses from ADM
-            aod_workflows = get_workflow_statuses_from_adm(
-                client, region, business_date, 'AOD', 
-                ['aod_raw', 'aod_enrich', 'aod_roll', 'aod_mart', 'aod_final'],
-                get_aod_workflow_status
-            )
-            response_data.extend(aod_workflows)
-
-            # Get SOD workflow statuses from ADM
-            sod_workflows = get_workflow_statuses_from_adm(
-                client, region, business_date, 'SOD', 
-                ['sod_raw', 'sod_enrich', 'sod_roll', 'sod_mart','sod_final'],
-                get_sod_workflow_status
-            )
-            response_data.extend(sod_workflows)
-                    
-        # Sort the response data by workflow order
-        sorted_response = sort_workflows(response_data)
+        # Nothing written since the caller's copy (and same time bucket): answer before computing
+        since = request.args.get('since')
+        etag, watermark = status_etag(business_date, since)
+        if etag and request.if_none_match.contains_weak(etag):
+            return not_modified(etag)
+
+        # Materialized snapshot when fresh, else cached per business date with
+        # concurrent pollers sharing one computation
+        snapshot = get_snapshot(business_date)
+        # With since=<token> only the workflows changed after that token (full=false)
+        delta = status_delta(snapshot, since)
         
-        return jsonify({
+        response = jsonify({
             "status": "success",
-            "data": sorted_response,
             "timestamp": datetime.now().isoformat(),
-            "business_date": business_date
+            "business_date": business_date,
+            **delta,
+            **snapshot_freshness(snapshot)
         })
+        # a snapshot older than the watermark is served untagged, the next poll gets the newer one
+        return with_etag(response, etag if etag and snapshot_covers(snapshot, watermark) else None)
+
+    except SingleFlightTimeout as e:
+        logger.error(f"Batch status still computing: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "Batch status is still being computed, retry shortly",
+            "timestamp": datetime.now().isoformat()
+        }), 503
 
     except Exception as e:
         logger.error(f"Error in batch status: {str(e)}")
@@ -273,6 +116,25 @@ def get_batch_status():
             "timestamp": datetime.now().isoformat()
         }), 500
 
+@app.route('/api/batch_status/stream')
+def batch_status_stream():
+    """Server-Sent Events of workflow status changes; resumes from Last-Event-ID"""
+    business_date = request.args.get('business_date')
+    try:
+        datetime.strptime(business_date or '', '%Y-%m-%d')
+    except ValueError:
+        return jsonify({
+            "status": "error",
+            "message": "business_date must be YYYY-MM-DD",
+            "timestamp": datetime.now().isoformat()
+        }), 400
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    # statuses are computed by the date's broadcaster thread, the stream never needs the request
+    return Response(stream_status_events(business_date, last_event_id),
+                    mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/')
 @app.route('/dashboard')
 def dashboard():
@@ -283,123 +145,9 @@ def details(client, region):
     business_date = request.args.get('business_date', datetime.now().strftime('%Y-%m-%d'))
     
     try:
-        workflows = []
-        seen = set()
-        
-        # Standard workflow types (ATLS workflows only)
-        standard_workflows = [
-            'trading_ars', 'pricing_ars', 'pricing_marker',
-            'eod_ars', 'eod', 'eod_marker',
-            'asof_events', 'asof_marker', 'aod', 'aod_marker',
-            'sod_ars', 'sod', 'sod_marker'
-        ]
-        
-        # Get standard workflow statuses
-        for workflow_type in standard_workflows:
-            status_data = get_workflow_status(client, region, workflow_type, business_date)
-            if not status_data:
-                status_data = {
-                    "client_cd": client,
-                    "processing_region_cd": region,
-                    "workflow_type": workflow_type,
-                    "status": "pending",
-                    "status_with_long_running": "pending",
-                    "last_updated": None,
-                    "business_dt": business_date
-                }
-            key = (status_data["client_cd"], status_data["processing_region_cd"], status_data["workflow_type"])
-            if key not in seen:
-                seen.add(key)
-                workflows.append(status_data)
-        
-        # Get pricing workflow statuses from ADM
-        message_ids_query = """
-            SELECT original_message_id
-            FROM pricing_events
-            WHERE client_cd = :client
-              AND processing_region_cd = :region
-              AND business_dt = :business_date
-        """
-        
-        with get_atls_engine().connect() as conn:
-            result = conn.execute(text(message_ids_query), {
-                'client': client,
-                'region': region,
-                'business_date': business_date
-            })
-            message_ids = [row[0] for row in result.fetchall()]
-        
-        # If no pricing message IDs found, return pending statuses
-        if not message_ids:
-            for workflow_type in ['pricing_raw', 'pricing_enrich', 'pricing_roll', 'pricing_mart']:
-                workflows.append({
-                    "client_cd": client,
-                    "processing_region_cd": region,
-                    "workflow_type": workflow_type,
-                    "status": "pending",
-                    "status_with_long_running": "pending",
-                    "last_updated": None,
-                    "business_dt": business_date
-                })
-        else:
-            for message_id in message_ids:
-                adm_workflows = get_pricing_workflow_status(message_id)
-                for workflow in adm_workflows:
-                    workflow.update({
-                        'client_cd': client,
-                        'processing_region_cd': region,
-                        'business_dt': business_date
-                    })
-                    key = (workflow["client_cd"], workflow["processing_region_cd"], workflow["workflow_type"])
-                    if key not in seen:
-                        seen.add(key)
-                        workflows.append(workflow)
-
-        # Get EOD workflow statuses from ADM
-        eod_workflows = get_workflow_statuses_from_adm(
-            client, region, business_date, 'EOD', 
-            ['eod_raw', 'eod_enrich', 'eod_roll', 'eod_mart'],
-            get_eod_workflow_status
-        )
-        workflows.extend(eod_workflows)
-
-        # Get AOD workflow statuses from ADM
-        aod_workflows = get_workflow_statuses_from_adm(
-            client, region, business_date, 'AOD', 
-            ['aod_raw', 'aod_enrich', 'aod_roll', 'aod_mart', 'aod_final'],
-            get_aod_workflow_status
-        )
-        workflows.extend(aod_workflows)
-
-        # Get SOD workflow statuses from ADM
-        sod_workflows = get_workflow_statuses_from_adm(
-            client, region, business_date, 'SOD', 
-            ['sod_raw', 'sod_enrich', 'sod_roll', 'sod_mart'],
-            get_sod_workflow_status
-        )
-        workflows.extend(sod_workflows)
-                
-        # Sort workflows according to the defined order
-        sorted_workflows = sort_workflows(workflows)
-        
         sod_date = calculate_sod_date(business_date)
-        
-        # Get reporting loaders status for different snapshot types
-        # For EOD, EODPX, AOD - use the regular business_date
-        reporting_loaders_eodpx = get_reporting_loaders_status(client, region, business_date, 'EODPX')
-        reporting_loaders_eod = get_reporting_loaders_status(client, region, business_date, 'EOD')
-        reporting_loaders_aod = get_reporting_loaders_status(client, region, business_date, 'AOD')
-        
-        # For SOD - use the SOD date as business_date
-        reporting_loaders_sod = get_reporting_loaders_status(client, region, sod_date, 'SOD')
-        
-        # Combine all reporting loaders by snapshot type
-        reporting_loaders = {
-            'EODPX': reporting_loaders_eodpx,
-            'EOD': reporting_loaders_eod,
-            'AOD': reporting_loaders_aod,
-            'SOD': reporting_loaders_sod
-        }
+        # Cut from the dashboard's snapshot of the date when it is cached
+        sorted_workflows, reporting_loaders, partial_sections, freshness = get_details(client, region, business_date)
         
         return render_template(
             'details.html', 
@@ -408,7 +156,9 @@ def details(client, region):
             business_date=business_date,
             sod_date=sod_date,  # Pass SOD date to template
             workflows=sorted_workflows,
-            reporting_loaders=reporting_loaders
+            reporting_loaders=reporting_loaders,
+            partial_sections=partial_sections,
+            freshness=freshness
         )
         
     except Exception as e:
@@ -435,44 +185,20 @@ def pricing_workflows():
         }), 400
 
     try:
-        # First get message IDs from ATLS
-        message_ids_query = """
-            SELECT original_message_id
-            FROM pricing_events
-            WHERE client_cd = :client
-              AND processing_region_cd = :region
-              AND business_dt = :business_date
-        """
-        
-        with get_atls_engine().connect() as conn:
-            result = conn.execute(text(message_ids_query), {
-                'client': client,
-                'region': region,
-                'business_date': business_date
-            })
-            message_ids = [row[0] for row in result.fetchall()]
-        
-        # Then get workflow statuses from ADM for each message ID
-        workflows = []
-        for message_id in message_ids:
-            adm_workflows = get_pricing_workflow_status(message_id)
-            for workflow in adm_workflows:
-                workflow.update({
-                    'client_cd': client,
-                    'processing_region_cd': region,
-                    'business_dt': business_date
-                })
-                workflows.append(workflow)
-        
-        # Sort workflows by order
-        sorted_workflows = sort_workflows(workflows)
+        etag, watermark = status_etag(business_date, client, region)
+        if etag and request.if_none_match.contains_weak(etag):
+            return not_modified(etag)
+
+        # Per message id pricing stages, from the same cached snapshot as the dashboard
+        sorted_workflows, snapshot = get_pricing_workflows(client, region, business_date)
         
-        return jsonify({
+        response = jsonify({
             "status": "success",
             "data": sorted_workflows,
             "timestamp": datetime.now().isoformat(),
             "business_date": business_date
         })
+        return with_etag(response, etag if etag and snapshot_covers(snapshot, watermark) else None)
         
     except Exception as e:
         logger.error(f"Error getting pricing workflows: {str(e)}")
@@ -482,119 +208,86 @@ def pricing_workflows():
             "timestamp": datetime.now().isoformat()
         }), 500
 
-def get_reporting_loaders_status(client, region, business_date, snapshot_type):
-    """Get reporting loaders status from ADM database"""
+@app.route('/api/aod_progress')
+def aod_progress():
+    """AOD progress per stage for one client/region: counts, percent complete, stragglers, failures"""
+    business_date = request.args.get('business_date')
+    client = request.args.get('client')
+    region = request.args.get('region')
+
+    if not all([business_date, client, region]):
+        return jsonify({
+            "status": "error",
+            "message": "business_date, client, and region parameters are required",
+            "timestamp": datetime.now().isoformat()
+        }), 400
+
     try:
-        # Define the static set of marker_type_cd and subject_area_cd pairs for each snapshot type
-        static_markers = {
-            'EODPX': [
-                ('eodpxReportingPricingLoadComplete', 'reporting_valuation_prices')
-            ],
-            'EOD': [
-                ('eodReportingIncomeReceivedLoadComplete', 'reporting_income_received_results'),
-                ('eodReportingSecurityMasterLoadComplete', 'reporting_security_masters'),
-                ('eodReportingPendingTradesLoadComplete', 'pending_trades'),
-                ('eodReportingDisposalLotsLoadComplete', 'reporting_disposal_lots'),
-                ('eodReportingPositionsNAVLoadComplete', 'reporting_account_nava'),
-                ('eodReportingAccountSummaryByAssetTypeLoadComplete', 'reporting_account_summary_by_asset_types'),
-                ('eodReportingLedgerCashBalancesLoadComplete', 'reporting_ledger_cash_balances'),
-                ('eodReportingPositionsLoadComplete', 'reporting_positions'),
-                ('eodReportingTaxlotsLoadComplete', 'reporting_taxlots'),
-                ('eodReportingCashStatementLoadComplete', 'reporting_cash_statements'),
-                ('eodReportingGLCategoriesLoadForPositionsComplete', 'position_gl_categories'),
-                ('eodReportingPendingFxTradesLoadComplete', 'reporting_pending_fx_trades'),
-                ('eodReportingPendingEXSPOTTradesLoadComplete', 'reporting_pending_fx_trades'),
-                ('eodReportingIncomeReceivableLoadComplete', 'reporting_income_receivables'),
-                ('eodReportingTotalNetAssetsAndCashFlowsComplete', 'reporting_transactions_cash_flows'),
-                ('eodReportingAccountMasterLoadComplete', 'reporting_account_masters'),
-                ('eodReportingEarnedIncomeLoadComplete', 'reporting_earned_income_results'),
-                ('eodReportingOTCETDRecordsLoadComplete', 'reporting_otcs_etds'),
-                ('eodReportingTransactionsSettlementsLoadComplete', 'reporting_transactions_settlements')
-            ],
-            'AOD': [
-                ('aodReportingPendingTradesLoadComplete', 'pending_trades'),
-                ('aodReportingDisposalLotsLoadComplete', 'reporting_disposal_lots'),
-                ('aodReportingPositionsNAVLoadComplete', 'reporting_account_nava'),
-                ('aodReportingAccountSummaryByAssetTypeLoadComplete', 'reporting_account_summary_by_asset_types'),
-                ('aodReportingLedgerCashBalancesLoadComplete', 'reporting_ledger_cash_balances'),
-                ('aodReportingPositionsLoadComplete', 'reporting_positions'),
-                ('aodReportingTaxlotsLoadComplete', 'reporting_taxlots')
-            ],
-            'SOD': [
-                ('sodReportingPositionsNAVLoadComplete', 'reporting_account_nava'),
-                ('sodReportingAccountSummaryByAssetTypeLoadComplete', 'reporting_account_summary_by_asset_types'),
-                ('sodReportingLedgerCashBalancesLoadComplete', 'reporting_ledger_cash_balances'),
-                ('sodReportingPositionsLoadComplete', 'reporting_positions'),
-                ('sodReportingTaxlotsLoadComplete', 'reporting_taxlots'),
-                ('sodReportingCashStatementLoadComplete', 'reporting_cash_statements'),
-                ('sodReportingGLCategoriesLoadForPositionsComplete', 'position_gl_categories'),
-                ('sodReportingPendingFxTradesLoadComplete', 'reporting_pending_fx_trades'),
-                ('sodReportingPendingEXSPOTTradesLoadComplete', 'reporting_pending_fx_trades'),
-                ('sodReportingIncomeReceivableLoadComplete', 'reporting_income_receivables'),
-                ('sodReportingTransactionsSettlementsLoadComplete', 'reporting_transactions_settlements'),
-                ('sodpxReportingPricingLoadComplete', 'reporting_valuation_prices')
-            ]
-        }
-        
-        # Get the appropriate static markers for the snapshot type
-        markers = static_markers.get(snapshot_type, [])
-        
-        # Query to get existing markers from the ADM database
-        query = """
-            SELECT client_cd, processing_region_cd, business_dt, 
-                   snapshot_type_cd, subject_area_cd, marker_type_cd, created_at
-            FROM reporting_loaders_markers
-            WHERE client_cd = :client
-              AND processing_region_cd = :region
-              AND business_dt = :business_date
-              AND snapshot_type_cd = :snapshot_type
-        """
-        
-        # Execute the query against ADM database
-        with get_adm_engine().connect() as conn:
-            result = conn.execute(text(query), {
-                'client': client,
-                'region': region,
-                'business_date': business_date,
-                'snapshot_type': snapshot_type
-            })
-            db_markers = {row['marker_type_cd']: row for row in result.mappings()}
-        
-        # Create the result set with all static markers
-        results = []
-        for marker_type, subject_area in markers:
-            if marker_type in db_markers:
-                # Marker exists in database
-                results.append({
-                    'client_cd': client,
-                    'processing_region_cd': region,
-                    'business_dt': business_date,
-                    'snapshot_type_cd': snapshot_type,
-                    'marker_type_cd': marker_type,
-                    'subject_area_cd': subject_area,
-                    'created_at': db_markers[marker_type]['created_at'],
-                    'status': 'completed'
-                })
-            else:
-                # Marker doesn't exist in database
-                results.append({
-                    'client_cd': client,
-                    'processing_region_cd': region,
-                    'business_dt': business_date,
-                    'snapshot_type_cd': snapshot_type,
-                    'marker_type_cd': marker_type,
-                    'subject_area_cd': subject_area,
-                    'created_at': None,
-                    'status': 'pending'
-                })
-        
-        return results
-        
+        progress = get_aod_progress(client, region, business_date,
+                                    max_stragglers=request.args.get('max_stragglers', 50, type=int))
+        if progress["last_updated"]:
+            progress["last_updated"] = progress["last_updated"].isoformat()
+        return jsonify({
+            "status": "success",
+            "data": progress,
+            "timestamp": datetime.now().isoformat(),
+            "business_date": business_date
+        })
+
     except Exception as e:
-        logger.error(f"Error getting reporting loaders status: {str(e)}")
-        # Return empty results in case of error
-        return []
-        
+        logger.error(f"Error getting AOD progress: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "Could not retrieve AOD progress",
+            "timestamp": datetime.now().isoformat()
+        }), 500
+
+@app.route('/datalake_validation')
+def datalake_validation():
+    return render_template('index.html')
+
+@app.route('/api/reconciliation/<client>/<region>/<business_date>', methods=['GET', 'POST'])
+def reconciliation(client, region, business_date):
+    """ADM vs datalake count mismatches and a summary line, streamed as NDJSON"""
+    try:
+        datetime.strptime(business_date, '%Y-%m-%d')
+    except ValueError:
+        return jsonify({
+            "status": "error",
+            "message": "business_date must be YYYY-MM-DD",
+            "timestamp": datetime.now().isoformat()
+        }), 400
+
+    return Response(stream_with_context(reconcile_ndjson(client, region, business_date)),
+                    mimetype='application/x-ndjson')
+
+@app.route('/api/lake_counts/<client>/<region>/<business_date>', methods=['POST'])
+def lake_counts(client, region, business_date):
+    """Start (or join) the chunked lake count extraction; poll the returned job for progress"""
+    try:
+        datetime.strptime(business_date, '%Y-%m-%d')
+    except ValueError:
+        return jsonify({
+            "status": "error",
+            "message": "business_date must be YYYY-MM-DD",
+            "timestamp": datetime.now().isoformat()
+        }), 400
+
+    job = start_lake_counts(client, region, business_date, RECON_LAKE_TABLE)
+    return jsonify(job.progress()), 202
+
+@app.route('/api/lake_counts/jobs/<job_id>')
+def lake_counts_progress(job_id):
+    """Progress of a lake count job plus the rows of the chunks finished after ?since=<n>"""
+    job = get_lake_count_job(job_id)
+    if job is None:
+        return jsonify({
+            "status": "error",
+            "message": "Unknown or expired lake count job",
+            "timestamp": datetime.now().isoformat()
+        }), 404
+    return jsonify(job.progress(since=request.args.get('since', 0, type=int)))
+
 def get_pricing_marker_processing_times(client, region, start_date, end_date):
     """Get pricing marker completion times with optimized query"""
     query = """
@@ -614,7 +307,7 @@ def get_pricing_marker_processing_times(client, region, start_date, end_date):
         LIMIT 7
     """
     
-    with get_atls_engine().connect() as conn:
+    with atls_connection() as conn:
         result = conn.execute(text(query), {
             'client': client,
             'region': region,
@@ -641,7 +334,7 @@ def get_eod_processing_times(client, region, start_date, end_date):
         LIMIT 7
     """
     
-    with get_atls_engine().connect() as conn:
+    with atls_connection() as conn:
         result = conn.execute(text(query), {
             'client': client,
             'region': region,
@@ -674,7 +367,7 @@ def get_ars_processing_times(client, region, start_date, end_date):
         LIMIT 21  -- 7 days * 3 types max
     """
     
-    with get_atls_engine().connect() as conn:
+    with atls_connection() as conn:
         result = conn.execute(text(query), {
             'client': client,
             'region': region,
@@ -701,7 +394,7 @@ def get_aod_processing_times(client, region, start_date, end_date):
         LIMIT 7
     """
     
-    with get_atls_engine().connect() as conn:
+    with atls_connection() as conn:
         result = conn.execute(text(query), {
             'client': client,
             'region': region,
@@ -728,7 +421,7 @@ def get_sod_processing_times(client, region, start_date, end_date):
         LIMIT 7
     """
     
-    with get_atls_engine().connect() as conn:
+    with atls_connection() as conn:
         result = conn.execute(text(query), {
             'client': client,
             'region': region,
@@ -808,6 +501,15 @@ def processing_times(client, region):
             processing_data={},
             days=7
         )
+@app.route('/api/pool_stats')
+def pool_stats():
+    """Expose connection pool statistics for the shared ATLS/ADM engines"""
+    return jsonify({
+        "status": "success",
+        "data": get_pool_stats(),
+        "timestamp": datetime.now().isoformat()
+    })
+
 @app.route('/api/volume_trends')
 def volume_trends_api():
     client = request.args.get('client')
@@ -819,15 +521,20 @@ def volume_trends_api():
         return jsonify({"status": "error", "message": "client parameter is required"}), 400
 
     try:
+        etag = make_etag(client, region, start_date, end_date,
+                         get_volume_trends_watermark(client, region, start_date, end_date))
+        if request.if_none_match.contains_weak(etag):
+            return not_modified(etag)
+
         data = get_volume_trends(client, region, start_date, end_date)
-        return jsonify({
+        return with_etag(jsonify({
             "status": "success",
             "client": client,
             "region": region,
             "start_date": start_date,
             "end_date": end_date,
             "data": data
-        })
+        }), etag)
     except Exception as e:
         logger.error(f"Error in volume_trends_api: {str(e)}")
         return jsonify({"status": "error", "message": "Could not fetch volume trends"}), 500
@@ -855,6 +562,38 @@ def all_volume_trends(region="ALL"):
         logger.error(f"Error in all_volume_trends: {str(e)}")
         return render_template('volume_trends_all.html', region=region, data=[])
 
+def get_volume_trends_watermark(client, region, start_date, end_date):
+    """(newest created_at, row count) of the volume_check rows behind a trend; counts catch deletes"""
+    query = text("""
+        SELECT MAX(created_at), COUNT(*)
+        FROM volume_check
+        WHERE business_dt BETWEEN :start_date AND :end_date
+          AND client_cd = :client
+          AND processing_region_cd = :region
+    """)
+    params = {"client": client, "region": region, "start_date": start_date, "end_date": end_date}
+    with atls_connection() as conn:
+        return tuple(conn.execute(query, params).one())
+
+def get_volume_trends(client, region, start_date, end_date):
+    """Get daily volume trends (expected records per snapshot type) for one client/region"""
+    query = text("""
+        SELECT
+            business_dt as business_dt,
+            snapshot_type_cd,
+            SUM(records_expected_ct) as total_records
+        FROM volume_check
+        WHERE business_dt BETWEEN :start_date AND :end_date
+          AND client_cd = :client
+          AND processing_region_cd = :region
+        GROUP BY business_dt, snapshot_type_cd
+        ORDER BY business_dt, snapshot_type_cd
+    """)
+    params = {"client": client, "region": region, "start_date": start_date, "end_date": end_date}
+    with atls_connection() as conn:
+        result = conn.execute(query, params)
+        return [dict(row) for row in result.mappings()]
+
 def get_all_volume_trends(region, start_date, end_date):
     """Get volume trends for all clients, all regions (or a specific one)"""
     base_query = """
@@ -878,7 +617,7 @@ def get_all_volume_trends(region, start_date, end_date):
         ORDER BY business_dt, client_cd, processing_region_cd, snapshot_type_cd
     """
 
-    with get_atls_engine().connect() as conn:
+    with atls_connection() as conn:
         result = conn.execute(text(base_query), params)
         return [dict(row) for row in result.mappings()]
 
@@ -1,125 +1,237 @@
-from sqlalchemy import text
 from datetime import datetime, timedelta
-from database.connectors import get_atls_engine
-import os
+from database.session import atls_connection
+from api.query_registry import ATLS_QUERIES
+import logging
+
+logger = logging.getLogger(__name__)
 
 def load_query(query_name):
-    """Helper function to load SQL queries from file"""
-    try:
-        query_file = os.path.join(os.path.dirname(__file__), '../sql/atls_queries.sql')
-        with open(query_file, 'r') as f:
-            content = f.read()
-        
-        # Extract the specific query by name
-        queries = content.split(';')
-        for query in queries:
-            if query.strip().startswith(f'-- {query_name}'):
-                return query.strip()
-        return None
-    except Exception as e:
-        print(f"Error loading query {query_name}: {str(e)}")
-        return None
+    """Return a named ATLS query from the in-memory registry (no file I/O)"""
+    statement = ATLS_QUERIES.get(query_name)
+    return statement.sql if statement else None
 
-def get_workflow_status(client, region, workflow_type, business_date):
-    """Get workflow status from ATLS database"""
-    try:
-        query = load_query(workflow_type)
-        if not query:
-            return default_workflow_status(client, region, workflow_type, business_date)
-        
-        # Calculate SOD date for workflows that need it
-        sod_date = None
-        if workflow_type in ['sod_ars', 'sod', 'sod_marker']:
-            business_dt = datetime.strptime(business_date, '%Y-%m-%d').date()
-            sod_date = business_dt + timedelta(days=1)
-            while sod_date.weekday() >= 5:  # Skip weekends
-                sod_date += timedelta(days=1)
-            sod_date = sod_date.strftime('%Y-%m-%d')
-        
-        # Format the query with parameters
-        formatted_query = query.format(
-            client=client,
-            region=region,
-            business_date=business_date,
-            sod_date=sod_date or business_date
-        )
-        
-        with get_atls_engine().connect() as conn:
-            result = conn.execute(text(formatted_query))
-            
-            # Get column names from the result
-            columns = result.keys()
-            
-            # Fetch the first row
-            row = result.fetchone()
-            
-            if row:
-                # Ensure we have matching columns and values
-                if len(columns) != len(row):
-                    logger.error(f"Column/value mismatch in {workflow_type} query. Columns: {len(columns)}, Values: {len(row)}")
-                    return default_workflow_status(client, region, workflow_type, business_date)
-                
-                # Create dictionary from column names and row values
-                status_data = dict(zip(columns, row))
-                
-                # Ensure we have all required fields
-                required_fields = ['client_cd', 'processing_region_cd', 'workflow_type', 
-                                  'status', 'status_with_long_running', 'last_updated', 
-                                  'business_dt']
-                
-                for field in required_fields:
-                    if field not in status_data:
-                        status_data[field] = default_workflow_status(client, region, workflow_type, business_date)[field]
-                
-                return status_data
-            
-            return default_workflow_status(client, region, workflow_type, business_date)
-            
-    except Exception as e:
-        logger.error(f"Error getting workflow status for {workflow_type}: {str(e)}")
-        return default_workflow_status(client, region, workflow_type, business_date)
+def calculate_sod_date(business_date):
+    """Calculate SOD date (next business day)"""
+    business_dt = datetime.strptime(business_date, '%Y-%m-%d').date()
+    sod_date = business_dt + timedelta(days=1)
+    while sod_date.weekday() >= 5:  # Skip weekends
+        sod_date += timedelta(days=1)
+    return sod_date.strftime('%Y-%m-%d')
 
-def get_original_message_id(client, region, business_date, workflow_type):
-    """Get original message ID for a workflow"""
-    try:
-        if workflow_type in ['pricing_ars', 'trading_ars', 'eod_ars', 'sod_ars']:
-            trigger_type = {
-                'pricing_ars': 'opsRegionEODPricingSignoff',
-                'trading_ars': 'opsRegionEODTradingSignoff',
-                'eod_ars': 'opsRegionEodSignoff',
-                'sod_ars': 'sodRegionGlobalProcessTrigger'
-            }.get(workflow_type)
-            
-            query = load_query('ars_original_message_id')
-            if not query:
-                return None
-                
-            formatted_query = query.format(
-                client=client,
-                region=region,
-                business_date=business_date,
-                trigger_type=trigger_type
-            )
-        elif workflow_type == 'pricing_marker':
-            query = load_query('pricing_original_message_id')
-            if not query:
-                return None
-                
-            formatted_query = query.format(
-                client=client,
-                region=region,
-                business_date=business_date
-            )
+# ATLS workflow types evaluated by get_batch_workflow_statuses, in UI order
+ATLS_WORKFLOW_TYPES = [
+    'trading_ars', 'pricing_ars', 'pricing_marker',
+    'eod_ars', 'eod', 'eod_marker',
+    'asof_events', 'asof_marker', 'aod', 'aod_marker',
+    'sod_ars', 'sod', 'sod_marker'
+]
+
+# Subject areas that must all be transformed for eod_marker/sod_marker to complete
+TRANSFORMED_SUBJECTS = {'positions', 'taxlots', 'traded_cash', 'disposal_lots', 'transactions', 'cash_settlements'}
+
+def _age_minutes(ts):
+    """Minutes elapsed since a timestamp (naive or tz-aware)"""
+    if ts is None:
+        return 0
+    now = datetime.now(ts.tzinfo) if ts.tzinfo else datetime.now()
+    return (now - ts).total_seconds() / 60
+
+def _status_row(client, region, workflow_type, business_dt, status, status_with_long_running, last_updated):
+    return {
+        'client_cd': client,
+        'processing_region_cd': region,
+        'workflow_type': workflow_type,
+        'status': status,
+        'status_with_long_running': status_with_long_running,
+        'last_updated': last_updated,
+        'business_dt': business_dt
+    }
+
+def _fetch_batch_summaries(business_date, sod_date, client=None, region=None):
+    """Run the batch_* summary queries once and index their rows by key"""
+    params = {
+        'business_date': business_date,
+        'sod_date': sod_date,
+        'client': client,
+        'region': region
+    }
+    summaries = {'ars': {}, 'pricing': {}, 'accounting': {}, 'asof': {}}
+    with atls_connection() as conn:
+        for row in conn.execute(ATLS_QUERIES.get('batch_ars_summary').clause, params).mappings():
+            key = (row['client_cd'], row['processing_region_cd'], row['business_dt'], row['trigger_marker_type_cd'])
+            summaries['ars'][key] = row
+        for row in conn.execute(ATLS_QUERIES.get('batch_pricing_summary').clause, params).mappings():
+            summaries['pricing'][(row['client_cd'], row['processing_region_cd'], row['business_dt'])] = row
+        for row in conn.execute(ATLS_QUERIES.get('batch_accounting_summary').clause, params).mappings():
+            key = (row['client_cd'], row['processing_region_cd'], row['snapshot_type_cd'], row['business_dt'])
+            summaries['accounting'][key] = row
+        for row in conn.execute(ATLS_QUERIES.get('batch_asof_summary').clause, params).mappings():
+            summaries['asof'][(row['client_cd'], row['processing_region_cd'], row['business_dt'])] = row
+    return summaries
+
+def _signoff_ars_status(client, region, workflow_type, business_dt, summaries, trigger):
+    """trading_ars/pricing_ars: completed once every signoff event has responses and markers"""
+    s = summaries['ars'].get((client, region, business_dt, trigger))
+    if not s:
+        return default_workflow_status(client, region, workflow_type, business_dt)
+    if s['complete_ct'] == s['event_ct']:
+        status = status_with_long_running = 'completed'
+    else:
+        status = 'inprogress'
+        status_with_long_running = 'long_running' if _age_minutes(s['first_incomplete_created']) > 15 else 'inprogress'
+    return _status_row(client, region, workflow_type, business_dt, status, status_with_long_running, s['last_created'])
+
+def _process_ars_status(client, region, workflow_type, business_dt, summaries, trigger, done_trigger):
+    """eod_ars/sod_ars: trigger event acknowledged and the closing event acknowledged"""
+    start = summaries['ars'].get((client, region, business_dt, trigger))
+    done = summaries['ars'].get((client, region, business_dt, done_trigger))
+    last_updated = max([s['last_created'] for s in (start, done) if s and s['last_created']], default=None)
+    if not start:
+        status = status_with_long_running = 'pending'
+    elif start['received_ct'] and done and done['received_ct']:
+        status = status_with_long_running = 'completed'
+    else:
+        status = 'inprogress'
+        done_outstanding = not done or not done['received_ct'] or done['not_received_ct']
+        if _age_minutes(start['first_created']) > 30 and done_outstanding:
+            status_with_long_running = 'long_running'
         else:
-            return None
-            
-        with get_atls_engine().connect() as conn:
-            result = conn.execute(text(formatted_query))
-            return result.scalar()
-            
+            status_with_long_running = 'inprogress'
+    return _status_row(client, region, workflow_type, business_dt, status, status_with_long_running, last_updated)
+
+def _exists_status(client, region, workflow_type, business_dt, summary):
+    """eod/sod/aod/asof_events: completed as soon as any event exists"""
+    status = 'completed' if summary else 'pending'
+    return _status_row(client, region, workflow_type, business_dt, status, status,
+                       summary['last_created'] if summary else None)
+
+def _transformed_marker_status(client, region, workflow_type, business_dt, acc):
+    """eod_marker/sod_marker: all six subject areas transformed"""
+    transformed = set(acc['transformed_subjects'] or []) if acc else set()
+    complete = len(transformed & TRANSFORMED_SUBJECTS) == len(TRANSFORMED_SUBJECTS)
+    long_running = acc is not None and _age_minutes(acc['first_created']) > 30
+
+    if not transformed:
+        status = 'pending'
+    else:
+        status = 'completed' if complete else 'inprogress'
+
+    if complete:
+        status_with_long_running = 'completed'
+    elif workflow_type == 'sod_marker' and not transformed:
+        status_with_long_running = 'pending'
+    elif acc is None:
+        status_with_long_running = 'pending'
+    else:
+        status_with_long_running = 'long_running' if long_running else 'inprogress'
+    return _status_row(client, region, workflow_type, business_dt, status, status_with_long_running,
+                       acc['last_created'] if acc else None)
+
+def _evaluate_pair(client, region, business_date, sod_date, summaries):
+    """Derive all ATLS workflow statuses for one client/region from the batch summaries"""
+    acc = summaries['accounting']
+    eod = acc.get((client, region, 'EOD', business_date))
+    aod = acc.get((client, region, 'AOD', business_date))
+    sod = acc.get((client, region, 'SOD', sod_date))
+    asof = summaries['asof'].get((client, region, business_date))
+    pricing = summaries['pricing'].get((client, region, business_date))
+
+    statuses = [
+        _signoff_ars_status(client, region, 'trading_ars', business_date, summaries, 'opsRegionEODTradingSignoff'),
+        _signoff_ars_status(client, region, 'pricing_ars', business_date, summaries, 'opsRegionEODPricingSignoff'),
+    ]
+
+    if not pricing:
+        statuses.append(default_workflow_status(client, region, 'pricing_marker', business_date))
+    else:
+        all_marked = pricing['marked_ct'] == pricing['event_ct']
+        if all_marked:
+            status = status_with_long_running = 'completed'
+        else:
+            status = 'inprogress' if pricing['marked_ct'] else 'pending'
+            if _age_minutes(pricing['first_unmarked_created']) > 15:
+                status_with_long_running = 'long_running'
+            else:
+                status_with_long_running = status
+        statuses.append(_status_row(client, region, 'pricing_marker', business_date,
+                                    status, status_with_long_running, pricing['last_created']))
+
+    statuses.append(_process_ars_status(client, region, 'eod_ars', business_date, summaries,
+                                        'opsRegionEodSignoff', 'accountingRegionEodclose'))
+    statuses.append(_exists_status(client, region, 'eod', business_date, eod))
+    statuses.append(_transformed_marker_status(client, region, 'eod_marker', business_date, eod))
+
+    statuses.append(_exists_status(client, region, 'asof_events', business_date, asof))
+    if not asof:
+        status = status_with_long_running = 'pending'
+    elif asof['marked_ct']:
+        status = status_with_long_running = 'completed'
+    else:
+        status = 'inprogress'
+        status_with_long_running = 'long_running' if _age_minutes(asof['first_created']) > 30 else 'inprogress'
+    statuses.append(_status_row(client, region, 'asof_marker', business_date, status, status_with_long_running,
+                                asof['last_created'] if asof else None))
+
+    statuses.append(_exists_status(client, region, 'aod', business_date, aod))
+    if not aod:
+        status = status_with_long_running = 'pending'
+    elif aod['aod_complete_ct'] == aod['event_ct']:
+        status = status_with_long_running = 'completed'
+    else:
+        status = 'inprogress'
+        status_with_long_running = 'long_running' if _age_minutes(aod['first_created']) > 30 else 'inprogress'
+    aod_marker = _status_row(client, region, 'aod_marker', business_date, status, status_with_long_running,
+                             aod['last_created'] if aod else None)
+    aod_marker.update({
+        'aod_entry_count': aod['event_ct'] if aod else 0,
+        'positions_marker_count': aod['positions_marker_ct'] if aod else 0,
+        'taxlots_marker_count': aod['taxlots_marker_ct'] if aod else 0
+    })
+    statuses.append(aod_marker)
+
+    statuses.append(_process_ars_status(client, region, 'sod_ars', sod_date, summaries,
+                                        'sodRegionGlobalProcessTrigger', 'sodRegionGlobalProcessDone'))
+    statuses.append(_exists_status(client, region, 'sod', sod_date, sod))
+    statuses.append(_transformed_marker_status(client, region, 'sod_marker', sod_date, sod))
+    return statuses
+
+def get_batch_workflow_statuses(business_date, clients_regions=None, raise_errors=False):
+    """
+    Get all ATLS workflow statuses for many client/regions with a constant number of queries.
+
+    Scans ars_events, pricing_events, accounting_events (with markers) and as_of_events once
+    for the business_date/sod_date instead of running 13 templated queries per client/region.
+    Returns a dict keyed by (client, region, workflow_type) holding the same fields that
+    the per-workflow statements in atls_queries.sql return. When clients_regions is None every client/region found in
+    the summaries is evaluated; requested pairs without data get pending statuses. A failed scan
+    is logged and every pair is pending, unless raise_errors (the caller must tell an ATLS
+    outage from pairs that have not started).
+    """
+    sod_date = calculate_sod_date(business_date)
+
+    client = region = None
+    if clients_regions is not None and len(clients_regions) == 1:
+        client, region = clients_regions[0]
+
+    try:
+        summaries = _fetch_batch_summaries(business_date, sod_date, client, region)
     except Exception as e:
-        print(f"Error getting original message ID: {str(e)}")
-        return None
+        if raise_errors:
+            raise
+        logger.error(f"Error getting batch ATLS workflow statuses: {str(e)}")
+        summaries = {'ars': {}, 'pricing': {}, 'accounting': {}, 'asof': {}}
+
+    if clients_regions is None:
+        pairs = set()
+        for rows in summaries.values():
+            pairs.update((key[0], key[1]) for key in rows)
+        clients_regions = sorted(pairs)
+
+    results = {}
+    for pair_client, pair_region in clients_regions:
+        for status_data in _evaluate_pair(pair_client, pair_region, business_date, sod_date, summaries):
+            results[(pair_client, pair_region, status_data['workflow_type'])] = status_data
+    return results
 
 def default_workflow_status(client, region, workflow_type, business_date):
     """Return default status when no query is found"""
@@ -1,8 +1,8 @@
 
 -- trading_ars
 SELECT 
-    '{client}' AS client_cd,
-    '{region}' AS processing_region_cd,
+    CAST(:client AS text) AS client_cd,
+    CAST(:region AS text) AS processing_region_cd,
     'trading_ars' AS workflow_type,
     CASE WHEN received_eagle_responses IS NOT NULL AND published_markers IS NOT NULL THEN 'completed'
          WHEN received_eagle_responses IS NULL OR published_markers IS NULL THEN 'inprogress'
@@ -13,19 +13,19 @@ SELECT
          WHEN received_eagle_responses IS NULL OR published_markers IS NULL THEN 'inprogress'
          ELSE 'pending' END AS status_with_long_running,
     MAX(created_at) AS last_updated,
-    '{business_date}' AS business_dt
+    CAST(:business_date AS text) AS business_dt
 FROM ars_events
 WHERE trigger_marker_type_cd = 'opsRegionEODTradingSignoff'
-  AND client_cd = '{client}' 
-  AND processing_region_cd = '{region}'
-  AND business_dt = '{business_date}'
+  AND client_cd = :client 
+  AND processing_region_cd = :region
+  AND business_dt = :business_date
 GROUP BY status, status_with_long_running
 LIMIT 1;
 
 -- pricing_ars
 SELECT 
-    '{client}' AS client_cd,
-    '{region}' AS processing_region_cd,
+    CAST(:client AS text) AS client_cd,
+    CAST(:region AS text) AS processing_region_cd,
     'pricing_ars' AS workflow_type,
     CASE WHEN received_eagle_responses IS NOT NULL AND published_markers IS NOT NULL THEN 'completed'
          WHEN received_eagle_responses IS NULL OR published_markers IS NULL THEN 'inprogress'
@@ -36,19 +36,19 @@ SELECT
          WHEN received_eagle_responses IS NULL OR published_markers IS NULL THEN 'inprogress'
          ELSE 'pending' END AS status_with_long_running,
     MAX(created_at) AS last_updated,
-    '{business_date}' AS business_dt
+    CAST(:business_date AS text) AS business_dt
 FROM ars_events
 WHERE trigger_marker_type_cd = 'opsRegionEODPricingSignoff'
-  AND client_cd = '{client}' 
-  AND processing_region_cd = '{region}'
-  AND business_dt = '{business_date}'
+  AND client_cd = :client 
+  AND processing_region_cd = :region
+  AND business_dt = :business_date
 GROUP BY status, status_with_long_running
 LIMIT 1;
 
 -- pricing_marker
 SELECT 
-    '{client}' AS client_cd,
-    '{region}' AS processing_region_cd,
+    CAST(:client AS text) AS client_cd,
+    CAST(:region AS text) AS processing_region_cd,
     'pricing_marker' AS workflow_type,
     CASE WHEN pm.pricing_event_id IS NULL THEN 'pending'
          WHEN pm.marker_type_cd = 'eodPXRegionSubjectAreaTransformed' THEN 'completed'
@@ -59,393 +59,393 @@ SELECT
          WHEN pm.pricing_event_id IS NOT NULL THEN 'inprogress'
          ELSE 'pending' END AS status_with_long_running,
     MAX(pe.created_at) AS last_updated,
-    '{business_date}' AS business_dt
+    CAST(:business_date AS text) AS business_dt
 FROM pricing_events pe
 LEFT JOIN pricing_markers pm ON pe.id = pm.pricing_event_id
     AND pm.marker_type_cd = 'eodPXRegionSubjectAreaTransformed'
-WHERE pe.client_cd = '{client}' 
-  AND pe.processing_region_cd = '{region}'
-  AND pe.business_dt = '{business_date}'
+WHERE pe.client_cd = :client 
+  AND pe.processing_region_cd = :region
+  AND pe.business_dt = :business_date
 GROUP BY status, status_with_long_running
 LIMIT 1;
 
 -- eod_ars
 SELECT 
-    '{client}' AS client_cd,
-    '{region}' AS processing_region_cd,
+    CAST(:client AS text) AS client_cd,
+    CAST(:region AS text) AS processing_region_cd,
     'eod_ars' AS workflow_type,
     CASE 
         WHEN NOT EXISTS (
             SELECT 1 FROM ars_events 
-            WHERE client_cd = '{client}' 
-              AND processing_region_cd = '{region}'
+            WHERE client_cd = :client 
+              AND processing_region_cd = :region
               AND trigger_marker_type_cd = 'opsRegionEodSignoff'
-              AND business_dt = '{business_date}'
+              AND business_dt = :business_date
         ) THEN 'pending'
         WHEN EXISTS (
             SELECT 1 FROM ars_events 
-            WHERE client_cd = '{client}' 
-              AND processing_region_cd = '{region}'
+            WHERE client_cd = :client 
+              AND processing_region_cd = :region
               AND trigger_marker_type_cd = 'opsRegionEodSignoff'
               AND received_eagle_responses IS NOT NULL
-              AND business_dt = '{business_date}'
+              AND business_dt = :business_date
         ) AND EXISTS (
             SELECT 1 FROM ars_events 
-            WHERE client_cd = '{client}' 
-              AND processing_region_cd = '{region}'
+            WHERE client_cd = :client 
+              AND processing_region_cd = :region
               AND trigger_marker_type_cd = 'accountingRegionEodclose'
               AND received_eagle_responses IS NOT NULL
-              AND business_dt = '{business_date}'
+              AND business_dt = :business_date
         ) THEN 'completed'
         ELSE 'inprogress' 
     END AS status,
     CASE 
         WHEN NOT EXISTS (
             SELECT 1 FROM ars_events 
-            WHERE client_cd = '{client}' 
-              AND processing_region_cd = '{region}'
+            WHERE client_cd = :client 
+              AND processing_region_cd = :region
               AND trigger_marker_type_cd = 'opsRegionEodSignoff'
-              AND business_dt = '{business_date}'
+              AND business_dt = :business_date
         ) THEN 'pending'
         WHEN EXISTS (
             SELECT 1 FROM ars_events 
-            WHERE client_cd = '{client}' 
-              AND processing_region_cd = '{region}'
+            WHERE client_cd = :client 
+              AND processing_region_cd = :region
               AND trigger_marker_type_cd = 'opsRegionEodSignoff'
               AND received_eagle_responses IS NOT NULL
-              AND business_dt = '{business_date}'
+              AND business_dt = :business_date
         ) AND EXISTS (
             SELECT 1 FROM ars_events 
-            WHERE client_cd = '{client}' 
-              AND processing_region_cd = '{region}'
+            WHERE client_cd = :client 
+              AND processing_region_cd = :region
               AND trigger_marker_type_cd = 'accountingRegionEodclose'
               AND received_eagle_responses IS NOT NULL
-              AND business_dt = '{business_date}'
+              AND business_dt = :business_date
         ) THEN 'completed'
         WHEN EXISTS (
             SELECT 1 FROM ars_events 
-            WHERE client_cd = '{client}' 
-              AND processing_region_cd = '{region}'
+            WHERE client_cd = :client 
+              AND processing_region_cd = :region
               AND trigger_marker_type_cd = 'opsRegionEodSignoff'
               AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
-              AND business_dt = '{business_date}'
+              AND business_dt = :business_date
         ) AND (
             NOT EXISTS (
                 SELECT 1 FROM ars_events 
-                WHERE client_cd = '{client}' 
-                  AND processing_region_cd = '{region}'
+                WHERE client_cd = :client 
+                  AND processing_region_cd = :region
                   AND trigger_marker_type_cd = 'accountingRegionEodclose'
                   AND received_eagle_responses IS NOT NULL
-                  AND business_dt = '{business_date}'
+                  AND business_dt = :business_date
             ) OR EXISTS (
                 SELECT 1 FROM ars_events 
-                WHERE client_cd = '{client}' 
-                  AND processing_region_cd = '{region}'
+                WHERE client_cd = :client 
+                  AND processing_region_cd = :region
                   AND trigger_marker_type_cd = 'accountingRegionEodclose'
                   AND received_eagle_responses IS NULL
-                  AND business_dt = '{business_date}'
+                  AND business_dt = :business_date
             )
         ) THEN 'long_running'
         ELSE 'inprogress' 
     END AS status_with_long_running,
     (SELECT MAX(created_at) FROM ars_events 
-     WHERE client_cd = '{client}' 
-       AND processing_region_cd = '{region}'
+     WHERE client_cd = :client 
+       AND processing_region_cd = :region
        AND trigger_marker_type_cd IN ('opsRegionEodSignoff', 'accountingRegionEodclose')
-       AND business_dt = '{business_date}'
+       AND business_dt = :business_date
     ) AS last_updated,
-    '{business_date}' AS business_dt;
+    CAST(:business_date AS text) AS business_dt;
 
 -- eod
 SELECT 
-    '{client}' AS client_cd,
-    '{region}' AS processing_region_cd,
+    CAST(:client AS text) AS client_cd,
+    CAST(:region AS text) AS processing_region_cd,
     'eod' AS workflow_type,
     CASE WHEN EXISTS (
         SELECT 1 FROM accounting_events 
-        WHERE client_cd = '{client}' 
-          AND processing_region_cd = '{region}'
+        WHERE client_cd = :client 
+          AND processing_region_cd = :region
           AND snapshot_type_cd='EOD'
-          AND business_dt = '{business_date}'
+          AND business_dt = :business_date
     ) THEN 'completed'
     ELSE 'pending' END AS status,
     CASE WHEN EXISTS (
         SELECT 1 FROM accounting_events 
-        WHERE client_cd = '{client}' 
-          AND processing_region_cd = '{region}'
+        WHERE client_cd = :client 
+          AND processing_region_cd = :region
           AND snapshot_type_cd='EOD'
-          AND business_dt = '{business_date}'
+          AND business_dt = :business_date
     ) THEN 'completed'
     WHEN EXISTS (
         SELECT 1 FROM accounting_events 
-        WHERE client_cd = '{client}' 
-          AND processing_region_cd = '{region}'
+        WHERE client_cd = :client 
+          AND processing_region_cd = :region
           AND snapshot_type_cd='EOD'
           AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
-          AND business_dt = '{business_date}'
+          AND business_dt = :business_date
     ) THEN 'long_running'
     ELSE 'pending' END AS status_with_long_running,
     (SELECT MAX(created_at) FROM accounting_events 
-     WHERE client_cd = '{client}' 
-       AND processing_region_cd = '{region}'
+     WHERE client_cd = :client 
+       AND processing_region_cd = :region
        AND snapshot_type_cd='EOD'
-       AND business_dt = '{business_date}'
+       AND business_dt = :business_date
     ) AS last_updated,
-    '{business_date}' AS business_dt;
+    CAST(:business_date AS text) AS business_dt;
 
 -- eod_marker
 SELECT 
-    '{client}' AS client_cd,
-    '{region}' AS processing_region_cd,
+    CAST(:client AS text) AS client_cd,
+    CAST(:region AS text) AS processing_region_cd,
     'eod_marker' AS workflow_type,
     CASE WHEN EXISTS (
         SELECT 1 FROM accounting_events ae
         JOIN markers m ON ae.id = m.accounting_event_id
-        WHERE ae.client_cd = '{client}' 
-          AND ae.processing_region_cd = '{region}'
+        WHERE ae.client_cd = :client 
+          AND ae.processing_region_cd = :region
           AND ae.snapshot_type_cd='EOD'
           AND m.marker_type = 'eodRegionSubjectAreaTransformed'
-          AND ae.business_dt = '{business_date}'
+          AND ae.business_dt = :business_date
     ) THEN 
         CASE WHEN (
             SELECT COUNT(DISTINCT subject_area_cd) FROM markers m
             JOIN accounting_events ae ON m.accounting_event_id = ae.id
-            WHERE ae.client_cd = '{client}'
-              AND ae.processing_region_cd = '{region}'
+            WHERE ae.client_cd = :client
+              AND ae.processing_region_cd = :region
               AND ae.snapshot_type_cd='EOD'
               AND m.marker_type = 'eodRegionSubjectAreaTransformed'
               AND m.subject_area_cd IN ('positions', 'taxlots', 'traded_cash', 'disposal_lots', 'transactions', 'cash_settlements')
-              AND ae.business_dt = '{business_date}'
+              AND ae.business_dt = :business_date
         ) = 6 THEN 'completed'
         ELSE 'inprogress' END
     ELSE 'pending' END AS status,
     CASE 
         WHEN NOT EXISTS (
             SELECT 1 FROM accounting_events 
-            WHERE client_cd = '{client}' 
-              AND processing_region_cd = '{region}'
+            WHERE client_cd = :client 
+              AND processing_region_cd = :region
               AND snapshot_type_cd='EOD'
-              AND business_dt = '{business_date}'
+              AND business_dt = :business_date
         ) THEN 'pending'
         WHEN (
             SELECT COUNT(DISTINCT subject_area_cd) FROM markers m
             JOIN accounting_events ae ON m.accounting_event_id = ae.id
-            WHERE ae.client_cd = '{client}'
-              AND ae.processing_region_cd = '{region}'
+            WHERE ae.client_cd = :client
+              AND ae.processing_region_cd = :region
               AND ae.snapshot_type_cd='EOD'
               AND m.marker_type = 'eodRegionSubjectAreaTransformed'
               AND m.subject_area_cd IN ('positions', 'taxlots', 'traded_cash', 'disposal_lots', 'transactions', 'cash_settlements')
-              AND ae.business_dt = '{business_date}'
+              AND ae.business_dt = :business_date
         ) = 6 THEN 'completed'
         WHEN EXISTS (
             SELECT 1 FROM accounting_events
-            WHERE client_cd = '{client}'
-              AND processing_region_cd = '{region}'
+            WHERE client_cd = :client
+              AND processing_region_cd = :region
               AND snapshot_type_cd='EOD'
               AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
-              AND business_dt = '{business_date}'
+              AND business_dt = :business_date
         ) THEN 'long_running'
         ELSE 'inprogress' END AS status_with_long_running,
     (SELECT MAX(created_at) FROM accounting_events 
-     WHERE client_cd = '{client}' 
-       AND processing_region_cd = '{region}'
+     WHERE client_cd = :client 
+       AND processing_region_cd = :region
        AND snapshot_type_cd='EOD'
-       AND business_dt = '{business_date}'
+       AND business_dt = :business_date
     ) AS last_updated,
-    '{business_date}' AS business_dt;
+    CAST(:business_date AS text) AS business_dt;
 
 -- asof_events
 SELECT 
-    '{client}' AS client_cd,
-    '{region}' AS processing_region_cd,
+    CAST(:client AS text) AS client_cd,
+    CAST(:region AS text) AS processing_region_cd,
     'asof_events' AS workflow_type,
     CASE WHEN EXISTS (
         SELECT 1 FROM as_of_events 
-        WHERE client_cd = '{client}' 
-          AND processing_region_cd = '{region}'
-          AND business_dt = '{business_date}'
+        WHERE client_cd = :client 
+          AND processing_region_cd = :region
+          AND business_dt = :business_date
     ) THEN 'completed'
     ELSE 'pending' END AS status,
     CASE WHEN EXISTS (
         SELECT 1 FROM as_of_events 
-        WHERE client_cd = '{client}' 
-          AND processing_region_cd = '{region}'
-          AND business_dt = '{business_date}'
+        WHERE client_cd = :client 
+          AND processing_region_cd = :region
+          AND business_dt = :business_date
     ) THEN 'completed'
     ELSE 'pending' END AS status_with_long_running,
     (SELECT MAX(created_at) FROM as_of_events 
-     WHERE client_cd = '{client}' 
-       AND processing_region_cd = '{region}'
-       AND business_dt = '{business_date}'
+     WHERE client_cd = :client 
+       AND processing_region_cd = :region
+       AND business_dt = :business_date
     ) AS last_updated,
-    '{business_date}' AS business_dt;
+    CAST(:business_date AS text) AS business_dt;
 
 -- asof_marker
 SELECT 
-    '{client}' AS client_cd,
-    '{region}' AS processing_region_cd,
+    CAST(:client AS text) AS client_cd,
+    CAST(:region AS text) AS processing_region_cd,
     'asof_marker' AS workflow_type,
     CASE WHEN NOT EXISTS (
         SELECT 1 FROM as_of_events 
-        WHERE client_cd = '{client}' 
-          AND processing_region_cd = '{region}'
-          AND business_dt = '{business_date}'
+        WHERE client_cd = :client 
+          AND processing_region_cd = :region
+          AND business_dt = :business_date
     ) THEN 'pending'
     WHEN EXISTS (
         SELECT 1 FROM as_of_events ae
         JOIN as_of_request_markers arm ON ae.id = arm.as_of_event_id
-        WHERE ae.client_cd = '{client}' 
-          AND ae.processing_region_cd = '{region}'
-          AND ae.business_dt = '{business_date}'
+        WHERE ae.client_cd = :client 
+          AND ae.processing_region_cd = :region
+          AND ae.business_dt = :business_date
     ) THEN 'completed'
     ELSE 'inprogress' END AS status,
     CASE WHEN NOT EXISTS (
         SELECT 1 FROM as_of_events 
-        WHERE client_cd = '{client}' 
-          AND processing_region_cd = '{region}'
-          AND business_dt = '{business_date}'
+        WHERE client_cd = :client 
+          AND processing_region_cd = :region
+          AND business_dt = :business_date
     ) THEN 'pending'
     WHEN EXISTS (
         SELECT 1 FROM as_of_events ae
         JOIN as_of_request_markers arm ON ae.id = arm.as_of_event_id
-        WHERE ae.client_cd = '{client}' 
-          AND ae.processing_region_cd = '{region}'
-          AND ae.business_dt = '{business_date}'
+        WHERE ae.client_cd = :client 
+          AND ae.processing_region_cd = :region
+          AND ae.business_dt = :business_date
     ) THEN 'completed'
     WHEN EXISTS (
         SELECT 1 FROM as_of_events
-        WHERE client_cd = '{client}' 
-          AND processing_region_cd = '{region}'
-          AND business_dt = '{business_date}'
+        WHERE client_cd = :client 
+          AND processing_region_cd = :region
+          AND business_dt = :business_date
           AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
     ) THEN 'long_running'
     ELSE 'inprogress' END AS status_with_long_running,
     (SELECT MAX(created_at) FROM as_of_events 
-     WHERE client_cd = '{client}' 
-       AND processing_region_cd = '{region}'
-       AND business_dt = '{business_date}'
+     WHERE client_cd = :client 
+       AND processing_region_cd = :region
+       AND business_dt = :business_date
     ) AS last_updated,
-    '{business_date}' AS business_dt;
+    CAST(:business_date AS text) AS business_dt;
 
 -- aod
 SELECT 
-    '{client}' AS client_cd,
-    '{region}' AS processing_region_cd,
+    CAST(:client AS text) AS client_cd,
+    CAST(:region AS text) AS processing_region_cd,
     'aod' AS workflow_type,
     CASE WHEN EXISTS (
         SELECT 1 FROM accounting_events 
-        WHERE client_cd = '{client}' 
-          AND processing_region_cd = '{region}'
-          AND business_dt = '{business_date}'
+        WHERE client_cd = :client 
+          AND processing_region_cd = :region
+          AND business_dt = :business_date
           AND snapshot_type_cd = 'AOD'
     ) THEN 'completed'
     ELSE 'pending' END AS status,
     CASE WHEN EXISTS (
         SELECT 1 FROM accounting_events 
-        WHERE client_cd = '{client}' 
-          AND processing_region_cd = '{region}'
-          AND business_dt = '{business_date}'
+        WHERE client_cd = :client 
+          AND processing_region_cd = :region
+          AND business_dt = :business_date
           AND snapshot_type_cd = 'AOD'
     ) THEN 'completed'
     ELSE 'pending' END AS status_with_long_running,
     (SELECT MAX(created_at) FROM accounting_events 
-     WHERE client_cd = '{client}' 
-       AND processing_region_cd = '{region}'
-       AND business_dt = '{business_date}'
+     WHERE client_cd = :client 
+       AND processing_region_cd = :region
+       AND business_dt = :business_date
        AND snapshot_type_cd = 'AOD'
     ) AS last_updated,
-    '{business_date}' AS business_dt;
+    CAST(:business_date AS text) AS business_dt;
 
 -- aod_marker
 SELECT 
-    '{client}' AS client_cd,
-    '{region}' AS processing_region_cd,
+    CAST(:client AS text) AS client_cd,
+    CAST(:region AS text) AS processing_region_cd,
     'aod_marker' AS workflow_type,
     CASE WHEN NOT EXISTS (
         SELECT 1 FROM accounting_events 
-        WHERE client_cd = '{client}' 
-          AND processing_region_cd = '{region}'
-          AND business_dt = '{business_date}'
+        WHERE client_cd = :client 
+          AND processing_region_cd = :region
+          AND business_dt = :business_date
           AND snapshot_type_cd = 'AOD'
     ) THEN 'pending'
     WHEN (
         SELECT COUNT(DISTINCT ae.id) FROM accounting_events ae
         JOIN markers m ON ae.id = m.accounting_event_id
-        WHERE ae.client_cd = '{client}'
-          AND ae.processing_region_cd = '{region}'
-          AND ae.business_dt = '{business_date}'
+        WHERE ae.client_cd = :client
+          AND ae.processing_region_cd = :region
+          AND ae.business_dt = :business_date
           AND ae.snapshot_type_cd = 'AOD'
           AND m.marker_type = 'asOfRegionSubjectAreaTransformed'
           AND m.subject_area_cd IN ('positions', 'taxlots')
         HAVING COUNT(DISTINCT m.subject_area_cd) = 2
     ) = (
         SELECT COUNT(*) FROM accounting_events
-        WHERE client_cd = '{client}'
-          AND processing_region_cd = '{region}'
-          AND business_dt = '{business_date}'
+        WHERE client_cd = :client
+          AND processing_region_cd = :region
+          AND business_dt = :business_date
           AND snapshot_type_cd = 'AOD'
     ) THEN 'completed'
     ELSE 'inprogress' END AS status,
     CASE WHEN NOT EXISTS (
         SELECT 1 FROM accounting_events 
-        WHERE client_cd = '{client}' 
-          AND processing_region_cd = '{region}'
-          AND business_dt = '{business_date}'
+        WHERE client_cd = :client 
+          AND processing_region_cd = :region
+          AND business_dt = :business_date
           AND snapshot_type_cd = 'AOD'
     ) THEN 'pending'
     WHEN (
         SELECT COUNT(DISTINCT ae.id) FROM accounting_events ae
         JOIN markers m ON ae.id = m.accounting_event_id
-        WHERE ae.client_cd = '{client}'
-          AND ae.processing_region_cd = '{region}'
-          AND ae.business_dt = '{business_date}'
+        WHERE ae.client_cd = :client
+          AND ae.processing_region_cd = :region
+          AND ae.business_dt = :business_date
           AND ae.snapshot_type_cd = 'AOD'
           AND m.marker_type = 'asOfRegionSubjectAreaTransformed'
           AND m.subject_area_cd IN ('positions', 'taxlots')
         HAVING COUNT(DISTINCT m.subject_area_cd) = 2
     ) = (
         SELECT COUNT(*) FROM accounting_events
-        WHERE client_cd = '{client}'
-          AND processing_region_cd = '{region}'
-          AND business_dt = '{business_date}'
+        WHERE client_cd = :client
+          AND processing_region_cd = :region
+          AND business_dt = :business_date
           AND snapshot_type_cd = 'AOD'
     ) THEN 'completed'
     WHEN EXISTS (
         SELECT 1 FROM accounting_events
-        WHERE client_cd = '{client}'
-          AND processing_region_cd = '{region}'
-          AND business_dt = '{business_date}'
+        WHERE client_cd = :client
+          AND processing_region_cd = :region
+          AND business_dt = :business_date
           AND snapshot_type_cd = 'AOD'
           AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
     ) THEN 'long_running'
     ELSE 'inprogress' END AS status_with_long_running,
     (SELECT MAX(created_at) FROM accounting_events 
-     WHERE client_cd = '{client}' 
-       AND processing_region_cd = '{region}'
-       AND business_dt = '{business_date}'
+     WHERE client_cd = :client 
+       AND processing_region_cd = :region
+       AND business_dt = :business_date
        AND snapshot_type_cd = 'AOD'
     ) AS last_updated,
-    '{business_date}' AS business_dt,
+    CAST(:business_date AS text) AS business_dt,
     (SELECT COUNT(*) FROM accounting_events 
-     WHERE client_cd = '{client}' 
-       AND processing_region_cd = '{region}'
-       AND business_dt = '{business_date}'
+     WHERE client_cd = :client 
+       AND processing_region_cd = :region
+       AND business_dt = :business_date
        AND snapshot_type_cd = 'AOD'
     ) AS aod_entry_count,
     (SELECT COUNT(DISTINCT ae.id) FROM accounting_events ae
      JOIN markers m ON ae.id = m.accounting_event_id
-     WHERE ae.client_cd = '{client}'
-       AND ae.processing_region_cd = '{region}'
-       AND ae.business_dt = '{business_date}'
+     WHERE ae.client_cd = :client
+       AND ae.processing_region_cd = :region
+       AND ae.business_dt = :business_date
        AND ae.snapshot_type_cd = 'AOD'
        AND m.marker_type = 'asOfRegionSubjectAreaTransformed'
        AND m.subject_area_cd = 'positions'
     ) AS positions_marker_count,
     (SELECT COUNT(DISTINCT ae.id) FROM accounting_events ae
      JOIN markers m ON ae.id = m.accounting_event_id
-     WHERE ae.client_cd = '{client}'
-       AND ae.processing_region_cd = '{region}'
-       AND ae.business_dt = '{business_date}'
+     WHERE ae.client_cd = :client
+       AND ae.processing_region_cd = :region
+       AND ae.business_dt = :business_date
        AND ae.snapshot_type_cd = 'AOD'
        AND m.marker_type = 'asOfRegionSubjectAreaTransformed'
        AND m.subject_area_cd = 'taxlots'
@@ -453,199 +453,324 @@ SELECT
 
 -- sod_ars
 SELECT 
-    '{client}' AS client_cd,
-    '{region}' AS processing_region_cd,
+    CAST(:client AS text) AS client_cd,
+    CAST(:region AS text) AS processing_region_cd,
     'sod_ars' AS workflow_type,
     CASE 
         WHEN NOT EXISTS (
             SELECT 1 FROM ars_events 
-            WHERE client_cd = '{client}' 
-              AND processing_region_cd = '{region}'
+            WHERE client_cd = :client 
+              AND processing_region_cd = :region
               AND trigger_marker_type_cd = 'sodRegionGlobalProcessTrigger'
-              AND business_dt = '{sod_date}'
+              AND business_dt = :sod_date
         ) THEN 'pending'
         WHEN EXISTS (
             SELECT 1 FROM ars_events 
-            WHERE client_cd = '{client}' 
-              AND processing_region_cd = '{region}'
+            WHERE client_cd = :client 
+              AND processing_region_cd = :region
               AND trigger_marker_type_cd = 'sodRegionGlobalProcessTrigger'
               AND received_eagle_responses IS NOT NULL
-              AND business_dt = '{sod_date}'
+              AND business_dt = :sod_date
         ) AND EXISTS (
             SELECT 1 FROM ars_events 
-            WHERE client_cd = '{client}' 
-              AND processing_region_cd = '{region}'
+            WHERE client_cd = :client 
+              AND processing_region_cd = :region
               AND trigger_marker_type_cd = 'sodRegionGlobalProcessDone'
               AND received_eagle_responses IS NOT NULL
-              AND business_dt = '{sod_date}'
+              AND business_dt = :sod_date
         ) THEN 'completed'
         ELSE 'inprogress' 
     END AS status,
     CASE 
         WHEN NOT EXISTS (
             SELECT 1 FROM ars_events 
-            WHERE client_cd = '{client}' 
-              AND processing_region_cd = '{region}'
+            WHERE client_cd = :client 
+              AND processing_region_cd = :region
               AND trigger_marker_type_cd = 'sodRegionGlobalProcessTrigger'
-              AND business_dt = '{sod_date}'
+              AND business_dt = :sod_date
         ) THEN 'pending'
         WHEN EXISTS (
             SELECT 1 FROM ars_events 
-            WHERE client_cd = '{client}' 
-              AND processing_region_cd = '{region}'
+            WHERE client_cd = :client 
+              AND processing_region_cd = :region
               AND trigger_marker_type_cd = 'sodRegionGlobalProcessTrigger'
               AND received_eagle_responses IS NOT NULL
-              AND business_dt = '{sod_date}'
+              AND business_dt = :sod_date
         ) AND EXISTS (
             SELECT 1 FROM ars_events 
-            WHERE client_cd = '{client}' 
-              AND processing_region_cd = '{region}'
+            WHERE client_cd = :client 
+              AND processing_region_cd = :region
               AND trigger_marker_type_cd = 'sodRegionGlobalProcessDone'
               AND received_eagle_responses IS NOT NULL
-              AND business_dt = '{sod_date}'
+              AND business_dt = :sod_date
         ) THEN 'completed'
         WHEN EXISTS (
             SELECT 1 FROM ars_events 
-            WHERE client_cd = '{client}' 
-              AND processing_region_cd = '{region}'
+            WHERE client_cd = :client 
+              AND processing_region_cd = :region
               AND trigger_marker_type_cd = 'sodRegionGlobalProcessTrigger'
               AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
-              AND business_dt = '{sod_date}'
+              AND business_dt = :sod_date
         ) AND (
             NOT EXISTS (
                 SELECT 1 FROM ars_events 
-                WHERE client_cd = '{client}' 
-                  AND processing_region_cd = '{region}'
+                WHERE client_cd = :client 
+                  AND processing_region_cd = :region
                   AND trigger_marker_type_cd = 'sodRegionGlobalProcessDone'
                   AND received_eagle_responses IS NOT NULL
-                  AND business_dt = '{sod_date}'
+                  AND business_dt = :sod_date
             ) OR EXISTS (
                 SELECT 1 FROM ars_events 
-                WHERE client_cd = '{client}' 
-                  AND processing_region_cd = '{region}'
+                WHERE client_cd = :client 
+                  AND processing_region_cd = :region
                   AND trigger_marker_type_cd = 'sodRegionGlobalProcessDone'
                   AND received_eagle_responses IS NULL
-                  AND business_dt = '{sod_date}'
+                  AND business_dt = :sod_date
             )
         ) THEN 'long_running'
         ELSE 'inprogress' 
     END AS status_with_long_running,
     (SELECT MAX(created_at) FROM ars_events 
-     WHERE client_cd = '{client}' 
-       AND processing_region_cd = '{region}'
+     WHERE client_cd = :client 
+       AND processing_region_cd = :region
        AND trigger_marker_type_cd IN ('sodRegionGlobalProcessTrigger', 'sodRegionGlobalProcessDone')
-       AND business_dt = '{sod_date}'
+       AND business_dt = :sod_date
     ) AS last_updated,
-    '{sod_date}' AS business_dt;
+    CAST(:sod_date AS text) AS business_dt;
 
 -- sod
 SELECT 
-    '{client}' AS client_cd,
-    '{region}' AS processing_region_cd,
+    CAST(:client AS text) AS client_cd,
+    CAST(:region AS text) AS processing_region_cd,
     'sod' AS workflow_type,
     CASE WHEN EXISTS (
         SELECT 1 FROM accounting_events 
-        WHERE client_cd = '{client}' 
-          AND processing_region_cd = '{region}'
+        WHERE client_cd = :client 
+          AND processing_region_cd = :region
           AND snapshot_type_cd='SOD'
-          AND business_dt = '{sod_date}'
+          AND business_dt = :sod_date
     ) THEN 'completed'
     ELSE 'pending' END AS status,
     CASE WHEN EXISTS (
         SELECT 1 FROM accounting_events 
-        WHERE client_cd = '{client}' 
-          AND processing_region_cd = '{region}'
+        WHERE client_cd = :client 
+          AND processing_region_cd = :region
           AND snapshot_type_cd='SOD'
-          AND business_dt = '{sod_date}'
+          AND business_dt = :sod_date
     ) THEN 'completed'
     WHEN EXISTS (
         SELECT 1 FROM accounting_events 
-        WHERE client_cd = '{client}' 
-          AND processing_region_cd = '{region}'
+        WHERE client_cd = :client 
+          AND processing_region_cd = :region
           AND snapshot_type_cd='SOD'
           AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
-          AND business_dt = '{sod_date}'
+          AND business_dt = :sod_date
     ) THEN 'long_running'
     ELSE 'pending' END AS status_with_long_running,
     (SELECT MAX(created_at) FROM accounting_events 
-     WHERE client_cd = '{client}' 
-       AND processing_region_cd = '{region}'
+     WHERE client_cd = :client 
+       AND processing_region_cd = :region
        AND snapshot_type_cd='SOD'
-       AND business_dt = '{sod_date}'
+       AND business_dt = :sod_date
     ) AS last_updated,
-    '{sod_date}' AS business_dt;
+    CAST(:sod_date AS text) AS business_dt;
 
 -- sod_marker
 SELECT 
-    '{client}' AS client_cd,
-    '{region}' AS processing_region_cd,
+    CAST(:client AS text) AS client_cd,
+    CAST(:region AS text) AS processing_region_cd,
     'sod_marker' AS workflow_type,
     CASE WHEN EXISTS (
         SELECT 1 FROM accounting_events ae
         JOIN markers m ON ae.id = m.accounting_event_id
-        WHERE ae.client_cd = '{client}' 
-          AND ae.processing_region_cd = '{region}'
+        WHERE ae.client_cd = :client 
+          AND ae.processing_region_cd = :region
           AND ae.snapshot_type_cd='SOD'
           AND m.marker_type = 'sodRegionSubjectAreaTransformed'
-          AND ae.business_dt = '{sod_date}'
+          AND ae.business_dt = :sod_date
     ) THEN 
         CASE WHEN (
             SELECT COUNT(DISTINCT subject_area_cd) FROM markers m
             JOIN accounting_events ae ON m.accounting_event_id = ae.id
-            WHERE ae.client_cd = '{client}'
-              AND ae.processing_region_cd = '{region}'
+            WHERE ae.client_cd = :client
+              AND ae.processing_region_cd = :region
               AND ae.snapshot_type_cd='SOD'
               AND m.marker_type = 'sodRegionSubjectAreaTransformed'
               AND m.subject_area_cd IN ('positions', 'taxlots', 'traded_cash', 'disposal_lots', 'transactions', 'cash_settlements')
-              AND ae.business_dt = '{sod_date}'
+              AND ae.business_dt = :sod_date
         ) = 6 THEN 'completed'
         ELSE 'inprogress' END
     ELSE 'pending' END AS status,
     CASE WHEN EXISTS (
         SELECT 1 FROM accounting_events ae
         JOIN markers m ON ae.id = m.accounting_event_id
-        WHERE ae.client_cd = '{client}' 
-          AND ae.processing_region_cd = '{region}'
+        WHERE ae.client_cd = :client 
+          AND ae.processing_region_cd = :region
           AND ae.snapshot_type_cd='SOD'
           AND m.marker_type = 'sodRegionSubjectAreaTransformed'
-          AND ae.business_dt = '{sod_date}'
+          AND ae.business_dt = :sod_date
     ) THEN 
         CASE WHEN (
             SELECT COUNT(DISTINCT subject_area_cd) FROM markers m
             JOIN accounting_events ae ON m.accounting_event_id = ae.id
-            WHERE ae.client_cd = '{client}'
-              AND ae.processing_region_cd = '{region}'
+            WHERE ae.client_cd = :client
+              AND ae.processing_region_cd = :region
               AND ae.snapshot_type_cd='SOD'
               AND m.marker_type = 'sodRegionSubjectAreaTransformed'
               AND m.subject_area_cd IN ('positions', 'taxlots', 'traded_cash', 'disposal_lots', 'transactions', 'cash_settlements')
-              AND ae.business_dt = '{sod_date}'
+              AND ae.business_dt = :sod_date
         ) = 6 THEN 'completed'
         WHEN EXISTS (
             SELECT 1 FROM accounting_events
-            WHERE client_cd = '{client}'
-              AND processing_region_cd = '{region}'
+            WHERE client_cd = :client
+              AND processing_region_cd = :region
               AND snapshot_type_cd='SOD'
               AND EXTRACT(EPOCH FROM (NOW() - created_at)/60) > 30
-              AND business_dt = '{sod_date}'
+              AND business_dt = :sod_date
         ) THEN 'long_running'
         ELSE 'inprogress' END
     ELSE 'pending' END AS status_with_long_running,
     (SELECT MAX(created_at) FROM accounting_events 
-     WHERE client_cd = '{client}' 
-       AND processing_region_cd = '{region}'
+     WHERE client_cd = :client 
+       AND processing_region_cd = :region
        AND snapshot_type_cd='SOD'
-       AND business_dt = '{sod_date}'
+       AND business_dt = :sod_date
     ) AS last_updated,
-    '{sod_date}' AS business_dt;
+    CAST(:sod_date AS text) AS business_dt;
+
+-- Batch status summaries
+-- The batch_* queries aggregate every client/region for a business_date/sod_date in a
+-- single scan per table, and atls_api.get_batch_workflow_statuses derives all ATLS
+-- workflow statuses from them. Pass NULL client/region binds to cover all clients.
+
+-- batch_ars_summary
+SELECT
+    client_cd,
+    processing_region_cd,
+    CAST(business_dt AS text) AS business_dt,
+    trigger_marker_type_cd,
+    COUNT(*) AS event_ct,
+    COUNT(*) FILTER (WHERE received_eagle_responses IS NOT NULL) AS received_ct,
+    COUNT(*) FILTER (WHERE received_eagle_responses IS NULL) AS not_received_ct,
+    COUNT(*) FILTER (WHERE received_eagle_responses IS NOT NULL
+                       AND published_markers IS NOT NULL) AS complete_ct,
+    MIN(created_at) AS first_created,
+    MIN(created_at) FILTER (WHERE received_eagle_responses IS NULL
+                              OR published_markers IS NULL) AS first_incomplete_created,
+    MAX(created_at) AS last_created
+FROM ars_events
+WHERE business_dt IN (:business_date, :sod_date)
+  AND trigger_marker_type_cd IN ('opsRegionEODTradingSignoff', 'opsRegionEODPricingSignoff',
+                                 'opsRegionEodSignoff', 'accountingRegionEodclose',
+                                 'sodRegionGlobalProcessTrigger', 'sodRegionGlobalProcessDone')
+  AND (CAST(:client AS text) IS NULL OR client_cd = :client)
+  AND (CAST(:region AS text) IS NULL OR processing_region_cd = :region)
+GROUP BY client_cd, processing_region_cd, business_dt, trigger_marker_type_cd;
+
+-- batch_pricing_summary
+SELECT
+    pe.client_cd,
+    pe.processing_region_cd,
+    CAST(pe.business_dt AS text) AS business_dt,
+    COUNT(DISTINCT pe.id) AS event_ct,
+    COUNT(DISTINCT pm.pricing_event_id) AS marked_ct,
+    MIN(pe.created_at) FILTER (WHERE pm.pricing_event_id IS NULL) AS first_unmarked_created,
+    MAX(pe.created_at) AS last_created
+FROM pricing_events pe
+LEFT JOIN pricing_markers pm ON pe.id = pm.pricing_event_id
+    AND pm.marker_type_cd = 'eodPXRegionSubjectAreaTransformed'
+WHERE pe.business_dt = :business_date
+  AND (CAST(:client AS text) IS NULL OR pe.client_cd = :client)
+  AND (CAST(:region AS text) IS NULL OR pe.processing_region_cd = :region)
+GROUP BY pe.client_cd, pe.processing_region_cd, pe.business_dt;
+
+-- batch_accounting_summary
+WITH ev AS (
+    SELECT
+        ae.client_cd,
+        ae.processing_region_cd,
+        ae.snapshot_type_cd,
+        CAST(ae.business_dt AS text) AS business_dt,
+        ae.created_at,
+        mk.aod_positions,
+        mk.aod_taxlots,
+        mk.transformed_subjects
+    FROM accounting_events ae
+    LEFT JOIN LATERAL (
+        SELECT
+            BOOL_OR(m.marker_type = 'asOfRegionSubjectAreaTransformed'
+                    AND m.subject_area_cd = 'positions') AS aod_positions,
+            BOOL_OR(m.marker_type = 'asOfRegionSubjectAreaTransformed'
+                    AND m.subject_area_cd = 'taxlots') AS aod_taxlots,
+            ARRAY_AGG(DISTINCT m.subject_area_cd) FILTER (
+                WHERE (ae.snapshot_type_cd = 'EOD' AND m.marker_type = 'eodRegionSubjectAreaTransformed')
+                   OR (ae.snapshot_type_cd = 'SOD' AND m.marker_type = 'sodRegionSubjectAreaTransformed')
+            ) AS transformed_subjects
+        FROM markers m
+        WHERE m.accounting_event_id = ae.id
+    ) mk ON TRUE
+    WHERE ae.business_dt IN (:business_date, :sod_date)
+      AND ae.snapshot_type_cd IN ('EOD', 'AOD', 'SOD')
+      AND (CAST(:client AS text) IS NULL OR ae.client_cd = :client)
+      AND (CAST(:region AS text) IS NULL OR ae.processing_region_cd = :region)
+),
+subjects AS (
+    SELECT
+        ev.client_cd,
+        ev.processing_region_cd,
+        ev.snapshot_type_cd,
+        ev.business_dt,
+        ARRAY_AGG(DISTINCT s.subject_area_cd) AS transformed_subjects
+    FROM ev, UNNEST(ev.transformed_subjects) AS s(subject_area_cd)
+    GROUP BY ev.client_cd, ev.processing_region_cd, ev.snapshot_type_cd, ev.business_dt
+)
+SELECT
+    ev.client_cd,
+    ev.processing_region_cd,
+    ev.snapshot_type_cd,
+    ev.business_dt,
+    COUNT(*) AS event_ct,
+    MIN(ev.created_at) AS first_created,
+    MAX(ev.created_at) AS last_created,
+    COUNT(*) FILTER (WHERE ev.aod_positions) AS positions_marker_ct,
+    COUNT(*) FILTER (WHERE ev.aod_taxlots) AS taxlots_marker_ct,
+    COUNT(*) FILTER (WHERE ev.aod_positions AND ev.aod_taxlots) AS aod_complete_ct,
+    subjects.transformed_subjects
+FROM ev
+LEFT JOIN subjects
+    ON subjects.client_cd = ev.client_cd
+   AND subjects.processing_region_cd = ev.processing_region_cd
+   AND subjects.snapshot_type_cd = ev.snapshot_type_cd
+   AND subjects.business_dt = ev.business_dt
+GROUP BY ev.client_cd, ev.processing_region_cd, ev.snapshot_type_cd, ev.business_dt,
+         subjects.transformed_subjects;
+
+-- batch_asof_summary
+SELECT
+    aoe.client_cd,
+    aoe.processing_region_cd,
+    CAST(aoe.business_dt AS text) AS business_dt,
+    COUNT(*) AS event_ct,
+    COUNT(*) FILTER (WHERE EXISTS (
+        SELECT 1 FROM as_of_request_markers arm
+        WHERE arm.as_of_event_id = aoe.id
+    )) AS marked_ct,
+    MIN(aoe.created_at) AS first_created,
+    MAX(aoe.created_at) AS last_created
+FROM as_of_events aoe
+WHERE aoe.business_dt = :business_date
+  AND (CAST(:client AS text) IS NULL OR aoe.client_cd = :client)
+  AND (CAST(:region AS text) IS NULL OR aoe.processing_region_cd = :region)
+GROUP BY aoe.client_cd, aoe.processing_region_cd, aoe.business_dt;
 
 -- Original Message ID Queries
 
 -- accounting_events_original_message_id
 SELECT original_message_id 
 FROM accounting_events 
-WHERE client_cd = '{client}' 
-  AND processing_region_cd = '{region}'
-  AND business_dt = '{business_date}'
+WHERE client_cd = :client 
+  AND processing_region_cd = :region
+  AND business_dt = :business_date
   AND snapshot_type_cd = 'EOD';
 
 -- pricing_message_ids (ATLS DB)
@@ -653,6 +778,6 @@ SELECT
     original_message_id,
     business_dt
 FROM pricing_events
-WHERE client_cd = '{client}'
-  AND processing_region_cd = '{region}'
-  AND business_dt = '{business_date}';
\ No newline at end of file
+WHERE client_cd = :client
+  AND processing_region_cd = :region
+  AND business_dt = :business_date;
\ No newline at end of file
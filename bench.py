@@ -0,0 +1,311 @@
+"""
+Micro-benchmarks for the status query layer.
+
+Run against a real ATLS/ADM database (ATLS_DATABASE_URL / ADM_DATABASE_URL):
+
+    python bench.py bind_params --client ACME --region AMER --business-date 2024-01-31
+    python bench.py id_sets --sizes 10 1000 50000
+
+The classifier benchmark runs on synthetic rows and needs no database:
+
+    python bench.py classifier --rows 100000 200000
+    python bench.py row_store --rows 100000 500000
+"""
+import argparse
+import pickle
+import random
+import re
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from database.connectors import get_adm_engine, get_atls_engine
+from api.query_registry import ADM_QUERIES, ATLS_QUERIES
+from api.adm_api import ID_SET_TEMP_TABLE_THRESHOLD, MessageIdSet
+from api.Newadmapi import _norm_client, _norm_date, _norm_region, group_rows_with_diagnostics
+from api.workflow_eval import (EXPECTED_SUBJECTS, STAGE_MARKER_FILTERS, WORKFLOW_CLASSIFIER, _norm_snapshot,
+                               evaluate_workflow, evaluate_workflow_rows, index_message_ids)
+from api.row_store import COMBINED_COLUMNS, CombinedRow, RowInterner
+
+
+def _timed(fn, iterations):
+    """Run fn iterations times and return per-call latencies in milliseconds"""
+    timings = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return timings
+
+
+def _report(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1] if len(timings) >= 20 else timings[-1]
+    print(f"{label:<32} n={len(timings):<6} mean={statistics.mean(timings):8.3f}ms "
+          f"median={statistics.median(timings):8.3f}ms p95={p95:8.3f}ms")
+
+
+def _inline_params(sql, params):
+    """Render bind parameters as quoted literals, i.e. the old str.format behaviour"""
+    return re.sub(r'(?<![:\w]):([A-Za-z_]\w*)', lambda m: "'%s'" % params[m.group(1)], sql)
+
+
+def bench_bind_params(args):
+    """Literal-SQL vs bound execution of the hottest ATLS status statements"""
+    params = {
+        'client': args.client,
+        'region': args.region,
+        'business_date': args.business_date,
+        'sod_date': args.business_date,
+    }
+    with get_atls_engine().connect() as conn:
+        for name in args.queries:
+            statement = ATLS_QUERIES.get(name)
+            if statement is None:
+                print(f"unknown query {name}")
+                continue
+            literal_sql = _inline_params(statement.sql, params)
+
+            # text() per call + literal values: a new statement for the server every time
+            literal = _timed(lambda: conn.execute(text(literal_sql)).fetchall(), args.iterations)
+            # cached clause + binds: stable text, prepared once the threshold is reached
+            bound = _timed(lambda: conn.execute(statement.clause, params).fetchall(), args.iterations)
+
+            _report(f"{name} literal", literal)
+            _report(f"{name} bound", bound)
+            print(f"{name}: median per-call latency change "
+                  f"{statistics.median(literal) - statistics.median(bound):+.3f}ms")
+
+
+def _message_id_sample(conn, size):
+    """Real message ids from markers, padded with synthetic ids up to size"""
+    rows = conn.execute(text("SELECT DISTINCT original_message_id FROM markers LIMIT :n"), {'n': size})
+    ids = [str(row[0]) for row in rows]
+    ids.extend(f"bench-{i:08d}" for i in range(size - len(ids)))
+    return ids
+
+
+def bench_id_sets(args):
+    """Quoted IN list vs array bind vs temp-table join for growing message id sets"""
+    with get_adm_engine().connect() as conn:
+        for name in args.queries:
+            statement = ADM_QUERIES.get(name)
+            if statement is None:
+                print(f"unknown query {name}")
+                continue
+            params = {'total_count': 0, 'marker_types': [], 'service_names': []}
+            for size in args.sizes:
+                ids = _message_id_sample(conn, size)
+                in_list = "IN (%s)" % ", ".join("'%s'" % i for i in ids)
+                literal_sql = re.sub(r'=\s*ANY\(\s*:message_ids\s*\)', in_list, statement.sql)
+
+                def run_literal():
+                    conn.execute(text(literal_sql), params).fetchall()
+                    conn.rollback()
+
+                def run_with(threshold):
+                    def run():
+                        MessageIdSet(conn, ids, threshold=threshold).execute(statement, params).fetchall()
+                        conn.rollback()
+                    return run
+
+                results = [
+                    ('in_list', _timed(run_literal, args.iterations)),
+                    ('array', _timed(run_with(size), args.iterations)),
+                    ('temp_table', _timed(run_with(0), args.iterations)),
+                ]
+                for strategy, timings in results:
+                    _report(f"{name} n={size} {strategy}", timings)
+                print(f"{name} n={size}: SQL text {len(literal_sql)} chars as IN list, "
+                      f"{len(statement.sql)} chars bound; automatic choice is "
+                      f"{'temp_table' if size > ID_SET_TEMP_TABLE_THRESHOLD else 'array'}")
+
+
+def _synthetic_combined_rows(n_rows, n_pairs, ids_per_key, business_date):
+    """Grouped combined rows and the ATLS message map for n_pairs synthetic client/region pairs"""
+    rng = random.Random(n_rows)
+    pairs = [(f"CLIENT{i:03d}", ("AMER", "EMEA", "APAC")[i % 3]) for i in range(n_pairs)]
+    markers = {}
+    for (snapshot, _), marker_filter in STAGE_MARKER_FILTERS.items():
+        markers.setdefault(snapshot, []).extend([marker_filter] if isinstance(marker_filter, str) else marker_filter)
+    markers["AOD"].append("eodAllRegionStatementsPublished")
+    subjects = sorted({s for expected in EXPECTED_SUBJECTS.values() for s in expected})
+
+    atls_message_map = {}
+    for client, region in pairs:
+        atls_message_map[(client, region)] = [
+            {"id": f"{client}-{region}-{snapshot}-{i}", "snapshot": snapshot, "business_dt": business_date,
+             "source": "ACCOUNTING"}
+            for snapshot in markers for i in range(ids_per_key)
+        ]
+
+    grouped_rows = {}
+    now = datetime.now()
+    for n in range(n_rows):
+        client, region = pairs[n % n_pairs]
+        snapshot = rng.choice(list(markers))
+        grouped_rows.setdefault((client, region, snapshot, business_date), []).append(CombinedRow(
+            last_updated=now - timedelta(minutes=rng.randrange(120)),
+            client_cd=client,
+            processing_region_cd=region,
+            snapshot_type_cd=snapshot,
+            marker_type_cd=rng.choice(markers[snapshot]),
+            subject_area_cd=rng.choice(subjects),
+            # a few rows of other (non-ATLS) messages so the id filter has work to do
+            original_message_id=f"{client}-{region}-{snapshot}-{rng.randrange(ids_per_key + 2)}",
+            business_dt=business_date,
+            status="success",
+            source="markers",
+        ))
+    return pairs, atls_message_map, grouped_rows
+
+
+def bench_classifier(args):
+    """Per-workflow list scans vs the compiled single-pass row classifier (synthetic rows, no database)"""
+    business_date = "2024-01-31"
+    for n_rows in args.rows:
+        pairs, atls_message_map, grouped_rows = _synthetic_combined_rows(
+            n_rows, args.pairs, args.ids_per_key, business_date)
+
+        def run_scans():
+            return [
+                evaluate_workflow(client, region, workflow_type, expected_subjects,
+                                  atls_message_map[(client, region)], grouped_rows, business_date, business_date)
+                for client, region in pairs for workflow_type, expected_subjects in EXPECTED_SUBJECTS.items()
+            ]
+
+        def run_classifier():
+            ids_by_key = index_message_ids(atls_message_map)
+            id_sets = {k: frozenset(v) for k, v in ids_by_key.items()}
+            buckets = WORKFLOW_CLASSIFIER.classify(grouped_rows, id_sets, business_date, business_date, set(pairs))
+            workflows = []
+            for client, region in pairs:
+                for workflow_type, expected_subjects in EXPECTED_SUBJECTS.items():
+                    snapshot = workflow_type.split("_")[0].upper()
+                    workflows.append(evaluate_workflow_rows(
+                        client, region, workflow_type, expected_subjects,
+                        ids_by_key.get((client, region, snapshot, business_date), []),
+                        buckets.get((client, region, workflow_type), []), business_date))
+            return workflows
+
+        if run_scans() != run_classifier():
+            print(f"rows={n_rows}: results differ between scans and classifier")
+
+        scans = _timed(run_scans, args.iterations)
+        compiled = _timed(run_classifier, args.iterations)
+        _report(f"rows={n_rows} scans", scans)
+        _report(f"rows={n_rows} classifier", compiled)
+        print(f"rows={n_rows}: {statistics.median(scans) / statistics.median(compiled):.1f}x, "
+              f"{statistics.median(compiled) * 1000 / n_rows:.3f}us per row with the classifier")
+
+
+def _driver_rows(n_rows, n_pairs):
+    """Raw combined rows as the driver hands them over: fresh str/date objects in every row"""
+    rng = random.Random(n_rows)
+    pairs = [(f"client{i:03d} ", ("AMER", "EMEA", "APAC")[i % 3]) for i in range(n_pairs)]
+    markers = sorted({m for f in STAGE_MARKER_FILTERS.values() for m in ([f] if isinstance(f, str) else f)})
+    subjects = sorted({s for expected in EXPECTED_SUBJECTS.values() for s in expected})
+    now = datetime.now()
+    for n in range(n_rows):
+        client, region = pairs[n % n_pairs]
+        yield (
+            now - timedelta(seconds=n),
+            "".join(client),
+            "".join(region),
+            "".join(rng.choice(("EOD", "AOD", "SOD"))),
+            "".join(rng.choice(markers)),
+            "".join(rng.choice(subjects)),
+            f"msg-{client.strip()}-{n // 40}",
+            (now - timedelta(days=rng.randrange(2))).date(),
+            "".join("success"),
+            "".join("markers"),
+        )
+
+
+def _group_dicts(rows):
+    """The previous pipeline: dict per row, every key normalized anew for every row"""
+    grouped = {}
+    for row in rows:
+        r = dict(zip(COMBINED_COLUMNS, row))
+        key = (
+            _norm_client.__wrapped__(r["client_cd"]),
+            _norm_region.__wrapped__(r["processing_region_cd"]),
+            _norm_snapshot.__wrapped__(r["snapshot_type_cd"]),
+            _norm_date.__wrapped__(r["business_dt"]),
+        )
+        grouped.setdefault(key, []).append(r)
+    return grouped
+
+
+def _group_compact(rows):
+    interner = RowInterner()
+    return group_rows_with_diagnostics(interner.compact(row) for row in rows)[0]
+
+
+def bench_row_store(args):
+    """Memory and CPU (grouping + cache pickling) of one refresh: row dicts vs interned CombinedRow tuples"""
+    for n_rows in args.rows:
+        results = {}
+        for label, group in (('dicts', _group_dicts), ('compact', _group_compact)):
+            # CPU without tracing, then memory in a second (traced, much slower) run
+            driver_rows = list(_driver_rows(n_rows, args.pairs))
+            cpu_ms = min(_timed(lambda: group(driver_rows), args.iterations))
+            driver_rows = None  # release before the traced run
+            tracemalloc.start()
+            grouped = group(_driver_rows(n_rows, args.pairs))
+            retained, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            # the per-pair cache write pickles every group once per refresh
+            t0 = time.perf_counter()
+            cached_bytes = sum(len(pickle.dumps(group_rows, pickle.HIGHEST_PROTOCOL))
+                               for group_rows in grouped.values())
+            cpu_ms += (time.perf_counter() - t0) * 1000
+            results[label] = (cpu_ms, retained)
+            print(f"rows={n_rows} {label:<8} cpu={cpu_ms:9.1f}ms retained={retained / 2**20:8.1f}MiB "
+                  f"peak={peak / 2**20:8.1f}MiB cached={cached_bytes / 2**20:8.1f}MiB groups={len(grouped)}")
+            del grouped
+        (cpu_d, mem_d), (cpu_c, mem_c) = results['dicts'], results['compact']
+        print(f"rows={n_rows}: saves {(mem_d - mem_c) / 2**20:.1f}MiB ({1 - mem_c / mem_d:.0%}) "
+              f"and {cpu_d - cpu_c:.1f}ms ({1 - cpu_c / cpu_d:.0%}) per refresh")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('bind_params', help=bench_bind_params.__doc__)
+    p.add_argument('--client', required=True)
+    p.add_argument('--region', required=True)
+    p.add_argument('--business-date', required=True)
+    p.add_argument('--iterations', type=int, default=200)
+    p.add_argument('--queries', nargs='+', default=['eod_ars', 'eod_marker', 'aod_marker', 'sod_ars'])
+    p.set_defaults(func=bench_bind_params)
+
+    p = sub.add_parser('id_sets', help=bench_id_sets.__doc__)
+    p.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 50000])
+    p.add_argument('--iterations', type=int, default=20)
+    p.add_argument('--queries', nargs='+', default=['aod_raw_status', 'eod_final_status', 'eod_raw_status'])
+    p.set_defaults(func=bench_id_sets)
+
+    p = sub.add_parser('classifier', help=bench_classifier.__doc__)
+    p.add_argument('--rows', type=int, nargs='+', default=[100000, 250000])
+    p.add_argument('--pairs', type=int, default=40)
+    p.add_argument('--ids-per-key', type=int, default=50)
+    p.add_argument('--iterations', type=int, default=5)
+    p.set_defaults(func=bench_classifier)
+
+    p = sub.add_parser('row_store', help=bench_row_store.__doc__)
+    p.add_argument('--rows', type=int, nargs='+', default=[100000, 500000])
+    p.add_argument('--pairs', type=int, default=40)
+    p.add_argument('--iterations', type=int, default=3)
+    p.set_defaults(func=bench_row_store)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
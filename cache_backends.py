@@ -0,0 +1,376 @@
+import abc
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:  # optional: only needed for CACHE_BACKEND=redis
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# The shared backends store pickled values (so cached rows keep their datetime values); the
+# memory backend only pickles a value to measure it when it has a byte limit.
+PICKLE_PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+
+class CacheStats:
+    """Hit/miss/eviction counters (per process, also for the shared backends)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def incr(self, name, n=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def as_dict(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            'sets': self.sets,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+
+class CacheBackend(abc.ABC):
+    """get/set/delete/clear with a per-entry TTL; subclasses bound the size"""
+
+    name = 'base'
+
+    def __init__(self, default_ttl=20):
+        self.default_ttl = default_ttl
+        self.stats = CacheStats()
+
+    @abc.abstractmethod
+    def get(self, key):
+        """The cached value, or None when missing or expired"""
+
+    @abc.abstractmethod
+    def set(self, key, value, ttl=None):
+        """Store value for ttl seconds (default_ttl when None)"""
+
+    @abc.abstractmethod
+    def delete(self, key):
+        pass
+
+    @abc.abstractmethod
+    def clear(self):
+        pass
+
+    def info(self):
+        info = {'backend': self.name, 'default_ttl': self.default_ttl}
+        info.update(self.stats.as_dict())
+        return info
+
+    @staticmethod
+    def key_str(key):
+        return key if isinstance(key, str) else repr(key)
+
+
+class MemoryCache(CacheBackend):
+    """
+    In-process LRU bounded by entry count and, when max_bytes is set, by pickled byte size.
+    Without max_bytes values are stored as they are and never pickled.
+    """
+
+    name = 'memory'
+
+    def __init__(self, max_entries=256, max_bytes=None, default_ttl=20):
+        super().__init__(default_ttl)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        key = self.key_str(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.incr('misses')
+                return None
+            expires_at, size, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                self._bytes -= size
+                self.stats.incr('expirations')
+                self.stats.incr('misses')
+                return None
+            self._entries.move_to_end(key)
+        self.stats.incr('hits')
+        return value
+
+    def set(self, key, value, ttl=None):
+        key = self.key_str(key)
+        size = 0
+        if self.max_bytes is not None:
+            size = len(pickle.dumps(value, PICKLE_PROTOCOL))
+            if size > self.max_bytes:
+                logger.warning("Not caching %s: %d bytes exceeds the %d byte limit", key, size, self.max_bytes)
+                return
+        expires_at = time.time() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (expires_at, size, value)
+            self._bytes += size
+            self._evict()
+        self.stats.incr('sets')
+
+    def _evict(self):
+        # Expired entries first, then least recently used until both limits hold
+        now = time.time()
+        for k in [k for k, (expires_at, _, _) in self._entries.items() if expires_at < now]:
+            self._bytes -= self._entries.pop(k)[1]
+            self.stats.incr('expirations')
+        while self._entries and (len(self._entries) > self.max_entries
+                                 or (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            _, (_, size, _) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.stats.incr('evictions')
+
+    def delete(self, key):
+        with self._lock:
+            entry = self._entries.pop(self.key_str(key), None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def info(self):
+        info = super().info()
+        info.update({'entries': len(self._entries), 'bytes': self._bytes,
+                     'max_entries': self.max_entries, 'max_bytes': self.max_bytes})
+        return info
+
+
+class FileCache(CacheBackend):
+    """
+    Host-wide cache shared by all worker processes: one pickle file per key in a directory
+    (use a tmpfs path such as /dev/shm for a shared-memory store). Writes are atomic
+    (temp file + rename); the least recently used files are removed beyond max_bytes.
+
+    Sizes are tracked in memory as files are written, read and removed; the directory is only
+    listed again every rescan_seconds to account for the files of the other processes.
+    """
+
+    name = 'file'
+
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024, default_ttl=20, rescan_seconds=60):
+        super().__init__(default_ttl)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.rescan_seconds = rescan_seconds
+        self._index = OrderedDict()  # path -> size, least recently used first
+        self._bytes = 0
+        self._scanned_at = 0.0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._rescan()
+
+    def _path(self, key):
+        digest = hashlib.sha1(self.key_str(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f"{digest}.cache")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                expires_at, value = pickle.load(f)
+        except FileNotFoundError:
+            self.stats.incr('misses')
+            return None
+        except Exception as e:
+            logger.error(f"Error reading cache file {path}: {str(e)}")
+            self.stats.incr('misses')
+            return None
+        if expires_at < time.time():
+            self._discard(path)
+            self.stats.incr('expirations')
+            self.stats.incr('misses')
+            return None
+        try:
+            os.utime(path)  # mtime is the LRU clock of the other processes
+        except OSError:
+            pass
+        with self._lock:
+            if path in self._index:
+                self._index.move_to_end(path)
+        self.stats.incr('hits')
+        return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + (self.default_ttl if ttl is None else ttl)
+        payload = pickle.dumps((expires_at, value), PICKLE_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            logger.warning("Not caching %s: %d bytes exceeds the %d byte limit", key, len(payload), self.max_bytes)
+            return
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except Exception:
+            self._remove(tmp_path)
+            raise
+        self.stats.incr('sets')
+        if time.time() - self._scanned_at > self.rescan_seconds:
+            self._rescan()
+        with self._lock:
+            self._bytes += len(payload) - self._index.pop(path, 0)
+            self._index[path] = len(payload)
+            self._evict()
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.cache'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _rescan(self):
+        """Rebuild the size index from the directory, least recently used (oldest mtime) first"""
+        entries = sorted(self._entries())
+        with self._lock:
+            self._index = OrderedDict((path, size) for _, size, path in entries)
+            self._bytes = sum(self._index.values())
+            self._scanned_at = time.time()
+
+    def _evict(self):
+        # caller holds self._lock
+        while self._index and self._bytes > self.max_bytes:
+            path, size = self._index.popitem(last=False)
+            self._bytes -= size
+            self._remove(path)
+            self.stats.incr('evictions')
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _discard(self, path):
+        self._remove(path)
+        with self._lock:
+            self._bytes -= self._index.pop(path, 0)
+
+    def delete(self, key):
+        self._discard(self._path(key))
+
+    def clear(self):
+        for _, _, path in self._entries():
+            self._remove(path)
+        with self._lock:
+            self._index.clear()
+            self._bytes = 0
+
+    def info(self):
+        info = super().info()
+        with self._lock:
+            info.update({'entries': len(self._index), 'bytes': self._bytes,
+                         'max_bytes': self.max_bytes, 'directory': self.directory})
+        return info
+
+
+class RedisCache(CacheBackend):
+    """
+    Shared cache on a Redis-compatible server. TTL is enforced by the server; bound its size
+    with maxmemory and an allkeys-lru policy (evictions there are not visible in these counters).
+    """
+
+    name = 'redis'
+
+    def __init__(self, url, prefix='cronet:', default_ttl=20):
+        if redis is None:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package")
+        super().__init__(default_ttl)
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url)
+
+    def _key(self, key):
+        return self.prefix + self.key_str(key)
+
+    def get(self, key):
+        try:
+            payload = self.client.get(self._key(key))
+        except Exception as e:
+            logger.error(f"Error reading from redis cache: {str(e)}")
+            payload = None
+        if payload is None:
+            self.stats.incr('misses')
+            return None
+        self.stats.incr('hits')
+        return pickle.loads(payload)
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        try:
+            self.client.set(self._key(key), pickle.dumps(value, PICKLE_PROTOCOL), ex=max(1, int(ttl)))
+            self.stats.incr('sets')
+        except Exception as e:
+            logger.error(f"Error writing to redis cache: {str(e)}")
+
+    def delete(self, key):
+        self.client.delete(self._key(key))
+
+    def clear(self):
+        for k in self.client.scan_iter(match=self.prefix + '*'):
+            self.client.delete(k)
+
+    def info(self):
+        info = super().info()
+        info['prefix'] = self.prefix
+        return info
+
+
+def get_cache_backend(namespace, default_ttl=20):
+    """
+    Build the cache backend configured by environment:
+      CACHE_BACKEND      memory (default) | file | redis
+      CACHE_MAX_BYTES    byte limit for file (default 256 MiB) and, only when set, for memory
+                         (every memory set then pickles its value to measure it)
+      CACHE_MAX_ENTRIES  entry limit for memory (default 256)
+      CACHE_DIR          base directory for file (default <tmp>/cronet-cache)
+      CACHE_REDIS_URL    server URL for redis (default redis://localhost:6379/0)
+    """
+    backend = os.getenv('CACHE_BACKEND', 'memory').lower()
+    max_bytes = os.getenv('CACHE_MAX_BYTES')
+    max_bytes = int(max_bytes) if max_bytes else None
+    if backend == 'file':
+        base_dir = os.getenv('CACHE_DIR', os.path.join(tempfile.gettempdir(), 'cronet-cache'))
+        return FileCache(os.path.join(base_dir, namespace), max_bytes=max_bytes or 256 * 1024 * 1024,
+                         default_ttl=default_ttl)
+    if backend == 'redis':
+        url = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+        return RedisCache(url, prefix=f"cronet:{namespace}:", default_ttl=default_ttl)
+    return MemoryCache(max_entries=int(os.getenv('CACHE_MAX_ENTRIES', 256)),
+                       max_bytes=max_bytes, default_ttl=default_ttl)
@@ -0,0 +1,281 @@
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import text
+from database.session import lake_connection
+from api.snapshot_store import SnapshotStore, STATUS_SNAPSHOT_DIR
+
+"""
+lake_counts.py
+
+Datalake message/record counts per (original_message_id, subject_area) for one
+client/region/business date. The lake stats table is partitioned by business date and subject
+area, so instead of one grouped scan the work is split into (snapshot, subject_area) chunks:
+a discovery query lists the chunks present in the business_dt partition and each chunk runs
+its own partition-pruned aggregate on a bounded pool (LAKE_EXTRACT_WORKERS, shared by all
+jobs). Progress and the rows of finished chunks can be read while the job runs.
+
+Counts of finished business dates (older than LAKE_COUNTS_SETTLE_DAYS) no longer change and
+are kept in a lake_counts_* snapshot file for good; later jobs for them never query the lake.
+"""
+
+logger = logging.getLogger(__name__)
+
+LAKE_EXTRACT_WORKERS = int(os.getenv('LAKE_EXTRACT_WORKERS', 4))
+LAKE_COUNTS_SETTLE_DAYS = int(os.getenv('LAKE_COUNTS_SETTLE_DAYS', 1))  # late loads still land the day after
+LAKE_COUNTS_DIR = os.getenv('LAKE_COUNTS_DIR', STATUS_SNAPSHOT_DIR)
+LAKE_JOB_RETENTION_SECONDS = int(os.getenv('LAKE_JOB_RETENTION_SECONDS', 600))
+
+_TABLE_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?$')
+_KEY_RE = re.compile(r'[^A-Za-z0-9.-]+')
+
+_EXTRACT_EXECUTOR = ThreadPoolExecutor(max_workers=LAKE_EXTRACT_WORKERS, thread_name_prefix='lake-counts')
+_FINISHED_STORE = SnapshotStore(LAKE_COUNTS_DIR, prefix='lake_counts')
+
+# business_dt first so the scan is pruned to one partition before anything else
+PARTITIONS_SQL = """
+    SELECT DISTINCT snapshot_type_cd, subject_area_cd
+    FROM {table}
+    WHERE business_dt = :business_date
+      AND client_cd = :client
+      AND processing_region_cd = :region
+"""
+
+PARTITION_COUNTS_SQL = """
+    SELECT original_message_id,
+           subject_area_cd,
+           COUNT(*) AS messages,
+           SUM(record_count) AS records,
+           MIN(created_at) AS started,
+           MAX(created_at) AS completed
+    FROM {table}
+    WHERE business_dt = :business_date
+      AND subject_area_cd = :subject_area
+      AND snapshot_type_cd = :snapshot
+      AND client_cd = :client
+      AND processing_region_cd = :region
+    GROUP BY original_message_id, subject_area_cd
+"""
+
+
+def stats_table(table):
+    """table if it is a plain (optionally schema qualified) identifier; it is formatted into SQL"""
+    if not _TABLE_RE.match(table):
+        raise ValueError(f"invalid stats table name {table!r}")
+    return table
+
+
+def _count(value):
+    return int(value) if value is not None else 0
+
+
+def _iso(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def is_finished(business_date, today=None):
+    """True when the lake counts of business_date are final and can be cached for good"""
+    settled = (today or date.today()) - timedelta(days=LAKE_COUNTS_SETTLE_DAYS)
+    return datetime.strptime(business_date, '%Y-%m-%d').date() < settled
+
+
+def discover_partitions(params, table):
+    """[(snapshot_type_cd, subject_area_cd)] present for the client/region on the business date"""
+    with lake_connection() as conn:
+        rows = conn.execute(text(PARTITIONS_SQL.format(table=stats_table(table))), params).fetchall()
+    return sorted((row[0], row[1]) for row in rows)
+
+
+def fetch_partition_counts(params, table, partition):
+    """{(original_message_id, subject_area): (messages, records, started, completed)} of one chunk"""
+    snapshot, subject_area = partition
+    counts = {}
+    with lake_connection() as conn:
+        result = conn.execute(text(PARTITION_COUNTS_SQL.format(table=stats_table(table))),
+                              dict(params, snapshot=snapshot, subject_area=subject_area))
+        for message_id, subject, messages, records, started, completed in result:
+            counts[(message_id, subject)] = (_count(messages), _count(records), started, completed)
+    return counts
+
+
+class LakeCountJob:
+    """
+    One extraction. Chunks finish in any order and are appended to completed; readers follow
+    it by index (progress(since) / iter_completed()), so partial results are never re-sent.
+    """
+
+    def __init__(self, client, region, business_date, table):
+        self.job_id = uuid.uuid4().hex
+        self.client = client
+        self.region = region
+        self.business_date = business_date
+        self.table = table
+        self.params = {'client': client, 'region': region, 'business_date': business_date}
+        self.status = 'running'  # running, done, failed
+        self.source = 'lake'  # lake or cache
+        self.partitions = None  # None until discovered
+        self.completed = []  # [(partition, counts)] in completion order
+        self.failed = []  # [(partition, error message)]
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self._cond = threading.Condition()
+
+    @property
+    def cache_key(self):
+        return _KEY_RE.sub('_', f'{self.table}_{self.client}_{self.region}_{self.business_date}')
+
+    def start(self):
+        record = _FINISHED_STORE.read(self.cache_key) if is_finished(self.business_date) else None
+        cached = record['snapshot'] if record else None
+        if cached and cached['params'] == self.params and cached['table'] == self.table:
+            self.source = 'cache'
+            self.partitions = [partition for partition, _counts in cached['completed']]
+            self.completed = list(cached['completed'])
+            self._finish()
+            return self
+        future = _EXTRACT_EXECUTOR.submit(discover_partitions, self.params, self.table)
+        future.add_done_callback(self._discovered)
+        return self
+
+    def _discovered(self, future):
+        try:
+            partitions = future.result()
+        except Exception as e:
+            logger.error(f"Lake partitions of {self.cache_key} could not be listed: {str(e)}")
+            self._finish(error='Could not list the datalake partitions')
+            return
+        with self._cond:
+            self.partitions = partitions
+        if not partitions:
+            self._finish()
+            return
+        # chunks are submitted from the callback, never waited on by a pool thread
+        for partition in partitions:
+            chunk = _EXTRACT_EXECUTOR.submit(fetch_partition_counts, self.params, self.table, partition)
+            chunk.add_done_callback(lambda f, partition=partition: self._chunk_done(partition, f))
+
+    def _chunk_done(self, partition, future):
+        try:
+            counts = future.result()
+        except Exception as e:
+            logger.error(f"Lake counts of {self.cache_key} {partition} failed: {str(e)}")
+            counts = None
+            error = str(e)
+        with self._cond:
+            if counts is None:
+                self.failed.append((partition, error))
+            else:
+                self.completed.append((partition, counts))
+            finished = len(self.completed) + len(self.failed) == len(self.partitions)
+            self._cond.notify_all()
+        if finished:
+            self._finish(error='Some datalake partitions could not be counted' if self.failed else None)
+
+    def _finish(self, error=None):
+        with self._cond:
+            self.error = error
+            self.status = 'failed' if error else 'done'
+            self.finished_at = time.time()
+            self._cond.notify_all()
+        logger.info(f"Lake counts {self.cache_key}: {self.status} from {self.source}, "
+                    f"{len(self.completed)}/{len(self.partitions or [])} partitions in "
+                    f"{self.finished_at - self.started_at:.2f}s")
+        if self.status == 'done' and self.source == 'lake' and is_finished(self.business_date):
+            try:
+                _FINISHED_STORE.write(self.cache_key, {
+                    'params': self.params, 'table': self.table, 'completed': self.completed})
+            except Exception:
+                logger.exception(f"Could not store the lake counts of {self.cache_key}")
+
+    def iter_completed(self, timeout=None):
+        """Yield (partition, counts) as chunks finish; raises RuntimeError if the job failed"""
+        deadline = time.monotonic() + timeout if timeout else None
+        index = 0
+        while True:
+            with self._cond:
+                while index == len(self.completed) and self.status == 'running':
+                    remaining = deadline - time.monotonic() if deadline else None
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"lake counts of {self.cache_key} still running")
+                    self._cond.wait(remaining)
+                ready = self.completed[index:]
+                status, error = self.status, self.error
+            for item in ready:
+                yield item
+            index += len(ready)
+            if status != 'running' and index == len(self.completed):
+                if error:
+                    raise RuntimeError(error)
+                return
+
+    def progress(self, since=None):
+        """
+        Job state and partition counts; with since, also the rows of the chunks that finished
+        after the first since ones (pass back next_since to continue).
+        """
+        with self._cond:
+            completed = list(self.completed)
+            info = {
+                'job_id': self.job_id,
+                'client': self.client,
+                'region': self.region,
+                'business_date': self.business_date,
+                'status': self.status,
+                'source': self.source,
+                'partitions_total': len(self.partitions) if self.partitions is not None else None,
+                'partitions_done': len(completed),
+                'partitions_failed': [{'snapshottypecd': p[0], 'subject_area': p[1], 'error': e}
+                                      for p, e in self.failed],
+                'error': self.error,
+                'elapsed_seconds': round((self.finished_at or time.time()) - self.started_at, 3),
+            }
+        if since is not None:
+            info['rows'] = [
+                {
+                    'snapshottypecd': snapshot,
+                    'subject_area': subject,
+                    'originalMessageId': message_id,
+                    'lake_messages': messages,
+                    'lake_records': records,
+                    'started': _iso(started),
+                    'completed': _iso(finished),
+                }
+                for (snapshot, _subject_area), counts in completed[max(since, 0):]
+                for (message_id, subject), (messages, records, started, finished) in counts.items()
+            ]
+            info['next_since'] = len(completed)
+        return info
+
+
+_JOBS = {}  # job_id -> job
+_ACTIVE = {}  # (table, client, region, business_date) -> running job
+_JOBS_LOCK = threading.Lock()
+
+
+def start_lake_counts(client, region, business_date, table):
+    """The running job for these parameters, or a new one (served from the cache when final)"""
+    key = (table, client, region, business_date)
+    with _JOBS_LOCK:
+        now = time.time()
+        for job_id, job in list(_JOBS.items()):
+            if job.finished_at and now - job.finished_at > LAKE_JOB_RETENTION_SECONDS:
+                del _JOBS[job_id]
+        job = _ACTIVE.get(key)
+        if job is not None and job.status == 'running':
+            return job
+        job = LakeCountJob(client, region, business_date, stats_table(table))
+        _JOBS[job.job_id] = job
+        _ACTIVE[key] = job
+    return job.start()
+
+
+def get_lake_count_job(job_id):
+    with _JOBS_LOCK:
+        return _JOBS.get(job_id)
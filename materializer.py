@@ -0,0 +1,150 @@
+import argparse
+import logging
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+from api.snapshot_store import get_snapshot_store
+from api.status_engine import compute_snapshot
+
+"""
+materializer.py
+
+Recomputes the full status grid of the active business dates on a schedule and writes each
+to the snapshot store, so /api/batch_status and /details read a stored snapshot instead of
+computing on request. Runs as its own process:
+
+    python materializer.py [--interval 30] [--dates 2024-05-01,2024-05-02] [--once]
+
+or as a daemon thread in the app with STATUS_MATERIALIZER_THREAD=1. Every app worker then
+starts a thread, but only the one holding the store's leader lock materializes; the others
+retry the lock every interval and take over when the leader's process exits.
+"""
+
+logger = logging.getLogger(__name__)
+
+MATERIALIZER_INTERVAL_SECONDS = float(os.getenv('MATERIALIZER_INTERVAL_SECONDS', 30))
+MATERIALIZER_ACTIVE_DAYS = int(os.getenv('MATERIALIZER_ACTIVE_DAYS', 2))  # business days back from today
+MATERIALIZER_DATES = os.getenv('MATERIALIZER_DATES', '')  # comma separated dates, overrides the above
+ENABLE_MATERIALIZER_THREAD = os.getenv('STATUS_MATERIALIZER_THREAD', '0') == '1'
+
+
+def active_business_dates(today=None, days=None):
+    """The business dates the dashboard shows: today and the previous business days (weekdays)"""
+    if MATERIALIZER_DATES:
+        return [d.strip() for d in MATERIALIZER_DATES.split(',') if d.strip()]
+    days = MATERIALIZER_ACTIVE_DAYS if days is None else days
+    current = today or date.today()
+    dates = []
+    while len(dates) < days:
+        if current.weekday() < 5:
+            dates.append(current.strftime('%Y-%m-%d'))
+        current -= timedelta(days=1)
+    return dates
+
+
+def materialize(business_date, store=None):
+    """
+    Compute and store the all-clients snapshot of business_date. A snapshot with incomplete
+    sections is not stored: readers keep the previous version, whose age shows it is stale.
+    Returns the stored record or None.
+    """
+    store = store or get_snapshot_store()
+    t0 = time.time()
+    snapshot = compute_snapshot(business_date)
+    if snapshot['partial_sections']:
+        logger.warning(f"Materializer {business_date}: sections {snapshot['partial_sections']} incomplete, "
+                       f"keeping the previous snapshot")
+        return None
+    record = store.write(business_date, snapshot)
+    logger.info(f"Materializer {business_date}: version {record['version']}, "
+                f"{len(snapshot['workflows'])} workflows in {time.time() - t0:.2f}s")
+    return record
+
+
+def run_once(dates=None, store=None):
+    """Materialize every active business date once; errors are logged per date"""
+    records = {}
+    for business_date in dates or active_business_dates():
+        try:
+            records[business_date] = materialize(business_date, store)
+        except Exception:
+            logger.exception(f"Materializer {business_date} failed")
+            records[business_date] = None
+    return records
+
+
+class Materializer(threading.Thread):
+    """Background loop: run_once every interval seconds until stop(), while this process leads"""
+
+    def __init__(self, interval=None, dates=None, store=None):
+        super().__init__(name='status-materializer', daemon=True)
+        self.interval = MATERIALIZER_INTERVAL_SECONDS if interval is None else interval
+        self.dates = dates
+        self.store = store
+        self._stop_event = threading.Event()
+        self._leader = None  # the held leader lock file
+
+    @property
+    def is_leader(self):
+        return self._leader is not None
+
+    def run(self):
+        store = self.store or get_snapshot_store()
+        try:
+            while not self._stop_event.is_set():
+                started = time.monotonic()
+                if self._leader is None:
+                    self._leader = store.try_leader_lock('materializer')
+                    if self._leader is not None:
+                        logger.info(f"Materializer: leading in process {os.getpid()}")
+                if self._leader is not None:
+                    run_once(self.dates, store)
+                self._stop_event.wait(max(0.0, self.interval - (time.monotonic() - started)))
+        finally:
+            if self._leader is not None:
+                self._leader.close()
+                self._leader = None
+
+    def stop(self):
+        self._stop_event.set()
+
+
+_THREAD = None
+_THREAD_LOCK = threading.Lock()
+
+
+def start_materializer_thread():
+    """Start the in-app materializer once per process (no-op when already running)"""
+    global _THREAD
+    with _THREAD_LOCK:
+        if _THREAD is None or not _THREAD.is_alive():
+            _THREAD = Materializer()
+            _THREAD.start()
+        return _THREAD
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Materialize workflow status snapshots on a schedule')
+    parser.add_argument('--interval', type=float, default=MATERIALIZER_INTERVAL_SECONDS)
+    parser.add_argument('--dates', help='comma separated business dates (default: active business dates)')
+    parser.add_argument('--once', action='store_true', help='materialize once and exit')
+    args = parser.parse_args(argv)
+    dates = [d.strip() for d in args.dates.split(',')] if args.dates else None
+
+    if args.once:
+        run_once(dates)
+        return
+    materializer = Materializer(interval=args.interval, dates=dates)
+    materializer.start()
+    try:
+        while materializer.is_alive():
+            materializer.join(1)
+    except KeyboardInterrupt:
+        materializer.stop()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
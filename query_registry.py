@@ -0,0 +1,121 @@
+import logging
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+from string import Formatter
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# QUERY_SQL_DIR points at another directory of .sql files (e.g. the flat checkout in the tests)
+SQL_DIR = os.getenv('QUERY_SQL_DIR', os.path.join(os.path.dirname(__file__), '../sql'))
+
+# Set QUERY_REGISTRY_HOT_RELOAD=1 to pick up edits to the .sql files without a restart.
+HOT_RELOAD = os.getenv('QUERY_REGISTRY_HOT_RELOAD', '0') == '1'
+HOT_RELOAD_CHECK_SECONDS = 2.0
+
+# Bind parameters each query file is allowed to use
+ATLS_PLACEHOLDERS = {'client', 'region', 'business_date', 'sod_date', 'trigger_type'}
+ADM_PLACEHOLDERS = {'message_ids', 'total_count', 'marker_types', 'service_names'}
+
+# A statement header is a leading comment of the form "-- name" or "-- name (ADM DB)"
+_HEADER_RE = re.compile(r'^--\s*([A-Za-z_][A-Za-z0-9_]*)\s*(\([^)]*\))?\s*$')
+
+# Named bind parameter (":name"), skipping Postgres casts ("::date")
+_BIND_RE = re.compile(r'(?<![:\w]):([A-Za-z_][A-Za-z0-9_]*)')
+
+# clause is a pre-built sqlalchemy text() object so the compiled form is cached across calls
+SqlStatement = namedtuple('SqlStatement', ['name', 'sql', 'placeholders', 'source', 'clause'])
+
+
+def parse_sql_file(content, source, allowed_placeholders):
+    """Split a .sql file on ';' into named statements keyed by their header comment"""
+    statements = {}
+    for chunk in content.split(';'):
+        chunk = chunk.strip()
+        if not chunk:
+            continue
+
+        names = []
+        for line in chunk.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            if not line.startswith('--'):
+                break
+            match = _HEADER_RE.match(line)
+            if match:
+                names.append(match.group(1))
+        if not names:
+            if any(line.strip() and not line.strip().startswith('--') for line in chunk.splitlines()):
+                # e.g. a ';' inside a comment split a statement away from its header
+                logger.warning("%s: skipping SQL without a '-- name' header: %.60r", source, chunk)
+            continue
+
+        templated = [field for _, field, _, _ in Formatter().parse(chunk) if field]
+        if templated:
+            raise ValueError(f"{source}: query {names[-1]} uses str.format placeholders {templated}; use :name binds")
+
+        placeholders = frozenset(_BIND_RE.findall(chunk))
+        unknown = placeholders - allowed_placeholders
+        if unknown:
+            raise ValueError(f"{source}: query {names[-1]} uses unknown placeholders {sorted(unknown)}")
+
+        for name in names:
+            if name in statements:
+                raise ValueError(f"{source}: duplicate query name {name}")
+            statements[name] = SqlStatement(name, chunk, placeholders, source, text(chunk))
+    return statements
+
+
+class QueryRegistry:
+    """Named SQL statements parsed once from a query file, with optional mtime-based reload"""
+
+    def __init__(self, path, allowed_placeholders, hot_reload=HOT_RELOAD):
+        self.path = os.path.normpath(path)
+        self.allowed_placeholders = frozenset(allowed_placeholders)
+        self.hot_reload = hot_reload
+        self._lock = threading.Lock()
+        self._statements = {}
+        self._mtime = None
+        self._last_check = 0.0
+        self.load()
+
+    def load(self):
+        """(Re)read the query file and swap in the parsed statements"""
+        mtime = os.path.getmtime(self.path)
+        with open(self.path, 'r') as f:
+            content = f.read()
+        statements = parse_sql_file(content, os.path.basename(self.path), self.allowed_placeholders)
+        with self._lock:
+            self._statements = statements
+            self._mtime = mtime
+            self._last_check = time.monotonic()
+        logger.info("Loaded %d queries from %s", len(statements), self.path)
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._last_check < HOT_RELOAD_CHECK_SECONDS:
+            return
+        self._last_check = now
+        try:
+            if os.path.getmtime(self.path) != self._mtime:
+                self.load()
+        except Exception as e:
+            # Keep serving the last good statements if the edited file does not parse
+            logger.error(f"Error reloading queries from {self.path}: {str(e)}")
+
+    def get(self, name):
+        """Return the SqlStatement for a query name, or None"""
+        if self.hot_reload:
+            self._maybe_reload()
+        return self._statements.get(name)
+
+    def names(self):
+        return sorted(self._statements)
+
+
+ATLS_QUERIES = QueryRegistry(os.path.join(SQL_DIR, 'atls_queries.sql'), ATLS_PLACEHOLDERS)
+ADM_QUERIES = QueryRegistry(os.path.join(SQL_DIR, 'adm_queries.sql'), ADM_PLACEHOLDERS)
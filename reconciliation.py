@@ -0,0 +1,132 @@
+import json
+import logging
+import os
+import time
+
+from sqlalchemy import text
+from database.session import adm_connection
+from api.lake_counts import start_lake_counts, stats_table, _count, _iso
+
+"""
+reconciliation.py
+
+ADM vs datalake reconciliation for the Datalake Validation pages: message and record counts
+per (original_message_id, subject_area) from both sides, joined through a dict keyed on that
+pair (one pass per side instead of a lake scan per ADM row). The lake side comes from a
+lake_counts job, one (snapshot, subject_area) chunk at a time, so mismatches of a chunk are
+emitted as soon as it is counted, each chunk followed by a progress line, and finally summary
+counts, as newline-delimited JSON.
+
+The stats tables are configurable (RECON_ADM_TABLE / RECON_LAKE_TABLE); both need
+client_cd, processing_region_cd, business_dt, snapshot_type_cd, original_message_id,
+subject_area_cd, record_count and created_at.
+"""
+
+logger = logging.getLogger(__name__)
+
+RECON_ADM_TABLE = os.getenv('RECON_ADM_TABLE', 'message_load_stats')
+RECON_LAKE_TABLE = os.getenv('RECON_LAKE_TABLE', 'message_load_stats')
+RECON_FETCH_SIZE = int(os.getenv('RECON_FETCH_SIZE', 5000))
+RECON_LAKE_TIMEOUT = float(os.getenv('RECON_LAKE_TIMEOUT', 900))
+
+COUNTS_SQL = """
+    SELECT original_message_id,
+           subject_area_cd,
+           MAX(snapshot_type_cd) AS snapshot_type_cd,
+           COUNT(*) AS messages,
+           SUM(record_count) AS records,
+           MIN(created_at) AS started,
+           MAX(created_at) AS completed
+    FROM {table}
+    WHERE client_cd = :client
+      AND processing_region_cd = :region
+      AND business_dt = :business_date
+    GROUP BY original_message_id, subject_area_cd
+"""
+
+
+def counts_clause(table):
+    """text() of the grouped counts query for a stats table (identifier checked, never a bind)"""
+    return text(COUNTS_SQL.format(table=stats_table(table)))
+
+
+def iter_counts(connection_factory, table, params):
+    """Grouped count rows as tuples, streamed through a server-side cursor where the driver has one"""
+    with connection_factory() as conn:
+        result = conn.execution_options(stream_results=True, max_row_buffer=RECON_FETCH_SIZE).execute(
+            counts_clause(table), params)
+        try:
+            for row in result:
+                yield tuple(row)
+        finally:
+            result.close()
+
+
+def _row(status, message_id, subject, snapshot, adm, lake):
+    return {
+        'type': 'mismatch',
+        'status': status,
+        'snapshottypecd': snapshot,
+        'subject_area': subject,
+        'originalMessageId': message_id,
+        'adm_messages': adm[0] if adm else None,
+        'lake_messages': lake[0] if lake else None,
+        'adm_records': adm[1] if adm else None,
+        'lake_records': lake[1] if lake else None,
+        'started': _iso(lake[2]) if lake else None,
+        'completed': _iso(lake[3]) if lake else None,
+    }
+
+
+def reconcile(client, region, business_date, adm_table=None, lake_table=None):
+    """
+    Yield mismatch dicts (status 'count_mismatch', 'missing_in_lake' or 'missing_in_adm'),
+    a {'type': 'progress', ...} dict after every lake chunk and finally one
+    {'type': 'summary', ...} dict. The ADM side is loaded into a dict while the lake chunks
+    are counted, so memory is bounded by the ADM row count.
+    """
+    t0 = time.time()
+    params = {'client': client, 'region': region, 'business_date': business_date}
+    job = start_lake_counts(client, region, business_date, lake_table or RECON_LAKE_TABLE)
+    adm = {}
+    for message_id, subject, snapshot, messages, records, _started, _completed in iter_counts(
+            adm_connection, adm_table or RECON_ADM_TABLE, params):
+        adm[(message_id, subject)] = (snapshot, _count(messages), _count(records))
+
+    summary = {'type': 'summary', 'adm_rows': len(adm), 'lake_rows': 0, 'matched': 0,
+               'count_mismatch': 0, 'missing_in_lake': 0, 'missing_in_adm': 0}
+    for (snapshot, _subject_area), lake in job.iter_completed(RECON_LAKE_TIMEOUT):
+        summary['lake_rows'] += len(lake)
+        for (message_id, subject), lake_counts in lake.items():
+            # matched keys leave the dict: what remains at the end is missing in the lake
+            adm_entry = adm.pop((message_id, subject), None)
+            if adm_entry is None:
+                summary['missing_in_adm'] += 1
+                yield _row('missing_in_adm', message_id, subject, snapshot, None, lake_counts)
+            elif adm_entry[1:] == lake_counts[:2]:
+                summary['matched'] += 1
+            else:
+                summary['count_mismatch'] += 1
+                yield _row('count_mismatch', message_id, subject, adm_entry[0], adm_entry[1:], lake_counts)
+        progress = job.progress()
+        yield {'type': 'progress', 'partitions_total': progress['partitions_total'],
+               'partitions_done': progress['partitions_done'], 'source': progress['source']}
+
+    for (message_id, subject), (snapshot, messages, records) in adm.items():
+        summary['missing_in_lake'] += 1
+        yield _row('missing_in_lake', message_id, subject, snapshot, (messages, records), None)
+
+    summary['lake_source'] = job.source
+    summary['elapsed_seconds'] = round(time.time() - t0, 3)
+    logger.info(f"Reconciliation {client}/{region}/{business_date}: {summary}")
+    yield summary
+
+
+def reconcile_ndjson(client, region, business_date):
+    """reconcile() as newline-delimited JSON lines; a failure ends the stream with an error line"""
+    try:
+        for item in reconcile(client, region, business_date):
+            yield json.dumps(item, default=str) + '\n'
+    except Exception as e:
+        logger.error(f"Reconciliation {client}/{region}/{business_date} failed: {str(e)}")
+        yield json.dumps({'type': 'error', 'message': 'Could not reconcile ADM and datalake counts'}) + '\n'
@@ -0,0 +1,71 @@
+import logging
+from collections import namedtuple
+from collections.abc import Mapping
+
+logger = logging.getLogger(__name__)
+
+# Columns of the combined ADM SQL (markers / final_markers / error_logs / reporting), in select order
+COMBINED_COLUMNS = (
+    'last_updated',
+    'client_cd',
+    'processing_region_cd',
+    'snapshot_type_cd',
+    'marker_type_cd',
+    'subject_area_cd',
+    'original_message_id',
+    'business_dt',
+    'status',
+    'source',
+)
+
+# Every column but last_updated holds a few hundred distinct values repeated across all rows
+# (original_message_id repeats once per subject/stage of a message): stored once per refresh
+INTERNED_COLUMNS = COMBINED_COLUMNS[1:]
+
+# One tuple per row: no per-row dict, attribute access by name, picklable for the cache backends
+CombinedRow = namedtuple('CombinedRow', COMBINED_COLUMNS)
+_new_row = tuple.__new__  # skips the namedtuple argument handling on the per-row path
+
+
+class RowInterner:
+    """
+    Dictionary encoding for the categorical columns: equal values of one refresh share a
+    single object (also dates, which the driver creates anew for every row).
+    """
+
+    def __init__(self):
+        self._values = {}
+
+    def __len__(self):
+        return len(self._values)
+
+    def compact(self, values):
+        """CombinedRow from a sequence of values in COMBINED_COLUMNS order"""
+        rest = values[1:]
+        return _new_row(CombinedRow, (values[0], *map(self._values.setdefault, rest, rest)))
+
+    def compact_mapping(self, row):
+        """CombinedRow from a mapping keyed by column name (missing columns are None)"""
+        return self.compact([row.get(c) for c in COMBINED_COLUMNS])
+
+
+def compact_rows(result, interner=None):
+    """
+    Iterate a SQLAlchemy result of the combined SQL as CombinedRow tuples. Columns are taken by
+    position when the result is in COMBINED_COLUMNS order, else matched by name.
+    """
+    interner = interner or RowInterner()
+    keys = tuple(result.keys())
+    if keys == COMBINED_COLUMNS:
+        for row in result:
+            yield interner.compact(row)
+        return
+    positions = [keys.index(c) if c in keys else None for c in COMBINED_COLUMNS]
+    for row in result:
+        yield interner.compact([row[i] if i is not None else None for i in positions])
+
+
+def as_compact_rows(rows):
+    """Rows from callers that may still hand over dicts: CombinedRow passes through, mappings are converted"""
+    interner = RowInterner()
+    return [interner.compact_mapping(r) if isinstance(r, Mapping) else r for r in rows]
@@ -0,0 +1,95 @@
+from contextlib import contextmanager
+from flask import g, has_app_context
+from database.connectors import get_atls_engine, get_adm_engine, get_lake_engine
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Request-scoped unit of work: inside a Flask request every helper that asks for
+# an ATLS or ADM connection gets the same one, checked out lazily on first use and
+# returned to the pool when the app context tears down. Outside a request (scripts,
+# worker threads without an app context) a pooled connection is used per block.
+#
+# With DB_SNAPSHOT_READS=1 the request connections run in one REPEATABLE READ
+# READ ONLY transaction, so every query of a page sees the same snapshot.
+SNAPSHOT_READS = os.getenv('DB_SNAPSHOT_READS', '0') == '1'
+
+_ENGINE_GETTERS = {
+    'atls': get_atls_engine,
+    'adm': get_adm_engine,
+    'lake': get_lake_engine,
+}
+
+# Snapshot reads use Postgres options; the lake may be Impala or a SQLite stand-in
+_SNAPSHOT_READ_DATABASES = ('atls', 'adm')
+
+
+def _g_key(name):
+    return f'_db_connection_{name}'
+
+
+def _checkout(name):
+    """Check out a pooled connection configured for request-scoped reads"""
+    conn = _ENGINE_GETTERS[name]().connect()
+    if SNAPSHOT_READS and name in _SNAPSHOT_READ_DATABASES:
+        conn = conn.execution_options(isolation_level='REPEATABLE READ', postgresql_readonly=True)
+    return conn
+
+
+def is_read_only(conn):
+    """True when the connection runs in a read-only snapshot (no temp tables)"""
+    return bool(conn.get_execution_options().get('postgresql_readonly'))
+
+
+@contextmanager
+def _connection(name):
+    if not has_app_context():
+        with _ENGINE_GETTERS[name]().connect() as conn:
+            yield conn
+        return
+
+    key = _g_key(name)
+    conn = g.get(key)
+    if conn is None:
+        conn = _checkout(name)
+        setattr(g, key, conn)
+
+    try:
+        yield conn
+    except Exception:
+        # A failed statement aborts the Postgres transaction; roll back so the
+        # helpers that run after this one in the same request can still query
+        try:
+            conn.rollback()
+        except Exception as e:
+            logger.error(f"Error rolling back {name} request connection: {str(e)}")
+        raise
+
+
+def atls_connection():
+    """Request-scoped ATLS connection (context manager)"""
+    return _connection('atls')
+
+
+def adm_connection():
+    """Request-scoped ADM connection (context manager)"""
+    return _connection('adm')
+
+
+def lake_connection():
+    """Request-scoped datalake connection (context manager)"""
+    return _connection('lake')
+
+
+def close_request_connections(exc=None):
+    """Flask teardown_appcontext handler: return the request connections to the pool"""
+    for name in _ENGINE_GETTERS:
+        conn = g.pop(_g_key(name), None)
+        if conn is None:
+            continue
+        try:
+            # Nothing here writes, so end the transaction without committing
+            conn.close()
+        except Exception as e:
+            logger.error(f"Error closing {name} request connection: {str(e)}")
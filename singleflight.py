@@ -0,0 +1,87 @@
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# How long a caller waits for an identical in-flight computation before giving up
+SINGLE_FLIGHT_WAIT_TIMEOUT = float(os.getenv('SINGLE_FLIGHT_WAIT_TIMEOUT', 30))
+
+
+class SingleFlightTimeout(TimeoutError):
+    """Raised to a caller whose wait for the in-flight computation timed out"""
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical computations within a process.
+
+    The first caller for a key runs fn; callers arriving while it runs wait for it and
+    receive the same result (or exception). The key is released as soon as the computation
+    finishes, so the next refresh computes again. Results are shared between callers and
+    must be treated as read-only.
+    """
+
+    def __init__(self, name, wait_timeout=None):
+        self.name = name
+        self.wait_timeout = SINGLE_FLIGHT_WAIT_TIMEOUT if wait_timeout is None else wait_timeout
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executions = 0
+        self.coalesced = 0
+        self.timeouts = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+
+        if leader:
+            try:
+                call.result = fn(*args, **kwargs)
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+                call.done.set()
+                if call.waiters:
+                    logger.debug("%s %s: shared result with %d waiting callers", self.name, key, call.waiters)
+            return call.result
+
+        if not call.done.wait(self.wait_timeout):
+            with self._lock:
+                self.timeouts += 1
+            raise SingleFlightTimeout(f"{self.name} {key}: still computing after {self.wait_timeout}s")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            return {
+                'name': self.name,
+                'in_flight': len(self._calls),
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'timeouts': self.timeouts,
+                'wait_timeout': self.wait_timeout,
+            }
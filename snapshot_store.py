@@ -0,0 +1,141 @@
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # optional: without it writers and the materializer must be a single process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Materialized status snapshots, one file per business date, shared by the materializer process
+# (or thread) and every app worker on the host
+STATUS_SNAPSHOT_DIR = os.getenv('STATUS_SNAPSHOT_DIR', os.path.join(tempfile.gettempdir(), 'cronet-status'))
+PICKLE_PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+
+class SnapshotStore:
+    """
+    Latest status snapshot per business date with a version number that grows by one on every
+    write. Files are replaced atomically, so readers never see a partial write; a reader keeps
+    the last record it loaded and only unpickles again when the file changed. Writers of a date
+    hold an flock on its .lock file, so writers in several processes never reuse a version.
+    prefix names the files, so other snapshots (e.g. lake counts) can share the format.
+    """
+
+    def __init__(self, directory=None, prefix='status'):
+        self.directory = directory or STATUS_SNAPSHOT_DIR
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._loaded = {}  # business_date -> (mtime_ns, size, record)
+
+    def path(self, business_date):
+        return os.path.join(self.directory, f'{self.prefix}_{business_date}.pickle')
+
+    def read(self, business_date):
+        """{'version', 'business_date', 'materialized_at', 'snapshot'} or None"""
+        path = self.path(business_date)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            loaded = self._loaded.get(business_date)
+            if loaded and loaded[0] == stat.st_mtime_ns and loaded[1] == stat.st_size:
+                return loaded[2]
+        try:
+            with open(path, 'rb') as f:
+                record = pickle.load(f)
+        except Exception:
+            logger.exception("Unreadable status snapshot %s", path)
+            return None
+        with self._lock:
+            self._loaded[business_date] = (stat.st_mtime_ns, stat.st_size, record)
+        return record
+
+    @contextmanager
+    def _locked(self, business_date):
+        """Exclusive flock across processes on the date's lock file (the thread lock without fcntl)"""
+        if fcntl is None:
+            with self._lock:
+                yield
+            return
+        with open(self.path(business_date) + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def write(self, business_date, snapshot):
+        """Store snapshot as the next version of business_date; returns the record"""
+        os.makedirs(self.directory, exist_ok=True)
+        with self._locked(business_date):
+            # another process may have written since this one loaded the file
+            with self._lock:
+                self._loaded.pop(business_date, None)
+            previous = self.read(business_date)
+            record = {
+                'version': (previous['version'] if previous else 0) + 1,
+                'business_date': business_date,
+                'materialized_at': datetime.now(),
+                'snapshot': snapshot,
+            }
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f'.{self.prefix}_')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(record, f, protocol=PICKLE_PROTOCOL)
+                os.replace(tmp_path, self.path(business_date))
+            except Exception:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+        return record
+
+    def try_leader_lock(self, name):
+        """
+        The open lock file of name once this process holds its flock, else None (another process
+        does). The lock lasts while the file stays open, and ends with the process. Without fcntl
+        every caller is the leader.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        lock_file = open(os.path.join(self.directory, f'{self.prefix}_{name}.lock'), 'a')
+        if fcntl is None:
+            return lock_file
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return None
+        return lock_file
+
+    def info(self):
+        """Version and materialization time of every stored business date"""
+        try:
+            names = sorted(os.listdir(self.directory))
+        except FileNotFoundError:
+            return []
+        result = []
+        head = f'{self.prefix}_'
+        for name in names:
+            if name.startswith(head) and name.endswith('.pickle'):
+                record = self.read(name[len(head):-len('.pickle')])
+                if record:
+                    result.append({k: record[k] for k in ('business_date', 'version', 'materialized_at')})
+        return result
+
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_snapshot_store():
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = SnapshotStore()
+        return _STORE
@@ -0,0 +1,104 @@
+import logging
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+# Every pipeline is a strict chain: ARS signoff -> ATLS events -> ATLS markers -> ADM stages.
+# Listed in WORKFLOW_ORDER order; eodpx (ADM pricing snapshot) has no ATLS stages of its own.
+WORKFLOW_CHAINS = (
+    ('trading_ars',),
+    ('pricing_ars', 'pricing_marker', 'pricing_raw', 'pricing_enrich', 'pricing_roll', 'pricing_mart'),
+    ('eodpx_raw', 'eodpx_enrich', 'eodpx_roll', 'eodpx_mart', 'eodpx_final'),
+    ('eod_ars', 'eod', 'eod_marker', 'eod_raw', 'eod_enrich', 'eod_roll', 'eod_mart', 'eod_final'),
+    ('asof_events', 'asof_marker', 'aod', 'aod_marker',
+     'aod_raw', 'aod_enrich', 'aod_roll', 'aod_mart', 'aod_final'),
+    ('sod_ars', 'sod', 'sod_marker', 'sod_raw', 'sod_enrich', 'sod_roll', 'sod_mart', 'sod_final'),
+)
+
+
+def is_started(workflow):
+    """A stage has started once it is past pending or has any activity (a pending stage that is
+    already waiting on its own work carries last_updated or a long-running status)"""
+    if workflow is None:
+        return False
+    return (workflow.get('status') != 'pending'
+            or workflow.get('status_with_long_running') not in (None, 'pending')
+            or workflow.get('last_updated') is not None)
+
+
+class StageDag:
+    """Workflow-type dependency graph: a stage can only start after its parents have started"""
+
+    def __init__(self, edges, nodes=()):
+        self.parents = {}
+        self.children = defaultdict(list)
+        for node in nodes:
+            self.parents.setdefault(node, [])
+        for parent, child in edges:
+            self.parents.setdefault(parent, [])
+            self.parents.setdefault(child, []).append(parent)
+            self.children[parent].append(child)
+        self.nodes = list(self.parents)
+        self._rank = {node: i for i, node in enumerate(self._topological())}
+
+    @classmethod
+    def from_chains(cls, chains):
+        edges = [(a, b) for chain in chains for a, b in zip(chain, chain[1:])]
+        return cls(edges, nodes=[node for chain in chains for node in chain])
+
+    def _topological(self):
+        indegree = {node: len(self.parents[node]) for node in self.nodes}
+        ready = [node for node in self.nodes if not indegree[node]]
+        order = []
+        while ready:
+            node = ready.pop(0)
+            order.append(node)
+            for child in self.children[node]:
+                indegree[child] -= 1
+                if not indegree[child]:
+                    ready.append(child)
+        if len(order) != len(self.nodes):
+            raise ValueError("workflow dependencies contain a cycle")
+        return order
+
+    def order(self, nodes):
+        """nodes sorted so every stage comes after its ancestors (unknown nodes last)"""
+        return sorted(nodes, key=lambda node: self._rank.get(node, len(self._rank)))
+
+    def blocked_by(self, node, statuses, failed_blocks=False, unstarted_blocks=True):
+        """
+        The first parent of node (among statuses) that has not started, else None. With
+        failed_blocks a failed parent also holds the stage back (it cannot run, although the
+        parent did start); without unstarted_blocks only a failed parent does.
+        """
+        for parent in self.parents.get(node, ()):
+            if parent not in statuses:
+                continue
+            if ((unstarted_blocks and not is_started(statuses[parent]))
+                    or (failed_blocks and statuses[parent].get('status') == 'failed')):
+                return parent
+        return None
+
+    def flag_anomalies(self, workflows):
+        """
+        Workflows (list of dicts of one client/region) with every stage that started before a
+        parent did replaced by a flagged copy (see mark_anomaly); the input dicts are not changed.
+        Returns (workflows, flagged copies).
+        """
+        statuses = {w['workflow_type']: w for w in workflows}
+        flagged = {}
+        for node in self.order(statuses):
+            parent = self.blocked_by(node, statuses)
+            if parent is not None and is_started(statuses[node]):
+                flagged[node] = mark_anomaly(statuses[node], parent)
+        if not flagged:
+            return workflows, []
+        return [flagged.get(w['workflow_type'], w) for w in workflows], list(flagged.values())
+
+
+def mark_anomaly(workflow, parent):
+    """Copy of a workflow that shows activity while its upstream stage has not started, flagged"""
+    return dict(workflow, anomaly='out_of_order', blocked_by=parent)
+
+
+WORKFLOW_DAG = StageDag.from_chains(WORKFLOW_CHAINS)
@@ -0,0 +1,122 @@
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+"""
+status_deltas.py
+
+Change tracking for /api/batch_status?since=<token>. For each business date the last served
+status of every (client, region, workflow_type) is kept with the version at which it last
+changed; a new snapshot bumps the version once if any status, status_with_long_running or
+last_updated differs. A poll with a token then gets only the rows changed after it.
+
+Tokens are "<generation>.<version>". The generation is random per log, so a token issued by
+another worker process, or by a log that was evicted, no longer matches and the caller gets
+the full payload once.
+"""
+
+logger = logging.getLogger(__name__)
+
+STATUS_DELTA_DATES = int(os.getenv('STATUS_DELTA_DATES', 8))  # business dates tracked per process
+
+
+def row_key(row):
+    return (row['client_cd'], row['processing_region_cd'], row['workflow_type'])
+
+
+def row_fingerprint(row):
+    return (row.get('status'), row.get('status_with_long_running'), row.get('last_updated'))
+
+
+class StatusDeltaLog:
+    """Versioned (fingerprint, row) per workflow of one business date"""
+
+    def __init__(self, business_date):
+        self.business_date = business_date
+        self.generation = uuid.uuid4().hex[:12]
+        self.version = 0
+        self.computed_at = None
+        self._rows = {}  # key -> (fingerprint, row, version changed at)
+        self._removed = {}  # key -> version removed at
+        self._lock = threading.Lock()
+
+    @property
+    def token(self):
+        return f'{self.generation}.{self.version}'
+
+    def observe(self, snapshot):
+        """Diff a complete snapshot newer than the last one against the stored rows"""
+        with self._lock:
+            if self.computed_at is not None and snapshot['computed_at'] <= self.computed_at:
+                return
+            version = self.version + 1
+            rows = {}  # rebuilt in snapshot order, so a full payload keeps the snapshot sort
+            changed = 0
+            for row in snapshot['workflows']:
+                key = row_key(row)
+                fingerprint = row_fingerprint(row)
+                previous = self._rows.get(key)
+                if previous is not None and previous[0] == fingerprint:
+                    rows[key] = (fingerprint, row, previous[2])
+                    continue
+                rows[key] = (fingerprint, row, version)
+                self._removed.pop(key, None)
+                changed += 1
+            for key in self._rows.keys() - rows.keys():
+                self._removed[key] = version
+                changed += 1
+            self._rows = rows
+            self.computed_at = snapshot['computed_at']
+            if changed:
+                self.version = version
+                logger.info(f"Status delta {self.business_date}: version {version}, {changed} rows changed")
+
+    def delta(self, token=None):
+        """
+        {'full', 'data', 'removed', 'token'}: the rows changed after token, or every row when
+        the token is missing or not from this log. Read under one lock, so the returned token
+        always matches the returned rows.
+        """
+        generation, _, version = (token or '').partition('.')
+        with self._lock:
+            if generation != self.generation or not version.isdigit() or int(version) > self.version:
+                return {'full': True, 'data': [row for _fingerprint, row, _changed_at in self._rows.values()],
+                        'removed': [], 'token': self.token}
+            version = int(version)
+            return {
+                'full': False,
+                'data': [row for _fingerprint, row, changed_at in self._rows.values() if changed_at > version],
+                'removed': [list(key) for key, removed_at in self._removed.items() if removed_at > version],
+                'token': self.token,
+            }
+
+
+_LOGS = OrderedDict()  # business_date -> StatusDeltaLog, least recently used first
+_LOGS_LOCK = threading.Lock()
+
+
+def get_delta_log(business_date):
+    with _LOGS_LOCK:
+        log = _LOGS.get(business_date)
+        if log is None:
+            log = _LOGS[business_date] = StatusDeltaLog(business_date)
+            while len(_LOGS) > STATUS_DELTA_DATES:
+                _LOGS.popitem(last=False)
+        else:
+            _LOGS.move_to_end(business_date)
+        return log
+
+
+def status_delta(snapshot, token=None):
+    """
+    Response fields of a snapshot polled with token (see StatusDeltaLog.delta). Partial
+    snapshots are sent in full without a token and are not recorded, so pending placeholders
+    of a failed section never show up as changes.
+    """
+    if snapshot['partial_sections']:
+        return {'full': True, 'data': snapshot['workflows'], 'removed': [], 'token': None}
+    log = get_delta_log(snapshot['business_date'])
+    log.observe(snapshot)
+    return log.delta(token)
@@ -0,0 +1,413 @@
+import logging
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from sqlalchemy import text
+from database.session import adm_connection, atls_connection
+from api.adm_api import MessageIdSet, PRICING_STAGES, aggregate_stage_statuses, get_batch_stage_statuses
+from api.atls_api import get_batch_workflow_statuses
+from api.cache_backends import get_cache_backend
+from api.Newadmapi import (WORKFLOW_ORDER, _norm_client, _norm_region, calculate_sod_date,
+                           get_all_reporting_loaders_status, get_combined_workflow_status)
+from api.singleflight import SingleFlight
+from api.snapshot_store import get_snapshot_store
+from api.stage_dag import WORKFLOW_DAG
+from api.workflow_eval import ENABLE_ADM_FALLBACK_WHEN_ATLS_EMPTY
+
+"""
+status_engine.py
+
+One place that assembles workflow statuses for /api/batch_status, /details and
+/api/pricing_workflows:
+- ATLS stages from the set-based ATLS pass (get_batch_workflow_statuses)
+- EOD/AOD/SOD ADM stages from the combined-SQL engine in Newadmapi (one fetch for all pairs)
+- pricing ADM stages from one batched stage query over every pricing message id
+- reporting loaders from the combined rows that fetch left in its cache
+A snapshot is computed once per (business_date, scope) and cached; scope is None for all
+clients or a (client, region) pair. A pair is answered from a cached all-clients snapshot
+when there is one, so the details page reuses the dashboard computation.
+All-clients snapshots written by the materializer (materializer.py) are served first while
+younger than STATUS_SNAPSHOT_MAX_AGE_SECONDS; on-demand computation is the fallback.
+"""
+
+logger = logging.getLogger(__name__)
+
+STATUS_CACHE_TTL_SECONDS = int(os.getenv('STATUS_CACHE_TTL_SECONDS', 20))
+STATUS_SECTION_TIMEOUT = float(os.getenv('STATUS_SECTION_TIMEOUT', 30))
+STATUS_MAX_WORKERS = int(os.getenv('STATUS_MAX_WORKERS', 4))
+# Materialized snapshots older than this are ignored and the status is computed on request
+STATUS_SNAPSHOT_MAX_AGE_SECONDS = float(os.getenv('STATUS_SNAPSHOT_MAX_AGE_SECONDS', 300))
+# long_running is derived from NOW(), so status ETags also roll over every bucket
+STATUS_ETAG_BUCKET_SECONDS = int(os.getenv('STATUS_ETAG_BUCKET_SECONDS', 60))
+
+# Standard workflow types (ATLS workflows only)
+STANDARD_WORKFLOWS = [
+    'trading_ars', 'pricing_ars', 'pricing_marker',
+    'eod_ars', 'eod', 'eod_marker',
+    'asof_events', 'asof_marker', 'aod', 'aod_marker',
+    'sod_ars', 'sod', 'sod_marker'
+]
+
+# ADM workflow types shown per snapshot. Pricing comes from the per-stage pricing definitions in
+# adm_api; the combined engine's eodpx_* buckets match on subject only and are not shown.
+ADM_WORKFLOW_TYPES = {
+    'EOD': ['eod_raw', 'eod_enrich', 'eod_roll', 'eod_mart', 'eod_final'],
+    'AOD': ['aod_raw', 'aod_enrich', 'aod_roll', 'aod_mart', 'aod_final'],
+    'SOD': ['sod_raw', 'sod_enrich', 'sod_roll', 'sod_mart', 'sod_final'],
+}
+COMBINED_WORKFLOW_TYPES = frozenset(wt for types in ADM_WORKFLOW_TYPES.values() for wt in types)
+
+_SNAPSHOT_CACHE = get_cache_backend('status_snapshots', default_ttl=STATUS_CACHE_TTL_SECONDS)
+_SNAPSHOT_FLIGHTS = SingleFlight('status_snapshot')
+_SECTION_EXECUTOR = ThreadPoolExecutor(max_workers=STATUS_MAX_WORKERS, thread_name_prefix='status-engine')
+
+CLIENTS_REGIONS_QUERY = text("""
+    SELECT DISTINCT client_cd, processing_region_cd
+    FROM (
+        SELECT client_cd, processing_region_cd FROM ars_events
+        UNION
+        SELECT client_cd, processing_region_cd FROM pricing_events
+        UNION
+        SELECT client_cd, processing_region_cd FROM accounting_events
+    ) AS combined
+    ORDER BY client_cd, processing_region_cd
+""")
+
+# Newest row behind the statuses of a business date, for conditional GETs
+ATLS_WATERMARK_QUERY = text("""
+    SELECT GREATEST(
+        (SELECT MAX(created_at) FROM ars_events WHERE business_dt IN (:business_date, :sod_date)),
+        (SELECT MAX(created_at) FROM pricing_events WHERE business_dt IN (:business_date, :sod_date)),
+        (SELECT MAX(created_at) FROM accounting_events WHERE business_dt IN (:business_date, :sod_date)),
+        (SELECT MAX(created_at) FROM as_of_events WHERE business_dt IN (:business_date, :sod_date))
+    ) AS watermark
+""")
+
+# The ADM rows the statuses of a business date read: markers, final markers and reporting
+# rows of the dates, error logs of those markers' messages, and every row of the date's
+# pricing message ids (the pricing stages read by id, whatever the row's date)
+ADM_WATERMARK_QUERY = text("""
+    SELECT GREATEST(
+        (SELECT MAX(created_at) FROM markers
+          WHERE business_dt IN (:business_date, :sod_date) OR original_message_id = ANY(:message_ids)),
+        (SELECT MAX(created_at) FROM final_markers
+          WHERE CAST(marker->'payload'->>'business_date' AS date) IN (:business_date, :sod_date)
+             OR original_message_id = ANY(:message_ids)),
+        (SELECT MAX(created_at) FROM error_logs
+          WHERE original_message_id IN (SELECT original_message_id FROM markers
+                                         WHERE business_dt IN (:business_date, :sod_date))
+             OR original_message_id = ANY(:message_ids)),
+        (SELECT MAX(created_at) FROM reporting_loaders_markers WHERE business_dt IN (:business_date, :sod_date))
+    ) AS watermark
+""")
+
+
+def sort_workflows(workflows):
+    """Sort workflows according to the defined order"""
+    return sorted(workflows, key=lambda x: WORKFLOW_ORDER.get(x['workflow_type'], 999))
+
+
+def pending_workflows(client, region, business_date, workflow_types):
+    """Placeholder rows for workflows whose status is not available"""
+    return [{
+        "client_cd": client,
+        "processing_region_cd": region,
+        "workflow_type": workflow_type,
+        "status": "pending",
+        "status_with_long_running": "pending",
+        "last_updated": None,
+        "business_dt": business_date
+    } for workflow_type in workflow_types]
+
+
+def get_clients_regions():
+    """Every client/region found in ATLS, as (client, region) tuples"""
+    try:
+        with atls_connection() as conn:
+            return [tuple(row) for row in conn.execute(CLIENTS_REGIONS_QUERY).fetchall()]
+    except Exception as e:
+        logger.error(f"Error getting client/regions: {str(e)}")
+        return []
+
+
+def get_pricing_message_ids(business_date, client=None, region=None):
+    """{(client, region): [pricing message ids in ATLS order]} for the business date, in one query"""
+    query = """
+        SELECT client_cd, processing_region_cd, original_message_id
+        FROM pricing_events
+        WHERE business_dt = :business_date
+    """
+    params = {'business_date': business_date}
+    if client is not None:
+        query += " AND client_cd = :client AND processing_region_cd = :region"
+        params.update(client=client, region=region)
+    ids_by_pair = defaultdict(list)
+    with atls_connection() as conn:
+        for pair_client, pair_region, message_id in conn.execute(text(query), params):
+            ids_by_pair[(pair_client, pair_region)].append(message_id)
+    return ids_by_pair
+
+
+def get_pricing_statuses(business_date, pairs):
+    """
+    Pricing ADM stages for many pairs from one batched stage query.
+    Returns ({pair: stage rows rolled up over the pair's ids}, {pair: per message id stage rows}).
+    """
+    client, region = pairs[0] if len(pairs) == 1 else (None, None)
+    ids_by_pair = get_pricing_message_ids(business_date, client, region)
+    all_ids = [message_id for pair in pairs for message_id in ids_by_pair.get(pair, ())]
+    per_id = get_batch_stage_statuses(all_ids, PRICING_STAGES)['per_id'] if all_ids else {}
+
+    aggregate, by_id = {}, {}
+    for pair in pairs:
+        pair_fields = {'client_cd': pair[0], 'processing_region_cd': pair[1], 'business_dt': business_date}
+        message_ids = ids_by_pair.get(pair)
+        if not message_ids:
+            aggregate[pair] = pending_workflows(pair[0], pair[1], business_date, PRICING_STAGES)
+            by_id[pair] = []
+            continue
+        aggregate[pair] = [dict(workflow, **pair_fields)
+                           for workflow in aggregate_stage_statuses(per_id, message_ids, PRICING_STAGES)]
+        by_id[pair] = [dict(workflow, **pair_fields)
+                       for message_id in message_ids for workflow in per_id.get(str(message_id), [])]
+    return aggregate, by_id
+
+
+def get_adm_statuses(business_date, pairs):
+    """{pair: [EOD/AOD/SOD workflow rows]} from the combined-SQL engine, keyed by the caller's pairs"""
+    by_norm = {(_norm_client(c), _norm_region(r)): (c, r) for c, r in pairs}
+    statuses = defaultdict(list)
+    for workflow in get_combined_workflow_status(pairs, business_date):
+        pair = by_norm.get((workflow['client_cd'], workflow['processing_region_cd']))
+        if pair is None or workflow['workflow_type'] not in COMBINED_WORKFLOW_TYPES:
+            continue
+        statuses[pair].append(dict(workflow, client_cd=pair[0], processing_region_cd=pair[1]))
+    return statuses
+
+
+def _unblocked(pairs, atls_by_pair, workflow_types):
+    """
+    Pairs where some of workflow_types is not held back by its ATLS parent (WORKFLOW_DAG). A failed
+    parent holds it back; one that has not started only without ENABLE_ADM_FALLBACK_WHEN_ATLS_EMPTY,
+    as the fallback evaluates exactly the pairs without ATLS rows from their ADM markers.
+    """
+    return [pair for pair in pairs
+            if any(WORKFLOW_DAG.blocked_by(wt, atls_by_pair[pair], failed_blocks=True,
+                                           unstarted_blocks=not ENABLE_ADM_FALLBACK_WHEN_ATLS_EMPTY) is None
+                   for wt in workflow_types)]
+
+
+def _section(name, future, partial_sections, default):
+    try:
+        return future.result(timeout=STATUS_SECTION_TIMEOUT)
+    except Exception as e:
+        # A timed-out section keeps running in its worker; its result is simply dropped
+        future.cancel()
+        logger.error(f"{name} did not complete: {type(e).__name__} {str(e)}")
+        partial_sections.append(name)
+        return default
+
+
+def compute_snapshot(business_date, scope=None):
+    """
+    Statuses of every workflow for the pairs in scope (None: every client/region in ATLS).
+    ADM sections only run for pairs whose upstream ATLS stage is not held back (see _unblocked);
+    the others are pending without a query. Sections that fail or time out are pending and listed
+    in partial_sections; when the ATLS pass fails ('atls') nothing is held back.
+    """
+    t0 = time.time()
+    sod_date = calculate_sod_date(business_date)
+    pairs = [scope] if scope is not None else get_clients_regions()
+    partial_sections = []
+
+    # ATLS workflow statuses for every pair in one set-based pass
+    try:
+        atls_statuses = get_batch_workflow_statuses(business_date, pairs, raise_errors=True)
+    except Exception as e:
+        logger.error(f"Error getting batch ATLS workflow statuses: {str(e)}")
+        atls_statuses = {}
+        partial_sections.append('atls')
+    atls_by_pair = {
+        (client, region): {wt: atls_statuses[(client, region, wt)]
+                           for wt in STANDARD_WORKFLOWS if (client, region, wt) in atls_statuses}
+        for client, region in pairs
+    }
+
+    # A pair whose ATLS parents of eod_raw, aod_raw and sod_raw (the marker stages) are all held
+    # back is pending without a query. Without ATLS statuses every stage would look not started,
+    # so an ATLS failure fetches every pair instead.
+    if 'atls' in partial_sections:
+        adm_pairs = pricing_pairs = pairs
+    else:
+        adm_pairs = _unblocked(pairs, atls_by_pair, ['eod_raw', 'aod_raw', 'sod_raw'])
+        pricing_pairs = _unblocked(pairs, atls_by_pair, ['pricing_raw'])
+    adm_statuses, pricing, pricing_by_id = {}, {}, {}
+    adm_future = pricing_future = None
+    if adm_pairs:
+        adm_future = _SECTION_EXECUTOR.submit(get_adm_statuses, business_date, adm_pairs)
+    if pricing_pairs:
+        pricing_future = _SECTION_EXECUTOR.submit(get_pricing_statuses, business_date, pricing_pairs)
+    if adm_future:
+        adm_statuses = _section('adm', adm_future, partial_sections, {})
+    if pricing_future:
+        pricing, pricing_by_id = _section('pricing', pricing_future, partial_sections, ({}, {}))
+
+    workflows = []
+    anomalies = 0
+    for client, region in pairs:
+        pair = (client, region)
+        pair_workflows = [atls_by_pair[pair].get(wt) or pending_workflows(client, region, business_date, [wt])[0]
+                          for wt in STANDARD_WORKFLOWS]
+        pair_workflows.extend(pricing.get(pair) or pending_workflows(client, region, business_date, PRICING_STAGES))
+        found = {w['workflow_type'] for w in adm_statuses.get(pair, ())}
+        pair_workflows.extend(adm_statuses.get(pair, ()))
+        for snapshot_type, types in ADM_WORKFLOW_TYPES.items():
+            query_date = sod_date if snapshot_type == 'SOD' else business_date
+            missing = [wt for wt in types if wt not in found]
+            pair_workflows.extend(pending_workflows(client, region, query_date, missing))
+        pair_workflows, pair_anomalies = WORKFLOW_DAG.flag_anomalies(pair_workflows)
+        for anomaly in pair_anomalies:
+            anomalies += 1
+            logger.warning(f"Out-of-order stage for {client}/{region}: {anomaly['workflow_type']} "
+                           f"is {anomaly['status']} before {anomaly['blocked_by']} started")
+        workflows.extend(pair_workflows)
+
+    logger.info(f"Status snapshot {business_date} scope={scope}: {len(pairs)} client/regions, "
+                f"{len(workflows)} workflows, ADM pairs={len(adm_pairs)} pricing pairs={len(pricing_pairs)} "
+                f"anomalies={anomalies} partial={partial_sections} in {time.time() - t0:.2f}s")
+    return {
+        'business_date': business_date,
+        'sod_date': sod_date,
+        'scope': scope,
+        'pairs': pairs,
+        'computed_at': datetime.now(),
+        'workflows': sort_workflows(workflows),
+        'pricing_by_id': pricing_by_id,
+        'partial_sections': partial_sections,
+    }
+
+
+def _compute_and_cache(key, business_date, scope):
+    # A flight that finished just before this one started may already have filled the cache
+    snapshot = _SNAPSHOT_CACHE.get(key)
+    if snapshot is not None:
+        return snapshot
+    snapshot = compute_snapshot(business_date, scope)
+    if not snapshot['partial_sections']:
+        # partial snapshots are served to their callers but not reused
+        _SNAPSHOT_CACHE.set(key, snapshot)
+    return snapshot
+
+
+def get_materialized_snapshot(business_date):
+    """Latest materialized all-clients snapshot of business_date, or None if missing or too old"""
+    record = get_snapshot_store().read(business_date)
+    if record is None:
+        return None
+    if (datetime.now() - record['materialized_at']).total_seconds() > STATUS_SNAPSHOT_MAX_AGE_SECONDS:
+        return None
+    return dict(record['snapshot'], version=record['version'])
+
+
+def get_snapshot(business_date, scope=None):
+    """
+    Snapshot of (business_date, scope): the materialized one for all clients when fresh enough,
+    else cached or computed on demand (concurrent misses share one computation)
+    """
+    if scope is None:
+        snapshot = get_materialized_snapshot(business_date)
+        if snapshot is not None:
+            return snapshot
+    key = ('status_snapshot', business_date, scope)
+    snapshot = _SNAPSHOT_CACHE.get(key)
+    if snapshot is not None:
+        return snapshot
+    return _SNAPSHOT_FLIGHTS.do(key, _compute_and_cache, key, business_date, scope)
+
+
+def get_pair_snapshot(business_date, client, region):
+    """Snapshot of one client/region, cut from the cached all-clients snapshot when there is one"""
+    pair = (client, region)
+    snapshot = get_materialized_snapshot(business_date) or _SNAPSHOT_CACHE.get(('status_snapshot', business_date, None))
+    if snapshot is not None and pair in snapshot['pairs']:
+        return dict(
+            snapshot,
+            scope=pair,
+            pairs=[pair],
+            workflows=[w for w in snapshot['workflows']
+                       if w['client_cd'] == client and w['processing_region_cd'] == region],
+            pricing_by_id={pair: snapshot['pricing_by_id'].get(pair, [])},
+        )
+    return get_snapshot(business_date, pair)
+
+
+def get_batch_status(business_date):
+    """All workflow statuses for every client/region on a business date (shared, read-only result)"""
+    return get_snapshot(business_date)['workflows']
+
+
+def snapshot_freshness(snapshot, now=None):
+    """When the statuses of a snapshot were computed, how long ago, and its materialized version"""
+    now = now or datetime.now()
+    return {
+        'as_of': snapshot['computed_at'].isoformat(),
+        'staleness_seconds': round((now - snapshot['computed_at']).total_seconds(), 1),
+        'version': snapshot.get('version'),
+    }
+
+
+def get_details(client, region, business_date):
+    """Workflows, reporting loaders, incomplete section names and snapshot freshness for the details page"""
+    snapshot = get_pair_snapshot(business_date, client, region)
+    partial_sections = list(snapshot['partial_sections'])
+    try:
+        # Reuses the combined rows the snapshot's ADM fetch cached for the pair
+        reporting_loaders = get_all_reporting_loaders_status(client, region, business_date)
+    except Exception as e:
+        logger.error(f"Error getting reporting loaders status: {str(e)}")
+        reporting_loaders = {}
+        partial_sections.append('loaders')
+    return snapshot['workflows'], reporting_loaders, partial_sections, snapshot_freshness(snapshot)
+
+
+def get_pricing_workflows(client, region, business_date):
+    """Pricing ADM stages of every pricing message id of one client/region, and the snapshot they came from"""
+    snapshot = get_pair_snapshot(business_date, client, region)
+    return sort_workflows(snapshot['pricing_by_id'].get((client, region), [])), snapshot
+
+
+def get_status_watermark(business_date):
+    """
+    (ATLS, ADM) newest created_at behind the statuses of business_date: MAX lookups scoped
+    to the date and its pricing ids, cheap enough to answer a conditional GET before any
+    status is computed; writes for other dates leave it unchanged
+    """
+    params = {'business_date': business_date, 'sod_date': calculate_sod_date(business_date)}
+    with atls_connection() as conn:
+        atls = conn.execute(ATLS_WATERMARK_QUERY, params).scalar()
+    pricing_ids = [message_id for ids in get_pricing_message_ids(business_date).values() for message_id in ids]
+    with adm_connection() as conn:
+        adm = MessageIdSet(conn, pricing_ids).execute(ADM_WATERMARK_QUERY, params).scalar()
+    return atls, adm
+
+
+def status_time_bucket(now=None):
+    return int((time.time() if now is None else now) // STATUS_ETAG_BUCKET_SECONDS)
+
+
+def _local_naive(value):
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo else value
+
+
+def snapshot_covers(snapshot, watermark):
+    """True when the snapshot was computed after every row of the watermark was written"""
+    newest = [_local_naive(ts) for ts in watermark if ts is not None]
+    return not newest or snapshot['computed_at'] >= max(newest)
+
+
+def get_status_cache_info():
+    """Snapshot cache counters and coalescing stats"""
+    return {'cache': _SNAPSHOT_CACHE.info(), 'flights': _SNAPSHOT_FLIGHTS.stats()}
@@ -0,0 +1,254 @@
+import json
+import logging
+import os
+import re
+import select
+import threading
+import time
+
+from sqlalchemy.exc import DBAPIError
+
+from database.connectors import get_atls_engine
+from api.status_engine import compute_snapshot, get_snapshot
+from api.status_deltas import get_delta_log
+
+try:
+    import psycopg
+except ImportError:  # optional: only needed to LISTEN with the psycopg driver
+    psycopg = None
+
+"""
+status_stream.py
+
+Server-Sent Events for /api/batch_status/stream. One broadcaster thread per business date
+with subscribers computes the statuses for all of them and diffs each snapshot through the
+status_deltas log; every subscriber then only serializes the rows changed after the token it
+last saw. Event ids are delta tokens, so a reconnecting EventSource (Last-Event-ID) resumes
+with just the changes it missed, or a full snapshot if the token is from another process.
+
+    event: snapshot   id: <token>   data: {"token", "data": [every workflow]}
+    event: workflow                 data: one changed workflow row
+    event: version    id: <token>   data: {"token", "removed": [[client, region, workflow_type]]}
+
+The workflow events of a change are followed by its version event; a client that drops in
+between resumes from the previous id and gets them again. A comment line is sent as a
+heartbeat when nothing changed for STATUS_STREAM_HEARTBEAT_SECONDS.
+
+Broadcasters re-read the (materialized or cached) snapshot every STATUS_STREAM_POLL_SECONDS,
+which also picks up long_running transitions that no insert announces. With the psycopg
+driver a listener thread additionally LISTENs on STATUS_NOTIFY_CHANNEL and recomputes the
+date at once (debounced) when a marker insert is announced, given a trigger like:
+
+    CREATE OR REPLACE FUNCTION notify_workflow_status() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('workflow_status', COALESCE(to_jsonb(NEW)->>'business_dt', ''));
+        RETURN NEW;
+    END $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER ars_events_notify AFTER INSERT ON ars_events
+        FOR EACH ROW EXECUTE FUNCTION notify_workflow_status();
+    -- likewise on pricing_events, pricing_markers, accounting_events, ...
+
+The payload is the business date (empty wakes every broadcaster). Each open stream holds a
+worker thread, so size the server's threads for the expected number of dashboards.
+"""
+
+logger = logging.getLogger(__name__)
+
+STATUS_STREAM_HEARTBEAT_SECONDS = float(os.getenv('STATUS_STREAM_HEARTBEAT_SECONDS', 15))
+STATUS_STREAM_POLL_SECONDS = float(os.getenv('STATUS_STREAM_POLL_SECONDS', 30))
+STATUS_STREAM_DEBOUNCE_SECONDS = float(os.getenv('STATUS_STREAM_DEBOUNCE_SECONDS', 2))
+STATUS_STREAM_IDLE_SECONDS = float(os.getenv('STATUS_STREAM_IDLE_SECONDS', 120))
+STATUS_STREAM_RETRY_MS = int(os.getenv('STATUS_STREAM_RETRY_MS', 5000))
+STATUS_NOTIFY_CHANNEL = os.getenv('STATUS_NOTIFY_CHANNEL', 'workflow_status')
+ENABLE_STATUS_NOTIFY = os.getenv('STATUS_STREAM_LISTEN', '1') == '1'
+
+_CHANNEL_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+# connection errors the listener reconnects after; anything else is a bug and ends it
+_TRANSIENT_ERRORS = (DBAPIError, OSError) + ((psycopg.OperationalError,) if psycopg else ())
+
+
+def sse_event(event, data, event_id=None):
+    lines = [f'event: {event}']
+    if event_id:
+        lines.append(f'id: {event_id}')
+    lines.append(f'data: {json.dumps(data, default=str)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+class StatusBroadcaster(threading.Thread):
+    """Refreshes one business date while it has subscribers and wakes them on every refresh"""
+
+    def __init__(self, business_date):
+        super().__init__(name=f'status-stream-{business_date}', daemon=True)
+        self.business_date = business_date
+        self.subscribers = 0
+        self.idle_since = time.time()
+        self.ready = threading.Event()  # set once a complete snapshot was observed
+        self._changed = threading.Condition()
+        self._wake = threading.Event()
+
+    @property
+    def log(self):
+        return get_delta_log(self.business_date)
+
+    def wake(self):
+        """Recompute now instead of at the next poll (e.g. a marker insert was announced)"""
+        self._wake.set()
+
+    def run(self):
+        recompute = False
+        while True:
+            try:
+                # a notification means the stored snapshot is behind; a poll reads the shared one
+                snapshot = compute_snapshot(self.business_date) if recompute else get_snapshot(self.business_date)
+                if not snapshot['partial_sections']:
+                    self.log.observe(snapshot)
+                    self.ready.set()
+            except Exception as e:
+                logger.error(f"Status stream {self.business_date} refresh failed: {str(e)}")
+            with self._changed:
+                self._changed.notify_all()
+
+            with _BROADCASTERS_LOCK:
+                if self.subscribers == 0 and time.time() - self.idle_since > STATUS_STREAM_IDLE_SECONDS:
+                    del _BROADCASTERS[self.business_date]
+                    logger.info(f"Status stream {self.business_date}: no subscribers, stopping")
+                    return
+            recompute = self._wake.wait(STATUS_STREAM_POLL_SECONDS)
+            if recompute:
+                # let a burst of inserts settle into one recomputation
+                time.sleep(STATUS_STREAM_DEBOUNCE_SECONDS)
+                self._wake.clear()
+
+    def wait_for_change(self, token, timeout):
+        """True once the log moved past token (or became ready), False after timeout"""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while self.log.token == token or not self.ready.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._changed.wait(remaining)
+        return True
+
+
+_BROADCASTERS = {}  # business_date -> StatusBroadcaster
+_BROADCASTERS_LOCK = threading.Lock()
+
+
+def _subscribe(business_date):
+    with _BROADCASTERS_LOCK:
+        broadcaster = _BROADCASTERS.get(business_date)
+        if broadcaster is None:
+            broadcaster = _BROADCASTERS[business_date] = StatusBroadcaster(business_date)
+            broadcaster.start()
+        broadcaster.subscribers += 1
+    start_notify_listener()
+    return broadcaster
+
+
+def _unsubscribe(broadcaster):
+    with _BROADCASTERS_LOCK:
+        broadcaster.subscribers -= 1
+        if broadcaster.subscribers == 0:
+            broadcaster.idle_since = time.time()
+
+
+def wake_broadcasters(payload=''):
+    """Wake the broadcaster of the business date in payload, or all of them"""
+    with _BROADCASTERS_LOCK:
+        targets = [b for date, b in _BROADCASTERS.items() if not payload or date == payload]
+    for broadcaster in targets:
+        broadcaster.wake()
+
+
+def stream_status_events(business_date, last_event_id=None):
+    """SSE text chunks for one subscriber, resuming after last_event_id when it is still valid"""
+    broadcaster = _subscribe(business_date)
+    token = last_event_id or None
+    try:
+        yield f'retry: {STATUS_STREAM_RETRY_MS}\n\n'
+        while True:
+            if broadcaster.ready.is_set():
+                delta = broadcaster.log.delta(token)
+                if delta['full']:
+                    yield sse_event('snapshot', {'token': delta['token'], 'data': delta['data']}, delta['token'])
+                elif delta['token'] != token:
+                    for row in delta['data']:
+                        yield sse_event('workflow', row)
+                    yield sse_event('version', {'token': delta['token'], 'removed': delta['removed']},
+                                    delta['token'])
+                token = delta['token']
+            if not broadcaster.wait_for_change(token, STATUS_STREAM_HEARTBEAT_SECONDS):
+                yield ': heartbeat\n\n'
+    finally:
+        _unsubscribe(broadcaster)
+
+
+class NotifyListener(threading.Thread):
+    """LISTENs on the ATLS database and wakes broadcasters; without psycopg (v3) polling alone remains"""
+
+    def __init__(self, channel=None):
+        super().__init__(name='status-notify', daemon=True)
+        self.channel = channel or STATUS_NOTIFY_CHANNEL
+        if not _CHANNEL_RE.match(self.channel):
+            raise ValueError(f"invalid notify channel {self.channel!r}")
+        self._stopped = threading.Event()
+
+    def stop(self):
+        """End the thread within STATUS_STREAM_POLL_SECONDS, closing its session"""
+        self._stopped.set()
+
+    def run(self):
+        backoff = 1
+        while not self._stopped.is_set():
+            try:
+                if not self._listen():
+                    return
+            except _TRANSIENT_ERRORS as e:
+                logger.error(f"LISTEN {self.channel} failed, polling only for {backoff}s: {str(e)}")
+            except Exception:
+                logger.exception(f"LISTEN {self.channel} stopped, polling only")
+                return
+            self._stopped.wait(backoff)
+            backoff = min(backoff * 2, STATUS_STREAM_POLL_SECONDS)
+
+    def _listen(self):
+        engine = get_atls_engine()
+        if engine.dialect.driver != 'psycopg':
+            logger.info(f"Status stream: {engine.dialect.driver} has no notification API here, polling only")
+            return False
+        raw = engine.raw_connection()
+        conn = raw.driver_connection  # None once detached
+        # a LISTENing session must never go back to the pool
+        raw.detach()
+        try:
+            conn.autocommit = True
+            conn.add_notify_handler(lambda notify: wake_broadcasters(notify.payload))
+            conn.execute(f'LISTEN {self.channel}')
+            logger.info(f"Status stream listening on {self.channel}")
+            while not self._stopped.is_set():
+                # psycopg 3.1 has no notifies(timeout=): wait for the socket, then a round trip
+                # hands the pending notifications to the handler (and proves the session alive)
+                select.select([conn.fileno()], [], [], STATUS_STREAM_POLL_SECONDS)
+                conn.execute('SELECT 1')
+            return False
+        finally:
+            conn.close()
+
+
+_LISTENER = None
+_LISTENER_LOCK = threading.Lock()
+
+
+def start_notify_listener():
+    """Start the LISTEN thread once per process, on the first stream subscriber"""
+    global _LISTENER
+    if not ENABLE_STATUS_NOTIFY:
+        return None
+    with _LISTENER_LOCK:
+        if _LISTENER is None:
+            _LISTENER = NotifyListener()
+            _LISTENER.start()
+        return _LISTENER
@@ -0,0 +1,102 @@
+"""
+Test setup for the flat checkout.
+
+The application imports its modules as api.* and database.* (the deployed layout); here both
+packages are aliased to the repository root and the query registry reads the .sql files next
+to them. Database-backed tests run against a throwaway database on the PostgreSQL server in
+TEST_POSTGRES_URL (e.g. postgresql+psycopg://postgres@localhost/postgres) and are skipped
+without it.
+"""
+import os
+import sys
+import types
+import uuid
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault('QUERY_SQL_DIR', ROOT)
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+for _package in ('api', 'database'):
+    if _package not in sys.modules:
+        _module = types.ModuleType(_package)
+        _module.__path__ = [ROOT]
+        sys.modules[_package] = _module
+
+TEST_POSTGRES_URL = os.getenv('TEST_POSTGRES_URL')
+
+ATLS_SCHEMA = """
+CREATE TABLE ars_events (id serial PRIMARY KEY, client_cd text, processing_region_cd text, business_dt date,
+    trigger_marker_type_cd text, received_eagle_responses text, published_markers text, created_at timestamp,
+    original_message_id text);
+CREATE TABLE pricing_events (id serial PRIMARY KEY, client_cd text, processing_region_cd text, business_dt date,
+    created_at timestamp, original_message_id text);
+CREATE TABLE pricing_markers (id serial PRIMARY KEY, pricing_event_id int, marker_type_cd text,
+    created_at timestamp);
+CREATE TABLE accounting_events (id serial PRIMARY KEY, client_cd text, processing_region_cd text,
+    business_dt date, snapshot_type_cd text, created_at timestamp, original_message_id text,
+    parent_original_message_id text);
+CREATE TABLE markers (id serial PRIMARY KEY, accounting_event_id int, marker_type text, subject_area_cd text,
+    created_at timestamp);
+CREATE TABLE as_of_events (id serial PRIMARY KEY, client_cd text, processing_region_cd text, business_dt date,
+    created_at timestamp, original_message_id text);
+CREATE TABLE as_of_request_markers (id serial PRIMARY KEY, as_of_event_id int, created_at timestamp);
+"""
+
+ADM_SCHEMA = """
+CREATE TABLE markers (id serial PRIMARY KEY, created_at timestamp, client_cd text, processing_region_cd text,
+    snapshot_type_cd text, marker_type_cd text, subject_area_cd text, original_message_id text,
+    business_dt date, parent_original_message_id text);
+CREATE TABLE final_markers (id serial PRIMARY KEY, created_at timestamp, marker jsonb, marker_type text,
+    original_message_id text, parent_original_message_id text);
+CREATE TABLE error_logs (id serial PRIMARY KEY, created_at timestamp, service_nm text, table_nm text,
+    original_message_id text);
+"""
+
+
+def _postgres_database(schema, env_var, monkeypatch):
+    """Create a database with schema, point env_var at it and return its engine"""
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.engine import make_url
+    from database.connectors import dispose_engines
+
+    server = make_url(TEST_POSTGRES_URL)
+    name = f'status_test_{uuid.uuid4().hex[:10]}'
+    admin = create_engine(server, isolation_level='AUTOCOMMIT')
+    with admin.connect() as conn:
+        conn.execute(text(f'CREATE DATABASE {name}'))
+    url = server.set(database=name)
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(schema)
+    monkeypatch.setenv(env_var, url.render_as_string(hide_password=False))
+
+    def drop():
+        dispose_engines()
+        engine.dispose()
+        with admin.connect() as conn:
+            conn.execute(text(f'DROP DATABASE IF EXISTS {name}'))
+        admin.dispose()
+    return engine, drop
+
+
+@pytest.fixture
+def atls_db(monkeypatch):
+    """Engine of an empty ATLS database that get_atls_engine() also connects to"""
+    if not TEST_POSTGRES_URL:
+        pytest.skip('TEST_POSTGRES_URL is not set')
+    engine, drop = _postgres_database(ATLS_SCHEMA, 'ATLS_DATABASE_URL', monkeypatch)
+    yield engine
+    drop()
+
+
+@pytest.fixture
+def adm_db(monkeypatch):
+    """Engine of an empty ADM database that get_adm_engine() also connects to"""
+    if not TEST_POSTGRES_URL:
+        pytest.skip('TEST_POSTGRES_URL is not set')
+    engine, drop = _postgres_database(ADM_SCHEMA, 'ADM_DATABASE_URL', monkeypatch)
+    yield engine
+    drop()
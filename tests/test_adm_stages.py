@@ -0,0 +1,140 @@
+"""
+get_batch_stage_statuses / aggregate_stage_statuses against the per-stage ADM statements they
+replaced, on fixed rows. Needs TEST_POSTGRES_URL (see conftest.py).
+"""
+import json
+
+import pytest
+from sqlalchemy import text
+
+from api.adm_api import (EOD_STAGES, FINAL_SUBJECTS, PRICING_STAGES, SOD_STAGES, MessageIdSet,
+                         aggregate_stage_statuses, get_batch_stage_statuses)
+from api.query_registry import ADM_QUERIES
+from database.connectors import get_adm_engine
+
+AGE = "LOCALTIMESTAMP - make_interval(mins => :age)"
+COMPARED_FIELDS = ('status', 'status_with_long_running', 'last_updated', 'started_at')
+
+
+def marker(conn, message_id, marker_type, subject=None, age=5):
+    conn.execute(text(f"""
+        INSERT INTO markers (original_message_id, marker_type_cd, subject_area_cd, created_at)
+        VALUES (:message_id, :marker_type, :subject, {AGE})"""),
+                 dict(message_id=message_id, marker_type=marker_type, subject=subject, age=age))
+
+
+def final_marker(conn, message_id, marker_type, subject=None, age=5):
+    payload = json.dumps({'payload': {'subject_area_cd': subject}} if subject else {'payload': {}})
+    conn.execute(text(f"""
+        INSERT INTO final_markers (original_message_id, marker_type, marker, created_at)
+        VALUES (:message_id, :marker_type, CAST(:payload AS jsonb), {AGE})"""),
+                 dict(message_id=message_id, marker_type=marker_type, payload=payload, age=age))
+
+
+def error(conn, message_id, service, age=5):
+    conn.execute(text(f"""
+        INSERT INTO error_logs (original_message_id, service_nm, created_at)
+        VALUES (:message_id, :service, {AGE})"""), dict(message_id=message_id, service=service, age=age))
+
+
+def old_stage_statuses(message_ids, workflow_types):
+    """What the per-stage <workflow_type>_status statements return for the whole id set"""
+    statuses = {}
+    with get_adm_engine().connect() as conn:
+        id_set = MessageIdSet(conn, message_ids)
+        for workflow_type in workflow_types:
+            status, last_updated, started_at = id_set.execute(ADM_QUERIES.get(f'{workflow_type}_status')).fetchone()
+            if status == 'pending' and started_at:
+                # the old helpers' rule for a pending stage that has started
+                minutes = id_set.conn.execute(text("SELECT EXTRACT(EPOCH FROM LOCALTIMESTAMP - :t) / 60"),
+                                              {'t': started_at}).scalar()
+                status_with_long_running = 'long_running' if minutes > 30 else 'inprogress'
+            else:
+                status_with_long_running = status
+            statuses[workflow_type] = {'status': status, 'status_with_long_running': status_with_long_running,
+                                       'last_updated': last_updated, 'started_at': started_at}
+    return statuses
+
+
+@pytest.fixture
+def stage_rows(adm_db):
+    with adm_db.begin() as conn:
+        # p1: every pricing stage complete
+        for marker_type in ('eodpxRegionSubjectAreaRawLoadComplete', 'eodpxRegionSubjectAreaEnrichStarted',
+                            'eodpxRegionSubjectAreaEnriched', 'eodpxRegionSubjectAreaRollupStarted',
+                            'eodpxRegionSubjectAreaRollupComplete', 'eodpxRegionSubjectAreaMartLoadStarted',
+                            'eodpxRegionValuationPricesMartLoadComplete'):
+            marker(conn, 'p1', marker_type, age=20)
+        # p2: raw done, enrich long running on account markers, rollup failed
+        marker(conn, 'p2', 'eodpxRegionSubjectAreaRawLoadComplete', age=50)
+        marker(conn, 'p2', 'eodpxRegionSubjectAreaEnrichStarted', age=48)
+        marker(conn, 'p2', 'eodpxAccountSubjectAreaEnriched', age=45)
+        error(conn, 'p2', 'rollup')
+
+        # e1/e2: raw subjects split over the two ids, enrich partly done and failed on e2,
+        # rollup only started long ago, final published for every subject
+        for subject in ('taxlots', 'positions', 'disposal_lots'):
+            marker(conn, 'e1', 'eodRegionSubjectAreaRawLoadComplete', subject, age=35)
+        for subject in ('transactions', 'cash_settlements'):
+            marker(conn, 'e2', 'eodRegionSubjectAreaRawLoadComplete', subject, age=25)
+        marker(conn, 'e1', 'eodRegionSubjectAreaEnrichStarted', 'positions', age=24)
+        marker(conn, 'e1', 'eodRegionSubjectAreaEnriched', 'positions', age=20)
+        marker(conn, 'e1', 'eodRegionSubjectAreaEnriched', 'taxlots', age=18)
+        error(conn, 'e2', 'eod_enrichment_service')
+        marker(conn, 'e2', 'eodRegionSubjectAreaRollupStarted', 'positions', age=40)
+        final_marker(conn, 'e1', 'eodRegionStatementsPublished', age=3)
+        for subject in FINAL_SUBJECTS:
+            final_marker(conn, 'e2' if subject == 'taxlots' else 'e1', 'eodRegionSubjectAreaPublished', subject, age=4)
+
+        # s1: raw load just started, one final subject published
+        marker(conn, 's1', 'sodRegionSubjectAreaRawloadStarted', 'positions', age=5)
+        final_marker(conn, 's1', 'sodRegionSubjectAreaPublished', 'positions', age=2)
+    return adm_db
+
+
+@pytest.mark.parametrize('message_ids, workflow_types', [
+    (['p1'], PRICING_STAGES),
+    (['p2'], PRICING_STAGES),
+    (['p1', 'p2'], PRICING_STAGES),
+    (['e1', 'e2'], EOD_STAGES),
+    (['e1'], EOD_STAGES),
+    (['s1'], SOD_STAGES),
+    (['nothing'], PRICING_STAGES + EOD_STAGES + SOD_STAGES),
+])
+def test_combined_matches_per_stage_statements(stage_rows, message_ids, workflow_types):
+    old = old_stage_statuses(message_ids, workflow_types)
+    combined = get_batch_stage_statuses(message_ids, workflow_types)['combined']
+
+    assert [row['workflow_type'] for row in combined] == workflow_types
+    for row in combined:
+        assert {f: row[f] for f in COMPARED_FIELDS} == old[row['workflow_type']], row['workflow_type']
+
+
+def test_combined_statuses_of_fixed_rows(stage_rows):
+    combined = get_batch_stage_statuses(['e1', 'e2'], EOD_STAGES)['combined']
+    assert {row['workflow_type']: row['status'] for row in combined} == {
+        'eod_raw': 'completed', 'eod_enrich': 'failed', 'eod_roll': 'long_running',
+        'eod_mart': 'pending', 'eod_final': 'completed'}
+
+
+def test_aggregate_rolls_up_per_id_rows(stage_rows):
+    batch = get_batch_stage_statuses(['e1', 'e2', 'p1', 'p2'], EOD_STAGES)
+    aggregate = {row['workflow_type']: row for row in batch['aggregate']}
+
+    # per id the raw subjects are incomplete, so unlike combined the rollup is only in progress
+    assert (aggregate['eod_raw']['status'], aggregate['eod_raw']['completed_count']) == ('inprogress', 0)
+    assert (aggregate['eod_enrich']['status'], aggregate['eod_enrich']['failed_count']) == ('failed', 1)
+    assert aggregate['eod_roll']['status'] == 'long_running'
+    assert aggregate['eod_roll']['message_count'] == 4
+
+    # a subset of the fetched ids rolls up like a batch fetched for just that subset
+    subset = aggregate_stage_statuses(batch['per_id'], ['e2', 'e1'], EOD_STAGES)
+    assert subset == get_batch_stage_statuses(['e2', 'e1'], EOD_STAGES)['aggregate']
+    assert aggregate_stage_statuses(batch['per_id'], ['e1', 'e2', 'p1', 'p2'], EOD_STAGES) == batch['aggregate']
+
+
+def test_large_id_sets_use_the_temp_table(stage_rows, monkeypatch):
+    monkeypatch.setattr('api.adm_api.ID_SET_TEMP_TABLE_THRESHOLD', 1)
+    old = old_stage_statuses(['e1', 'e2'], EOD_STAGES)
+    combined = get_batch_stage_statuses(['e1', 'e2'], EOD_STAGES)['combined']
+    assert {row['workflow_type']: {f: row[f] for f in COMPARED_FIELDS} for row in combined} == old
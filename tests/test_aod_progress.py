@@ -0,0 +1,147 @@
+"""
+AodProgressTracker against the AOD evaluation it answers for (evaluate_workflow ->
+evaluate_aod_stage / evaluate_aod_final over the selected rows), on fixed and random rows.
+"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from api.aod_progress import AOD_STAGES, AodProgressTracker
+from api.row_store import CombinedRow
+from api.workflow_eval import AOD_STAGE_MARKERS, EXPECTED_SUBJECTS, GLOBAL_AOD_FINAL_MARKER, evaluate_workflow
+
+BUSINESS_DATE = '2024-03-14'
+KEY = ('ACME', 'AMER', 'AOD', BUSINESS_DATE)
+NOW = datetime.now()
+
+
+def row(marker_type, subject, message_id, age=5, status='success'):
+    return CombinedRow(NOW - timedelta(minutes=age), 'ACME', 'AMER', 'AOD', marker_type, subject, message_id,
+                       BUSINESS_DATE, status, 'error_logs' if status == 'failed' else 'markers')
+
+
+def evaluated(rows, atls_ids):
+    """{stage: (status, positions_count, taxlots_count, total_count)} from evaluate_workflow"""
+    entries = [{'id': i, 'snapshot': 'AOD', 'business_dt': BUSINESS_DATE, 'source': 'ACCOUNTING'} for i in atls_ids]
+    result = {}
+    for stage in AOD_STAGES:
+        workflow_type = f'aod_{stage.lower()}'
+        w = evaluate_workflow('ACME', 'AMER', workflow_type, EXPECTED_SUBJECTS[workflow_type], entries,
+                              {KEY: rows}, BUSINESS_DATE, BUSINESS_DATE)
+        result[stage] = (w['status'], w['positions_count'], w['taxlots_count'], w['total_count'])
+    return result
+
+
+def tracked(rows, atls_ids):
+    tracker = AodProgressTracker(AOD_STAGE_MARKERS, GLOBAL_AOD_FINAL_MARKER)
+    tracker.observe_rows(rows)
+    if atls_ids:
+        tracker.expect(atls_ids)
+    return tracker
+
+
+def tracked_statuses(tracker):
+    return {stage: (*tracker.stage_status(stage), tracker.counts(stage)['total']) for stage in AOD_STAGES}
+
+
+def expected_stragglers(rows, atls_ids, stage):
+    """Member ids that lack a marker of the stage for one of the two subjects"""
+    marker = AOD_STAGE_MARKERS[stage]
+    done = {(r.original_message_id, r.subject_area_cd) for r in rows if r.marker_type_cd == marker}
+    return sorted(i for i in atls_ids if not {(i, 'positions'), (i, 'taxlots')} <= done)
+
+
+@pytest.fixture
+def rows():
+    return [
+        # q1 through every stage, q2 stuck in ENRICH on taxlots, q3 only raw positions, q4 nothing
+        *[row(AOD_STAGE_MARKERS[stage], subject, 'q1') for stage in AOD_STAGES for subject in ('positions', 'taxlots')],
+        row(AOD_STAGE_MARKERS['RAW'], 'positions', 'q2'),
+        row(AOD_STAGE_MARKERS['RAW'], 'taxlots', 'q2'),
+        row(AOD_STAGE_MARKERS['ENRICH'], 'positions', 'q2'),
+        row('asof_enrichment_service', None, 'q2', status='failed'),
+        row(AOD_STAGE_MARKERS['RAW'], 'positions', 'q3'),
+        # a re-delivered marker and a marker of a message ATLS does not know
+        row(AOD_STAGE_MARKERS['RAW'], 'positions', 'q1', age=1),
+        row(AOD_STAGE_MARKERS['RAW'], 'taxlots', 'stray'),
+        row(GLOBAL_AOD_FINAL_MARKER, None, 'global-1'),
+    ]
+
+
+def test_tracker_matches_evaluation_on_fixed_rows(rows):
+    atls_ids = ['q1', 'q2', 'q3', 'q4']
+    tracker = tracked(rows, atls_ids)
+
+    assert tracked_statuses(tracker) == evaluated(rows, atls_ids)
+    assert tracker.counts('RAW') == {'total': 4, 'positions': 3, 'taxlots': 2, 'complete': 2, 'failed': 0}
+    assert tracker.counts('ENRICH') == {'total': 4, 'positions': 2, 'taxlots': 1, 'complete': 1, 'failed': 1}
+    assert tracker.percent_complete('RAW') == 50.0
+    assert tracker.stragglers('RAW') == expected_stragglers(rows, atls_ids, 'RAW') == ['q3', 'q4']
+    assert tracker.stragglers('ENRICH') == ['q2', 'q3', 'q4']
+    assert tracker.failures('ENRICH') == ['q2']
+    assert tracker.stage_status('FINAL')[0] == 'inprogress'
+
+
+def test_tracker_matches_evaluation_without_atls_ids(rows):
+    # ATLS-empty fallback: each stage counts the ids of its own markers, FINAL every AOD id
+    assert tracked_statuses(tracked(rows, [])) == evaluated(rows, [])
+
+
+def test_summary_lists_stragglers_up_to_the_limit(rows):
+    summary = tracked(rows, ['q1', 'q2', 'q3', 'q4']).summary(max_stragglers=1)
+    assert (summary['RAW']['stragglers'], summary['RAW']['straggler_count']) == (['q3'], 2)
+    assert summary['FINAL']['percent_complete'] == 25.0
+    assert summary['global_marker'] is True
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_tracker_matches_evaluation_on_random_rows(seed):
+    rng = random.Random(seed)
+    atls_ids = [f'q{i}' for i in range(20)]
+    markers = list(AOD_STAGE_MARKERS.values())
+    rows = [
+        row(rng.choice(markers), rng.choice(['positions', 'taxlots']), rng.choice(atls_ids + ['stray1', 'stray2']),
+            age=rng.randrange(60))
+        for _ in range(300)
+    ]
+    rows += [row('asof_rollup_service', None, rng.choice(atls_ids), status='failed') for _ in range(3)]
+    if seed % 2:
+        rows.append(row(GLOBAL_AOD_FINAL_MARKER, None, 'global-1'))
+
+    for ids in (atls_ids, atls_ids[:7], []):
+        tracker = tracked(rows, ids)
+        assert tracked_statuses(tracker) == evaluated(rows, ids), ids
+        if ids:
+            for stage in AOD_STAGES:
+                assert tracker.stragglers(stage) == expected_stragglers(rows, ids, stage)
+
+    # the order rows arrive in, and expecting the ids before the rows, change nothing
+    shuffled = rows[:]
+    rng.shuffle(shuffled)
+    tracker = AodProgressTracker(AOD_STAGE_MARKERS, GLOBAL_AOD_FINAL_MARKER)
+    tracker.expect(atls_ids[:7])
+    tracker.observe_rows(shuffled)
+    tracker.expect(atls_ids)
+    assert tracker.summary() == tracked(rows, atls_ids).summary()
+
+
+def test_aod_progress_endpoint(adm_db):
+    from app import app
+    with adm_db.begin() as conn:
+        conn.exec_driver_sql("""CREATE TABLE reporting_loaders_markers (created_at timestamp, client_cd text,
+            processing_region_cd text, snapshot_type_cd text, marker_type_cd text, subject_area_cd text,
+            original_message_id text, business_dt date)""")
+        for message_id, subjects in (('q1', ('positions', 'taxlots')), ('q2', ('positions',))):
+            for subject in subjects:
+                conn.exec_driver_sql(f"""
+                    INSERT INTO markers (created_at, client_cd, processing_region_cd, snapshot_type_cd,
+                                         marker_type_cd, subject_area_cd, original_message_id, business_dt)
+                    VALUES (LOCALTIMESTAMP, 'ACME', 'AMER', 'AOD', '{AOD_STAGE_MARKERS['RAW']}', '{subject}',
+                            '{message_id}', '{BUSINESS_DATE}')""")
+
+    client = app.test_client()
+    assert client.get('/api/aod_progress?client=ACME&region=AMER').status_code == 400
+    response = client.get(f'/api/aod_progress?client=acme&region=AMER&business_date={BUSINESS_DATE}')
+    raw = response.get_json()['data']['RAW']
+    assert (raw['total'], raw['complete'], raw['stragglers'], raw['percent_complete']) == (2, 1, ['q2'], 50.0)
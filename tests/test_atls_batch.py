@@ -0,0 +1,182 @@
+"""
+get_batch_workflow_statuses against the per-workflow ATLS statements it replaced, on fixed
+rows. Needs TEST_POSTGRES_URL (see conftest.py).
+"""
+import pytest
+from sqlalchemy import text
+
+from api.atls_api import (ATLS_WORKFLOW_TYPES, TRANSFORMED_SUBJECTS, calculate_sod_date,
+                          default_workflow_status, get_batch_workflow_statuses)
+from api.query_registry import _BIND_RE, ATLS_QUERIES
+from database.connectors import get_atls_engine
+
+BUSINESS_DATE = '2024-03-14'  # a Thursday
+SOD_DATE = calculate_sod_date(BUSINESS_DATE)
+
+COMPARED_FIELDS = ('status', 'status_with_long_running', 'last_updated', 'business_dt')
+AOD_COUNT_FIELDS = ('aod_entry_count', 'positions_marker_count', 'taxlots_marker_count')
+
+AGE = "LOCALTIMESTAMP - make_interval(mins => :age)"
+
+
+def _insert(conn, sql, **params):
+    return conn.execute(text(sql + ' RETURNING id'), params).scalar()
+
+
+def ars_event(conn, client, region, business_dt, trigger, received=True, published=True, age=5):
+    return _insert(conn, f"""
+        INSERT INTO ars_events (client_cd, processing_region_cd, business_dt, trigger_marker_type_cd,
+                                received_eagle_responses, published_markers, created_at)
+        VALUES (:client, :region, :business_dt, :trigger, :received, :published, {AGE})""",
+                   client=client, region=region, business_dt=business_dt, trigger=trigger,
+                   received='y' if received else None, published='y' if published else None, age=age)
+
+
+def pricing_event(conn, client, region, marked=True, age=5):
+    event_id = _insert(conn, f"""
+        INSERT INTO pricing_events (client_cd, processing_region_cd, business_dt, created_at)
+        VALUES (:client, :region, :business_dt, {AGE})""",
+                       client=client, region=region, business_dt=BUSINESS_DATE, age=age)
+    if marked:
+        _insert(conn, f"""
+            INSERT INTO pricing_markers (pricing_event_id, marker_type_cd, created_at)
+            VALUES (:event_id, 'eodPXRegionSubjectAreaTransformed', {AGE})""", event_id=event_id, age=age)
+    return event_id
+
+
+def accounting_event(conn, client, region, snapshot, business_dt, marker_type=None, subjects=(), age=5):
+    event_id = _insert(conn, f"""
+        INSERT INTO accounting_events (client_cd, processing_region_cd, business_dt, snapshot_type_cd, created_at)
+        VALUES (:client, :region, :business_dt, :snapshot, {AGE})""",
+                       client=client, region=region, business_dt=business_dt, snapshot=snapshot, age=age)
+    for subject in subjects:
+        _insert(conn, f"""
+            INSERT INTO markers (accounting_event_id, marker_type, subject_area_cd, created_at)
+            VALUES (:event_id, :marker_type, :subject, {AGE})""",
+                event_id=event_id, marker_type=marker_type, subject=subject, age=age)
+    return event_id
+
+
+def asof_event(conn, client, region, marked=True, age=5):
+    event_id = _insert(conn, f"""
+        INSERT INTO as_of_events (client_cd, processing_region_cd, business_dt, created_at)
+        VALUES (:client, :region, :business_dt, {AGE})""",
+                       client=client, region=region, business_dt=BUSINESS_DATE, age=age)
+    if marked:
+        _insert(conn, "INSERT INTO as_of_request_markers (as_of_event_id) VALUES (:event_id)", event_id=event_id)
+    return event_id
+
+
+def old_statuses(client, region):
+    """
+    What the 13 per-workflow statements return for one client/region. They ran with the values
+    formatted in as quoted literals, which the server types per use (date or text).
+    """
+    params = {'client': client, 'region': region, 'business_date': BUSINESS_DATE, 'sod_date': SOD_DATE}
+    statuses = {}
+    with get_atls_engine().connect() as conn:
+        for workflow_type in ATLS_WORKFLOW_TYPES:
+            sql = _BIND_RE.sub(lambda m: "'%s'" % params[m.group(1)], ATLS_QUERIES.get(workflow_type).sql)
+            row = conn.exec_driver_sql(sql.replace('%', '%%')).mappings().first()
+            statuses[workflow_type] = (dict(row) if row
+                                       else default_workflow_status(client, region, workflow_type, BUSINESS_DATE))
+    return statuses
+
+
+def _compared(status, fields=COMPARED_FIELDS):
+    return {field: status.get(field) for field in fields}
+
+
+@pytest.fixture
+def scenario(atls_db):
+    eod_subjects = sorted(TRANSFORMED_SUBJECTS)
+    with atls_db.begin() as conn:
+        # ACME/AMER: every workflow complete
+        ars_event(conn, 'ACME', 'AMER', BUSINESS_DATE, 'opsRegionEODTradingSignoff')
+        ars_event(conn, 'ACME', 'AMER', BUSINESS_DATE, 'opsRegionEODPricingSignoff')
+        pricing_event(conn, 'ACME', 'AMER')
+        ars_event(conn, 'ACME', 'AMER', BUSINESS_DATE, 'opsRegionEodSignoff', age=40)
+        ars_event(conn, 'ACME', 'AMER', BUSINESS_DATE, 'accountingRegionEodclose', age=10)
+        accounting_event(conn, 'ACME', 'AMER', 'EOD', BUSINESS_DATE, 'eodRegionSubjectAreaTransformed', eod_subjects)
+        asof_event(conn, 'ACME', 'AMER')
+        for _ in range(2):
+            accounting_event(conn, 'ACME', 'AMER', 'AOD', BUSINESS_DATE, 'asOfRegionSubjectAreaTransformed',
+                             ('positions', 'taxlots'))
+        ars_event(conn, 'ACME', 'AMER', SOD_DATE, 'sodRegionGlobalProcessTrigger')
+        ars_event(conn, 'ACME', 'AMER', SOD_DATE, 'sodRegionGlobalProcessDone')
+        accounting_event(conn, 'ACME', 'AMER', 'SOD', SOD_DATE, 'sodRegionSubjectAreaTransformed', eod_subjects)
+
+        # ACME/EMEA: in progress, old rows long running
+        ars_event(conn, 'ACME', 'EMEA', BUSINESS_DATE, 'opsRegionEODTradingSignoff', received=False, age=60)
+        ars_event(conn, 'ACME', 'EMEA', BUSINESS_DATE, 'opsRegionEODPricingSignoff', published=False)
+        pricing_event(conn, 'ACME', 'EMEA', marked=False, age=60)
+        ars_event(conn, 'ACME', 'EMEA', BUSINESS_DATE, 'opsRegionEodSignoff', age=45)
+        accounting_event(conn, 'ACME', 'EMEA', 'EOD', BUSINESS_DATE, 'eodRegionSubjectAreaTransformed',
+                         ('positions', 'taxlots', 'transactions'), age=45)
+        asof_event(conn, 'ACME', 'EMEA', marked=False, age=45)
+        accounting_event(conn, 'ACME', 'EMEA', 'AOD', BUSINESS_DATE, 'asOfRegionSubjectAreaTransformed',
+                         ('positions',))
+        ars_event(conn, 'ACME', 'EMEA', SOD_DATE, 'sodRegionGlobalProcessTrigger', received=False)
+        accounting_event(conn, 'ACME', 'EMEA', 'SOD', SOD_DATE)
+
+        # GAMMA/AMER: two AOD events, each with only one of the two subjects
+        accounting_event(conn, 'GAMMA', 'AMER', 'AOD', BUSINESS_DATE, 'asOfRegionSubjectAreaTransformed',
+                         ('positions',))
+        accounting_event(conn, 'GAMMA', 'AMER', 'AOD', BUSINESS_DATE, 'asOfRegionSubjectAreaTransformed',
+                         ('taxlots',))
+    return atls_db
+
+
+@pytest.mark.parametrize('client, region', [('ACME', 'AMER'), ('ACME', 'EMEA'), ('BETA', 'APAC')])
+def test_batch_matches_per_workflow_statements(scenario, client, region):
+    old = old_statuses(client, region)
+    new = get_batch_workflow_statuses(BUSINESS_DATE, [(client, region)])
+
+    for workflow_type in ATLS_WORKFLOW_TYPES:
+        assert _compared(new[(client, region, workflow_type)]) == _compared(old[workflow_type]), workflow_type
+    if old['aod_marker'].get('aod_entry_count') is not None:
+        assert (_compared(new[(client, region, 'aod_marker')], AOD_COUNT_FIELDS)
+                == _compared(old['aod_marker'], AOD_COUNT_FIELDS))
+
+
+def test_batch_statuses_of_fixed_rows(scenario):
+    new = get_batch_workflow_statuses(BUSINESS_DATE, [('ACME', 'AMER'), ('ACME', 'EMEA')])
+
+    assert {wt for (client, _region, wt), s in new.items()
+            if client == 'ACME' and s['status'] != 'completed' and _region == 'AMER'} == set()
+    emea = {wt: (s['status'], s['status_with_long_running'])
+            for (_client, region, wt), s in new.items() if region == 'EMEA'}
+    assert emea == {
+        'trading_ars': ('inprogress', 'long_running'),
+        'pricing_ars': ('inprogress', 'inprogress'),
+        'pricing_marker': ('pending', 'long_running'),
+        'eod_ars': ('inprogress', 'long_running'),
+        'eod': ('completed', 'completed'),
+        'eod_marker': ('inprogress', 'long_running'),
+        'asof_events': ('completed', 'completed'),
+        'asof_marker': ('inprogress', 'long_running'),
+        'aod': ('completed', 'completed'),
+        'aod_marker': ('inprogress', 'inprogress'),
+        'sod_ars': ('inprogress', 'inprogress'),
+        'sod': ('completed', 'completed'),
+        'sod_marker': ('pending', 'pending'),
+    }
+
+
+def test_all_pairs_scan_matches_single_pair(scenario):
+    every = get_batch_workflow_statuses(BUSINESS_DATE)
+    for pair in (('ACME', 'AMER'), ('ACME', 'EMEA')):
+        single = get_batch_workflow_statuses(BUSINESS_DATE, [pair])
+        assert {k: v for k, v in every.items() if k[:2] == pair} == single
+
+
+def test_aod_marker_needs_both_subjects_on_every_event(scenario):
+    # The old statement counted events with either subject and only checked that both subjects
+    # appeared somewhere, so split markers passed as completed. Every AOD event now needs both.
+    old = old_statuses('GAMMA', 'AMER')['aod_marker']
+    new = get_batch_workflow_statuses(BUSINESS_DATE, [('GAMMA', 'AMER')])[('GAMMA', 'AMER', 'aod_marker')]
+
+    assert old['status'] == 'completed'
+    assert (new['status'], new['status_with_long_running']) == ('inprogress', 'inprogress')
+    assert _compared(new, AOD_COUNT_FIELDS) == _compared(old, AOD_COUNT_FIELDS) == {
+        'aod_entry_count': 2, 'positions_marker_count': 1, 'taxlots_marker_count': 1}
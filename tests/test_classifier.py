@@ -0,0 +1,155 @@
+"""
+WORKFLOW_CLASSIFIER + evaluate_workflow_rows against the per-workflow list scans of
+evaluate_workflow they replaced, on fixed and on random rows (no database).
+"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from api.workflow_eval import (EXPECTED_SUBJECTS, GLOBAL_AOD_FINAL_MARKER, STAGE_MARKER_FILTERS,
+                               WORKFLOW_CLASSIFIER, evaluate_workflow, evaluate_workflow_rows, index_message_ids)
+from api.row_store import CombinedRow
+
+BUSINESS_DATE = '2024-03-14'
+SOD_DATE = '2024-03-15'
+NOW = datetime.now()
+
+# pricing (EODPX) workflows have no marker filter: every row of their key counts
+SNAPSHOT_MARKERS = {'EODPX': ['eodpxRegionSubjectAreaRawLoadComplete']}
+for (_snapshot, _stage), _filter in STAGE_MARKER_FILTERS.items():
+    SNAPSHOT_MARKERS.setdefault(_snapshot, []).extend(sorted([_filter] if isinstance(_filter, str) else _filter))
+SUBJECTS = sorted({s for expected in EXPECTED_SUBJECTS.values() for s in expected})
+
+
+def row(client, region, snapshot, marker_type, subject, message_id, business_dt=BUSINESS_DATE, age=5,
+        status='success', source='markers'):
+    return CombinedRow(NOW - timedelta(minutes=age), client, region, snapshot, marker_type, subject,
+                       message_id, business_dt, status, source)
+
+
+def atls(message_id, snapshot, business_dt=BUSINESS_DATE, source='ACCOUNTING'):
+    return {'id': message_id, 'snapshot': snapshot, 'business_dt': business_dt, 'source': source}
+
+
+def group(rows):
+    grouped = {}
+    for r in rows:
+        grouped.setdefault((r.client_cd, r.processing_region_cd, r.snapshot_type_cd, r.business_dt), []).append(r)
+    return grouped
+
+
+def scanned(pairs, atls_message_map, grouped_rows):
+    """One evaluate_workflow call (list scans over the key's rows) per pair and workflow"""
+    return [
+        evaluate_workflow(client, region, workflow_type, expected_subjects, atls_message_map.get((client, region), []),
+                          grouped_rows, BUSINESS_DATE, SOD_DATE)
+        for client, region in pairs for workflow_type, expected_subjects in EXPECTED_SUBJECTS.items()
+    ]
+
+
+def classified(pairs, atls_message_map, grouped_rows):
+    """One classify pass, then evaluate_workflow_rows per bucket (evaluate_pairs without the DAG checks)"""
+    ids_by_key = index_message_ids(atls_message_map)
+    buckets = WORKFLOW_CLASSIFIER.classify(grouped_rows, {k: frozenset(v) for k, v in ids_by_key.items()},
+                                           BUSINESS_DATE, SOD_DATE, set(pairs))
+    workflows = []
+    for client, region in pairs:
+        for workflow_type, expected_subjects in EXPECTED_SUBJECTS.items():
+            snapshot = workflow_type.split('_')[0].upper()
+            target_date = SOD_DATE if snapshot == 'SOD' else BUSINESS_DATE
+            workflows.append(evaluate_workflow_rows(
+                client, region, workflow_type, expected_subjects,
+                ids_by_key.get((client, region, snapshot, target_date), []), buckets.get((client, region, workflow_type), []), target_date))
+    return workflows
+
+
+@pytest.fixture
+def fixed():
+    pairs = [('ACME', 'AMER'), ('BETA', 'EMEA')]
+    atls_message_map = {
+        ('ACME', 'AMER'): [atls('a1', 'EOD'), atls('a2', 'EOD'), atls('p1', 'EODPX', source='PRICING'),
+                           atls('q1', 'AOD'), atls('q2', 'AOD'), atls('s1', 'SOD', SOD_DATE)],
+        # BETA/EMEA has no ATLS ids: every row of the key counts (ADM fallback)
+    }
+    rows = [
+        # EOD raw complete over two ATLS ids, enrich partial, a row of a non-ATLS id that must not count
+        *[row('ACME', 'AMER', 'EOD', 'eodRegionSubjectAreaRawLoadComplete', s, 'a1' if i % 2 else 'a2', age=40 + i)
+          for i, s in enumerate(EXPECTED_SUBJECTS['eod_raw'])],
+        row('ACME', 'AMER', 'EOD', 'eodRegionSubjectAreaEnriched', 'positions', 'a1', age=20),
+        row('ACME', 'AMER', 'EOD', 'eodRegionSubjectAreaEnriched', 'taxlots', 'zz', age=2),
+        row('ACME', 'AMER', 'EOD', 'eodRegionTaxlotsMartLoadComplete', 'taxlots', 'a2'),
+        # error_logs rows carry the service in marker_type_cd, so they only reach unfiltered workflows
+        row('ACME', 'AMER', 'EOD', 'eod_rollup_service', None, 'a2', status='failed', source='error_logs'),
+        row('ACME', 'AMER', 'EODPX', 'eodpxRegionSubjectAreaRawLoadComplete', 'valuation_prices', 'p1', age=50),
+        row('ACME', 'AMER', 'EODPX', 'eodpx_enrich_service', None, 'p1', status='failed', source='error_logs'),
+        row('ACME', 'AMER', 'EODPX', 'eodpx_enrich_service', None, 'other', status='failed', source='error_logs'),
+        # the same markers on another business date are ignored
+        row('ACME', 'AMER', 'EOD', 'eodRegionSubjectAreaEnriched', 'transactions', 'a1', business_dt='2024-03-13'),
+        # AOD: q1 complete, q2 only positions; the global final marker counts whatever its id
+        row('ACME', 'AMER', 'AOD', 'asOfRegionSubjectAreaRawLoadComplete', 'positions', 'q1'),
+        row('ACME', 'AMER', 'AOD', 'asOfRegionSubjectAreaRawLoadComplete', 'taxlots', 'q1'),
+        row('ACME', 'AMER', 'AOD', 'asOfRegionSubjectAreaRawLoadComplete', 'positions', 'q2'),
+        row('ACME', 'AMER', 'AOD', 'asOfRegionsStatementsPublished', 'positions', 'q1'),
+        row('ACME', 'AMER', 'AOD', GLOBAL_AOD_FINAL_MARKER, None, 'global-1'),
+        # SOD is read on the SOD date only
+        row('ACME', 'AMER', 'SOD', 'sodRegionSubjectAreaRawLoadComplete', 'positions', 's1', business_dt=SOD_DATE),
+        row('ACME', 'AMER', 'SOD', 'sodRegionSubjectAreaRawLoadComplete', 'taxlots', 's1'),
+        # fallback pair
+        row('BETA', 'EMEA', 'EOD', 'eodRegionSubjectAreaRawLoadComplete', 'positions', 'b1', age=45),
+        row('BETA', 'EMEA', 'EODPX', 'eodpx_roll_service', None, 'b1', status='failed', source='error_logs'),
+        row('BETA', 'EMEA', 'AOD', 'asOfRegionSubjectAreaEnriched', 'taxlots', 'b2'),
+        # a pair that was not requested
+        row('GAMMA', 'APAC', 'EOD', 'eodRegionSubjectAreaRawLoadComplete', 'positions', 'g1'),
+    ]
+    return pairs, atls_message_map, group(rows)
+
+
+def test_classifier_matches_scans_on_fixed_rows(fixed):
+    assert classified(*fixed) == scanned(*fixed)
+
+
+def test_fixed_rows_statuses(fixed):
+    workflows = {(w['client_cd'], w['workflow_type']): w for w in classified(*fixed)}
+
+    assert workflows[('ACME', 'eod_raw')]['status'] == 'completed'
+    assert workflows[('ACME', 'eod_enrich')]['subjects_found'] == ['positions']
+    assert workflows[('ACME', 'eod_roll')]['status'] == 'pending'
+    assert (workflows[('ACME', 'eodpx_raw')]['status'], workflows[('ACME', 'eodpx_enrich')]['status']) == (
+        'completed', 'failed')
+    assert workflows[('ACME', 'sod_raw')]['subjects_found'] == ['positions']
+    assert (workflows[('ACME', 'aod_raw')]['positions_count'], workflows[('ACME', 'aod_raw')]['taxlots_count']) == (2, 1)
+    assert workflows[('ACME', 'aod_final')]['last_updated'] is not None
+    assert workflows[('BETA', 'eod_raw')]['original_message_id'] == 'b1'
+    assert workflows[('BETA', 'eodpx_roll')]['status'] == 'failed'
+    assert {w['client_cd'] for w in workflows.values()} == {'ACME', 'BETA'}
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_classifier_matches_scans_on_random_rows(seed):
+    rng = random.Random(seed)
+    pairs = [(f'CLIENT{i}', ('AMER', 'EMEA', 'APAC')[i % 3]) for i in range(6)]
+    atls_message_map = {
+        pair: [atls(f'{pair[0]}-{snapshot}-{i}', snapshot, SOD_DATE if snapshot == 'SOD' else BUSINESS_DATE)
+               for snapshot in SNAPSHOT_MARKERS for i in range(3)]
+        for pair in pairs[1:]  # the first pair falls back to the ADM ids
+    }
+    rows = []
+    for n in range(2000):
+        client, region = rng.choice(pairs + [('OTHER', 'AMER')])
+        snapshot = rng.choice(list(SNAPSHOT_MARKERS))
+        rows.append(row(
+            client, region, snapshot,
+            rng.choice(SNAPSHOT_MARKERS[snapshot] + [GLOBAL_AOD_FINAL_MARKER, 'eodpx_enrich_service']),
+            rng.choice(SUBJECTS + [None]),
+            f'{client}-{snapshot}-{rng.randrange(5)}',
+            business_dt=rng.choice([BUSINESS_DATE, SOD_DATE, '2024-03-13']),
+            age=rng.randrange(90),
+            status=rng.choice(['success'] * 9 + ['failed'])))
+    grouped_rows = group(rows)
+
+    assert classified(pairs, atls_message_map, grouped_rows) == scanned(pairs, atls_message_map, grouped_rows)
+    buckets = WORKFLOW_CLASSIFIER.classify(grouped_rows, {k: frozenset(v) for k, v in
+                                                          index_message_ids(atls_message_map).items()},
+                                           BUSINESS_DATE, SOD_DATE, set(pairs))
+    assert set(buckets) <= {(c, r, wt) for c, r in pairs for wt in EXPECTED_SUBJECTS}
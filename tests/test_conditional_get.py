@@ -0,0 +1,89 @@
+"""
+Conditional GETs: a repeated request with the ETag of the previous answer gets a 304 until
+a row behind the answer is written, and writes for other dates leave the status ETag alone.
+"""
+from api.status_engine import get_status_watermark
+
+BUSINESS_DATE = '2024-03-14'
+SOD_DATE = '2024-03-15'
+
+VOLUME_CHECK = """
+CREATE TABLE volume_check (id serial PRIMARY KEY, business_dt date, client_cd text, processing_region_cd text,
+    snapshot_type_cd text, records_expected_ct integer, created_at timestamp)
+"""
+
+
+def add_volume(conn, business_dt, snapshot, records, client='ACME'):
+    conn.exec_driver_sql(f"""
+        INSERT INTO volume_check (business_dt, client_cd, processing_region_cd, snapshot_type_cd,
+                                  records_expected_ct, created_at)
+        VALUES ('{business_dt}', '{client}', 'AMER', '{snapshot}', {records}, LOCALTIMESTAMP)""")
+
+
+def test_volume_trends_answers_200_then_304(atls_db):
+    from app import app
+    with atls_db.begin() as conn:
+        conn.exec_driver_sql(VOLUME_CHECK)
+        add_volume(conn, '2024-03-13', 'EOD', 10)
+        add_volume(conn, BUSINESS_DATE, 'EOD', 5)
+        add_volume(conn, BUSINESS_DATE, 'EOD', 7)
+
+    client = app.test_client()
+    url = f'/api/volume_trends?client=ACME&region=AMER&start_date=2024-03-13&end_date={BUSINESS_DATE}'
+    first = client.get(url)
+    assert first.status_code == 200
+    assert [(row['snapshot_type_cd'], row['total_records']) for row in first.get_json()['data']] == [
+        ('EOD', 10), ('EOD', 12)]
+    etag = first.headers['ETag']
+
+    second = client.get(url, headers={'If-None-Match': etag})
+    assert (second.status_code, second.headers['ETag'], second.data) == (304, etag, b'')
+
+    # another client's rows are not behind this trend; a row of its own is
+    with atls_db.begin() as conn:
+        add_volume(conn, BUSINESS_DATE, 'EOD', 1, client='OTHER')
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+    with atls_db.begin() as conn:
+        add_volume(conn, BUSINESS_DATE, 'SOD', 3)
+    third = client.get(url, headers={'If-None-Match': etag})
+    assert third.status_code == 200 and third.headers['ETag'] != etag
+
+
+def test_status_watermark_only_moves_with_rows_of_the_date(atls_db, adm_db):
+    with adm_db.begin() as conn:
+        conn.exec_driver_sql("""CREATE TABLE reporting_loaders_markers (created_at timestamp, client_cd text,
+            processing_region_cd text, snapshot_type_cd text, marker_type_cd text, subject_area_cd text,
+            original_message_id text, business_dt date)""")
+    with atls_db.begin() as conn:
+        conn.exec_driver_sql(f"""INSERT INTO pricing_events (client_cd, processing_region_cd, business_dt,
+            created_at, original_message_id) VALUES ('ACME', 'AMER', '{BUSINESS_DATE}', '2024-03-14 17:00', 'p1')""")
+
+    def write(sql):
+        with adm_db.begin() as conn:
+            conn.exec_driver_sql(sql)
+        return get_status_watermark(BUSINESS_DATE)[1]
+
+    def marker(created_at, business_dt, message_id):
+        return f"""INSERT INTO markers (created_at, client_cd, processing_region_cd, snapshot_type_cd,
+            marker_type_cd, subject_area_cd, original_message_id, business_dt)
+            VALUES ('{created_at}', 'ACME', 'AMER', 'EOD', 'eodRegionSubjectAreaRawLoadComplete', 'positions',
+                    '{message_id}', '{business_dt}')"""
+
+    def error(created_at, message_id):
+        return f"""INSERT INTO error_logs (created_at, service_nm, table_nm, original_message_id)
+            VALUES ('{created_at}', 'eod_enrichment_service', 'positions', '{message_id}')"""
+
+    assert get_status_watermark(BUSINESS_DATE)[1] is None
+    watermark = write(marker('2024-03-14 18:00', BUSINESS_DATE, 'm1'))
+    assert str(watermark) == '2024-03-14 18:00:00'
+
+    # rows of other dates and their messages' errors are not behind the statuses of the date
+    assert write(marker('2024-03-16 09:00', '2024-03-16', 'm2')) == watermark
+    assert write(error('2024-03-16 09:05', 'm2')) == watermark
+    assert write("""INSERT INTO final_markers (created_at, marker, marker_type, original_message_id)
+        VALUES ('2024-03-16 10:00', '{"payload": {"business_date": "2024-03-16"}}', 'x', 'm2')""") == watermark
+
+    # the SOD date, an error of a message of the date and any row of a pricing id are
+    assert str(write(marker('2024-03-15 07:00', SOD_DATE, 's1'))) == '2024-03-15 07:00:00'
+    assert str(write(error('2024-03-15 08:00', 'm1'))) == '2024-03-15 08:00:00'
+    assert str(write(error('2024-03-16 11:00', 'p1'))) == '2024-03-16 11:00:00'
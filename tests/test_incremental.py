@@ -0,0 +1,31 @@
+"""
+Incremental refresh and _FETCH_EXECUTOR: no pool task may wait on work queued behind it in the
+same pool, or concurrent refreshes that occupy every worker deadlock for good.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from api import Newadmapi
+
+BUSINESS_DATE = '2024-03-14'
+
+
+def test_incremental_refresh_finishes_on_a_single_worker_pool(atls_db, adm_db, monkeypatch):
+    with adm_db.begin() as conn:
+        conn.exec_driver_sql("""CREATE TABLE reporting_loaders_markers (created_at timestamp, client_cd text,
+            processing_region_cd text, snapshot_type_cd text, marker_type_cd text, subject_area_cd text,
+            original_message_id text, business_dt date)""")
+    # one worker is the worst case of every worker busy: a task waiting on the pool never returns
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(Newadmapi, '_FETCH_EXECUTOR', pool)
+    results = []
+
+    def refresh():
+        results.append(Newadmapi._get_combined_workflow_status_incremental(
+            [('ACME', 'AMER')], BUSINESS_DATE, BUSINESS_DATE, 'ACME', 'AMER'))
+
+    thread = threading.Thread(target=refresh, daemon=True)
+    thread.start()
+    thread.join(30)
+    pool.shutdown(wait=False)
+    assert not thread.is_alive() and len(results) == 1
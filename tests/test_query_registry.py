@@ -0,0 +1,23 @@
+from api.atls_api import ATLS_WORKFLOW_TYPES
+from api.query_registry import ADM_QUERIES, ATLS_PLACEHOLDERS, ATLS_QUERIES, parse_sql_file
+
+
+def test_batch_and_workflow_statements_are_registered():
+    names = set(ATLS_QUERIES.names())
+    assert {'batch_ars_summary', 'batch_pricing_summary', 'batch_accounting_summary', 'batch_asof_summary'} <= names
+    assert set(ATLS_WORKFLOW_TYPES) <= names
+    assert 'batch_stage_events' in ADM_QUERIES.names()
+
+
+def test_semicolon_in_comment_drops_the_statement_with_a_warning(caplog):
+    content = """
+-- first
+SELECT 1;
+
+-- a note; with a semicolon
+-- second
+SELECT :client
+"""
+    statements = parse_sql_file(content, 'test.sql', ATLS_PLACEHOLDERS)
+    assert list(statements) == ['first']
+    assert "skipping SQL without a '-- name' header" in caplog.text
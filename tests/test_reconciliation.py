@@ -0,0 +1,111 @@
+"""
+reconcile() end to end, with SQLite files standing in for the ADM database (ADM_DATABASE_URL)
+and the datalake (IMPALA_URI).
+"""
+import json
+import time
+
+import pytest
+from sqlalchemy import create_engine
+
+from api import lake_counts
+from api.reconciliation import reconcile, reconcile_ndjson
+from api.snapshot_store import SnapshotStore
+from database.connectors import dispose_engines
+
+STATS_TABLE = """
+CREATE TABLE message_load_stats (client_cd text, processing_region_cd text, business_dt text,
+    snapshot_type_cd text, original_message_id text, subject_area_cd text, record_count integer,
+    created_at text)
+"""
+
+BUSINESS_DATE = '2024-03-14'
+
+
+def load(url, rows):
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(STATS_TABLE)
+        for client, snapshot, message_id, subject, record_count, created_at in rows:
+            conn.exec_driver_sql(
+                "INSERT INTO message_load_stats VALUES (?, 'AMER', ?, ?, ?, ?, ?, ?)",
+                (client, BUSINESS_DATE, snapshot, message_id, subject, record_count, created_at))
+    engine.dispose()
+
+
+@pytest.fixture
+def stats_dbs(tmp_path, monkeypatch):
+    adm_url, lake_url = f"sqlite:///{tmp_path / 'adm.db'}", f"sqlite:///{tmp_path / 'lake.db'}"
+    load(adm_url, [
+        ('ACME', 'EOD', 'm1', 'positions', 10, '2024-03-14 18:00:00'),   # matched
+        ('ACME', 'EOD', 'm1', 'taxlots', 5, '2024-03-14 18:01:00'),      # record count differs
+        ('ACME', 'EOD', 'm2', 'positions', 7, '2024-03-14 18:02:00'),    # twice in ADM, once in the lake
+        ('ACME', 'EOD', 'm2', 'positions', 7, '2024-03-14 18:03:00'),
+        ('ACME', 'SOD', 'm3', 'positions', 1, '2024-03-15 06:00:00'),    # not in the lake
+        ('OTHER', 'EOD', 'm9', 'positions', 1, '2024-03-14 18:00:00'),   # other client, ignored
+    ])
+    load(lake_url, [
+        ('ACME', 'EOD', 'm1', 'positions', 10, '2024-03-14 18:10:00'),
+        ('ACME', 'EOD', 'm1', 'taxlots', 4, '2024-03-14 18:11:00'),
+        ('ACME', 'EOD', 'm2', 'positions', 14, '2024-03-14 18:12:00'),
+        ('ACME', 'AOD', 'm4', 'taxlots', 3, '2024-03-14 20:00:00'),     # not in ADM
+        ('OTHER', 'EOD', 'm8', 'positions', 1, '2024-03-14 18:00:00'),
+    ])
+    monkeypatch.setenv('ADM_DATABASE_URL', adm_url)
+    monkeypatch.setenv('IMPALA_URI', lake_url)
+    monkeypatch.setenv('LAKE_COUNTS_DIR', str(tmp_path))
+    # the store is created at import: point the finished-date counts at the test directory too
+    monkeypatch.setattr(lake_counts, '_FINISHED_STORE', SnapshotStore(str(tmp_path), prefix='lake_counts'))
+    yield tmp_path
+    dispose_engines()
+
+
+def test_reconcile_reports_every_kind_of_mismatch(stats_dbs):
+    items = list(reconcile('ACME', 'AMER', BUSINESS_DATE))
+    mismatches = {(i['originalMessageId'], i['subject_area']): i for i in items if i['type'] == 'mismatch'}
+    progress = [i for i in items if i['type'] == 'progress']
+    summary = items[-1]
+
+    assert {key: m['status'] for key, m in mismatches.items()} == {
+        ('m1', 'taxlots'): 'count_mismatch',
+        ('m2', 'positions'): 'count_mismatch',
+        ('m3', 'positions'): 'missing_in_lake',
+        ('m4', 'taxlots'): 'missing_in_adm',
+    }
+    m1 = mismatches[('m1', 'taxlots')]
+    assert (m1['adm_messages'], m1['lake_messages'], m1['adm_records'], m1['lake_records']) == (1, 1, 5, 4)
+    m2 = mismatches[('m2', 'positions')]
+    assert (m2['adm_messages'], m2['lake_messages'], m2['adm_records'], m2['lake_records']) == (2, 1, 14, 14)
+    assert (mismatches[('m3', 'positions')]['snapshottypecd'], mismatches[('m3', 'positions')]['lake_records']) == (
+        'SOD', None)
+    assert (mismatches[('m4', 'taxlots')]['adm_records'], mismatches[('m4', 'taxlots')]['completed']) == (
+        None, '2024-03-14 20:00:00')
+
+    # one progress line per lake chunk: (AOD, taxlots), (EOD, positions), (EOD, taxlots); chunks
+    # finish concurrently, so a line may already count chunks that are emitted after it
+    assert len(progress) == 3 and progress[-1]['partitions_done'] == 3
+    assert {p['partitions_total'] for p in progress} == {3}
+    assert {k: summary[k] for k in ('adm_rows', 'lake_rows', 'matched', 'count_mismatch',
+                                    'missing_in_lake', 'missing_in_adm', 'lake_source')} == {
+        'adm_rows': 4, 'lake_rows': 4, 'matched': 1, 'count_mismatch': 2,
+        'missing_in_lake': 1, 'missing_in_adm': 1, 'lake_source': 'lake'}
+
+
+def test_finished_date_is_served_from_the_stored_counts(stats_dbs):
+    first = [json.loads(line) for line in reconcile_ndjson('ACME', 'AMER', BUSINESS_DATE)]
+    # the job stores the counts right after it reports done
+    deadline = time.monotonic() + 5
+    while not list(stats_dbs.glob('lake_counts_*.pickle')) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert list(stats_dbs.glob('lake_counts_*.pickle'))
+
+    # the lake is gone, the stored counts of the finished date answer instead
+    (stats_dbs / 'lake.db').unlink()
+    dispose_engines()
+    second = [json.loads(line) for line in reconcile_ndjson('ACME', 'AMER', BUSINESS_DATE)]
+
+    def mismatches(lines):
+        return sorted((i['originalMessageId'], i['subject_area'], i['status'])
+                      for i in lines if i['type'] == 'mismatch')
+    assert mismatches(second) == mismatches(first)
+    assert (first[-1]['lake_source'], second[-1]['lake_source']) == ('lake', 'cache')
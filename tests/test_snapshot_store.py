@@ -0,0 +1,70 @@
+"""
+SnapshotStore across processes: concurrent writers never reuse a version, and one process at a
+time holds the materializer leader lock.
+"""
+import multiprocessing
+import time
+
+from api import materializer
+from api.snapshot_store import SnapshotStore
+
+BUSINESS_DATE = '2024-03-14'
+WRITES = 10
+
+
+def write_versions(directory, queue):
+    store = SnapshotStore(directory)
+    queue.put([store.write(BUSINESS_DATE, {'workflows': []})['version'] for _ in range(WRITES)])
+
+
+def test_concurrent_writers_get_distinct_versions(tmp_path):
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    processes = [context.Process(target=write_versions, args=(str(tmp_path), queue)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    versions = [version for _ in processes for version in queue.get(timeout=30)]
+    for process in processes:
+        process.join(30)
+
+    assert sorted(versions) == list(range(1, 4 * WRITES + 1))
+    assert SnapshotStore(str(tmp_path)).read(BUSINESS_DATE)['version'] == 4 * WRITES
+
+
+def test_one_leader_at_a_time(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    leader = store.try_leader_lock('materializer')
+    assert leader is not None
+    # flock is per open file: another open of the lock file, as in another worker, is refused
+    assert SnapshotStore(str(tmp_path)).try_leader_lock('materializer') is None
+    leader.close()
+    successor = SnapshotStore(str(tmp_path)).try_leader_lock('materializer')
+    assert successor is not None
+    successor.close()
+    assert store.info() == []
+
+
+def test_only_the_leading_materializer_computes(tmp_path, monkeypatch):
+    runs = []
+    monkeypatch.setattr(materializer, 'run_once', lambda dates, store: runs.append(store.directory))
+    # two workers of one host: each has its own store over the shared directory
+    first = materializer.Materializer(interval=0.05, store=SnapshotStore(str(tmp_path)))
+    second = materializer.Materializer(interval=0.05, store=SnapshotStore(str(tmp_path)))
+    first.start()
+    deadline = time.monotonic() + 5
+    while not first.is_leader and time.monotonic() < deadline:
+        time.sleep(0.01)
+    second.start()
+    time.sleep(0.3)
+    assert first.is_leader and not second.is_leader
+
+    # the leader stops: the other takes over at its next interval
+    first.stop()
+    first.join(5)
+    deadline = time.monotonic() + 5
+    while not second.is_leader and time.monotonic() < deadline:
+        time.sleep(0.01)
+    took_over = second.is_leader
+    second.stop()
+    second.join(5)
+    assert took_over and runs and not first.is_alive() and not second.is_alive()
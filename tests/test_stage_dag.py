@@ -0,0 +1,94 @@
+import pytest
+
+from api import status_engine
+from api.stage_dag import WORKFLOW_DAG
+from api.status_engine import _unblocked, compute_snapshot
+
+BUSINESS_DATE = '2024-03-14'
+
+
+def workflow(workflow_type, status='pending', last_updated=None):
+    return {'client_cd': 'ACME', 'processing_region_cd': 'AMER', 'workflow_type': workflow_type,
+            'status': status, 'status_with_long_running': status, 'last_updated': last_updated}
+
+
+def test_flag_anomalies_returns_flagged_copies():
+    workflows = [workflow('eod_marker'), workflow('eod_raw', 'completed', '10:00'), workflow('eod_enrich')]
+    flagged, anomalies = WORKFLOW_DAG.flag_anomalies(workflows)
+
+    assert [a['workflow_type'] for a in anomalies] == ['eod_raw']
+    assert flagged[1] == dict(workflows[1], anomaly='out_of_order', blocked_by='eod_marker')
+    assert flagged[0] is workflows[0] and flagged[2] is workflows[2]
+    assert 'anomaly' not in workflows[1]
+    # an in-order list comes back as is
+    in_order = [workflow('eod_marker', 'completed'), workflow('eod_raw', 'inprogress')]
+    assert WORKFLOW_DAG.flag_anomalies(in_order) == (in_order, [])
+
+
+@pytest.fixture
+def atls_by_pair():
+    markers = ('eod_marker', 'aod_marker', 'sod_marker')
+    atls_by_pair = {
+        ('ACME', 'AMER'): {wt: workflow(wt) for wt in markers},
+        ('ACME', 'EMEA'): {wt: workflow(wt, 'failed') for wt in markers},
+        ('BETA', 'AMER'): dict({wt: workflow(wt) for wt in markers}, aod_marker=workflow('aod_marker', 'inprogress')),
+        ('BETA', 'EMEA'): {wt: workflow(wt, 'failed') for wt in markers},
+    }
+    atls_by_pair[('BETA', 'EMEA')]['sod_marker'] = workflow('sod_marker', 'completed')
+    return atls_by_pair
+
+
+def test_failed_parents_block_the_adm_fetch(atls_by_pair):
+    assert WORKFLOW_DAG.blocked_by('eod_raw', atls_by_pair[('ACME', 'EMEA')]) is None
+    assert WORKFLOW_DAG.blocked_by('eod_raw', atls_by_pair[('ACME', 'EMEA')], failed_blocks=True) == 'eod_marker'
+    assert WORKFLOW_DAG.blocked_by('eod_raw', atls_by_pair[('ACME', 'AMER')], unstarted_blocks=False) is None
+    # with the ATLS-empty fallback a pair that has not started is fetched: its ADM rows answer
+    assert _unblocked(list(atls_by_pair), atls_by_pair, ['eod_raw', 'aod_raw', 'sod_raw']) == [
+        ('ACME', 'AMER'), ('BETA', 'AMER'), ('BETA', 'EMEA')]
+
+
+def test_not_started_parents_block_the_adm_fetch_without_the_fallback(atls_by_pair, monkeypatch):
+    monkeypatch.setattr(status_engine, 'ENABLE_ADM_FALLBACK_WHEN_ATLS_EMPTY', False)
+    assert _unblocked(list(atls_by_pair), atls_by_pair, ['eod_raw', 'aod_raw', 'sod_raw']) == [
+        ('BETA', 'AMER'), ('BETA', 'EMEA')]
+
+
+@pytest.fixture
+def sections(monkeypatch):
+    """compute_snapshot over two pairs with stand-in sections; records the pairs each section got"""
+    fetched = {}
+
+    def adm_statuses(business_date, pairs):
+        fetched['adm'] = pairs
+        # ACME/AMER has no ATLS rows; its ADM markers (fallback) show eod_raw completed
+        return {('ACME', 'AMER'): [dict(workflow('eod_raw', 'completed', '10:00'), business_dt=BUSINESS_DATE)]}
+
+    def pricing_statuses(business_date, pairs):
+        fetched['pricing'] = pairs
+        return {}, {}
+    monkeypatch.setattr(status_engine, 'get_adm_statuses', adm_statuses)
+    monkeypatch.setattr(status_engine, 'get_pricing_statuses', pricing_statuses)
+    monkeypatch.setattr(status_engine, 'get_clients_regions', lambda: [('ACME', 'AMER'), ('BETA', 'AMER')])
+    return fetched
+
+
+def test_pairs_without_atls_rows_are_evaluated_and_flagged(sections, monkeypatch):
+    monkeypatch.setattr(status_engine, 'get_batch_workflow_statuses', lambda *args, **kwargs: {})
+    snapshot = compute_snapshot(BUSINESS_DATE)
+
+    assert sections['adm'] == [('ACME', 'AMER'), ('BETA', 'AMER')] and not snapshot['partial_sections']
+    eod_raw = next(w for w in snapshot['workflows']
+                   if w['client_cd'] == 'ACME' and w['workflow_type'] == 'eod_raw')
+    assert (eod_raw['status'], eod_raw['anomaly'], eod_raw['blocked_by']) == ('completed', 'out_of_order', 'eod_marker')
+
+
+def test_an_atls_failure_is_partial_and_prunes_nothing(sections, monkeypatch):
+    def fail(business_date, pairs, raise_errors=False):
+        assert raise_errors
+        raise RuntimeError('ATLS is down')
+    monkeypatch.setattr(status_engine, 'get_batch_workflow_statuses', fail)
+    monkeypatch.setattr(status_engine, 'ENABLE_ADM_FALLBACK_WHEN_ATLS_EMPTY', False)
+    snapshot = compute_snapshot(BUSINESS_DATE)
+
+    assert snapshot['partial_sections'] == ['atls']
+    assert sections['adm'] == sections['pricing'] == [('ACME', 'AMER'), ('BETA', 'AMER')]
@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from api import status_deltas
+from api.status_deltas import StatusDeltaLog, get_delta_log, status_delta
+
+BUSINESS_DATE = '2024-03-14'
+T0 = datetime(2024, 3, 14, 18, 0)
+
+
+def workflow(client, workflow_type, status='pending', last_updated=None):
+    return {'client_cd': client, 'processing_region_cd': 'AMER', 'workflow_type': workflow_type,
+            'status': status, 'status_with_long_running': status, 'last_updated': last_updated}
+
+
+def snapshot(workflows, minutes, partial_sections=()):
+    return {'business_date': BUSINESS_DATE, 'computed_at': T0 + timedelta(minutes=minutes),
+            'workflows': workflows, 'partial_sections': list(partial_sections)}
+
+
+@pytest.fixture
+def log():
+    log = StatusDeltaLog(BUSINESS_DATE)
+    log.observe(snapshot([workflow('ACME', 'eod_raw'), workflow('ACME', 'eod_enrich'), workflow('BETA', 'eod_raw')], 0))
+    return log
+
+
+def test_token_only_returns_rows_changed_after_it(log):
+    first = log.delta()
+    assert first['full'] and len(first['data']) == 3
+
+    log.observe(snapshot([workflow('ACME', 'eod_raw', 'completed', T0), workflow('ACME', 'eod_enrich'),
+                          workflow('BETA', 'eod_raw')], 1))
+    second = log.delta(first['token'])
+    assert (second['full'], [w['workflow_type'] for w in second['data']], second['removed']) == (
+        False, ['eod_raw'], [])
+
+    # the same token can be polled again: it still sees that change
+    assert log.delta(first['token']) == second
+    # an unchanged snapshot keeps the version, so the newest token gets nothing
+    log.observe(snapshot([workflow('ACME', 'eod_raw', 'completed', T0), workflow('ACME', 'eod_enrich'),
+                          workflow('BETA', 'eod_raw')], 2))
+    assert log.token == second['token']
+    assert log.delta(second['token'])['data'] == []
+
+
+def test_removed_rows_are_listed_until_they_return(log):
+    token = log.token
+    log.observe(snapshot([workflow('ACME', 'eod_raw'), workflow('ACME', 'eod_enrich')], 1))
+    delta = log.delta(token)
+    assert (delta['data'], delta['removed']) == ([], [['BETA', 'AMER', 'eod_raw']])
+
+    # the row comes back: it is a changed row again and no longer removed
+    log.observe(snapshot([workflow('ACME', 'eod_raw'), workflow('ACME', 'eod_enrich'), workflow('BETA', 'eod_raw')], 2))
+    delta = log.delta(token)
+    assert ([w['client_cd'] for w in delta['data']], delta['removed']) == (['BETA'], [])
+
+
+@pytest.mark.parametrize('token', [None, '', 'other.1', 'garbage', 'GEN.x', 'GEN.99'])
+def test_foreign_or_unknown_tokens_get_the_full_payload(log, token):
+    token = token.replace('GEN', log.generation) if token else token
+    delta = log.delta(token)
+    assert (delta['full'], len(delta['data']), delta['token']) == (True, 3, log.token)
+
+
+def test_a_token_of_another_log_generation_gets_the_full_payload(log):
+    token = log.token
+    other = StatusDeltaLog(BUSINESS_DATE)  # e.g. another worker, or this date's log after eviction
+    other.observe(snapshot([workflow('ACME', 'eod_raw')], 0))
+    assert other.delta(token)['full'] is True
+    assert other.token.split('.')[0] != token.split('.')[0]
+
+
+def test_older_snapshots_are_ignored(log):
+    token = log.token
+    log.observe(snapshot([workflow('ACME', 'eod_raw', 'completed', T0)], -1))
+    assert log.token == token and log.delta(token)['data'] == []
+
+
+def test_partial_snapshots_are_sent_in_full_and_not_recorded(monkeypatch):
+    monkeypatch.setattr(status_deltas, '_LOGS', status_deltas.OrderedDict())
+    complete = snapshot([workflow('ACME', 'eod_raw')], 0)
+    token = status_delta(complete)['token']
+
+    partial = snapshot([workflow('ACME', 'eod_raw', 'completed', T0)], 1, partial_sections=['adm'])
+    assert status_delta(partial, token) == {'full': True, 'data': partial['workflows'], 'removed': [], 'token': None}
+    assert get_delta_log(BUSINESS_DATE).token == token
+
+
+def test_least_recently_used_dates_are_evicted(monkeypatch):
+    monkeypatch.setattr(status_deltas, '_LOGS', status_deltas.OrderedDict())
+    monkeypatch.setattr(status_deltas, 'STATUS_DELTA_DATES', 2)
+    first = get_delta_log('2024-03-12')
+    get_delta_log('2024-03-13')
+    get_delta_log('2024-03-12')  # touched, so 03-13 is the oldest
+    get_delta_log('2024-03-14')
+    assert list(status_deltas._LOGS) == ['2024-03-12', '2024-03-14']
+    assert get_delta_log('2024-03-12') is first
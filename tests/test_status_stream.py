@@ -0,0 +1,74 @@
+"""
+NotifyListener: a NOTIFY on the ATLS database wakes the broadcaster of its business date, and
+only connection errors are retried.
+"""
+import threading
+
+import pytest
+
+from api import status_stream
+from api.status_stream import NotifyListener
+
+BUSINESS_DATE = '2024-03-14'
+
+
+class Broadcaster:
+    def __init__(self):
+        self.woken = threading.Event()
+
+    def wake(self):
+        self.woken.set()
+
+
+@pytest.fixture
+def broadcasters(monkeypatch):
+    broadcasters = {BUSINESS_DATE: Broadcaster(), '2024-03-13': Broadcaster()}
+    monkeypatch.setattr(status_stream, '_BROADCASTERS', broadcasters)
+    return broadcasters
+
+
+def test_listener_stops_on_a_non_transient_error(monkeypatch):
+    calls = []
+
+    def listen():
+        calls.append(1)
+        raise TypeError('not a connection problem')
+    listener = NotifyListener()
+    monkeypatch.setattr(listener, '_listen', listen)
+    listener.run()
+    assert calls == [1]
+
+
+def test_listener_retries_connection_errors(monkeypatch):
+    listener = NotifyListener()
+    calls = []
+
+    def listen():
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError('connection reset')
+        return False
+    monkeypatch.setattr(listener, '_listen', listen)
+    monkeypatch.setattr(listener._stopped, 'wait', lambda timeout: False)
+    listener.run()
+    assert calls == [1, 1]
+
+
+def test_notify_wakes_the_broadcaster_of_its_date(atls_db, broadcasters, monkeypatch):
+    monkeypatch.setattr(status_stream, 'STATUS_STREAM_POLL_SECONDS', 0.2)
+    listener = NotifyListener()
+    listener.start()
+    try:
+        # NOTIFY until the listener's LISTEN is in place
+        for _ in range(50):
+            with atls_db.connect() as conn:
+                conn.exec_driver_sql(f"SELECT pg_notify('{listener.channel}', '{BUSINESS_DATE}')")
+                conn.commit()
+            if broadcasters[BUSINESS_DATE].woken.wait(0.1):
+                break
+        assert broadcasters[BUSINESS_DATE].woken.is_set()
+        assert not broadcasters['2024-03-13'].woken.is_set()
+    finally:
+        listener.stop()
+        listener.join(5)
+    assert not listener.is_alive()
@@ -0,0 +1,394 @@
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime
+from functools import lru_cache
+from api.stage_dag import WORKFLOW_DAG
+
+"""
+workflow_eval.py
+
+Workflow evaluation over grouped combined ADM rows (CombinedRow tuples): expected subjects and
+stage marker filters, the per-workflow evaluators, WorkflowRowClassifier and evaluate_pairs.
+Pure functions of their arguments with no connections, executors or caches created at import,
+so spawned evaluation workers (Newadmapi.evaluate_pairs_sharded) import only this module.
+"""
+
+logger = logging.getLogger(__name__)
+
+LONG_RUNNING_THRESHOLD_MINUTES = 30
+ENABLE_ADM_FALLBACK_WHEN_ATLS_EMPTY = True  # If True, evaluate status from ADM markers when ATLS IDs are missing
+
+EXPECTED_SUBJECTS = {
+    "eodpx_raw": ["valuation_prices"],
+    "eodpx_enrich": ["valuation_prices"],
+    "eodpx_roll": ["valuation_prices"],
+    "eodpx_mart": ["valuation_prices"],
+    "eodpx_final": ["valuation_prices"],
+
+    "eod_raw": ["positions", "taxlots", "transactions", "cash_settlements", "disposal_lots"],
+    "eod_enrich": ["positions", "taxlots", "transactions", "cash_settlements", "disposal_lots"],
+    "eod_roll": ["positions", "taxlots", "transactions", "cash_settlements", "disposal_lots"],
+    "eod_mart": ["positions", "taxlots", "transactions", "cash_settlements", "disposal_lots"],
+    "eod_final": ["positions", "taxlots", "transactions", "cash_settlements", "disposal_lots"],
+
+    "aod_raw": ["positions", "taxlots"],
+    "aod_enrich": ["positions", "taxlots"],
+    "aod_roll": ["positions", "taxlots"],
+    "aod_mart": ["positions", "taxlots"],
+    "aod_final": ["positions", "taxlots"],
+
+    "sod_raw": ["positions", "taxlots", "transactions", "cash_settlements", "disposal_lots"],
+    "sod_enrich": ["positions", "taxlots", "transactions", "cash_settlements", "disposal_lots"],
+    "sod_roll": ["positions", "taxlots", "transactions", "cash_settlements", "disposal_lots"],
+    "sod_mart": ["positions", "taxlots", "transactions", "cash_settlements", "disposal_lots"],
+    "sod_final": ["positions", "taxlots", "transactions", "cash_settlements", "disposal_lots"]
+}
+
+# Stage → marker_type_cd filtering
+STAGE_MARKER_FILTERS = {
+    ("EOD", "RAW"): "eodRegionSubjectAreaRawLoadComplete",
+    ("EOD", "ENRICH"): "eodRegionSubjectAreaEnriched",
+    ("EOD", "ROLL"): "eodRegionSubjectAreaRollupComplete",
+    ("EOD", "MART"): {
+        "eodRegionPositionsMartLoadComplete",
+        "eodRegionTaxlotsMartLoadComplete",
+        "eodRegionTransactionsMartLoadComplete",
+        "eodRegionDisposalLotsMartLoadComplete",
+        "eodRegionCashSettlementsMartLoadComplete",
+    },
+
+    ("SOD", "RAW"): "sodRegionSubjectAreaRawLoadComplete",
+    ("SOD", "ENRICH"): "sodRegionSubjectAreaEnriched",
+    ("SOD", "ROLL"): "sodRegionSubjectAreaRollupComplete",
+    ("SOD", "MART"): {
+        "sodRegionPositionsMartLoadComplete",
+        "sodRegionTaxlotsMartLoadComplete",
+        "sodRegionTransactionsMartLoadComplete",
+        "sodRegionDisposalLotsMartLoadComplete",
+        "sodRegionCashSettlementsMartLoadComplete",
+    },
+
+    ("AOD", "RAW"): "asOfRegionSubjectAreaRawLoadComplete",
+    ("AOD", "ENRICH"): "asOfRegionSubjectAreaEnriched",
+    ("AOD", "ROLL"): "asOfRegionSubjectAreaRollupComplete",
+    ("AOD", "MART"): "asOfRegionSubjectAreaMartLoadComplete",
+    ("AOD", "FINAL"): "asOfRegionsStatementsPublished",
+}
+
+# Marker completing a subject of an AOD message per stage, for AodProgressTracker
+AOD_STAGE_MARKERS = {stage: marker for (snapshot, stage), marker in STAGE_MARKER_FILTERS.items() if snapshot == "AOD"}
+
+
+@lru_cache(maxsize=64)
+def _norm_snapshot(v: str) -> str:
+    return (v or "").strip().upper()
+
+
+# ----------------------------------
+# Evaluators (unchanged)
+# ----------------------------------
+
+
+def evaluate_workflow_status(subjects_found, expected_subjects, first_event_time):
+    if not subjects_found:
+        return "pending"
+    missing = set(expected_subjects) - set(subjects_found)
+    if not missing:
+        return "completed"
+    elif first_event_time:
+        age = (datetime.now() - first_event_time).total_seconds() / 60
+        if age > LONG_RUNNING_THRESHOLD_MINUTES:
+            return "long_running"
+        return "inprogress"
+    return "pending"
+
+
+def evaluate_aod_stage(rows, total_count):
+    positions_ids = {r.original_message_id for r in rows if r.subject_area_cd == "positions"}
+    taxlots_ids = {r.original_message_id for r in rows if r.subject_area_cd == "taxlots"}
+
+    pos_count, tax_count = len(positions_ids), len(taxlots_ids)
+
+    if total_count == 0:
+        return "pending", pos_count, tax_count
+    if pos_count == total_count and tax_count == total_count:
+        return "completed", pos_count, tax_count
+    elif pos_count or tax_count:
+        return "inprogress", pos_count, tax_count
+    return "pending", pos_count, tax_count
+
+
+def evaluate_aod_final(rows, total_count):
+    positions_ids = {
+        r.original_message_id
+        for r in rows
+        if r.marker_type_cd == "asOfRegionsStatementsPublished" and r.subject_area_cd == "positions"
+    }
+    taxlots_ids = {
+        r.original_message_id
+        for r in rows
+        if r.marker_type_cd == "asOfRegionsStatementsPublished" and r.subject_area_cd == "taxlots"
+    }
+    global_marker = any(r.marker_type_cd == "eodAllRegionStatementsPublished" for r in rows)
+
+    pos_count, tax_count = len(positions_ids), len(taxlots_ids)
+
+    if total_count == 0:
+        return "pending", pos_count, tax_count
+    if pos_count == total_count and tax_count == total_count and global_marker:
+        return "completed", pos_count, tax_count
+    elif pos_count or tax_count or global_marker:
+        return "inprogress", pos_count, tax_count
+    return "pending", pos_count, tax_count
+
+
+
+def evaluate_workflow(client, region, workflow_type, expected_subjects, message_entries, grouped_rows,
+                      business_date, sod_date, aod_progress=None):
+    """
+    Evaluate one workflow for one (client, region) from the grouped ADM rows and the
+    ATLS message entries of that pair. Returns the workflow dict.
+    """
+    snapshot = _norm_snapshot(workflow_type.split("_")[0])
+    stage = workflow_type.split("_")[1].upper()
+    target_date = sod_date if snapshot == "SOD" else business_date
+    key = (client, region, snapshot, target_date)
+
+    message_items = [
+        m for m in message_entries
+        if m["snapshot"] == snapshot and m["business_dt"] == target_date
+    ]
+    message_ids = [m["id"] for m in message_items]
+
+    acc_ids = [m["id"] for m in message_items if m.get("source") == "ACCOUNTING"]
+    prc_ids = [m["id"] for m in message_items if m.get("source") == "PRICING"]
+    logger.debug(
+        "ATLS key [%s|%s|%s|%s] → total=%d acc=%d%s prc=%d%s",
+        client, region, snapshot, target_date,
+        len(message_ids), len(acc_ids), f" sample={acc_ids[:3]}" if acc_ids else "",
+        len(prc_ids), f" sample={prc_ids[:3]}" if prc_ids else "",
+    )
+
+    candidate_rows = grouped_rows.get(key, [])
+    marker_filter = STAGE_MARKER_FILTERS.get((snapshot, stage))
+    id_set = set(message_ids)
+
+    if snapshot == "AOD" and stage == "FINAL":
+        workflow_rows = [
+            r for r in candidate_rows
+            if (not id_set or r.original_message_id in id_set
+                or r.marker_type_cd == "eodAllRegionStatementsPublished")
+        ]
+    else:
+        workflow_rows = [
+            r for r in candidate_rows
+            if (not id_set or r.original_message_id in id_set)
+            and (
+                not marker_filter or (
+                    isinstance(marker_filter, set) and r.marker_type_cd in marker_filter
+                ) or (
+                    isinstance(marker_filter, str) and r.marker_type_cd == marker_filter
+                )
+            )
+        ]
+
+    return evaluate_workflow_rows(client, region, workflow_type, expected_subjects, message_ids,
+                                  workflow_rows, target_date, aod_progress)
+
+
+def evaluate_workflow_rows(client, region, workflow_type, expected_subjects, message_ids, workflow_rows,
+                           target_date, aod_progress=None):
+    """
+    Status of one workflow from the rows already selected for it (see WorkflowRowClassifier).
+    message_ids are the ATLS ids of the (client, region, snapshot, target_date) key, in ATLS order.
+    aod_progress (AodProgressTracker of the key) answers AOD counts without rescanning the rows.
+    """
+    stage_start = time.time()
+    snapshot = _norm_snapshot(workflow_type.split("_")[0])
+    stage = workflow_type.split("_")[1].upper()
+
+    atls_ids = message_ids
+    if aod_progress is not None and atls_ids:
+        aod_progress.expect(atls_ids)
+
+    if ENABLE_ADM_FALLBACK_WHEN_ATLS_EMPTY and not message_ids and workflow_rows:
+        adm_ids = list({r.original_message_id for r in workflow_rows if r.original_message_id})
+        if adm_ids:
+            logger.warning(
+                "ATLS empty, using ADM fallback IDs for [%s|%s|%s|%s]: %s",
+                client, region, snapshot + "_" + stage, target_date, adm_ids[:3] + (["..."] if len(adm_ids) > 3 else [])
+            )
+            message_ids = adm_ids
+
+    found = {r.subject_area_cd for r in workflow_rows}
+    # in expected_subjects order: set order varies between processes
+    subjects_found = [s for s in expected_subjects if s in found]
+    missing = [s for s in expected_subjects if s not in found]
+
+    first_event_time = min([r.last_updated for r in workflow_rows if r.last_updated], default=None)
+
+    progress = None
+    if snapshot == "AOD" and aod_progress is not None and atls_ids:
+        progress = aod_progress.counts(stage)
+        total_count = progress["total"]
+        status, pos_count, tax_count = aod_progress.stage_status(stage)
+    elif snapshot == "AOD":
+        total_count = len(message_ids)
+        if stage == "FINAL":
+            status, pos_count, tax_count = evaluate_aod_final(workflow_rows, total_count)
+        else:
+            status, pos_count, tax_count = evaluate_aod_stage(workflow_rows, total_count)
+    else:
+        status = evaluate_workflow_status(subjects_found, expected_subjects, first_event_time)
+        pos_count, tax_count, total_count = None, None, None
+
+        failed_rows = [r for r in workflow_rows if r.status == "failed"]
+        if failed_rows:
+            service_nm_list = [(fr.marker_type_cd or "").lower() for fr in failed_rows]
+            if stage == "RAW" and any("raw" in s for s in service_nm_list):
+                status = "failed"
+            elif stage == "ENRICH" and any("enrich" in s for s in service_nm_list):
+                status = "failed"
+            elif stage in ("ROLL", "ROLLUP") and any(("roll" in s or "rollup" in s) for s in service_nm_list):
+                status = "failed"
+            elif stage == "MART" and any("mart" in s for s in service_nm_list):
+                status = "failed"
+            elif stage == "FINAL" and any("final" in s for s in service_nm_list):
+                status = "failed"
+
+    last_updated = max([r.last_updated for r in workflow_rows if r.last_updated], default=None)
+    first_oid = message_ids[0] if message_ids else next((r.original_message_id for r in workflow_rows if r.original_message_id), None)
+
+    workflow = {
+        "client_cd": client,
+        "processing_region_cd": region,
+        "workflow_type": workflow_type,
+        "snapshot_type_cd": snapshot,
+        "status": status,
+        "status_with_long_running": status,
+        "subjects_found": subjects_found,
+        "last_updated": last_updated,
+        "business_dt": target_date,
+        "original_message_id": first_oid,
+        "total_count": total_count,
+        "positions_count": pos_count if snapshot == "AOD" else None,
+        "taxlots_count": tax_count if snapshot == "AOD" else None,
+    }
+    if progress is not None:
+        workflow["percent_complete"] = aod_progress.percent_complete(stage)
+        workflow["straggler_count"] = progress["total"] - progress["complete"]
+
+    elapsed = time.time() - stage_start
+    logger.debug(
+        "Stage [%s|%s|%s] status=%s subjects=%s missing=%s rows=%d elapsed=%.3fs",
+        client, region, workflow_type, status, subjects_found, missing, len(workflow_rows), elapsed
+    )
+    return workflow
+
+
+# ----------------------------------
+# Compiled row classifier
+# ----------------------------------
+
+GLOBAL_AOD_FINAL_MARKER = "eodAllRegionStatementsPublished"
+
+
+class WorkflowRowClassifier:
+    """
+    Routes grouped ADM rows to their (client, region, workflow_type) buckets in one pass.
+    Built once from STAGE_MARKER_FILTERS / EXPECTED_SUBJECTS:
+      by_marker[snapshot][marker_type_cd] -> workflow types whose marker filter accepts it
+      catch_all[snapshot]                 -> workflow types without a marker filter
+    A row passes a key's id filter when the key has no ATLS ids or its id is in the key's
+    id set; aod_final also accepts the global marker regardless of id (same rules as
+    evaluate_workflow).
+    """
+
+    def __init__(self, stage_marker_filters=None, expected_subjects=None):
+        stage_marker_filters = STAGE_MARKER_FILTERS if stage_marker_filters is None else stage_marker_filters
+        expected_subjects = EXPECTED_SUBJECTS if expected_subjects is None else expected_subjects
+        self.by_marker = defaultdict(dict)
+        self.catch_all = defaultdict(list)
+        self.id_exempt = {}
+        for workflow_type in expected_subjects:
+            snapshot = _norm_snapshot(workflow_type.split("_")[0])
+            stage = workflow_type.split("_")[1].upper()
+            marker_filter = stage_marker_filters.get((snapshot, stage))
+            if snapshot == "AOD" and stage == "FINAL":
+                self.catch_all[snapshot].append(workflow_type)
+                self.id_exempt[workflow_type] = frozenset([GLOBAL_AOD_FINAL_MARKER])
+            elif not marker_filter:
+                self.catch_all[snapshot].append(workflow_type)
+            else:
+                markers = [marker_filter] if isinstance(marker_filter, str) else marker_filter
+                for marker_type in markers:
+                    self.by_marker[snapshot].setdefault(marker_type, []).append(workflow_type)
+        self.snapshots = frozenset(self.by_marker) | frozenset(self.catch_all)
+
+    def classify(self, grouped_rows, id_sets, business_date, sod_date, pairs=None):
+        """
+        grouped_rows: {(client, region, snapshot, business_dt): [rows]}
+        id_sets:      {(client, region, snapshot, business_dt): frozenset of ATLS ids}
+        pairs:        optional set of (client, region) to keep
+        Returns {(client, region, workflow_type): [rows]}.
+        """
+        buckets = defaultdict(list)
+        for (client, region, snapshot, bdt), rows in grouped_rows.items():
+            if snapshot not in self.snapshots:
+                continue
+            if pairs is not None and (client, region) not in pairs:
+                continue
+            if bdt != (sod_date if snapshot == "SOD" else business_date):
+                continue
+            routes = self.by_marker.get(snapshot, {})
+            catch_all = [(wt, buckets[(client, region, wt)], self.id_exempt.get(wt))
+                         for wt in self.catch_all.get(snapshot, ())]
+            ids = id_sets.get((client, region, snapshot, bdt))
+            for r in rows:
+                marker_type = r.marker_type_cd
+                id_ok = not ids or r.original_message_id in ids
+                if id_ok:
+                    for workflow_type in routes.get(marker_type, ()):
+                        buckets[(client, region, workflow_type)].append(r)
+                for workflow_type, bucket, exempt in catch_all:
+                    if id_ok or (exempt and marker_type in exempt):
+                        bucket.append(r)
+        return buckets
+
+
+WORKFLOW_CLASSIFIER = WorkflowRowClassifier()
+
+
+def index_message_ids(atls_message_map):
+    """{(client, region, snapshot, business_dt): [ids in ATLS order]} in one pass over the ATLS entries"""
+    ids_by_key = defaultdict(list)
+    for (client, region), entries in atls_message_map.items():
+        for m in entries:
+            ids_by_key[(client, region, m["snapshot"], m["business_dt"])].append(m["id"])
+    return ids_by_key
+
+
+def evaluate_pairs(pairs, grouped_rows, ids_by_key, business_date, sod_date):
+    """Route every row to its workflow bucket once, then evaluate each bucket, pair by pair"""
+    id_sets = {k: frozenset(v) for k, v in ids_by_key.items()}
+    buckets = WORKFLOW_CLASSIFIER.classify(grouped_rows, id_sets, business_date, sod_date, set(pairs))
+
+    workflows = []
+    for client, region in pairs:
+        pair_workflows = []
+        for workflow_type, expected_subjects in EXPECTED_SUBJECTS.items():
+            snapshot = _norm_snapshot(workflow_type.split("_")[0])
+            target_date = sod_date if snapshot == "SOD" else business_date
+            pair_workflows.append(evaluate_workflow_rows(
+                client, region, workflow_type, expected_subjects,
+                ids_by_key.get((client, region, snapshot, target_date), []),
+                buckets.get((client, region, workflow_type), []), target_date))
+        # markers of a stage whose upstream stage has none yet are flagged, not hidden
+        pair_workflows, anomalies = WORKFLOW_DAG.flag_anomalies(pair_workflows)
+        for anomaly in anomalies:
+            logger.warning("Out-of-order stage for %s/%s: %s is %s before %s started", client, region,
+                           anomaly["workflow_type"], anomaly["status"], anomaly["blocked_by"])
+        workflows.extend(pair_workflows)
+    return workflows
+